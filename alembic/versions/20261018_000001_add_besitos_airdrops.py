@@ -0,0 +1,51 @@
+"""add_besitos_airdrops
+
+Revision ID: 20261018_000001
+Revises: 20260320_000002
+Create Date: 2026-10-18 00:00:01.000000+00:00
+
+Tabla de campañas de airdrop masivo de besitos. La clave de campaña es
+única (idempotencia) y last_user_id guarda el cursor keyset del progreso.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_000001'
+down_revision: Union[str, None] = '20260320_000002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'besitos_airdrops',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('campaign_key', sa.String(length=64), nullable=False),
+        sa.Column('segment', sa.String(length=30), nullable=False),
+        sa.Column('min_level', sa.Integer(), nullable=True),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.Column('reason', sa.String(length=255), nullable=False),
+        sa.Column('admin_id', sa.BigInteger(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('credited_count', sa.Integer(), nullable=False),
+        sa.Column('last_user_id', sa.BigInteger(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        op.f('ix_besitos_airdrops_campaign_key'),
+        'besitos_airdrops',
+        ['campaign_key'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_besitos_airdrops_campaign_key'), table_name='besitos_airdrops')
+    op.drop_table('besitos_airdrops')
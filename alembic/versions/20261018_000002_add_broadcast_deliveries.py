@@ -0,0 +1,72 @@
+"""add_broadcast_deliveries
+
+Revision ID: 20261018_000002
+Revises: 20261018_000001
+Create Date: 2026-10-18 00:00:02.000000+00:00
+
+Broadcasts por DM a segmentos de usuarios. broadcast_deliveries guarda el
+estado por destinatario para que un broadcast interrumpido se reanude
+sin reenviar lo ya entregado.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_000002'
+down_revision: Union[str, None] = '20261018_000001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'broadcasts',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('segment', sa.String(length=30), nullable=False),
+        sa.Column('content_type', sa.String(length=20), nullable=False),
+        sa.Column('file_id', sa.String(length=255), nullable=True),
+        sa.Column('text', sa.String(length=4096), nullable=True),
+        sa.Column('protect_content', sa.Boolean(), nullable=False),
+        sa.Column('admin_id', sa.BigInteger(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('total_recipients', sa.Integer(), nullable=False),
+        sa.Column('sent_count', sa.Integer(), nullable=False),
+        sa.Column('failed_count', sa.Integer(), nullable=False),
+        sa.Column('blocked_count', sa.Integer(), nullable=False),
+        sa.Column('progress_chat_id', sa.BigInteger(), nullable=True),
+        sa.Column('progress_message_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_broadcasts_status'), 'broadcasts', ['status'], unique=False)
+
+    op.create_table(
+        'broadcast_deliveries',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('broadcast_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.BigInteger(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('error_code', sa.String(length=30), nullable=True),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['broadcast_id'], ['broadcasts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('broadcast_id', 'user_id', name='uq_broadcast_delivery_user')
+    )
+    op.create_index(
+        'idx_broadcast_delivery_status',
+        'broadcast_deliveries',
+        ['broadcast_id', 'status', 'user_id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_broadcast_delivery_status', table_name='broadcast_deliveries')
+    op.drop_table('broadcast_deliveries')
+    op.drop_index(op.f('ix_broadcasts_status'), table_name='broadcasts')
+    op.drop_table('broadcasts')
@@ -0,0 +1,51 @@
+"""add_scheduled_posts
+
+Revision ID: 20261018_000003
+Revises: 20261018_000002
+Create Date: 2026-10-18 00:00:03.000000+00:00
+
+Publicaciones programadas a canales. Es el job store persistente del
+scheduler: los jobs se recrean desde los posts pendientes al iniciar.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_000003'
+down_revision: Union[str, None] = '20261018_000002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'scheduled_posts',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('target_channel', sa.String(length=10), nullable=False),
+        sa.Column('content_type', sa.String(length=20), nullable=False),
+        sa.Column('file_id', sa.String(length=255), nullable=True),
+        sa.Column('caption', sa.String(length=4096), nullable=True),
+        sa.Column('add_reactions', sa.Boolean(), nullable=False),
+        sa.Column('protect_content', sa.Boolean(), nullable=False),
+        sa.Column('scheduled_at', sa.DateTime(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('created_by', sa.BigInteger(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.Column('error', sa.String(length=255), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'idx_scheduled_post_status_time',
+        'scheduled_posts',
+        ['status', 'scheduled_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_scheduled_post_status_time', table_name='scheduled_posts')
+    op.drop_table('scheduled_posts')
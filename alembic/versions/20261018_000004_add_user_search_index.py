@@ -0,0 +1,30 @@
+"""add_user_search_index
+
+Revision ID: 20261018_000004
+Revises: 20261018_000003
+Create Date: 2026-10-18 00:00:04.000000+00:00
+
+Índice de búsqueda de usuarios por username, first_name y last_name:
+- SQLite: tabla virtual FTS5 (trigram) sincronizada por triggers
+- PostgreSQL: pg_trgm + índice GIN sobre el documento de búsqueda
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from bot.database.search_index import create_user_search_index, drop_user_search_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_000004'
+down_revision: Union[str, None] = '20261018_000003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_user_search_index(op.get_bind())
+
+
+def downgrade() -> None:
+    drop_user_search_index(op.get_bind())
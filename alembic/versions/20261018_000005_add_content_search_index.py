@@ -0,0 +1,30 @@
+"""add_content_search_index
+
+Revision ID: 20261018_000005
+Revises: 20261018_000004
+Create Date: 2026-10-18 00:00:05.000000+00:00
+
+Índice full-text de paquetes, content sets y productos de la tienda:
+- SQLite: tabla FTS5 compartida mantenida por triggers
+- PostgreSQL: índices GIN sobre to_tsvector(name || description)
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from bot.database.search_index import create_content_search_index, drop_content_search_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_000005'
+down_revision: Union[str, None] = '20261018_000004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_content_search_index(op.get_bind())
+
+
+def downgrade() -> None:
+    drop_content_search_index(op.get_bind())
@@ -0,0 +1,27 @@
+"""add_interest_created_at_index
+
+Revision ID: 20261018_000006
+Revises: 20261018_000005
+Create Date: 2026-10-18 00:00:06.000000+00:00
+
+Índice sobre user_interests.created_at para la lista de intereses
+recientes de get_interest_stats (ORDER BY created_at DESC LIMIT n).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_000006'
+down_revision: Union[str, None] = '20261018_000005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_interest_created_at', 'user_interests', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_interest_created_at', table_name='user_interests')
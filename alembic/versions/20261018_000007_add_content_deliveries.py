@@ -0,0 +1,56 @@
+"""add_content_deliveries
+
+Revision ID: 20261018_000007
+Revises: 20261018_000006
+Create Date: 2026-10-18 00:00:07.000000+00:00
+
+Cola persistente de entregas de contenido comprado. La compra solo encola
+la entrega; el runner la envía en álbumes y reintenta con backoff.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_000007'
+down_revision: Union[str, None] = '20261018_000006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'content_deliveries',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('access_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.BigInteger(), nullable=False),
+        sa.Column('content_type', sa.String(length=20), nullable=False),
+        sa.Column('file_ids', sa.JSON(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('chunks_sent', sa.Integer(), nullable=False),
+        sa.Column('total_chunks', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('last_error', sa.String(length=30), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('delivered_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['access_id'], ['user_content_access.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_content_deliveries_access_id'), 'content_deliveries', ['access_id'], unique=False)
+    op.create_index(op.f('ix_content_deliveries_user_id'), 'content_deliveries', ['user_id'], unique=False)
+    op.create_index(
+        'idx_content_delivery_due',
+        'content_deliveries',
+        ['status', 'next_attempt_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_content_delivery_due', table_name='content_deliveries')
+    op.drop_index(op.f('ix_content_deliveries_user_id'), table_name='content_deliveries')
+    op.drop_index(op.f('ix_content_deliveries_access_id'), table_name='content_deliveries')
+    op.drop_table('content_deliveries')
@@ -0,0 +1,37 @@
+"""add_fsm_states
+
+Revision ID: 20261018_000008
+Revises: 20261018_000007
+Create Date: 2026-10-18 00:00:08.000000+00:00
+
+Estados FSM de aiogram persistidos en BD (SQLAlchemyStorage): los flujos
+de varios pasos sobreviven a un redeploy y se comparten entre réplicas.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_000008'
+down_revision: Union[str, None] = '20261018_000007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'fsm_states',
+        sa.Column('key', sa.String(length=255), nullable=False),
+        sa.Column('state', sa.String(length=255), nullable=True),
+        sa.Column('data', sa.Text(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index(op.f('ix_fsm_states_updated_at'), 'fsm_states', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_fsm_states_updated_at'), table_name='fsm_states')
+    op.drop_table('fsm_states')
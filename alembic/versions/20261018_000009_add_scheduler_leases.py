@@ -0,0 +1,35 @@
+"""add_scheduler_leases
+
+Revision ID: 20261018_000009
+Revises: 20261018_000008
+Create Date: 2026-10-18 00:00:09.000000+00:00
+
+Lease de liderazgo del scheduler: con varias réplicas solo el líder
+ejecuta los jobs de expulsión VIP, cola Free, limpieza y rachas.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_000009'
+down_revision: Union[str, None] = '20261018_000008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'scheduler_leases',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('holder', sa.String(length=128), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('acquired_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('scheduler_leases')
@@ -6,11 +6,39 @@ Exports functions to start and stop the scheduler.
 from bot.background.tasks import (
     start_background_tasks,
     stop_background_tasks,
-    get_scheduler_status
+    get_scheduler_status,
+    release_leadership,
+    schedule_post,
+    unschedule_post
+)
+from bot.background.airdrop import (
+    start_airdrop,
+    is_airdrop_running
+)
+from bot.background.broadcast import (
+    start_broadcast,
+    is_broadcast_running,
+    resume_broadcasts
+)
+from bot.background.content_delivery import (
+    start_delivery,
+    is_delivery_running,
+    process_due_deliveries
 )
 
 __all__ = [
     "start_background_tasks",
     "stop_background_tasks",
-    "get_scheduler_status"
+    "get_scheduler_status",
+    "release_leadership",
+    "schedule_post",
+    "unschedule_post",
+    "start_airdrop",
+    "is_airdrop_running",
+    "start_broadcast",
+    "is_broadcast_running",
+    "resume_broadcasts",
+    "start_delivery",
+    "is_delivery_running",
+    "process_due_deliveries"
 ]
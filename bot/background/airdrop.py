@@ -0,0 +1,179 @@
+"""
+Airdrop Runner - Ejecución en background de airdrops masivos de besitos.
+
+Recorre el segmento de una campaña por chunks (ver
+WalletService.credit_airdrop_chunk), con una sesión y un commit por chunk,
+y reporta el progreso editando un mensaje en el chat del admin.
+
+Antes de acreditar, el runner reclama la campaña (pending/failed → running)
+para que dos procesos no la ejecuten a la vez. Como el cursor se persiste
+junto con cada chunk, un runner interrumpido (error, cancelación) marca la
+campaña como fallida y se reanuda relanzando la misma clave.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from aiogram import Bot
+
+from bot.background.progress import PROGRESS_INTERVAL_SECONDS, report_progress
+from bot.database import get_session
+from bot.services.wallet import WalletService, AIRDROP_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Runners activos en este proceso: campaign_key -> Task
+_running_airdrops: Dict[str, asyncio.Task] = {}
+
+
+async def _mark_failed(campaign_key: str) -> None:
+    """Marca la campaña como fallida para que pueda reclamarse de nuevo."""
+    try:
+        async with get_session() as session:
+            airdrop = await WalletService(session).get_airdrop(campaign_key)
+            if airdrop is not None and airdrop.status == "running":
+                airdrop.status = "failed"
+    except Exception as mark_error:
+        logger.warning(f"⚠️ No se pudo marcar airdrop como fallido: {mark_error}")
+
+
+def _format_progress(campaign_key: str, credited: int, total: int, amount: int, done: bool) -> str:
+    """Formatea el mensaje de progreso de un airdrop."""
+    percent = (credited * 100 // total) if total else 100
+    header = "✅ <b>Airdrop completado</b>" if done else "⏳ <b>Airdrop en curso...</b>"
+    return (
+        f"🎩 <b>Lucien:</b>\n\n"
+        f"{header}\n\n"
+        f"🏷 Campaña: <code>{campaign_key}</code>\n"
+        f"💋 Besitos por usuario: <b>{amount}</b>\n"
+        f"👥 Acreditados: <b>{credited}</b> / {total} ({percent}%)"
+    )
+
+
+async def run_airdrop(
+    bot: Bot,
+    campaign_key: str,
+    chat_id: int,
+    message_id: Optional[int] = None,
+    chunk_size: int = AIRDROP_CHUNK_SIZE
+) -> int:
+    """
+    Ejecuta una campaña de airdrop hasta completarla.
+
+    Args:
+        bot: Instancia del bot (para reportar progreso)
+        campaign_key: Clave de la campaña a ejecutar
+        chat_id: Chat del admin donde reportar progreso
+        message_id: Mensaje a editar con el progreso (None = enviar nuevo al final)
+        chunk_size: Usuarios por chunk
+
+    Returns:
+        int: Total de usuarios acreditados por la campaña
+    """
+    logger.info(f"🚀 Iniciando airdrop '{campaign_key}'")
+
+    total: Optional[int] = None
+    credited = 0
+    amount = 0
+    last_report = 0.0
+
+    # Reclamo confirmado antes del primer chunk: otro runner ya no puede tomarla
+    async with get_session() as session:
+        claimed = await WalletService(session).claim_airdrop(campaign_key)
+
+    if claimed is None:
+        logger.warning(f"⚠️ Airdrop '{campaign_key}' no existe o ya está en curso/completado")
+        await report_progress(
+            bot, chat_id, message_id,
+            f"🎩 <b>Lucien:</b>\n\n"
+            f"⏳ La campaña <code>{campaign_key}</code> ya está en curso "
+            f"o fue completada."
+        )
+        return 0
+
+    try:
+        while True:
+            async with get_session() as session:
+                wallet = WalletService(session)
+                airdrop = await wallet.get_airdrop(campaign_key)
+
+                amount = airdrop.amount
+                if total is None:
+                    total = airdrop.credited_count + await wallet.count_airdrop_recipients(airdrop)
+
+                processed = await wallet.credit_airdrop_chunk(airdrop, chunk_size=chunk_size)
+                credited = airdrop.credited_count
+            # Commit del chunk al salir del context manager
+
+            if processed == 0:
+                break
+
+            now = time.monotonic()
+            if message_id is not None and now - last_report >= PROGRESS_INTERVAL_SECONDS:
+                last_report = now
+                await report_progress(
+                    bot, chat_id, message_id,
+                    _format_progress(campaign_key, credited, max(total, credited), amount, done=False)
+                )
+
+            # Ceder el event loop entre chunks para no bloquear updates
+            await asyncio.sleep(0)
+
+    except asyncio.CancelledError:
+        # Liberar el reclamo para que relanzar la clave pueda reanudarla
+        await _mark_failed(campaign_key)
+        raise
+
+    except Exception as e:
+        logger.error(f"❌ Error en airdrop '{campaign_key}': {e}", exc_info=True)
+        await _mark_failed(campaign_key)
+        await report_progress(
+            bot, chat_id, message_id,
+            f"🎩 <b>Lucien:</b>\n\n"
+            f"❌ <b>Airdrop interrumpido</b>\n\n"
+            f"🏷 Campaña: <code>{campaign_key}</code>\n"
+            f"👥 Acreditados: <b>{credited}</b>\n\n"
+            f"<i>Relance la misma clave para reanudar sin duplicar créditos.</i>"
+        )
+        return credited
+
+    await report_progress(
+        bot, chat_id, message_id,
+        _format_progress(campaign_key, credited, max(total or 0, credited), amount, done=True)
+    )
+    logger.info(f"✅ Airdrop '{campaign_key}' finalizado: {credited} usuarios acreditados")
+    return credited
+
+
+def start_airdrop(
+    bot: Bot,
+    campaign_key: str,
+    chat_id: int,
+    message_id: Optional[int] = None
+) -> bool:
+    """
+    Lanza run_airdrop como tarea en background.
+
+    Args:
+        bot: Instancia del bot
+        campaign_key: Clave de la campaña
+        chat_id: Chat del admin para reportar progreso
+        message_id: Mensaje de progreso a editar
+
+    Returns:
+        bool: False si la campaña ya se está ejecutando en este proceso
+    """
+    if is_airdrop_running(campaign_key):
+        return False
+
+    task = asyncio.create_task(run_airdrop(bot, campaign_key, chat_id, message_id))
+    _running_airdrops[campaign_key] = task
+    task.add_done_callback(lambda _: _running_airdrops.pop(campaign_key, None))
+    return True
+
+
+def is_airdrop_running(campaign_key: str) -> bool:
+    """Retorna True si la campaña tiene un runner activo en este proceso."""
+    task = _running_airdrops.get(campaign_key)
+    return task is not None and not task.done()
@@ -0,0 +1,325 @@
+"""
+Broadcast Runner - Envío masivo de DMs a un segmento de usuarios.
+
+Arquitectura:
+- Productor: recorre las entregas pendientes con un cursor del lado del
+  servidor (BroadcastService.stream_pending_user_ids) y llena una cola acotada
+- Workers: N corutinas consumen la cola y envían por el carril BULK del
+  TelegramRateLimiter de la sesión, que aplica el presupuesto global y por
+  chat y reintenta los retry_after cortos; así nunca desplazan a las
+  respuestas interactivas. Un retry_after que llega hasta aquí (agotó los
+  reintentos del limitador) cuenta como entrega fallida
+- Resultados: se persisten por lotes en broadcast_deliveries; un reporter
+  periódico los vuelca y edita el mensaje de progreso del admin
+
+Como cada entrega queda registrada, un broadcast interrumpido (restart) se
+reanuda enviando solo lo que sigue "pending" (ver resume_broadcasts). Las
+entregas enviadas pero aún no volcadas al caer el proceso se reenvían:
+la garantía es at-least-once.
+"""
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+
+from bot.background.progress import PROGRESS_INTERVAL_SECONDS, report_progress
+from bot.database import get_session
+from bot.database.enums import BroadcastSegment, DeliveryStatus
+from bot.services.broadcast import BroadcastService, DeliveryResult
+from bot.services.subscription import _classify_notification_error
+from bot.utils.rate_limit import bulk_lane
+
+logger = logging.getLogger(__name__)
+
+# Corutinas enviando en paralelo
+BROADCAST_WORKERS = 8
+
+# Resultados acumulados antes de forzar un volcado a BD
+RESULT_FLUSH_SIZE = 200
+
+# Códigos de _classify_notification_error que indican usuario inalcanzable
+UNREACHABLE_ERRORS = frozenset({
+    "blocked",
+    "deactivated",
+    "chat_not_found",
+    "cant_initiate",
+    "kicked",
+    "user_banned",
+    "forbidden_other",
+})
+
+# Runners activos en este proceso: broadcast_id -> Task
+_running_broadcasts: Dict[int, asyncio.Task] = {}
+
+
+def _format_progress(
+    broadcast_id: int,
+    segment: str,
+    counts: Dict[str, int],
+    total: int,
+    done: bool
+) -> str:
+    """Formatea el mensaje de progreso de un broadcast."""
+    processed = counts["sent"] + counts["failed"] + counts["blocked"]
+    percent = (processed * 100 // total) if total else 100
+    header = "✅ <b>Broadcast completado</b>" if done else "⏳ <b>Broadcast en curso...</b>"
+    return (
+        f"🎩 <b>Lucien:</b>\n\n"
+        f"{header}\n\n"
+        f"📨 Broadcast <code>#{broadcast_id}</code>\n"
+        f"👥 Segmento: <b>{BroadcastSegment(segment).display_name}</b>\n"
+        f"📊 Procesados: <b>{processed}</b> / {total} ({percent}%)\n\n"
+        f"✅ Entregados: <b>{counts['sent']}</b>\n"
+        f"🚫 Bloqueados: <b>{counts['blocked']}</b>\n"
+        f"❌ Fallidos: <b>{counts['failed']}</b>"
+    )
+
+
+async def _send(bot: Bot, content: Dict, user_id: int) -> None:
+    """Envía el contenido del broadcast a un usuario."""
+    if content["content_type"] == "photo":
+        await bot.send_photo(
+            chat_id=user_id,
+            photo=content["file_id"],
+            caption=content["text"],
+            parse_mode="HTML",
+            protect_content=content["protect_content"]
+        )
+    elif content["content_type"] == "video":
+        await bot.send_video(
+            chat_id=user_id,
+            video=content["file_id"],
+            caption=content["text"],
+            parse_mode="HTML",
+            protect_content=content["protect_content"]
+        )
+    else:
+        await bot.send_message(
+            chat_id=user_id,
+            text=content["text"],
+            parse_mode="HTML",
+            protect_content=content["protect_content"]
+        )
+
+
+async def deliver(
+    bot: Bot,
+    content: Dict,
+    user_id: int
+) -> Tuple[DeliveryStatus, Optional[str]]:
+    """
+    Entrega el broadcast a un usuario.
+
+    El throttling y los reintentos por retry_after los hace el
+    TelegramRateLimiter de la sesión; aquí solo se clasifica el resultado.
+
+    Args:
+        bot: Instancia del bot
+        content: Contenido del broadcast (content_type, file_id, text, protect_content)
+        user_id: Destinatario
+
+    Returns:
+        Tuple[DeliveryStatus, Optional[str]]: Estado y código de error clasificado
+    """
+    try:
+        await _send(bot, content, user_id)
+        return DeliveryStatus.SENT, None
+    except TelegramRetryAfter as e:
+        logger.warning(f"⏳ Flood control persistente enviando broadcast a {user_id}: {e.retry_after}s")
+        return DeliveryStatus.FAILED, "rate_limit"
+    except Exception as e:
+        error_code = _classify_notification_error(e)
+        if error_code in UNREACHABLE_ERRORS:
+            return DeliveryStatus.BLOCKED, error_code
+        logger.warning(f"⚠️ Error enviando broadcast a {user_id}: {error_code} - {e}")
+        return DeliveryStatus.FAILED, error_code
+
+
+async def run_broadcast(
+    bot: Bot,
+    broadcast_id: int,
+    workers: int = BROADCAST_WORKERS
+) -> Dict[str, int]:
+    """
+    Ejecuta un broadcast hasta agotar sus entregas pendientes.
+
+    Args:
+        bot: Instancia del bot
+        broadcast_id: ID del broadcast
+        workers: Cantidad de workers de envío
+
+    Returns:
+        Dict[str, int]: Conteo final de entregas por estado
+    """
+    async with get_session() as session:
+        service = BroadcastService(session)
+        broadcast = await service.get_broadcast(broadcast_id)
+
+        if broadcast is None:
+            logger.warning(f"⚠️ Broadcast #{broadcast_id} no existe")
+            return {}
+
+        if broadcast.is_finished:
+            return await service.get_delivery_counts(broadcast_id)
+
+        total = await service.enqueue_recipients(broadcast)
+        segment = broadcast.segment
+        chat_id = broadcast.progress_chat_id
+        message_id = broadcast.progress_message_id
+        content = {
+            "content_type": broadcast.content_type,
+            "file_id": broadcast.file_id,
+            "text": broadcast.text,
+            "protect_content": broadcast.protect_content,
+        }
+        counts = {
+            "sent": broadcast.sent_count,
+            "failed": broadcast.failed_count,
+            "blocked": broadcast.blocked_count,
+        }
+    # Commit de la materialización al salir del context manager
+
+    logger.info(f"🚀 Iniciando broadcast #{broadcast_id} ({total} destinatarios)")
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 4)
+    pending_results: List[DeliveryResult] = []
+    flush_lock = asyncio.Lock()
+
+    async def flush() -> None:
+        async with flush_lock:
+            if not pending_results:
+                return
+            batch = pending_results[:]
+            pending_results.clear()
+            async with get_session() as flush_session:
+                await BroadcastService(flush_session).record_results(broadcast_id, batch)
+
+    async def producer() -> None:
+        async with get_session() as stream_session:
+            stream = BroadcastService(stream_session).stream_pending_user_ids(broadcast_id)
+            async for user_id in stream:
+                await queue.put(user_id)
+        # Solo al terminar bien: si algo falla, el TaskGroup cancela a los workers
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def worker() -> None:
+        while True:
+            user_id = await queue.get()
+            if user_id is None:
+                return
+            status, error_code = await deliver(bot, content, user_id)
+            pending_results.append((user_id, status, error_code))
+            counts[status.value] += 1
+            if len(pending_results) >= RESULT_FLUSH_SIZE:
+                await flush()
+
+    async def reporter() -> None:
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL_SECONDS)
+            await flush()
+            if chat_id is not None:
+                await report_progress(
+                    bot, chat_id, message_id,
+                    _format_progress(broadcast_id, segment, counts, total, done=False)
+                )
+
+    reporter_task = asyncio.create_task(reporter())
+    try:
+        # TaskGroup: si el productor, un worker o un flush falla, se cancela el resto
+        async with bulk_lane(), asyncio.TaskGroup() as group:
+            group.create_task(producer())
+            for _ in range(workers):
+                group.create_task(worker())
+        await flush()
+
+        async with get_session() as session:
+            service = BroadcastService(session)
+            await service.finish_broadcast(broadcast_id, "completed")
+            final_counts = await service.get_delivery_counts(broadcast_id)
+
+    except Exception as e:
+        if isinstance(e, ExceptionGroup):
+            e = e.exceptions[0]
+        logger.error(f"❌ Error en broadcast #{broadcast_id}: {e}", exc_info=e)
+        try:
+            await flush()
+            async with get_session() as session:
+                await BroadcastService(session).finish_broadcast(broadcast_id, "failed")
+        except Exception as mark_error:
+            logger.warning(f"⚠️ No se pudo marcar broadcast como fallido: {mark_error}")
+        if chat_id is not None:
+            await report_progress(
+                bot, chat_id, message_id,
+                f"🎩 <b>Lucien:</b>\n\n"
+                f"❌ <b>Broadcast interrumpido</b>\n\n"
+                f"📨 Broadcast <code>#{broadcast_id}</code>\n"
+                f"✅ Entregados: <b>{counts['sent']}</b>"
+            )
+        return counts
+
+    finally:
+        reporter_task.cancel()
+
+    if chat_id is not None:
+        await report_progress(
+            bot, chat_id, message_id,
+            _format_progress(broadcast_id, segment, final_counts, total, done=True)
+        )
+
+    logger.info(
+        f"✅ Broadcast #{broadcast_id} finalizado: {final_counts['sent']} entregados, "
+        f"{final_counts['blocked']} bloqueados, {final_counts['failed']} fallidos"
+    )
+    return final_counts
+
+
+def start_broadcast(bot: Bot, broadcast_id: int) -> bool:
+    """
+    Lanza run_broadcast como tarea en background.
+
+    Args:
+        bot: Instancia del bot
+        broadcast_id: ID del broadcast
+
+    Returns:
+        bool: False si el broadcast ya se está ejecutando en este proceso
+    """
+    if is_broadcast_running(broadcast_id):
+        return False
+
+    task = asyncio.create_task(run_broadcast(bot, broadcast_id))
+    _running_broadcasts[broadcast_id] = task
+    task.add_done_callback(lambda _: _running_broadcasts.pop(broadcast_id, None))
+    return True
+
+
+def is_broadcast_running(broadcast_id: int) -> bool:
+    """Retorna True si el broadcast tiene un runner activo en este proceso."""
+    task = _running_broadcasts.get(broadcast_id)
+    return task is not None and not task.done()
+
+
+async def resume_broadcasts(bot: Bot) -> int:
+    """
+    Reanuda los broadcasts interrumpidos por un reinicio.
+
+    Solo la réplica líder del scheduler la ejecuta (al ganar el lease, ver
+    lease_heartbeat); si cada réplica la llamara, todas reenviarían lo
+    pendiente.
+
+    Args:
+        bot: Instancia del bot
+
+    Returns:
+        int: Cantidad de broadcasts relanzados
+    """
+    async with get_session() as session:
+        broadcast_ids = await BroadcastService(session).get_unfinished_broadcast_ids()
+
+    resumed = sum(1 for broadcast_id in broadcast_ids if start_broadcast(bot, broadcast_id))
+    if resumed:
+        logger.info(f"🔁 {resumed} broadcast(s) reanudados tras reinicio")
+    return resumed
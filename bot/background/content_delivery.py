@@ -0,0 +1,293 @@
+"""
+Content Delivery Runner - Envío de contenido comprado desde la cola persistente.
+
+Arquitectura:
+- La compra encola una ContentDelivery y lanza start_delivery(): el usuario
+  recibe su contenido en segundos sin que el handler espere a Telegram
+- Cada entrega se envía en álbumes de hasta 10 archivos (send_media_group);
+  el progreso se confirma por álbum, así que un reintento no reenvía lo ya
+  entregado
+- Los envíos pasan por el TelegramRateLimiter de la sesión (bucket por chat
+  y global, reintento de retry_after cortos)
+- Cada runner reclama la entrega antes de enviar (claim_delivery): el
+  handler de compra y el job, aun en réplicas distintas, no la envían dos veces
+- Un fallo agenda el reintento con backoff exponencial; el job
+  process_due_deliveries (scheduler) retoma las vencidas, incluidas las
+  interrumpidas por un reinicio. Los reintentos van por el carril BULK
+- Usuario inalcanzable o reintentos agotados: la entrega queda "failed" y
+  se alerta a los admins; no se reintenta sola, solo al reencolarla
+"""
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.types import (
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    InputMediaAudio,
+    InputMediaPhoto,
+    InputMediaVideo,
+)
+
+from bot.background.broadcast import UNREACHABLE_ERRORS
+from bot.database import get_session
+from bot.database.enums import ContentDeliveryStatus, ContentType
+from bot.services.content_delivery import (
+    DUE_BATCH_SIZE,
+    ContentDeliveryService,
+    chunk_file_ids,
+)
+from bot.services.subscription import _classify_notification_error
+from bot.utils.rate_limit import bulk_lane
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Entregas enviando en paralelo por pasada del job
+DELIVERY_WORKERS = 4
+
+DELIVERY_CAPTION = "🎩 <i>Aquí está su contenido adquirido.</i>"
+
+# Runners activos en este proceso: delivery_id -> Task
+_running_deliveries: Dict[int, asyncio.Task] = {}
+
+# Entregas vencidas en la última pasada del job (muestra de la cola, hasta DUE_BATCH_SIZE)
+_last_due_count = 0
+
+
+async def send_chunk(
+    bot: Bot,
+    user_id: int,
+    content_type: str,
+    file_ids: List[str],
+    caption: Optional[str] = None
+) -> None:
+    """
+    Envía un álbum (hasta 10 archivos) al usuario.
+
+    Un álbum de un solo archivo se envía con el método individual, ya que
+    send_media_group exige al menos 2 elementos. Los sets mixtos se envían
+    como fotos (ContentSet no guarda el tipo por archivo).
+
+    Args:
+        bot: Instancia del bot
+        user_id: Destinatario
+        content_type: ContentType.value del set
+        file_ids: file_ids del álbum
+        caption: Caption del primer archivo (None en álbumes siguientes)
+    """
+    if content_type == ContentType.VIDEO.value:
+        single, media_cls, field = bot.send_video, InputMediaVideo, "video"
+    elif content_type == ContentType.AUDIO.value:
+        single, media_cls, field = bot.send_audio, InputMediaAudio, "audio"
+    else:
+        single, media_cls, field = bot.send_photo, InputMediaPhoto, "photo"
+
+    if len(file_ids) == 1:
+        await single(
+            chat_id=user_id,
+            caption=caption,
+            parse_mode="HTML",
+            **{field: file_ids[0]}
+        )
+        return
+
+    media = [
+        media_cls(media=file_id, caption=caption, parse_mode="HTML") if i == 0 and caption
+        else media_cls(media=file_id)
+        for i, file_id in enumerate(file_ids)
+    ]
+    await bot.send_media_group(chat_id=user_id, media=media)
+
+
+async def _notify_failure(bot: Bot, user_id: int) -> None:
+    """Avisa al usuario que su entrega no pudo completarse."""
+    try:
+        await bot.send_message(
+            chat_id=user_id,
+            text=(
+                "🎩 <b>Lucien:</b>\n\n"
+                "<i>No he podido completar la entrega de su contenido.</i>\n\n"
+                "<i>Su adquisición sigue registrada y Diana ha sido notificada; "
+                "la entrega se reanudará en cuanto ella la revise.</i>"
+            ),
+            parse_mode="HTML"
+        )
+    except Exception as e:
+        logger.debug(f"No se pudo avisar a {user_id} del fallo de entrega: {e}")
+
+
+async def _notify_admins_failure(bot: Bot, delivery_id: int, user_id: int, error_code: str) -> None:
+    """Alerta a los admins de una entrega fallida (el reintento es manual)."""
+    text = (
+        f"🎩 <b>Lucien:</b>\n\n"
+        f"❌ <b>Entrega #{delivery_id} fallida</b>\n\n"
+        f"👤 Usuario: <code>{user_id}</code>\n"
+        f"⚠️ Motivo: <code>{error_code}</code>\n\n"
+        f"<i>No se reintentará sola: reencólela desde 📦 Entregas.</i>"
+    )
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[[
+        InlineKeyboardButton(text="📦 Entregas", callback_data="admin:shop:deliveries")
+    ]])
+
+    for admin_id in Config.ADMIN_USER_IDS:
+        try:
+            await bot.send_message(
+                chat_id=admin_id, text=text, parse_mode="HTML", reply_markup=keyboard
+            )
+        except Exception as e:
+            logger.debug(f"No se pudo alertar al admin {admin_id} de la entrega #{delivery_id}: {e}")
+
+
+async def process_delivery(bot: Bot, delivery_id: int) -> Optional[ContentDeliveryStatus]:
+    """
+    Envía los álbumes pendientes de una entrega.
+
+    Args:
+        bot: Instancia del bot
+        delivery_id: ID de la entrega
+
+    Returns:
+        ContentDeliveryStatus final del intento, o None si la entrega no existe
+        o ya la reclamó otro runner
+    """
+    async with get_session() as session:
+        service = ContentDeliveryService(session)
+        delivery = await service.get_delivery(delivery_id)
+        if delivery is None:
+            logger.warning(f"⚠️ Entrega #{delivery_id} no existe")
+            return None
+        if delivery.is_finished:
+            return ContentDeliveryStatus(delivery.status)
+        if not await service.claim_delivery(delivery_id):
+            logger.debug(f"Entrega #{delivery_id} ya reclamada por otro runner")
+            return None
+
+        user_id = delivery.user_id
+        content_type = delivery.content_type
+        chunks = chunk_file_ids(delivery.file_ids or [])
+        chunks_sent = delivery.chunks_sent
+
+    for index in range(chunks_sent, len(chunks)):
+        try:
+            await send_chunk(
+                bot, user_id, content_type, chunks[index],
+                caption=DELIVERY_CAPTION if index == 0 else None
+            )
+        except Exception as e:
+            retry_after = e.retry_after if isinstance(e, TelegramRetryAfter) else None
+            error_code = _classify_notification_error(e)
+            permanent = error_code in UNREACHABLE_ERRORS
+
+            async with get_session() as session:
+                status = await ContentDeliveryService(session).record_failure(
+                    delivery_id, error_code, permanent=permanent, retry_after=retry_after
+                )
+
+            logger.warning(
+                f"⚠️ Entrega #{delivery_id} a {user_id} falló en álbum "
+                f"{index + 1}/{len(chunks)}: {error_code} - {e}"
+            )
+            if status is ContentDeliveryStatus.FAILED:
+                await _notify_admins_failure(bot, delivery_id, user_id, error_code)
+                if not permanent:
+                    await _notify_failure(bot, user_id)
+            return status
+
+        async with get_session() as session:
+            await ContentDeliveryService(session).record_chunk_sent(delivery_id, index + 1)
+
+    async with get_session() as session:
+        await ContentDeliveryService(session).mark_delivered(delivery_id)
+
+    logger.info(f"✅ Entrega #{delivery_id} completada: {len(chunks)} álbum(es) a {user_id}")
+    return ContentDeliveryStatus.DELIVERED
+
+
+def start_delivery(bot: Bot, delivery_id: int) -> bool:
+    """
+    Lanza process_delivery como tarea en background.
+
+    La entrega debe estar confirmada en BD (el runner usa sus propias sesiones).
+
+    Args:
+        bot: Instancia del bot
+        delivery_id: ID de la entrega
+
+    Returns:
+        bool: False si la entrega ya se está enviando en este proceso
+    """
+    if is_delivery_running(delivery_id):
+        return False
+
+    task = asyncio.create_task(process_delivery(bot, delivery_id))
+    _running_deliveries[delivery_id] = task
+    task.add_done_callback(lambda _: _running_deliveries.pop(delivery_id, None))
+    return True
+
+
+def is_delivery_running(delivery_id: int) -> bool:
+    """Retorna True si la entrega tiene un runner activo en este proceso."""
+    task = _running_deliveries.get(delivery_id)
+    return task is not None and not task.done()
+
+
+def delivery_queue_stats() -> Dict[str, int]:
+    """
+    Estado de la cola de entregas visto desde este proceso.
+
+    Returns:
+        Dict con running (runners activos) y due (vencidas en la última pasada)
+    """
+    running = sum(1 for task in _running_deliveries.values() if not task.done())
+    return {"running": running, "due": _last_due_count}
+
+
+async def process_due_deliveries(bot: Bot, workers: int = DELIVERY_WORKERS) -> int:
+    """
+    Procesa las entregas pendientes cuyo próximo intento venció.
+
+    Ejecutada por el scheduler; también reanuda las entregas interrumpidas
+    por un reinicio.
+
+    Args:
+        bot: Instancia del bot
+        workers: Entregas enviando en paralelo
+
+    Returns:
+        int: Cantidad de entregas procesadas
+    """
+    global _last_due_count
+
+    try:
+        async with get_session() as session:
+            delivery_ids = await ContentDeliveryService(session).get_due_delivery_ids(DUE_BATCH_SIZE)
+    except Exception as e:
+        logger.error(f"❌ Error leyendo cola de entregas: {e}", exc_info=True)
+        return 0
+
+    _last_due_count = len(delivery_ids)
+
+    delivery_ids = [d for d in delivery_ids if not is_delivery_running(d)]
+    if not delivery_ids:
+        return 0
+
+    semaphore = asyncio.Semaphore(workers)
+
+    async def run(delivery_id: int) -> bool:
+        async with semaphore:
+            try:
+                return await process_delivery(bot, delivery_id) is not None
+            except Exception as e:
+                logger.error(f"❌ Error procesando entrega #{delivery_id}: {e}", exc_info=True)
+                return False
+
+    async with bulk_lane():
+        results = await asyncio.gather(*(run(delivery_id) for delivery_id in delivery_ids))
+
+    processed = sum(results)
+    if processed:
+        logger.info(f"📦 {processed} entrega(s) de contenido procesadas")
+    return processed
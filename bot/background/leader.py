@@ -0,0 +1,170 @@
+"""
+Scheduler Leader - Elección de líder para los jobs del scheduler.
+
+Con varias réplicas del bot (webhook escalado horizontalmente) cada proceso
+arranca su propio AsyncIOScheduler. Los jobs que modifican estado global
+(expulsión VIP, cola Free, limpieza, rachas) no toleran ejecutarse dos
+veces, así que solo los corre la réplica que tiene el lease.
+
+El lease es una fila en scheduler_leases con holder y expires_at:
+- Tomarlo es un UPDATE condicional (holder propio o lease vencido), atómico
+  en SQLite y PostgreSQL; la primera vez se crea con INSERT ... ON CONFLICT
+- El líder lo renueva con un heartbeat (cada ttl/3); si el proceso muere,
+  otra réplica lo toma al vencer (failover automático, como mucho ttl)
+- En un shutdown limpio se libera para que el relevo sea inmediato
+"""
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import case, or_, update
+
+from bot.database.dialect import dialect_insert
+from bot.database.engine import get_session_factory
+from bot.database.models import SchedulerLease
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Lease de los jobs del scheduler que deben correr en una sola réplica
+SCHEDULER_LEASE_NAME = "scheduler"
+
+
+def _utc_now() -> datetime:
+    """Datetime UTC naive (convención de la BD)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _default_holder_id() -> str:
+    """Identificador único de este proceso: host:pid:sufijo aleatorio."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LeaderLease:
+    """
+    Lease de liderazgo respaldado por una fila en BD.
+
+    Attributes:
+        name: Nombre del lease
+        holder_id: Identificador de esta réplica
+        ttl: Vigencia de cada renovación
+        is_leader: True si la última renovación tuvo éxito y no ha vencido
+    """
+
+    def __init__(
+        self,
+        name: str = SCHEDULER_LEASE_NAME,
+        *,
+        ttl_seconds: Optional[float] = None,
+        holder_id: Optional[str] = None,
+        session_factory: Optional[Callable] = None
+    ):
+        """
+        Args:
+            name: Nombre del lease
+            ttl_seconds: Vigencia del lease (default: Config.SCHEDULER_LEASE_TTL_SECONDS)
+            holder_id: Identificador de la réplica (default: host:pid:sufijo)
+            session_factory: Factory de AsyncSession (default: el del engine global)
+        """
+        self.name = name
+        self.ttl = timedelta(seconds=(
+            ttl_seconds if ttl_seconds is not None else Config.SCHEDULER_LEASE_TTL_SECONDS
+        ))
+        self.holder_id = holder_id or _default_holder_id()
+        self._session_factory = session_factory
+        self._expires_at: Optional[datetime] = None
+
+    @property
+    def heartbeat_seconds(self) -> float:
+        """Intervalo de renovación: un tercio del TTL (tolera dos fallos seguidos)."""
+        return max(self.ttl.total_seconds() / 3, 1.0)
+
+    @property
+    def is_leader(self) -> bool:
+        """True mientras el lease propio siga vigente."""
+        return self._expires_at is not None and self._expires_at > _utc_now()
+
+    def _factory(self) -> Callable:
+        if self._session_factory is None:
+            self._session_factory = get_session_factory()
+        return self._session_factory
+
+    async def try_acquire(self) -> bool:
+        """
+        Toma o renueva el lease.
+
+        Un error de BD no lanza: se conserva el liderazgo hasta que el
+        lease vence (is_leader lo refleja), así un fallo transitorio no
+        provoca un relevo innecesario.
+
+        Returns:
+            bool: True si esta réplica es líder tras la llamada
+        """
+        now = _utc_now()
+        expires_at = now + self.ttl
+
+        try:
+            async with self._factory()() as session:
+                stmt = dialect_insert(session, SchedulerLease).values(
+                    name=self.name,
+                    holder=self.holder_id,
+                    expires_at=expires_at,
+                    acquired_at=now
+                ).on_conflict_do_nothing(index_elements=["name"])
+                result = await session.execute(stmt)
+
+                if not result.rowcount:
+                    # Renovar el propio o tomar uno vencido, en una sola sentencia
+                    result = await session.execute(
+                        update(SchedulerLease)
+                        .where(
+                            SchedulerLease.name == self.name,
+                            or_(
+                                SchedulerLease.holder == self.holder_id,
+                                SchedulerLease.expires_at <= now
+                            )
+                        )
+                        .values(
+                            holder=self.holder_id,
+                            expires_at=expires_at,
+                            # acquired_at solo cambia en un relevo
+                            acquired_at=case(
+                                (SchedulerLease.holder == self.holder_id, SchedulerLease.acquired_at),
+                                else_=now
+                            )
+                        )
+                        .execution_options(synchronize_session=False)
+                    )
+                await session.commit()
+
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo renovar el lease '{self.name}': {e}")
+            return self.is_leader
+
+        self._expires_at = expires_at if result.rowcount else None
+        return self._expires_at is not None
+
+    async def release(self) -> None:
+        """Libera el lease (si es propio) para que otra réplica lo tome ya."""
+        if self._expires_at is None:
+            return
+
+        self._expires_at = None
+        try:
+            async with self._factory()() as session:
+                await session.execute(
+                    update(SchedulerLease)
+                    .where(
+                        SchedulerLease.name == self.name,
+                        SchedulerLease.holder == self.holder_id
+                    )
+                    .values(expires_at=_utc_now())
+                    .execution_options(synchronize_session=False)
+                )
+                await session.commit()
+            logger.info(f"👑 Lease '{self.name}' liberado")
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo liberar el lease '{self.name}': {e}")
@@ -0,0 +1,42 @@
+"""
+Progress Reporting - Mensajes de progreso de tareas en background.
+
+Los runners largos (airdrops, broadcasts) reportan su avance editando
+un mensaje en el chat del admin.
+"""
+import logging
+from typing import Optional
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest
+
+logger = logging.getLogger(__name__)
+
+# Segundos mínimos entre ediciones del mensaje de progreso (evita flood control)
+PROGRESS_INTERVAL_SECONDS = 3
+
+
+async def report_progress(bot: Bot, chat_id: int, message_id: Optional[int], text: str) -> None:
+    """
+    Edita el mensaje de progreso (o envía uno nuevo si no hay message_id).
+
+    Los errores se registran y se ignoran: el reporte nunca interrumpe al runner.
+
+    Args:
+        bot: Instancia del bot
+        chat_id: Chat del admin
+        message_id: Mensaje a editar (None = enviar uno nuevo)
+        text: Texto HTML del reporte
+    """
+    try:
+        if message_id is None:
+            await bot.send_message(chat_id=chat_id, text=text, parse_mode="HTML")
+        else:
+            await bot.edit_message_text(
+                text=text, chat_id=chat_id, message_id=message_id, parse_mode="HTML"
+            )
+    except TelegramBadRequest as e:
+        if "message is not modified" not in str(e).lower():
+            logger.warning(f"⚠️ No se pudo reportar progreso: {e}")
+    except Exception as e:
+        logger.warning(f"⚠️ No se pudo reportar progreso: {e}")
@@ -6,20 +6,38 @@ Tareas:
 - Procesamiento de cola Free (envío de invite links)
 - Limpieza de datos antiguos
 - Limpieza de solicitudes expiradas al inicio (post-restart)
+- Publicaciones programadas a canales (restauradas desde BD al inicio)
+- Barrido del historial de mensajes en memoria (sesiones inactivas)
+- Cola de entregas de contenido comprado (reintentos y reanudación)
+
+Con varias réplicas cada proceso arranca su scheduler, pero los jobs que
+modifican estado global solo se ejecutan en la réplica líder (lease en
+BD, ver bot/background/leader.py).
 """
+import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Awaitable, Callable, Dict, Optional
 
 from aiogram import Bot
+from apscheduler.jobstores.base import JobLookupError
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
 from sqlalchemy import select
 
+from bot.background.airdrop import _running_airdrops
+from bot.background.broadcast import _running_broadcasts, resume_broadcasts
+from bot.background.content_delivery import delivery_queue_stats, process_due_deliveries
+from bot.background.leader import LeaderLease
 from bot.database import get_session
+from bot.database.fsm_storage import purge_expired_states
 from bot.database.models import FreeChannelRequest
 from bot.services.container import ServiceContainer
+from bot.services.message.session_history import get_session_history
+from bot.utils.metrics import instrument_scheduler
+from bot.utils.rate_limit import bulk_lane
 from config import Config
 
 logger = logging.getLogger(__name__)
@@ -27,6 +45,24 @@ logger = logging.getLogger(__name__)
 # Scheduler global
 _scheduler: Optional[AsyncIOScheduler] = None
 
+# Lease de líder de esta réplica y si ya se ejecutó el arranque como líder
+_lease: Optional[LeaderLease] = None
+_leading = False
+
+# Publicaciones programadas enviándose a la vez (ráfagas de posts vencidos)
+SCHEDULED_POST_CONCURRENCY = 3
+
+_post_semaphore: Optional[asyncio.Semaphore] = None
+
+# Barrido de posts vencidos: recoge los agendados en réplicas que murieron
+SCHEDULED_POST_SWEEP_SECONDS = 60
+
+# Intervalo del barrido de sesiones inactivas (TTL del historial: 5 min)
+SESSION_HISTORY_SWEEP_MINUTES = 5
+
+# Intervalo de la cola de entregas de contenido (backoff mínimo: 30s)
+CONTENT_DELIVERY_POLL_SECONDS = 30
+
 
 async def expire_and_kick_vip_subscribers(bot: Bot):
     """
@@ -129,7 +165,8 @@ async def cleanup_old_data(bot: Bot):
 
     Proceso:
     1. Elimina solicitudes Free procesadas hace más de 30 días
-    2. (Futuro: Limpiar tokens expirados muy antiguos)
+    2. Elimina estados FSM abandonados (sin actividad en FSM_STATE_TTL_HOURS)
+    3. (Futuro: Limpiar tokens expirados muy antiguos)
 
     Args:
         bot: Instancia del bot
@@ -150,6 +187,11 @@ async def cleanup_old_data(bot: Bot):
             else:
                 logger.debug("✓ No hay datos antiguos para limpiar")
 
+        # Limpiar flujos FSM abandonados
+        purged_states = await purge_expired_states()
+        if purged_states > 0:
+            logger.info(f"🗑️ {purged_states} estado(s) FSM abandonados eliminados")
+
     except Exception as e:
         logger.error(f"❌ Error en tarea de limpieza: {e}", exc_info=True)
 
@@ -194,6 +236,24 @@ async def expire_streaks(bot: Bot):
         logger.error(f"❌ Error en tarea de expiración de rachas: {e}", exc_info=True)
 
 
+async def sweep_session_history():
+    """
+    Tarea: Barrido del historial de mensajes de sesión.
+
+    Elimina las sesiones cuyo último mensaje superó el TTL. Es async para
+    correr en el event loop (el historial no es thread-safe).
+    """
+    history = get_session_history()
+    removed = history.sweep_expired()
+
+    if removed > 0:
+        stats = history.get_stats()
+        logger.debug(
+            f"🧹 Historial de sesión: {removed} sesiones inactivas eliminadas "
+            f"({stats['total_users']} activas, ~{stats['memory_bytes'] // 1024} KB)"
+        )
+
+
 async def cleanup_expired_requests_after_restart(bot: Bot):
     """
     Limpia solicitudes Free pendientes que probablemente expiraron durante un reinicio.
@@ -260,20 +320,285 @@ async def cleanup_expired_requests_after_restart(bot: Bot):
         return 0
 
 
+async def _run_as_leader(job: Callable[..., Awaitable], *args) -> None:
+    """
+    Ejecuta un job solo si esta réplica tiene el lease de líder vigente.
+
+    El chequeo se hace en cada disparo (no solo en el heartbeat): entre el
+    vencimiento del lease y la siguiente renovación otra réplica puede
+    haberlo tomado ya.
+
+    Args:
+        job: Corutina del job
+        *args: Argumentos del job
+    """
+    if _lease is None or not _lease.is_leader:
+        logger.debug(f"⏭️ {job.__name__} omitido: esta réplica no es líder")
+        return
+    await job(*args)
+
+
+async def lease_heartbeat(bot: Bot) -> bool:
+    """
+    Tarea: Toma o renueva el lease de líder del scheduler.
+
+    Al ganar el liderazgo ejecuta lo que antes se hacía en cada arranque:
+    limpieza de solicitudes post-reinicio, restauración de publicaciones
+    programadas, reanudación de broadcasts y liberación de airdrops
+    interrumpidos. Al perderlo solo lo registra (los jobs se omiten solos).
+
+    Args:
+        bot: Instancia del bot de Telegram
+
+    Returns:
+        bool: True si esta réplica es líder
+    """
+    global _leading
+
+    if _lease is None:
+        return False
+
+    is_leader = await _lease.try_acquire()
+
+    if is_leader and not _leading:
+        _leading = True
+        logger.info(f"👑 Réplica {_lease.holder_id} es líder del scheduler")
+
+        # LIMPIEZA POST-REINICIO: Marcar solicitudes antiguas como expiradas
+        # Esto evita errores cuando el bot se reinicia y hay solicitudes pendientes
+        # que ya expiraron en Telegram (ChatJoinRequest expira después de ~10 min)
+        await cleanup_expired_requests_after_restart(bot)
+
+        # Publicaciones programadas (un job por post pendiente)
+        await restore_scheduled_posts(bot)
+
+        # Broadcasts por DM interrumpidos por un reinicio
+        try:
+            await resume_broadcasts(bot)
+        except Exception as e:
+            logger.error(f"❌ Error reanudando broadcasts: {e}", exc_info=True)
+
+        # Airdrops interrumpidos: liberar el reclamo para poder relanzarlos
+        try:
+            running_here = [key for key, task in _running_airdrops.items() if not task.done()]
+            async with get_session() as session:
+                await ServiceContainer(session, bot).wallet.fail_interrupted_airdrops(
+                    exclude_keys=running_here
+                )
+        except Exception as e:
+            logger.error(f"❌ Error liberando airdrops interrumpidos: {e}", exc_info=True)
+
+    elif not is_leader and _leading:
+        _leading = False
+        logger.warning(f"⚠️ Réplica {_lease.holder_id} perdió el liderazgo del scheduler")
+
+    return is_leader
+
+
+def _get_post_semaphore() -> asyncio.Semaphore:
+    """Semáforo que acota las publicaciones programadas simultáneas."""
+    global _post_semaphore
+    if _post_semaphore is None:
+        _post_semaphore = asyncio.Semaphore(SCHEDULED_POST_CONCURRENCY)
+    return _post_semaphore
+
+
+async def publish_scheduled_post(bot: Bot, post_id: int):
+    """
+    Tarea: Publicar un post programado.
+
+    Proceso:
+    1. Reclama el post (pending → sending) y confirma el reclamo
+    2. Publica en los canales destino en paralelo
+    3. Registra el resultado (sent/failed)
+
+    Args:
+        bot: Instancia del bot de Telegram
+        post_id: ID del post programado
+    """
+    async with _get_post_semaphore():
+        try:
+            async with get_session() as session:
+                container = ServiceContainer(session, bot)
+
+                post = await container.scheduled_post.claim_post(post_id)
+                if post is None:
+                    logger.debug(f"✓ Post programado #{post_id} ya no está pendiente")
+                    return
+
+                # Confirmar el reclamo antes de enviar: un reinicio a mitad
+                # de envío deja el post en "sending" y no se republica
+                await session.commit()
+
+                channels = []
+                if post.target_channel in ("vip", "both"):
+                    vip_channel = await container.channel.get_vip_channel_id()
+                    if vip_channel:
+                        channels.append(("VIP", vip_channel))
+                if post.target_channel in ("free", "both"):
+                    free_channel = await container.channel.get_free_channel_id()
+                    if free_channel:
+                        channels.append(("Free", free_channel))
+
+                if not channels:
+                    await container.scheduled_post.mark_result(
+                        post_id, False, "Canales no configurados"
+                    )
+                    logger.warning(f"⚠️ Post programado #{post_id}: canales no configurados")
+                    return
+
+                errors = []
+                async with bulk_lane():
+                    async for name, success, msg, _ in container.channel.send_to_channels(
+                        channels,
+                        text=post.caption or "",
+                        photo=post.file_id if post.content_type == "photo" else None,
+                        video=post.file_id if post.content_type == "video" else None,
+                        add_reactions=post.add_reactions,
+                        protect_content=post.protect_content
+                    ):
+                        if not success:
+                            errors.append(f"{name}: {msg}")
+
+                await container.scheduled_post.mark_result(
+                    post_id, not errors, "; ".join(errors) or None
+                )
+
+                if errors:
+                    logger.error(f"❌ Post programado #{post_id} con errores: {errors}")
+                else:
+                    logger.info(f"✅ Post programado #{post_id} publicado")
+
+        except Exception as e:
+            logger.error(f"❌ Error publicando post programado #{post_id}: {e}", exc_info=True)
+
+
+async def publish_due_posts(bot: Bot) -> int:
+    """
+    Tarea: Publicar los posts pendientes cuya hora ya pasó.
+
+    schedule_post agenda el job en la réplica que atendió al admin; si esa
+    réplica muere antes de la hora, nadie más tiene el job en memoria. El
+    líder barre la tabla periódicamente y publica lo vencido (el reclamo
+    pending → sending evita duplicar lo que publique el job original).
+
+    Args:
+        bot: Instancia del bot de Telegram
+
+    Returns:
+        int: Posts vencidos encontrados
+    """
+    try:
+        async with get_session() as session:
+            post_ids = await ServiceContainer(session, bot).scheduled_post.get_due_post_ids()
+    except Exception as e:
+        logger.error(f"❌ Error leyendo posts programados vencidos: {e}", exc_info=True)
+        return 0
+
+    if post_ids:
+        logger.info(f"🕒 {len(post_ids)} publicación(es) programada(s) vencida(s)")
+        await asyncio.gather(*(publish_scheduled_post(bot, post_id) for post_id in post_ids))
+    return len(post_ids)
+
+
+def schedule_post(bot: Bot, post_id: int, run_at: datetime) -> bool:
+    """
+    Agenda la publicación de un post en el scheduler.
+
+    Sin misfire_grace_time: un post vencido mientras el bot estaba
+    caído se publica en cuanto el scheduler arranca.
+
+    Args:
+        bot: Instancia del bot de Telegram
+        post_id: ID del post programado
+        run_at: Momento de publicación (UTC naive)
+
+    Returns:
+        bool: False si el scheduler no está corriendo
+    """
+    if _scheduler is None:
+        logger.warning(f"⚠️ Scheduler no iniciado, post #{post_id} se agendará al iniciar")
+        return False
+
+    _scheduler.add_job(
+        publish_scheduled_post,
+        trigger=DateTrigger(run_date=run_at, timezone="UTC"),
+        args=[bot, post_id],
+        id=f"scheduled_post_{post_id}",
+        name=f"Publicación programada #{post_id}",
+        replace_existing=True,
+        misfire_grace_time=None,
+        coalesce=True
+    )
+    return True
+
+
+def unschedule_post(post_id: int) -> None:
+    """
+    Quita del scheduler el job de un post (si existe).
+
+    Args:
+        post_id: ID del post programado
+    """
+    if _scheduler is None:
+        return
+
+    try:
+        _scheduler.remove_job(f"scheduled_post_{post_id}")
+    except JobLookupError:
+        pass
+
+
+async def restore_scheduled_posts(bot: Bot) -> int:
+    """
+    Recrea los jobs de los posts pendientes guardados en BD.
+
+    La tabla scheduled_posts es el job store persistente: los jobs en
+    memoria se reconstruyen en cada arranque.
+
+    Args:
+        bot: Instancia del bot de Telegram
+
+    Returns:
+        int: Posts agendados
+    """
+    try:
+        async with get_session() as session:
+            container = ServiceContainer(session, bot)
+            await container.scheduled_post.fail_interrupted_posts()
+            posts = await container.scheduled_post.get_pending_posts()
+
+        for post in posts:
+            schedule_post(bot, post.id, post.scheduled_at)
+
+        if posts:
+            logger.info(f"🕒 {len(posts)} publicación(es) programada(s) restaurada(s)")
+        return len(posts)
+
+    except Exception as e:
+        logger.error(f"❌ Error restaurando publicaciones programadas: {e}", exc_info=True)
+        return 0
+
+
 async def start_background_tasks(bot: Bot):
     """
     Inicia el scheduler con todas las tareas programadas.
 
     Configuración:
-    - Expulsión VIP: Cada 60 minutos (configurable)
-    - Procesamiento Free: Cada 5 minutos (o según wait_time)
-    - Limpieza: Cada 24 horas (diaria a las 3 AM)
-    - Limpieza post-reinicio: Al inicio del bot
+    - Heartbeat del lease de líder: Cada lease.heartbeat_seconds (y al inicio)
+    - Expulsión VIP: Cada 60 minutos (configurable) [solo líder]
+    - Procesamiento Free: Cada 5 minutos (o según wait_time) [solo líder]
+    - Limpieza: Cada 24 horas (diaria a las 3 AM) [solo líder]
+    - Expiración de rachas: Diaria a medianoche UTC [solo líder]
+    - Barrido de historial de sesión: Cada SESSION_HISTORY_SWEEP_MINUTES (memoria local)
+    - Cola de entregas de contenido: Cada CONTENT_DELIVERY_POLL_SECONDS (y al inicio) [solo líder]
+    - Posts programados vencidos: Cada SCHEDULED_POST_SWEEP_SECONDS [solo líder]
+    - Limpieza post-reinicio y publicaciones programadas: Al ganar el liderazgo
 
     Args:
         bot: Instancia del bot de Telegram
     """
-    global _scheduler
+    global _scheduler, _lease
 
     if _scheduler is not None:
         logger.warning("⚠️ Scheduler ya está corriendo")
@@ -281,19 +606,32 @@ async def start_background_tasks(bot: Bot):
 
     logger.info("🚀 Iniciando background tasks...")
 
-    # LIMPIEZA POST-REINICIO: Marcar solicitudes antiguas como expiradas
-    # Esto evita errores cuando el bot se reinicia y hay solicitudes pendientes
-    # que ya expiraron en Telegram (ChatJoinRequest expira después de ~10 min)
-    await cleanup_expired_requests_after_restart(bot)
+    if _lease is None:
+        _lease = LeaderLease()
 
     _scheduler = AsyncIOScheduler(timezone="UTC")
+    instrument_scheduler(_scheduler)  # Duración y errores por job (GET /metrics)
+
+    # Tarea 0: Heartbeat del lease de líder
+    # La primera renovación se hace ahora (abajo): una sola réplica es líder
+    # desde el arranque, como antes de la elección
+    _scheduler.add_job(
+        lease_heartbeat,
+        trigger=IntervalTrigger(seconds=_lease.heartbeat_seconds, timezone="UTC"),
+        args=[bot],
+        id="lease_heartbeat",
+        name="Heartbeat del lease de líder",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True
+    )
 
     # Tarea 1: Expulsión VIP expirados
     # Frecuencia: Cada 60 minutos (Config.CLEANUP_INTERVAL_MINUTES)
     _scheduler.add_job(
-        expire_and_kick_vip_subscribers,
+        _run_as_leader,
         trigger=IntervalTrigger(minutes=Config.CLEANUP_INTERVAL_MINUTES, timezone="UTC"),
-        args=[bot],
+        args=[expire_and_kick_vip_subscribers, bot],
         id="expire_vip",
         name="Expulsar VIPs expirados",
         replace_existing=True,
@@ -308,9 +646,9 @@ async def start_background_tasks(bot: Bot):
     # Tarea 2: Procesamiento cola Free
     # Frecuencia: Cada 5 minutos (Config.PROCESS_FREE_QUEUE_MINUTES)
     _scheduler.add_job(
-        process_free_queue,
+        _run_as_leader,
         trigger=IntervalTrigger(minutes=Config.PROCESS_FREE_QUEUE_MINUTES, timezone="UTC"),
-        args=[bot],
+        args=[process_free_queue, bot],
         id="process_free_queue",
         name="Procesar cola Free",
         replace_existing=True,
@@ -325,9 +663,9 @@ async def start_background_tasks(bot: Bot):
     # Tarea 3: Limpieza de datos antiguos
     # Frecuencia: Diaria a las 3 AM UTC
     _scheduler.add_job(
-        cleanup_old_data,
+        _run_as_leader,
         trigger=CronTrigger(hour=3, minute=0, timezone="UTC"),
-        args=[bot],
+        args=[cleanup_old_data, bot],
         id="cleanup_old_data",
         name="Limpieza de datos antiguos",
         replace_existing=True,
@@ -340,9 +678,9 @@ async def start_background_tasks(bot: Bot):
     # Tarea 4: Expiración de rachas diarias
     # Frecuencia: Diaria a medianoche UTC (00:00)
     _scheduler.add_job(
-        expire_streaks,
+        _run_as_leader,
         trigger=CronTrigger(hour=0, minute=0, timezone="UTC"),
-        args=[bot],
+        args=[expire_streaks, bot],
         id="expire_streaks",
         name="Expiración de rachas diarias",
         replace_existing=True,
@@ -352,6 +690,59 @@ async def start_background_tasks(bot: Bot):
     )
     logger.info("✅ Tarea programada: Expiración de rachas (medianoche UTC)")
 
+    # Tarea 5: Barrido del historial de mensajes en memoria
+    # Historial local de cada proceso: corre en todas las réplicas
+    _scheduler.add_job(
+        sweep_session_history,
+        trigger=IntervalTrigger(minutes=SESSION_HISTORY_SWEEP_MINUTES, timezone="UTC"),
+        id="sweep_session_history",
+        name="Barrido de historial de sesión",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True
+    )
+    logger.info(
+        f"✅ Tarea programada: Barrido de historial (cada {SESSION_HISTORY_SWEEP_MINUTES} min)"
+    )
+
+    # Tarea 6: Cola de entregas de contenido comprado
+    # Primera pasada inmediata: reanuda las entregas interrumpidas por un reinicio
+    _scheduler.add_job(
+        _run_as_leader,
+        trigger=IntervalTrigger(seconds=CONTENT_DELIVERY_POLL_SECONDS, timezone="UTC"),
+        args=[process_due_deliveries, bot],
+        id="process_content_deliveries",
+        name="Procesar cola de entregas de contenido",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+        next_run_time=datetime.now(timezone.utc)
+    )
+    logger.info(
+        f"✅ Tarea programada: Entregas de contenido (cada {CONTENT_DELIVERY_POLL_SECONDS}s)"
+    )
+
+    # Tarea 7: Barrido de posts programados vencidos
+    # Los jobs viven en la réplica que atendió al admin; si muere, el líder
+    # los publica aquí
+    _scheduler.add_job(
+        _run_as_leader,
+        trigger=IntervalTrigger(seconds=SCHEDULED_POST_SWEEP_SECONDS, timezone="UTC"),
+        args=[publish_due_posts, bot],
+        id="publish_due_posts",
+        name="Publicar posts programados vencidos",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True
+    )
+    logger.info(
+        f"✅ Tarea programada: Posts programados vencidos (cada {SCHEDULED_POST_SWEEP_SECONDS}s)"
+    )
+
+    # Elección inicial: si esta réplica es líder, limpieza post-reinicio
+    # y Tarea 8 (publicaciones programadas restauradas desde BD)
+    await lease_heartbeat(bot)
+
     # Iniciar scheduler
     _scheduler.start()
     logger.info("✅ Background tasks iniciados correctamente")
@@ -382,6 +773,41 @@ def stop_background_tasks():
         _scheduler = None
 
 
+async def release_leadership() -> None:
+    """
+    Libera el lease de líder en un shutdown limpio.
+
+    Otra réplica lo toma en su siguiente heartbeat, sin esperar a que
+    venza. Debe llamarse después de stop_background_tasks().
+    """
+    global _lease, _leading
+
+    if _lease is None:
+        return
+
+    await _lease.release()
+    _lease = None
+    _leading = False
+
+
+def get_background_queue_stats() -> Dict[str, int]:
+    """
+    Trabajos en segundo plano de este proceso (para GET /metrics).
+
+    Returns:
+        Dict con broadcasts y airdrops corriendo, entregas de contenido
+        corriendo y vencidas, y jobs del scheduler
+    """
+    deliveries = delivery_queue_stats()
+    return {
+        "running_broadcasts": sum(1 for task in _running_broadcasts.values() if not task.done()),
+        "running_airdrops": sum(1 for task in _running_airdrops.values() if not task.done()),
+        "running_content_deliveries": deliveries["running"],
+        "due_content_deliveries": deliveries["due"],
+        "scheduler_jobs": len(_scheduler.get_jobs()) if _scheduler is not None else 0,
+    }
+
+
 def get_scheduler_status() -> dict:
     """
     Obtiene el estado actual del scheduler de background tasks.
@@ -390,6 +816,7 @@ def get_scheduler_status() -> dict:
         Dict con info del scheduler:
         {
             "running": bool,
+            "leader": bool,  # Esta réplica ejecuta los jobs de líder
             "jobs_count": int,
             "jobs": [
                 {
@@ -409,6 +836,7 @@ def get_scheduler_status() -> dict:
     if _scheduler is None:
         return {
             "running": False,
+            "leader": False,
             "jobs_count": 0,
             "jobs": []
         }
@@ -424,6 +852,7 @@ def get_scheduler_status() -> dict:
 
     return {
         "running": _scheduler.running,
+        "leader": _lease is not None and _lease.is_leader,
         "jobs_count": len(jobs_info),
         "jobs": jobs_info
     }
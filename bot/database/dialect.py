@@ -137,3 +137,25 @@ def is_production_database(url: str) -> bool:
             "Asumiendo desarrollo (False)."
         )
         return False
+
+
+def dialect_insert(session, table):
+    """
+    Construye un INSERT específico del dialecto de la sesión.
+
+    Los INSERT de los dialectos SQLite y PostgreSQL exponen
+    on_conflict_do_nothing()/on_conflict_do_update(), que el INSERT
+    genérico de SQLAlchemy no tiene.
+
+    Args:
+        session: AsyncSession (o Session) ligada a un engine
+        table: Modelo o Table destino
+
+    Returns:
+        Insert del dialecto correspondiente
+    """
+    if session.bind.dialect.name == DatabaseDialect.POSTGRESQL.value:
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
@@ -18,6 +18,8 @@ from config import Config
 from bot.database.base import Base
 from bot.database.models import BotConfig
 from bot.database.dialect import parse_database_url, DatabaseDialect
+from bot.database.search_index import create_content_search_index, create_user_search_index
+from bot.utils.metrics import instrument_engine
 
 logger = logging.getLogger(__name__)
 
@@ -186,11 +188,23 @@ async def init_db(debug_mode: bool = False) -> None:
             "Use 'sqlite://' o 'postgresql://'"
         )
 
+    # Métricas: queries por update y pool de conexiones (GET /metrics)
+    instrument_engine(_engine)
+
     # Crear todas las tablas
     async with _engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
         logger.info("✅ Tablas creadas/verificadas")
 
+    # Índices de búsqueda (usuarios: FTS5 / pg_trgm; contenido: FTS5 / tsvector).
+    # Si fallan (p.ej. sin permisos para CREATE EXTENSION) la búsqueda cae a ILIKE.
+    for create_index in (create_user_search_index, create_content_search_index):
+        try:
+            async with _engine.begin() as conn:
+                await conn.run_sync(create_index)
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo crear el índice de búsqueda ({create_index.__name__}): {e}")
+
     # Crear session factory
     _session_factory = async_sessionmaker(
         _engine,
@@ -546,3 +546,124 @@ class RewardStatus(str, Enum):
             RewardStatus.EXPIRED: "⏰"
         }
         return emojis[self]
+
+
+class AirdropSegment(str, Enum):
+    """
+    Segmentos de usuarios para airdrops masivos de besitos.
+
+    Segmentos:
+        ACTIVE_VIP: Suscriptores VIP activos
+        MIN_LEVEL: Usuarios con nivel de gamificación >= N
+        WEEKLY_REACTORS: Usuarios que reaccionaron en los últimos 7 días
+    """
+
+    ACTIVE_VIP = "active_vip"
+    MIN_LEVEL = "min_level"
+    WEEKLY_REACTORS = "weekly_reactors"
+
+    def __str__(self) -> str:
+        """Retorna valor string del enum."""
+        return self.value
+
+    @property
+    def display_name(self) -> str:
+        """Retorna nombre legible del segmento."""
+        names = {
+            AirdropSegment.ACTIVE_VIP: "VIPs activos",
+            AirdropSegment.MIN_LEVEL: "Nivel mínimo",
+            AirdropSegment.WEEKLY_REACTORS: "Reaccionaron esta semana"
+        }
+        return names[self]
+
+
+class BroadcastSegment(str, Enum):
+    """
+    Segmentos de usuarios para broadcasts por mensaje directo.
+
+    Segmentos:
+        ALL_FREE: Todos los usuarios con rol FREE
+        ACTIVE_VIP: Suscriptores VIP activos
+        VIP_EXPIRING: VIPs activos que expiran en los próximos 7 días
+        PENDING_INTERESTS: Usuarios con intereses sin atender
+    """
+
+    ALL_FREE = "all_free"
+    ACTIVE_VIP = "active_vip"
+    VIP_EXPIRING = "vip_expiring"
+    PENDING_INTERESTS = "pending_interests"
+
+    def __str__(self) -> str:
+        """Retorna valor string del enum."""
+        return self.value
+
+    @property
+    def display_name(self) -> str:
+        """Retorna nombre legible del segmento."""
+        names = {
+            BroadcastSegment.ALL_FREE: "Todos los Free",
+            BroadcastSegment.ACTIVE_VIP: "VIPs activos",
+            BroadcastSegment.VIP_EXPIRING: "VIPs que expiran en 7 días",
+            BroadcastSegment.PENDING_INTERESTS: "Con intereses pendientes"
+        }
+        return names[self]
+
+
+class DeliveryStatus(str, Enum):
+    """
+    Estado de entrega de un broadcast a un destinatario.
+
+    Estados:
+        PENDING: Aún no enviado (se reintenta al reanudar)
+        SENT: Entregado
+        FAILED: Error transitorio o desconocido
+        BLOCKED: Usuario inalcanzable (bloqueó el bot, cuenta eliminada, etc.)
+    """
+
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    BLOCKED = "blocked"
+
+    def __str__(self) -> str:
+        """Retorna valor string del enum."""
+        return self.value
+
+
+class ContentDeliveryStatus(str, Enum):
+    """
+    Estado de la entrega de un contenido comprado.
+
+    Estados:
+        PENDING: En cola o esperando reintento (puede haber álbumes ya enviados)
+        DELIVERED: Todos los álbumes entregados
+        FAILED: Reintentos agotados o usuario inalcanzable
+    """
+
+    PENDING = "pending"
+    DELIVERED = "delivered"
+    FAILED = "failed"
+
+    def __str__(self) -> str:
+        """Retorna valor string del enum."""
+        return self.value
+
+    @property
+    def emoji(self) -> str:
+        """Retorna emoji del estado."""
+        emojis = {
+            ContentDeliveryStatus.PENDING: "⏳",
+            ContentDeliveryStatus.DELIVERED: "✅",
+            ContentDeliveryStatus.FAILED: "⚠️"
+        }
+        return emojis[self]
+
+    @property
+    def display_name(self) -> str:
+        """Retorna nombre legible del estado."""
+        names = {
+            ContentDeliveryStatus.PENDING: "En camino",
+            ContentDeliveryStatus.DELIVERED: "Entregado",
+            ContentDeliveryStatus.FAILED: "Entrega fallida"
+        }
+        return names[self]
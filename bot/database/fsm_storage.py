@@ -0,0 +1,403 @@
+"""
+FSM Storage - Storage de aiogram persistido en la base de datos.
+
+MemoryStorage perdía todos los flujos de varios pasos (broadcast, creación
+de contenido y productos, tarifas...) en cada redeploy y ataba el bot a un
+solo proceso. SQLAlchemyStorage guarda el estado en la tabla fsm_states
+sobre el engine existente (SQLite o PostgreSQL):
+
+- Cache write-through en memoria (LRU acotado): las lecturas repetidas de
+  un mismo update (middleware FSM, filtros, handler) no tocan la BD
+- Escrituras agrupadas: set_state/set_data actualizan la cache y marcan la
+  clave; un flush coalesce las claves sucias en un UPSERT por lote tras
+  flush_interval (o al llegar a flush_batch_size). Un crash pierde a lo
+  sumo esa ventana
+- Los datos se serializan en set_data: un valor no serializable falla en el
+  handler que lo guardó y nunca llega al lote del flush
+- Expiración: un estado sin escrituras durante state_ttl se considera
+  abandonado (se lee vacío) y purge_expired_states() borra sus filas
+- Réplicas: cache_ttl acota cuánto se confía en la cache antes de releer
+  la fila; con varias réplicas sin afinidad por usuario conviene un valor
+  bajo (0 = releer siempre salvo escrituras pendientes)
+
+Los datos se serializan a JSON preservando Enums del proyecto y datetimes
+(los flujos guardan, p. ej., ContentTier y ContentCategory en el contexto).
+
+Uso (main.py):
+    dp = Dispatcher(storage=SQLAlchemyStorage())
+"""
+import asyncio
+import importlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StateType, StorageKey
+from sqlalchemy import delete
+
+from bot.database.dialect import dialect_insert
+from bot.database.engine import get_session, get_session_factory
+from bot.database.models import FSMRecord
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Ventana de agrupación de escrituras (segundos)
+FLUSH_INTERVAL_SECONDS = 0.2
+
+# Claves sucias que fuerzan un flush inmediato (y filas por UPSERT)
+FLUSH_BATCH_SIZE = 100
+
+# Solo se reconstruyen Enums de módulos del proyecto
+_ENUM_MODULE_PREFIX = "bot."
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# ===== SERIALIZACIÓN =====
+
+def _to_json(value: Any) -> Any:
+    """Convierte valores a tipos JSON, etiquetando Enums y datetimes."""
+    if isinstance(value, Enum):
+        enum_cls = type(value)
+        return {"__enum__": f"{enum_cls.__module__}:{enum_cls.__qualname__}", "value": value.value}
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, Mapping):
+        return {str(k): _to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [_to_json(v) for v in value]
+    return value
+
+
+def _from_json(obj: Dict[str, Any]) -> Any:
+    """object_hook: reconstruye los valores etiquetados por _to_json."""
+    if "__datetime__" in obj and len(obj) == 1:
+        return datetime.fromisoformat(obj["__datetime__"])
+
+    if "__enum__" in obj and len(obj) == 2:
+        module_name, _, qualname = obj["__enum__"].partition(":")
+        if module_name.startswith(_ENUM_MODULE_PREFIX):
+            try:
+                target = importlib.import_module(module_name)
+                for attr in qualname.split("."):
+                    target = getattr(target, attr)
+                return target(obj["value"])
+            except (ImportError, AttributeError, ValueError, TypeError):
+                logger.warning(f"⚠️ FSM: no se pudo reconstruir {obj['__enum__']}")
+        return obj["value"]
+
+    return obj
+
+
+def encode_data(data: Mapping[str, Any]) -> Optional[str]:
+    """
+    Serializa los datos de un contexto FSM.
+
+    Args:
+        data: Datos del contexto
+
+    Returns:
+        str JSON, o None si no hay datos
+    """
+    if not data:
+        return None
+    return json.dumps(_to_json(data), ensure_ascii=False, separators=(",", ":"))
+
+
+def decode_data(raw: Optional[str]) -> Dict[str, Any]:
+    """
+    Deserializa los datos de un contexto FSM.
+
+    Args:
+        raw: JSON guardado por encode_data
+
+    Returns:
+        dict (vacío si no hay datos)
+    """
+    if not raw:
+        return {}
+    return json.loads(raw, object_hook=_from_json)
+
+
+# ===== STORAGE =====
+
+class _Entry:
+    """Estado cacheado de una clave (raw: data ya serializada a JSON)."""
+
+    __slots__ = ("state", "data", "raw", "updated_at", "cached_at")
+
+    def __init__(
+        self,
+        state: Optional[str],
+        data: Dict[str, Any],
+        raw: Optional[str],
+        updated_at: datetime
+    ):
+        self.state = state
+        self.data = data
+        self.raw = raw
+        self.updated_at = updated_at
+        self.cached_at = time.monotonic()
+
+
+class SQLAlchemyStorage(BaseStorage):
+    """
+    BaseStorage de aiogram sobre la tabla fsm_states.
+
+    Thread Safety:
+        No requerido - event loop async único. Las claves con escrituras
+        pendientes o en vuelo (flush sin confirmar) nunca se evictan ni se
+        releen de la BD.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        *,
+        max_cached: Optional[int] = None,
+        cache_ttl: Optional[float] = None,
+        state_ttl: Optional[float] = None,
+        flush_interval: float = FLUSH_INTERVAL_SECONDS,
+        flush_batch_size: int = FLUSH_BATCH_SIZE,
+        key_builder: Optional[KeyBuilder] = None
+    ):
+        """
+        Inicializa el storage.
+
+        Args:
+            session_factory: Factory de AsyncSession (default: el del engine global, al primer uso)
+            max_cached: Claves en memoria (default: Config.FSM_CACHE_MAX_ENTRIES)
+            cache_ttl: Segundos que una entrada limpia se sirve sin releer
+                (default: Config.FSM_CACHE_TTL_SECONDS; 0 = releer siempre)
+            state_ttl: Segundos sin escrituras tras los que un estado se
+                considera abandonado (default: Config.FSM_STATE_TTL_HOURS)
+            flush_interval: Ventana de agrupación de escrituras
+            flush_batch_size: Claves sucias que fuerzan flush inmediato
+            key_builder: Constructor de claves (default: bot, chat, user, destiny)
+        """
+        self._session_factory = session_factory
+        self.max_cached = max_cached if max_cached is not None else Config.FSM_CACHE_MAX_ENTRIES
+        self.cache_ttl = cache_ttl if cache_ttl is not None else Config.FSM_CACHE_TTL_SECONDS
+        self.state_ttl = timedelta(
+            seconds=state_ttl if state_ttl is not None else Config.FSM_STATE_TTL_HOURS * 3600
+        )
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        self.key_builder = key_builder or DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+
+        self._cache: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._dirty: Set[str] = set()
+        self._inflight: Set[str] = set()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._stats = {"hits": 0, "loads": 0, "flushes": 0, "rows_written": 0}
+
+    def _factory(self) -> Callable:
+        if self._session_factory is None:
+            self._session_factory = get_session_factory()
+        return self._session_factory
+
+    # ===== CACHE =====
+
+    def _is_fresh(self, key: str, entry: _Entry) -> bool:
+        if key in self._dirty or key in self._inflight:
+            return True
+        return self.cache_ttl > 0 and time.monotonic() - entry.cached_at < self.cache_ttl
+
+    def _remember(self, key: str, entry: _Entry) -> None:
+        """Guarda la entrada y evicta las limpias más antiguas (LRU)."""
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+
+        if len(self._cache) <= self.max_cached:
+            return
+        for old_key in list(self._cache):
+            if len(self._cache) <= self.max_cached:
+                break
+            if old_key not in self._dirty and old_key not in self._inflight and old_key != key:
+                del self._cache[old_key]
+
+    async def _entry(self, key: StorageKey) -> _Entry:
+        """Obtiene la entrada de la clave (cache o BD), vacía si expiró."""
+        storage_key = self.key_builder.build(key)
+        entry = self._cache.get(storage_key)
+
+        if entry is not None and self._is_fresh(storage_key, entry):
+            self._cache.move_to_end(storage_key)
+            self._stats["hits"] += 1
+        else:
+            async with self._factory()() as session:
+                record = await session.get(FSMRecord, storage_key)
+                if record is None:
+                    entry = _Entry(None, {}, None, _utc_now())
+                else:
+                    entry = _Entry(
+                        record.state, decode_data(record.data), record.data, record.updated_at
+                    )
+            self._stats["loads"] += 1
+            self._remember(storage_key, entry)
+
+        if entry.updated_at < _utc_now() - self.state_ttl:
+            # Estado abandonado: se lee vacío; purge_expired_states() borra la fila
+            entry.state, entry.data, entry.raw = None, {}, None
+        return entry
+
+    def _mark_dirty(self, key: StorageKey, entry: _Entry) -> str:
+        storage_key = self.key_builder.build(key)
+        entry.updated_at = _utc_now()
+        entry.cached_at = time.monotonic()
+        self._dirty.add(storage_key)
+        self._remember(storage_key, entry)
+        return storage_key
+
+    async def _after_write(self) -> None:
+        if len(self._dirty) >= self.flush_batch_size:
+            try:
+                await self.flush()
+                return
+            except Exception as e:
+                # El handler no falla: las claves siguen sucias y se reintentan
+                logger.error(f"❌ Error guardando estados FSM: {e}", exc_info=True)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"❌ Error guardando estados FSM: {e}", exc_info=True)
+            if self._dirty:
+                self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    # ===== BaseStorage =====
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        entry = await self._entry(key)
+        entry.state = state.state if isinstance(state, State) else state
+        self._mark_dirty(key, entry)
+        await self._after_write()
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return (await self._entry(key)).state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        if not isinstance(data, dict):
+            raise TypeError(f"Data must be a dict, not {type(data).__name__}")
+        # Serializar aquí: un valor inválido falla en este handler, no en el flush
+        raw = encode_data(data)
+        entry = await self._entry(key)
+        entry.data = data.copy()
+        entry.raw = raw
+        self._mark_dirty(key, entry)
+        await self._after_write()
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        return (await self._entry(key)).data.copy()
+
+    async def close(self) -> None:
+        """Cancela el flush diferido y guarda las escrituras pendientes."""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._flush_task = None
+        if self._dirty:
+            await self.flush()
+
+    # ===== PERSISTENCIA =====
+
+    async def flush(self) -> int:
+        """
+        Guarda las claves sucias: UPSERT por lotes y DELETE de las vacías.
+
+        Mientras la escritura está en vuelo las claves siguen protegidas de
+        la evicción; si falla, vuelven a quedar sucias para el próximo flush.
+
+        Returns:
+            int: Claves persistidas
+        """
+        async with self._flush_lock:
+            keys = list(self._dirty)
+            if not keys:
+                return 0
+            self._inflight.update(keys)
+            self._dirty.clear()
+
+            rows: List[Dict[str, Any]] = []
+            empty: List[str] = []
+            for storage_key in keys:
+                entry = self._cache[storage_key]
+                if entry.state is None and not entry.data:
+                    empty.append(storage_key)
+                else:
+                    rows.append({
+                        "key": storage_key,
+                        "state": entry.state,
+                        "data": entry.raw,
+                        "updated_at": entry.updated_at,
+                    })
+
+            try:
+                async with self._factory()() as session:
+                    for start in range(0, len(rows), self.flush_batch_size):
+                        stmt = dialect_insert(session, FSMRecord).values(
+                            rows[start:start + self.flush_batch_size]
+                        )
+                        stmt = stmt.on_conflict_do_update(
+                            index_elements=["key"],
+                            set_={
+                                "state": stmt.excluded.state,
+                                "data": stmt.excluded.data,
+                                "updated_at": stmt.excluded.updated_at,
+                            }
+                        )
+                        await session.execute(stmt)
+                    if empty:
+                        await session.execute(delete(FSMRecord).where(FSMRecord.key.in_(empty)))
+                    await session.commit()
+            except Exception:
+                self._dirty.update(keys)
+                raise
+            finally:
+                self._inflight.difference_update(keys)
+
+            self._stats["flushes"] += 1
+            self._stats["rows_written"] += len(keys)
+            logger.debug(f"💾 FSM: {len(rows)} estado(s) guardados, {len(empty)} eliminados")
+            return len(keys)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Métricas del storage.
+
+        Returns:
+            dict: hits/loads de cache, flushes, filas escritas, entradas y pendientes
+        """
+        return {**self._stats, "cached": len(self._cache), "pending": len(self._dirty)}
+
+
+async def purge_expired_states(state_ttl_hours: Optional[float] = None) -> int:
+    """
+    Borra los estados FSM abandonados (sin escrituras durante el TTL).
+
+    Args:
+        state_ttl_hours: Horas sin escrituras (default: Config.FSM_STATE_TTL_HOURS)
+
+    Returns:
+        int: Filas eliminadas
+    """
+    hours = state_ttl_hours if state_ttl_hours is not None else Config.FSM_STATE_TTL_HOURS
+    cutoff = _utc_now() - timedelta(hours=hours)
+
+    async with get_session() as session:
+        result = await session.execute(
+            delete(FSMRecord).where(FSMRecord.updated_at < cutoff)
+        )
+        return result.rowcount or 0
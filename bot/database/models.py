@@ -11,6 +11,8 @@ Tablas:
 - content_packages: Paquetes de contenido (FREE/VIP/PREMIUM)
 - user_interests: Intereses de usuario en paquetes de contenido
 - user_role_change_log: Auditoría de cambios de rol
+- broadcasts / broadcast_deliveries: Broadcasts por DM y su estado por destinatario
+- scheduled_posts: Publicaciones programadas a canales
 """
 import logging
 from datetime import datetime, timezone
@@ -18,7 +20,7 @@ from typing import Optional, List
 
 from sqlalchemy import (
     Column, Integer, String, Boolean, DateTime,
-    BigInteger, JSON, ForeignKey, Index, Float, Enum, Numeric, desc, UniqueConstraint, text
+    BigInteger, JSON, ForeignKey, Index, Float, Enum, Numeric, desc, UniqueConstraint, text, Text
 )
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
@@ -463,6 +465,8 @@ class UserInterest(Base):
         Index('idx_interest_user_package', 'user_id', 'package_id', unique=True),
         # Composite index for "attended interests by user" queries
         Index('idx_interest_user_package_attended', 'user_id', 'package_id', 'is_attended'),
+        # Index for "recent interests" (ORDER BY created_at DESC LIMIT n)
+        Index('idx_interest_created_at', 'created_at'),
     )
 
 
@@ -802,6 +806,247 @@ class Transaction(Base):
         )
 
 
+class BesitosAirdrop(Base):
+    """
+    Campaña de airdrop masivo de besitos a un segmento de usuarios.
+
+    La clave de campaña es única: relanzar un airdrop con la misma clave
+    reanuda la campaña existente en lugar de acreditar dos veces. El
+    progreso se guarda como cursor keyset (last_user_id) en la misma
+    transacción que acredita cada chunk.
+
+    Attributes:
+        id: ID único de la campaña (Primary Key)
+        campaign_key: Clave de idempotencia elegida por el admin
+        segment: Segmento objetivo (AirdropSegment.value)
+        min_level: Nivel mínimo (solo segmento MIN_LEVEL)
+        amount: Besitos a acreditar por usuario
+        reason: Descripción registrada en cada transacción
+        admin_id: Admin que lanzó la campaña
+        status: "pending", "running", "completed" o "failed"
+        credited_count: Usuarios acreditados hasta ahora
+        last_user_id: Último user_id procesado (cursor keyset)
+        created_at: Fecha de creación (ancla la ventana de WEEKLY_REACTORS)
+        completed_at: Fecha de finalización
+    """
+
+    __tablename__ = "besitos_airdrops"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    campaign_key = Column(String(64), unique=True, nullable=False, index=True)
+
+    # Segmento
+    segment = Column(String(30), nullable=False)
+    min_level = Column(Integer, nullable=True)
+
+    # Crédito
+    amount = Column(Integer, nullable=False)
+    reason = Column(String(255), nullable=False)
+    admin_id = Column(BigInteger, nullable=False)
+
+    # Progreso
+    status = Column(String(20), nullable=False, default="pending")
+    credited_count = Column(Integer, nullable=False, default=0)
+    last_user_id = Column(BigInteger, nullable=False, default=0)
+
+    # Timestamps
+    created_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
+    updated_at = Column(
+        DateTime,
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        onupdate=lambda: datetime.now(timezone.utc).replace(tzinfo=None)
+    )
+    completed_at = Column(DateTime, nullable=True)
+
+    @property
+    def is_completed(self) -> bool:
+        """Retorna True si la campaña ya terminó de acreditar."""
+        return self.status == "completed"
+
+    def __repr__(self) -> str:
+        return (
+            f"<BesitosAirdrop(key={self.campaign_key}, segment={self.segment}, "
+            f"amount={self.amount}, status={self.status}, credited={self.credited_count})>"
+        )
+
+
+class Broadcast(Base):
+    """
+    Broadcast por mensaje directo a un segmento de usuarios.
+
+    Los destinatarios se materializan en broadcast_deliveries al iniciar;
+    el estado por destinatario permite reanudar tras un reinicio enviando
+    solo las entregas que siguen en "pending".
+
+    Attributes:
+        id: ID único del broadcast (Primary Key)
+        segment: Segmento objetivo (BroadcastSegment.value)
+        content_type: "text", "photo" o "video"
+        file_id: file_id de Telegram (photo/video)
+        text: Texto o caption del mensaje
+        protect_content: Si el contenido se envía protegido
+        admin_id: Admin que lanzó el broadcast
+        status: "pending", "running", "completed" o "failed"
+        total_recipients: Destinatarios materializados
+        sent_count / failed_count / blocked_count: Contadores de entrega
+        progress_chat_id / progress_message_id: Mensaje donde se reporta el progreso
+    """
+
+    __tablename__ = "broadcasts"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Destino y contenido
+    segment = Column(String(30), nullable=False)
+    content_type = Column(String(20), nullable=False)
+    file_id = Column(String(255), nullable=True)
+    text = Column(String(4096), nullable=True)
+    protect_content = Column(Boolean, nullable=False, default=False)
+    admin_id = Column(BigInteger, nullable=False)
+
+    # Progreso
+    status = Column(String(20), nullable=False, default="pending", index=True)
+    total_recipients = Column(Integer, nullable=False, default=0)
+    sent_count = Column(Integer, nullable=False, default=0)
+    failed_count = Column(Integer, nullable=False, default=0)
+    blocked_count = Column(Integer, nullable=False, default=0)
+
+    # Reporte de progreso
+    progress_chat_id = Column(BigInteger, nullable=True)
+    progress_message_id = Column(Integer, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+
+    # Relaciones
+    deliveries = relationship(
+        "BroadcastDelivery",
+        back_populates="broadcast",
+        cascade="all, delete-orphan"
+    )
+
+    @property
+    def processed_count(self) -> int:
+        """Retorna entregas con estado final (sent + failed + blocked)."""
+        return self.sent_count + self.failed_count + self.blocked_count
+
+    @property
+    def is_finished(self) -> bool:
+        """Retorna True si el broadcast ya no tiene trabajo pendiente."""
+        return self.status in ("completed", "failed")
+
+    def __repr__(self) -> str:
+        return (
+            f"<Broadcast(id={self.id}, segment={self.segment}, status={self.status}, "
+            f"sent={self.sent_count}/{self.total_recipients})>"
+        )
+
+
+class BroadcastDelivery(Base):
+    """
+    Estado de entrega de un broadcast a un destinatario.
+
+    Attributes:
+        id: ID único (Primary Key)
+        broadcast_id: Broadcast al que pertenece
+        user_id: Destinatario
+        status: DeliveryStatus.value
+        error_code: Código de _classify_notification_error si falló
+        sent_at: Momento de la entrega o del último intento
+    """
+
+    __tablename__ = "broadcast_deliveries"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    broadcast_id = Column(
+        Integer,
+        ForeignKey("broadcasts.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    user_id = Column(BigInteger, nullable=False)
+
+    status = Column(String(20), nullable=False, default="pending")
+    error_code = Column(String(30), nullable=True)
+    sent_at = Column(DateTime, nullable=True)
+
+    # Relaciones
+    broadcast = relationship("Broadcast", back_populates="deliveries")
+
+    __table_args__ = (
+        # Un destinatario por broadcast (materialización idempotente)
+        UniqueConstraint('broadcast_id', 'user_id', name='uq_broadcast_delivery_user'),
+        # Streaming de pendientes en orden de user_id
+        Index('idx_broadcast_delivery_status', 'broadcast_id', 'status', 'user_id'),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<BroadcastDelivery(broadcast={self.broadcast_id}, user={self.user_id}, "
+            f"status={self.status}, error={self.error_code})>"
+        )
+
+
+class ScheduledPost(Base):
+    """
+    Publicación programada a canal(es).
+
+    Guarda el contenido capturado por el flujo de broadcasting para
+    publicarlo en scheduled_at. La tabla es la fuente de verdad: al
+    iniciar, el scheduler recrea un job por cada post pendiente (los
+    vencidos durante una caída se publican de inmediato).
+
+    Attributes:
+        id: ID único (Primary Key)
+        target_channel: "vip", "free" o "both"
+        content_type: "text", "photo" o "video"
+        file_id: file_id de Telegram (photo/video)
+        caption: Texto o caption del mensaje
+        add_reactions: Si se agregan botones de reacción
+        protect_content: Si el contenido se publica protegido
+        scheduled_at: Momento de publicación (UTC)
+        status: "pending", "sending", "sent", "failed" o "cancelled"
+        created_by: Admin que programó la publicación
+        sent_at: Momento en que se publicó
+        error: Resultado por canal si algún envío falló
+    """
+
+    __tablename__ = "scheduled_posts"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Destino y contenido
+    target_channel = Column(String(10), nullable=False)
+    content_type = Column(String(20), nullable=False)
+    file_id = Column(String(255), nullable=True)
+    caption = Column(String(4096), nullable=True)
+    add_reactions = Column(Boolean, nullable=False, default=True)
+    protect_content = Column(Boolean, nullable=False, default=False)
+
+    # Programación y estado
+    scheduled_at = Column(DateTime, nullable=False)
+    status = Column(String(20), nullable=False, default="pending")
+    created_by = Column(BigInteger, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
+    sent_at = Column(DateTime, nullable=True)
+    error = Column(String(255), nullable=True)
+
+    __table_args__ = (
+        # Posts pendientes en orden de publicación (restauración al iniciar)
+        Index('idx_scheduled_post_status_time', 'status', 'scheduled_at'),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<ScheduledPost(id={self.id}, target={self.target_channel}, "
+            f"at={self.scheduled_at}, status={self.status})>"
+        )
+
+
 class UserReaction(Base):
     """
     Registro de reacciones de usuario a contenido de canales.
@@ -1270,6 +1515,79 @@ class UserContentAccess(Base):
         )
 
 
+class ContentDelivery(Base):
+    """
+    Entrega persistente de un contenido comprado.
+
+    El handler de compra solo encola la entrega; el runner
+    (bot/background/content_delivery.py) la envía en álbumes de hasta 10
+    archivos y registra el progreso por álbum, así que un fallo o reinicio
+    reanuda desde el último álbum confirmado. Los file_ids se copian al
+    encolar: editar el ContentSet después no altera una entrega en curso.
+
+    Attributes:
+        id: ID único (Primary Key)
+        access_id: UserContentAccess que originó la entrega
+        user_id: Destinatario
+        content_type: ContentType.value del set al momento de la compra
+        file_ids: file_ids de Telegram a enviar
+        status: ContentDeliveryStatus.value
+        attempts: Intentos fallidos acumulados
+        chunks_sent: Álbumes ya entregados
+        total_chunks: Álbumes totales de la entrega
+        next_attempt_at: Momento a partir del cual el runner la procesa
+        last_error: Código del último error (_classify_notification_error)
+        created_at / delivered_at: Timestamps
+    """
+
+    __tablename__ = "content_deliveries"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    access_id = Column(
+        Integer,
+        ForeignKey("user_content_access.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    user_id = Column(BigInteger, nullable=False, index=True)
+
+    # Contenido (copiado del ContentSet al encolar)
+    content_type = Column(String(20), nullable=False)
+    file_ids = Column(JSON, nullable=False, default=list)
+
+    # Progreso
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    chunks_sent = Column(Integer, nullable=False, default=0)
+    total_chunks = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
+    last_error = Column(String(30), nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
+    delivered_at = Column(DateTime, nullable=True)
+
+    # Relaciones
+    access = relationship("UserContentAccess", uselist=False)
+
+    __table_args__ = (
+        # Entregas vencidas: status = pending AND next_attempt_at <= now
+        Index('idx_content_delivery_due', 'status', 'next_attempt_at'),
+    )
+
+    @property
+    def is_finished(self) -> bool:
+        """Retorna True si la entrega ya no tiene trabajo pendiente."""
+        return self.status in ("delivered", "failed")
+
+    def __repr__(self) -> str:
+        return (
+            f"<ContentDelivery(id={self.id}, access={self.access_id}, user={self.user_id}, "
+            f"status={self.status}, chunks={self.chunks_sent}/{self.total_chunks})>"
+        )
+
+
 class Reward(Base):
     """
     Recompensa del sistema de logros.
@@ -1542,3 +1860,65 @@ class UserReward(Base):
             f"<UserReward(id={self.id}, user={self.user_id}, "
             f"reward={self.reward_id}, status={self.status.value})>"
         )
+
+
+class FSMRecord(Base):
+    """
+    Estado FSM (aiogram) persistido de un chat/usuario.
+
+    Lo escribe SQLAlchemyStorage (bot/database/fsm_storage.py): los flujos
+    de varios pasos sobreviven a un redeploy y las réplicas que comparten
+    la BD ven el mismo estado.
+
+    Attributes:
+        key: Clave del StorageKey (bot:chat:user[:thread]:destiny)
+        state: Nombre del State actual (None si no hay estado)
+        data: Datos del contexto, serializados por el storage (JSON)
+        updated_at: Última escritura (expiración de estados abandonados)
+    """
+
+    __tablename__ = "fsm_states"
+
+    key = Column(String(255), primary_key=True)
+    state = Column(String(255), nullable=True)
+    data = Column(Text, nullable=True)
+    updated_at = Column(
+        DateTime,
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        index=True
+    )
+
+    def __repr__(self) -> str:
+        return f"<FSMRecord(key={self.key}, state={self.state})>"
+
+
+class SchedulerLease(Base):
+    """
+    Lease de liderazgo del scheduler (elección de líder entre réplicas).
+
+    Solo la réplica que tiene el lease vigente ejecuta los jobs que no
+    toleran ejecutarse dos veces (expulsión VIP, cola Free, limpieza,
+    rachas). El líder renueva expires_at con un heartbeat; si deja de
+    renovarlo, otra réplica toma el lease al vencer.
+
+    Attributes:
+        name: Nombre del lease (uno por grupo de jobs)
+        holder: Identificador de la réplica que lo tiene (host:pid:sufijo)
+        expires_at: Vencimiento del lease (UTC)
+        acquired_at: Momento en que el holder actual lo tomó
+    """
+
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String(64), primary_key=True)
+    holder = Column(String(128), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    acquired_at = Column(
+        DateTime,
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None)
+    )
+
+    def __repr__(self) -> str:
+        return f"<SchedulerLease(name={self.name}, holder={self.holder})>"
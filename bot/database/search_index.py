@@ -0,0 +1,304 @@
+"""
+Índices de búsqueda (usuarios y contenido).
+
+Usuarios (username, first_name, last_name):
+- SQLite: tabla virtual FTS5 (tokenizer trigram) de contenido externo
+  sobre `users`, sincronizada por triggers
+- PostgreSQL: extensión pg_trgm + índice GIN sobre el documento de búsqueda
+
+Contenido (name, description de paquetes, content sets y productos):
+- SQLite: una tabla FTS5 compartida, mantenida por triggers en cada tabla
+- PostgreSQL: índice GIN sobre to_tsvector en cada tabla
+
+La DDL es idempotente: la ejecutan tanto las migraciones de Alembic como
+init_db (entornos que crean el esquema con create_all).
+"""
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+USER_SEARCH_FTS_TABLE = "users_search_fts"
+USER_SEARCH_TRGM_INDEX = "idx_users_search_trgm"
+
+# Documento de búsqueda en PostgreSQL. La query debe usar exactamente esta
+# expresión para que el planner use el índice GIN.
+USER_SEARCH_DOCUMENT_SQL = (
+    "(coalesce(users.username, '') || ' ' || users.first_name"
+    " || ' ' || coalesce(users.last_name, ''))"
+)
+
+_SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {USER_SEARCH_FTS_TABLE} USING fts5(
+        username, first_name, last_name,
+        content='users', content_rowid='user_id', tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS users_search_ai AFTER INSERT ON users BEGIN
+        INSERT INTO {USER_SEARCH_FTS_TABLE}(rowid, username, first_name, last_name)
+        VALUES (new.user_id, new.username, new.first_name, new.last_name);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS users_search_ad AFTER DELETE ON users BEGIN
+        INSERT INTO {USER_SEARCH_FTS_TABLE}({USER_SEARCH_FTS_TABLE}, rowid, username, first_name, last_name)
+        VALUES ('delete', old.user_id, old.username, old.first_name, old.last_name);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS users_search_au
+    AFTER UPDATE OF username, first_name, last_name ON users BEGIN
+        INSERT INTO {USER_SEARCH_FTS_TABLE}({USER_SEARCH_FTS_TABLE}, rowid, username, first_name, last_name)
+        VALUES ('delete', old.user_id, old.username, old.first_name, old.last_name);
+        INSERT INTO {USER_SEARCH_FTS_TABLE}(rowid, username, first_name, last_name)
+        VALUES (new.user_id, new.username, new.first_name, new.last_name);
+    END
+    """,
+]
+
+
+def _sqlite_index_exists(conn: Connection) -> bool:
+    return conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": USER_SEARCH_FTS_TABLE}
+    ).first() is not None
+
+
+def create_user_search_index(conn: Connection) -> None:
+    """
+    Crea el índice de búsqueda de usuarios si no existe.
+
+    Args:
+        conn: Conexión síncrona (op.get_bind() o AsyncConnection.run_sync)
+    """
+    dialect = conn.dialect.name
+
+    if dialect == "sqlite":
+        existed = _sqlite_index_exists(conn)
+        for statement in _SQLITE_DDL:
+            conn.execute(text(statement))
+        if not existed:
+            # Indexar los usuarios existentes
+            conn.execute(text(
+                f"INSERT INTO {USER_SEARCH_FTS_TABLE}({USER_SEARCH_FTS_TABLE}) VALUES ('rebuild')"
+            ))
+            logger.info(f"✅ Índice de búsqueda {USER_SEARCH_FTS_TABLE} creado")
+
+    elif dialect == "postgresql":
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS {USER_SEARCH_TRGM_INDEX} ON users "
+            f"USING gin ({USER_SEARCH_DOCUMENT_SQL} gin_trgm_ops)"
+        ))
+
+    else:
+        logger.warning(f"⚠️ Índice de búsqueda no soportado en dialecto {dialect}")
+
+
+def drop_user_search_index(conn: Connection) -> None:
+    """
+    Elimina el índice de búsqueda de usuarios.
+
+    Args:
+        conn: Conexión síncrona
+    """
+    dialect = conn.dialect.name
+
+    if dialect == "sqlite":
+        for trigger in ("users_search_ai", "users_search_ad", "users_search_au"):
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+        conn.execute(text(f"DROP TABLE IF EXISTS {USER_SEARCH_FTS_TABLE}"))
+
+    elif dialect == "postgresql":
+        # pg_trgm se conserva: otras tablas pueden usarlo
+        conn.execute(text(f"DROP INDEX IF EXISTS {USER_SEARCH_TRGM_INDEX}"))
+
+
+def has_user_search_index(conn: Connection) -> bool:
+    """
+    Verifica si el índice de búsqueda existe en la base de datos.
+
+    Args:
+        conn: Conexión síncrona
+
+    Returns:
+        bool: True si el índice está disponible
+    """
+    dialect = conn.dialect.name
+
+    if dialect == "sqlite":
+        return _sqlite_index_exists(conn)
+
+    if dialect == "postgresql":
+        return conn.execute(
+            text("SELECT 1 FROM pg_indexes WHERE indexname = :name"),
+            {"name": USER_SEARCH_TRGM_INDEX}
+        ).first() is not None
+
+    return False
+
+
+# ===== CONTENT SEARCH (packages, content sets, shop products) =====
+
+CONTENT_SEARCH_FTS_TABLE = "content_search_fts"
+
+# Tipo de documento → (tabla origen, código). En SQLite el rowid del índice
+# es id * CONTENT_SEARCH_KIND_SLOTS + código: tres tablas en un solo índice
+# con borrado/actualización por rowid (sin escanear la tabla FTS).
+CONTENT_SEARCH_KINDS = {
+    "package": ("content_packages", 1),
+    "content_set": ("content_sets", 2),
+    "shop_product": ("shop_products", 3),
+}
+CONTENT_SEARCH_KIND_SLOTS = 4
+
+# Configuración de text search en PostgreSQL ('simple': sin stemming,
+# mismo comportamiento que el tokenizer unicode61 de SQLite)
+CONTENT_SEARCH_TS_CONFIG = "simple"
+
+
+def content_search_document_sql(table_name: str) -> str:
+    """
+    Expresión tsvector de una tabla de contenido (PostgreSQL).
+
+    La query debe usar exactamente esta expresión para usar el índice GIN.
+
+    Args:
+        table_name: Tabla origen (content_packages, content_sets, shop_products)
+
+    Returns:
+        str: Expresión SQL
+    """
+    return (
+        f"to_tsvector('{CONTENT_SEARCH_TS_CONFIG}', "
+        f"coalesce({table_name}.name, '') || ' ' || coalesce({table_name}.description, ''))"
+    )
+
+
+def _content_rowid_sql(alias: str, code: int) -> str:
+    return f"{alias}.id * {CONTENT_SEARCH_KIND_SLOTS} + {code}"
+
+
+def _content_sqlite_ddl() -> list:
+    statements = [
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {CONTENT_SEARCH_FTS_TABLE} USING fts5(
+            name, description, tokenize='unicode61 remove_diacritics 2'
+        )
+        """
+    ]
+    for table_name, code in CONTENT_SEARCH_KINDS.values():
+        statements += [
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table_name}_search_ai AFTER INSERT ON {table_name} BEGIN
+                INSERT INTO {CONTENT_SEARCH_FTS_TABLE}(rowid, name, description)
+                VALUES ({_content_rowid_sql('new', code)}, new.name, new.description);
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table_name}_search_ad AFTER DELETE ON {table_name} BEGIN
+                DELETE FROM {CONTENT_SEARCH_FTS_TABLE} WHERE rowid = {_content_rowid_sql('old', code)};
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table_name}_search_au
+            AFTER UPDATE OF name, description ON {table_name} BEGIN
+                UPDATE {CONTENT_SEARCH_FTS_TABLE}
+                SET name = new.name, description = new.description
+                WHERE rowid = {_content_rowid_sql('old', code)};
+            END
+            """,
+        ]
+    return statements
+
+
+def _content_search_index_name(table_name: str) -> str:
+    return f"idx_{table_name}_search_tsv"
+
+
+def _sqlite_content_index_exists(conn: Connection) -> bool:
+    return conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": CONTENT_SEARCH_FTS_TABLE}
+    ).first() is not None
+
+
+def create_content_search_index(conn: Connection) -> None:
+    """
+    Crea el índice full-text de paquetes, content sets y productos si no existe.
+
+    Args:
+        conn: Conexión síncrona (op.get_bind() o AsyncConnection.run_sync)
+    """
+    dialect = conn.dialect.name
+
+    if dialect == "sqlite":
+        existed = _sqlite_content_index_exists(conn)
+        for statement in _content_sqlite_ddl():
+            conn.execute(text(statement))
+        if not existed:
+            # Indexar el contenido existente
+            for table_name, code in CONTENT_SEARCH_KINDS.values():
+                conn.execute(text(
+                    f"INSERT INTO {CONTENT_SEARCH_FTS_TABLE}(rowid, name, description) "
+                    f"SELECT {_content_rowid_sql(table_name, code)}, name, description FROM {table_name}"
+                ))
+            logger.info(f"✅ Índice de búsqueda {CONTENT_SEARCH_FTS_TABLE} creado")
+
+    elif dialect == "postgresql":
+        for table_name, _ in CONTENT_SEARCH_KINDS.values():
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS {_content_search_index_name(table_name)} "
+                f"ON {table_name} USING gin ({content_search_document_sql(table_name)})"
+            ))
+
+    else:
+        logger.warning(f"⚠️ Índice de búsqueda no soportado en dialecto {dialect}")
+
+
+def drop_content_search_index(conn: Connection) -> None:
+    """
+    Elimina el índice full-text de contenido.
+
+    Args:
+        conn: Conexión síncrona
+    """
+    dialect = conn.dialect.name
+
+    if dialect == "sqlite":
+        for table_name, _ in CONTENT_SEARCH_KINDS.values():
+            for suffix in ("ai", "ad", "au"):
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {table_name}_search_{suffix}"))
+        conn.execute(text(f"DROP TABLE IF EXISTS {CONTENT_SEARCH_FTS_TABLE}"))
+
+    elif dialect == "postgresql":
+        for table_name, _ in CONTENT_SEARCH_KINDS.values():
+            conn.execute(text(f"DROP INDEX IF EXISTS {_content_search_index_name(table_name)}"))
+
+
+def has_content_search_index(conn: Connection) -> bool:
+    """
+    Verifica si el índice full-text de contenido existe.
+
+    Args:
+        conn: Conexión síncrona
+
+    Returns:
+        bool: True si el índice está disponible
+    """
+    dialect = conn.dialect.name
+
+    if dialect == "sqlite":
+        return _sqlite_content_index_exists(conn)
+
+    if dialect == "postgresql":
+        return conn.execute(
+            text("SELECT 1 FROM pg_indexes WHERE indexname = :name"),
+            {"name": _content_search_index_name("shop_products")}
+        ).first() is not None
+
+    return False
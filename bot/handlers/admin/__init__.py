@@ -10,6 +10,7 @@ from bot.handlers.admin.user_gamification import user_gamification_router
 from bot.handlers.admin.economy_stats import economy_stats_router
 from bot.handlers.admin.reward_management import reward_router
 from bot.handlers.admin.simulation import router as simulation_router
+from bot.handlers.admin.airdrop import airdrop_router
 
 # Include routers
 admin_router.include_router(tests_router)
@@ -21,5 +22,6 @@ admin_router.include_router(user_gamification_router)
 admin_router.include_router(economy_stats_router)
 admin_router.include_router(reward_router)
 admin_router.include_router(simulation_router)
+admin_router.include_router(airdrop_router)
 
 __all__ = ["admin_router", "show_admin_menu"]
@@ -0,0 +1,177 @@
+"""
+Admin Airdrop Handler
+
+Handler para acreditar besitos en masa a un segmento de usuarios
+via comando /airdrop. El crédito corre en background y reporta el
+progreso editando el mensaje de estado.
+Solo accesible para administradores.
+"""
+
+import logging
+import re
+from typing import Optional, Tuple
+
+from aiogram import Router
+from aiogram.filters import Command
+from aiogram.types import Message
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.background import start_airdrop, is_airdrop_running
+from bot.database.enums import AirdropSegment
+from bot.middlewares import AdminAuthMiddleware
+from bot.services.container import ServiceContainer
+
+logger = logging.getLogger(__name__)
+
+airdrop_router = Router(name="admin_airdrop")
+airdrop_router.message.middleware(AdminAuthMiddleware())
+
+# Alias de segmento aceptados por el comando
+SEGMENT_ALIASES = {
+    "vip": AirdropSegment.ACTIVE_VIP,
+    "nivel": AirdropSegment.MIN_LEVEL,
+    "level": AirdropSegment.MIN_LEVEL,
+    "reacciones": AirdropSegment.WEEKLY_REACTORS,
+    "reactions": AirdropSegment.WEEKLY_REACTORS,
+}
+
+CAMPAIGN_KEY_PATTERN = re.compile(r"^[A-Za-z0-9_\-]{3,64}$")
+
+USAGE_TEXT = (
+    "🎩 <b>Lucien:</b>\n\n"
+    "💋 <b>Airdrop de besitos</b>\n\n"
+    "<code>/airdrop vip &lt;monto&gt; &lt;clave&gt;</code>\n"
+    "<code>/airdrop nivel &lt;N&gt; &lt;monto&gt; &lt;clave&gt;</code>\n"
+    "<code>/airdrop reacciones &lt;monto&gt; &lt;clave&gt;</code>\n\n"
+    "<i>La clave identifica la campaña: relanzarla reanuda el airdrop "
+    "sin acreditar dos veces.</i>"
+)
+
+
+def parse_airdrop_args(
+    args: list[str]
+) -> Optional[Tuple[AirdropSegment, Optional[int], int, str]]:
+    """
+    Parsea los argumentos de /airdrop.
+
+    Args:
+        args: Argumentos del comando (sin "/airdrop")
+
+    Returns:
+        (segment, min_level, amount, campaign_key) o None si son inválidos
+    """
+    if not args or args[0].lower() not in SEGMENT_ALIASES:
+        return None
+
+    segment = SEGMENT_ALIASES[args[0].lower()]
+    rest = args[1:]
+
+    min_level = None
+    if segment == AirdropSegment.MIN_LEVEL:
+        if not rest or not rest[0].isdigit():
+            return None
+        min_level = int(rest[0])
+        rest = rest[1:]
+
+    if len(rest) != 2 or not rest[0].isdigit():
+        return None
+
+    amount = int(rest[0])
+    campaign_key = rest[1]
+
+    if amount <= 0 or not CAMPAIGN_KEY_PATTERN.match(campaign_key):
+        return None
+
+    return segment, min_level, amount, campaign_key
+
+
+@airdrop_router.message(Command("airdrop"))
+async def cmd_airdrop(message: Message, session: AsyncSession):
+    """
+    Registra (o reanuda) un airdrop y lo lanza en background.
+
+    Uso:
+        /airdrop vip 100 promo_navidad
+        /airdrop nivel 5 50 promo_nivel5
+        /airdrop reacciones 20 semana_42
+
+    Args:
+        message: Mensaje del comando
+        session: Sesion de BD
+    """
+    args = message.text.split()[1:] if message.text else []
+    parsed = parse_airdrop_args(args)
+
+    if parsed is None:
+        await message.answer(USAGE_TEXT, parse_mode="HTML")
+        return
+
+    segment, min_level, amount, campaign_key = parsed
+    admin_id = message.from_user.id
+
+    if is_airdrop_running(campaign_key):
+        await message.answer(
+            f"🎩 <b>Lucien:</b>\n\n"
+            f"⏳ La campaña <code>{campaign_key}</code> ya está en curso.",
+            parse_mode="HTML"
+        )
+        return
+
+    container = ServiceContainer(session, message.bot)
+    success, status, airdrop = await container.wallet.create_airdrop(
+        campaign_key=campaign_key,
+        segment=segment,
+        amount=amount,
+        reason=f"Airdrop {campaign_key}",
+        admin_id=admin_id,
+        min_level=min_level
+    )
+
+    if not success:
+        await message.answer(
+            f"🎩 <b>Lucien:</b>\n\n❌ No se pudo registrar el airdrop: {status}",
+            parse_mode="HTML"
+        )
+        return
+
+    if airdrop.is_completed:
+        await message.answer(
+            f"🎩 <b>Lucien:</b>\n\n"
+            f"✅ La campaña <code>{campaign_key}</code> ya fue completada "
+            f"({airdrop.credited_count} usuarios acreditados).",
+            parse_mode="HTML"
+        )
+        return
+
+    if airdrop.status == "running":
+        # Reclamada por un runner de otro proceso; si murió, el líder la
+        # libera (failed) y relanzar la clave la reanuda
+        await message.answer(
+            f"🎩 <b>Lucien:</b>\n\n"
+            f"⏳ La campaña <code>{campaign_key}</code> ya está en curso.",
+            parse_mode="HTML"
+        )
+        return
+
+    # El runner usa sus propias sesiones: la campaña debe estar persistida
+    await session.commit()
+
+    segment_label = AirdropSegment(airdrop.segment).display_name
+    if airdrop.min_level:
+        segment_label += f" ≥ {airdrop.min_level}"
+
+    resumed = status == "exists"
+    status_msg = await message.answer(
+        f"🎩 <b>Lucien:</b>\n\n"
+        f"{'🔁 Reanudando' if resumed else '🚀 Iniciando'} airdrop "
+        f"<code>{campaign_key}</code>\n"
+        f"👥 Segmento: <b>{segment_label}</b>\n"
+        f"💋 Besitos por usuario: <b>{airdrop.amount}</b>",
+        parse_mode="HTML"
+    )
+
+    start_airdrop(message.bot, campaign_key, message.chat.id, status_msg.message_id)
+    logger.info(
+        f"💋 Admin {admin_id} lanzó airdrop '{campaign_key}' "
+        f"({airdrop.segment}, {airdrop.amount} besitos, resumed={resumed})"
+    )
@@ -2,10 +2,11 @@
 Broadcast Handlers - Envío de publicaciones a canales.
 
 Handlers para:
-- Iniciar flujo de broadcasting
+- Iniciar flujo de broadcasting (canales o DM a un segmento de usuarios)
 - Recibir contenido multimedia
 - Mostrar preview del mensaje
 - Confirmar y enviar a canal(es)
+- Programar publicaciones a canal(es)
 - Cancelar broadcasting
 """
 import logging
@@ -13,16 +14,25 @@ from typing import Optional
 
 from aiogram import F
 from aiogram.types import CallbackQuery, Message, ContentType
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.fsm.context import FSMContext
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.handlers.admin.main import admin_router
+from bot.background import start_broadcast, schedule_post, unschedule_post
+from bot.database.enums import BroadcastSegment
 from bot.states.admin import BroadcastStates
 from bot.services.container import ServiceContainer
 from bot.utils.keyboards import create_inline_keyboard
+from bot.utils.validators import parse_schedule_time
 
 logger = logging.getLogger(__name__)
 
+# Publicaciones programadas listadas a la vez
+SCHEDULED_POSTS_PAGE_SIZE = 10
+
+_SCHEDULE_TARGET_NAMES = {"vip": "Canal VIP", "free": "Canal Free", "both": "Ambos Canales"}
+
 
 # ===== INICIO DE BROADCASTING =====
 
@@ -109,6 +119,118 @@ async def callback_broadcast_to_free(
     await callback.answer()
 
 
+@admin_router.callback_query(F.data == "broadcast:both")
+async def callback_broadcast_to_both(
+    callback: CallbackQuery,
+    session: AsyncSession,
+    state: FSMContext
+):
+    """
+    Inicia broadcasting a ambos canales (VIP y Free) en paralelo.
+
+    Args:
+        callback: Callback query
+        session: Sesión de BD (inyectada por middleware)
+        state: FSM context
+    """
+    logger.info(f"📤 Usuario {callback.from_user.id} iniciando broadcast a ambos canales")
+
+    await state.set_data({"target_channel": "both"})
+    await state.set_state(BroadcastStates.waiting_for_content)
+
+    text = (
+        "📤 <b>Enviar Publicación a Ambos Canales</b>\n\n"
+        "Envía el contenido que quieres publicar en VIP y Free:\n\n"
+        "• <b>Texto:</b> Envía un mensaje de texto\n"
+        "• <b>Foto:</b> Envía una foto (con caption opcional)\n"
+        "• <b>Video:</b> Envía un video (con caption opcional)\n\n"
+        "El mensaje será enviado exactamente como lo envíes.\n\n"
+        "👁️ Verás un preview antes de confirmar el envío."
+    )
+
+    await callback.message.edit_text(
+        text=text,
+        reply_markup=create_inline_keyboard([
+            [{"text": "❌ Cancelar", "callback_data": "broadcast:cancel"}]
+        ]),
+        parse_mode="HTML"
+    )
+
+    await callback.answer()
+
+
+@admin_router.callback_query(F.data == "broadcast:dm")
+async def callback_broadcast_dm(
+    callback: CallbackQuery,
+    state: FSMContext
+):
+    """
+    Inicia broadcasting por mensaje directo: selección de segmento.
+
+    Args:
+        callback: Callback query
+        state: FSM context
+    """
+    logger.info(f"📤 Usuario {callback.from_user.id} iniciando broadcast por DM")
+
+    await state.clear()
+
+    await callback.message.edit_text(
+        text=(
+            "📨 <b>Mensaje Directo a Usuarios</b>\n\n"
+            "Selecciona el segmento que recibirá el mensaje:"
+        ),
+        reply_markup=create_inline_keyboard(
+            [
+                [{"text": segment.display_name, "callback_data": f"broadcast:dm:{segment.value}"}]
+                for segment in BroadcastSegment
+            ] + [[{"text": "❌ Cancelar", "callback_data": "broadcast:cancel"}]]
+        ),
+        parse_mode="HTML"
+    )
+
+    await callback.answer()
+
+
+@admin_router.callback_query(F.data.startswith("broadcast:dm:"))
+async def callback_broadcast_dm_segment(
+    callback: CallbackQuery,
+    state: FSMContext
+):
+    """
+    Guarda el segmento elegido y espera el contenido del DM.
+
+    Args:
+        callback: Callback query
+        state: FSM context
+    """
+    try:
+        segment = BroadcastSegment(callback.data.split(":", 2)[2])
+    except ValueError:
+        await callback.answer("❌ Segmento inválido", show_alert=True)
+        return
+
+    await state.set_data({"target_channel": "dm", "segment": segment.value})
+    await state.set_state(BroadcastStates.waiting_for_content)
+
+    await callback.message.edit_text(
+        text=(
+            f"📨 <b>Mensaje Directo: {segment.display_name}</b>\n\n"
+            "Envía el contenido que quieres enviar:\n\n"
+            "• <b>Texto:</b> Envía un mensaje de texto\n"
+            "• <b>Foto:</b> Envía una foto (con caption opcional)\n"
+            "• <b>Video:</b> Envía un video (con caption opcional)\n\n"
+            "👁️ Verás un preview antes de confirmar el envío."
+        ),
+        reply_markup=create_inline_keyboard([
+            [{"text": "❌ Cancelar", "callback_data": "broadcast:cancel"}]
+        ]),
+        parse_mode="HTML"
+    )
+
+    await callback.answer()
+
+
 # ===== RECEPCIÓN DE CONTENIDO =====
 
 @admin_router.message(
@@ -368,20 +490,27 @@ async def callback_broadcast_continue(
 
     # Generar texto de preview
     preview_text = await _generate_preview_text(
-        target_channel, content_type, caption, add_reactions, protect_content
+        target_channel, content_type, caption, add_reactions, protect_content,
+        segment=data.get("segment")
     )
 
+    buttons = [
+        [
+            {"text": "✅ Confirmar y Enviar", "callback_data": "broadcast:confirm"},
+            {"text": "❌ Cancelar", "callback_data": "broadcast:cancel"}
+        ],
+        [{"text": "🔄 Cambiar Opciones", "callback_data": "broadcast:back_to_options"}],
+        [{"text": "📝 Enviar Otro Contenido", "callback_data": "broadcast:change"}]
+    ]
+
+    # Solo las publicaciones a canales se pueden programar
+    if target_channel != "dm":
+        buttons.insert(1, [{"text": "🕒 Programar Publicación", "callback_data": "broadcast:schedule"}])
+
     # Mostrar preview con opciones actuales
     await callback.message.edit_text(
         text=preview_text,
-        reply_markup=create_inline_keyboard([
-            [
-                {"text": "✅ Confirmar y Enviar", "callback_data": "broadcast:confirm"},
-                {"text": "❌ Cancelar", "callback_data": "broadcast:cancel"}
-            ],
-            [{"text": "🔄 Cambiar Opciones", "callback_data": "broadcast:back_to_options"}],
-            [{"text": "📝 Enviar Otro Contenido", "callback_data": "broadcast:change"}]
-        ]),
+        reply_markup=create_inline_keyboard(buttons),
         parse_mode="HTML"
     )
 
@@ -438,6 +567,9 @@ async def callback_broadcast_confirm(
     """
     Confirma y envía el mensaje al canal(es).
 
+    Con varios canales los envíos corren en paralelo y el mensaje de
+    confirmación se actualiza a medida que cada canal termina.
+
     Args:
         callback: Callback query
         state: FSM context
@@ -461,18 +593,22 @@ async def callback_broadcast_confirm(
 
     container = ServiceContainer(session, callback.bot)
 
+    if target_channel == "dm":
+        await _start_dm_broadcast(callback, state, session, container, data)
+        return
+
     # Nota: send_to_channel ahora incluye botones de reacción por defecto (add_reactions=True)
     # Esto satisface REACT-01: Channel messages display inline reaction buttons
 
     # Determinar canales destino
     channels_to_send = []
 
-    if target_channel == "vip":
+    if target_channel in ("vip", "both"):
         vip_channel = await container.channel.get_vip_channel_id()
         if vip_channel:
             channels_to_send.append(("VIP", vip_channel))
 
-    elif target_channel == "free":
+    if target_channel in ("free", "both"):
         free_channel = await container.channel.get_free_channel_id()
         if free_channel:
             channels_to_send.append(("Free", free_channel))
@@ -490,64 +626,231 @@ async def callback_broadcast_confirm(
         await state.clear()
         return
 
-    # Enviar a cada canal
-    results = []
-
-    for channel_name, channel_id in channels_to_send:
-        try:
-            if content_type == ContentType.PHOTO:
-                success, msg, _ = await container.channel.send_to_channel(
-                    channel_id=channel_id,
-                    text=caption or "",
-                    photo=file_id,
-                    add_reactions=add_reactions,
-                    protect_content=protect_content
-                )
-
-            elif content_type == ContentType.VIDEO:
-                success, msg, _ = await container.channel.send_to_channel(
-                    channel_id=channel_id,
-                    text=caption or "",
-                    video=file_id,
-                    add_reactions=add_reactions,
-                    protect_content=protect_content
-                )
-
-            else:  # TEXT
-                success, msg, _ = await container.channel.send_to_channel(
-                    channel_id=channel_id,
-                    text=caption or "",
-                    add_reactions=add_reactions,
-                    protect_content=protect_content
-                )
+    # Enviar a todos los canales en paralelo, informando cada uno al terminar
+    results = {name: "⏳ Canal " + name for name, _ in channels_to_send}
+
+    await _edit_send_results(callback.message, results, done=False)
+
+    sends = container.channel.send_to_channels(
+        channels_to_send,
+        text=caption or "",
+        photo=file_id if content_type == ContentType.PHOTO else None,
+        video=file_id if content_type == ContentType.VIDEO else None,
+        add_reactions=add_reactions,
+        protect_content=protect_content
+    )
 
+    try:
+        async for channel_name, success, msg, _ in sends:
             if success:
-                results.append(f"✅ Canal {channel_name}")
+                results[channel_name] = f"✅ Canal {channel_name}"
                 logger.info(f"✅ Publicación enviada a canal {channel_name}")
             else:
-                results.append(f"❌ Canal {channel_name}: {msg}")
+                results[channel_name] = f"❌ Canal {channel_name}: {msg}"
                 logger.error(f"❌ Error enviando a {channel_name}: {msg}")
 
-        except Exception as e:
-            results.append(f"❌ Canal {channel_name}: Error inesperado")
-            logger.error(f"❌ Excepción enviando a {channel_name}: {e}", exc_info=True)
+            if len(channels_to_send) > 1:
+                await _edit_send_results(callback.message, results, done=False)
+
+    except Exception as e:
+        for channel_name, line in results.items():
+            if line.startswith("⏳"):
+                results[channel_name] = f"❌ Canal {channel_name}: Error inesperado"
+        logger.error(f"❌ Excepción enviando publicación: {e}", exc_info=True)
 
     # Mostrar resultados
-    results_text = "\n".join(results)
+    await _edit_send_results(callback.message, results, done=True)
+
+    # Limpiar estado FSM
+    await state.clear()
+
+    logger.info(f"✅ Broadcasting completado para user {user_id}")
+
+
+# ===== PROGRAMACIÓN =====
+
+@admin_router.callback_query(
+    BroadcastStates.waiting_for_confirmation,
+    F.data == "broadcast:schedule"
+)
+async def callback_broadcast_schedule(
+    callback: CallbackQuery,
+    state: FSMContext
+):
+    """
+    Pide la fecha/hora para programar la publicación.
+
+    Args:
+        callback: Callback query
+        state: FSM context
+    """
+    await state.set_state(BroadcastStates.waiting_for_schedule_time)
 
     await callback.message.edit_text(
-        f"📤 <b>Resultado del Envío</b>\n\n{results_text}\n\n"
-        f"La publicación ha sido procesada.",
+        "🕒 <b>Programar Publicación</b>\n\n"
+        "¿Cuándo debe publicarse? (hora UTC)\n\n"
+        "• <code>+30m</code>, <code>+2h</code>, <code>+1d</code>\n"
+        "• <code>21:00</code> (hoy, o mañana si ya pasó)\n"
+        "• <code>2026-12-24 21:00</code>",
         reply_markup=create_inline_keyboard([
-            [{"text": "🔙 Volver al Menú", "callback_data": "admin:main"}]
+            [{"text": "🔙 Volver al Preview", "callback_data": "broadcast:continue"}],
+            [{"text": "❌ Cancelar", "callback_data": "broadcast:cancel"}]
         ]),
         parse_mode="HTML"
     )
+    await callback.answer()
 
-    # Limpiar estado FSM
+
+@admin_router.callback_query(
+    BroadcastStates.waiting_for_schedule_time,
+    F.data == "broadcast:continue"
+)
+async def callback_schedule_back_to_preview(
+    callback: CallbackQuery,
+    state: FSMContext,
+    session: AsyncSession
+):
+    """
+    Vuelve del paso de programación al preview.
+
+    Args:
+        callback: Callback query
+        state: FSM context
+        session: Sesión de BD
+    """
+    await state.set_state(BroadcastStates.configuring_options)
+    await callback_broadcast_continue(callback, state, session)
+
+
+@admin_router.message(BroadcastStates.waiting_for_schedule_time, F.text)
+async def process_schedule_time(
+    message: Message,
+    state: FSMContext,
+    session: AsyncSession
+):
+    """
+    Registra la publicación programada y la agenda en el scheduler.
+
+    Args:
+        message: Mensaje con la fecha/hora
+        state: FSM context
+        session: Sesión de BD
+    """
+    scheduled_at = parse_schedule_time(message.text)
+    if scheduled_at is None:
+        await message.answer(
+            "❌ <b>Fecha inválida</b>\n\n"
+            "Usa <code>+2h</code>, <code>21:00</code> o <code>2026-12-24 21:00</code> "
+            "(hora UTC, en el futuro).",
+            parse_mode="HTML"
+        )
+        return
+
+    data = await state.get_data()
+    container = ServiceContainer(session, message.bot)
+
+    success, status, post = await container.scheduled_post.create_post(
+        target_channel=data["target_channel"],
+        content_type=ContentType(data["content_type"]).value,
+        scheduled_at=scheduled_at,
+        created_by=message.from_user.id,
+        caption=data.get("caption"),
+        file_id=data.get("file_id"),
+        add_reactions=data.get("add_reactions", True),
+        protect_content=data.get("protect_content", False)
+    )
+
+    if not success:
+        logger.warning(f"⚠️ No se pudo programar publicación: {status}")
+        await message.answer(
+            "❌ <b>No se pudo programar la publicación</b>",
+            parse_mode="HTML"
+        )
+        return
+
+    # El job usa su propia sesión: el post debe estar persistido
+    await session.commit()
+    schedule_post(message.bot, post.id, post.scheduled_at)
     await state.clear()
 
-    logger.info(f"✅ Broadcasting completado para user {user_id}")
+    await message.answer(
+        f"🕒 <b>Publicación Programada</b>\n\n"
+        f"📌 Post <code>#{post.id}</code>\n"
+        f"📅 {scheduled_at:%Y-%m-%d %H:%M} UTC",
+        reply_markup=create_inline_keyboard([
+            [{"text": "🗓️ Ver Programadas", "callback_data": "broadcast:scheduled"}],
+            [{"text": "🔙 Volver al Menú", "callback_data": "admin:main"}]
+        ]),
+        parse_mode="HTML"
+    )
+
+
+@admin_router.callback_query(F.data == "broadcast:scheduled")
+async def callback_scheduled_posts(
+    callback: CallbackQuery,
+    session: AsyncSession
+):
+    """
+    Lista las publicaciones programadas pendientes.
+
+    Args:
+        callback: Callback query
+        session: Sesión de BD
+    """
+    container = ServiceContainer(session, callback.bot)
+    posts = await container.scheduled_post.get_pending_posts(limit=SCHEDULED_POSTS_PAGE_SIZE)
+
+    if not posts:
+        text = "🗓️ <b>Publicaciones Programadas</b>\n\nNo hay publicaciones pendientes."
+    else:
+        lines = [
+            f"• <code>#{post.id}</code> {post.scheduled_at:%Y-%m-%d %H:%M} UTC → "
+            f"{_SCHEDULE_TARGET_NAMES.get(post.target_channel, post.target_channel)}"
+            for post in posts
+        ]
+        text = "🗓️ <b>Publicaciones Programadas</b>\n\n" + "\n".join(lines)
+
+    buttons = [
+        [{"text": f"🗑️ Cancelar #{post.id}", "callback_data": f"broadcast:unschedule:{post.id}"}]
+        for post in posts
+    ]
+    buttons.append([{"text": "🔙 Volver al Menú", "callback_data": "admin:main"}])
+
+    await callback.message.edit_text(
+        text,
+        reply_markup=create_inline_keyboard(buttons),
+        parse_mode="HTML"
+    )
+    await callback.answer()
+
+
+@admin_router.callback_query(F.data.startswith("broadcast:unschedule:"))
+async def callback_unschedule_post(
+    callback: CallbackQuery,
+    session: AsyncSession
+):
+    """
+    Cancela una publicación programada.
+
+    Args:
+        callback: Callback query
+        session: Sesión de BD
+    """
+    try:
+        post_id = int(callback.data.split(":")[2])
+    except (IndexError, ValueError):
+        await callback.answer("❌ Publicación inválida", show_alert=True)
+        return
+
+    container = ServiceContainer(session, callback.bot)
+    if not await container.scheduled_post.cancel_post(post_id):
+        await callback.answer("⚠️ La publicación ya no está pendiente", show_alert=True)
+        return
+
+    unschedule_post(post_id)
+    await session.commit()
+
+    await callback_scheduled_posts(callback, session)
 
 
 @admin_router.callback_query(
@@ -576,12 +879,14 @@ async def callback_broadcast_change(
     target_channel = data.get("target_channel", "vip")
 
     channel_name = {
-        "vip": "VIP",
-        "free": "Free",
-    }.get(target_channel, "VIP")
+        "vip": "Canal VIP",
+        "free": "Canal Free",
+        "both": "Ambos Canales",
+        "dm": "Mensaje Directo",
+    }.get(target_channel, "Canal VIP")
 
     await callback.message.edit_text(
-        f"📤 <b>Enviar Publicación a Canal {channel_name}</b>\n\n"
+        f"📤 <b>Enviar Publicación a {channel_name}</b>\n\n"
         f"Envía el nuevo contenido que quieres publicar.\n\n"
         f"El contenido anterior será descartado.",
         reply_markup=create_inline_keyboard([
@@ -628,22 +933,108 @@ async def callback_broadcast_cancel(
 
 # ===== HELPERS =====
 
+async def _edit_send_results(message: Message, results: dict, done: bool) -> None:
+    """
+    Actualiza el mensaje de confirmación con el estado de cada canal.
+
+    Args:
+        message: Mensaje a editar
+        results: Nombre de canal -> línea de estado
+        done: Si ya terminaron todos los envíos
+    """
+    results_text = "\n".join(results.values())
+
+    if done:
+        text = (
+            f"📤 <b>Resultado del Envío</b>\n\n{results_text}\n\n"
+            f"La publicación ha sido procesada."
+        )
+        reply_markup = create_inline_keyboard([
+            [{"text": "🔙 Volver al Menú", "callback_data": "admin:main"}]
+        ])
+    else:
+        text = f"📤 <b>Enviando Publicación...</b>\n\n{results_text}"
+        reply_markup = None
+
+    try:
+        await message.edit_text(text, reply_markup=reply_markup, parse_mode="HTML")
+    except TelegramBadRequest as e:
+        # "message is not modified" si dos canales terminan con el mismo texto
+        logger.debug(f"No se pudo actualizar resultado del envío: {e}")
+
+
+async def _start_dm_broadcast(
+    callback: CallbackQuery,
+    state: FSMContext,
+    session: AsyncSession,
+    container: ServiceContainer,
+    data: dict
+) -> None:
+    """
+    Registra el broadcast por DM y lanza el envío en background.
+
+    El mensaje del callback se reutiliza como reporte de progreso.
+
+    Args:
+        callback: Callback query de confirmación
+        state: FSM context
+        session: Sesión de BD
+        container: Container de services
+        data: Data del FSM (segment, content_type, file_id, caption, protect_content)
+    """
+    success, status, broadcast = await container.broadcast.create_broadcast(
+        segment=BroadcastSegment(data["segment"]),
+        content_type=ContentType(data["content_type"]).value,
+        text=data.get("caption"),
+        admin_id=callback.from_user.id,
+        file_id=data.get("file_id"),
+        protect_content=data.get("protect_content", False),
+        progress_chat_id=callback.message.chat.id,
+        progress_message_id=callback.message.message_id
+    )
+    await state.clear()
+
+    if not success:
+        logger.warning(f"⚠️ Broadcast por DM rechazado: {status}")
+        await callback.message.edit_text(
+            "❌ <b>No se pudo crear el broadcast</b>\n\n"
+            "El contenido no es válido para envío directo.",
+            reply_markup=create_inline_keyboard([
+                [{"text": "🔙 Volver al Menú", "callback_data": "admin:main"}]
+            ]),
+            parse_mode="HTML"
+        )
+        return
+
+    # El runner usa sus propias sesiones: el broadcast debe estar persistido
+    await session.commit()
+
+    await callback.message.edit_text(
+        f"⏳ <b>Broadcast <code>#{broadcast.id}</code> en cola...</b>\n\n"
+        f"El progreso se actualizará en este mensaje.",
+        parse_mode="HTML"
+    )
+    start_broadcast(callback.bot, broadcast.id)
+
+
 async def _generate_preview_text(
     target_channel: str,
     content_type: str,
     caption: Optional[str],
     add_reactions: bool = True,
-    protect_content: bool = False
+    protect_content: bool = False,
+    segment: Optional[str] = None
 ) -> str:
     """
     Genera el texto de preview antes de enviar.
 
     Args:
-        target_channel: "vip" o "free"
+        target_channel: "vip", "free", "both" o "dm"
         content_type: Tipo de contenido (photo, video, text)
         caption: Caption o texto del mensaje
         add_reactions: Si se agregan botones de reacción
         protect_content: Si el contenido está protegido
+        segment: Segmento destino (solo para "dm")
 
     Returns:
         String HTML formateado
@@ -651,8 +1042,13 @@ async def _generate_preview_text(
     channel_name = {
         "vip": "Canal VIP",
         "free": "Canal Free",
+        "both": "Canales VIP y Free",
+        "dm": "Mensaje Directo",
     }.get(target_channel, "Canal")
 
+    if target_channel == "dm" and segment:
+        channel_name += f" ({BroadcastSegment(segment).display_name})"
+
     content_name = {
         ContentType.PHOTO: "Foto",
         ContentType.VIDEO: "Video",
@@ -14,7 +14,7 @@ from bot.database.models import ContentPackage
 from bot.middlewares import AdminAuthMiddleware
 from bot.services.container import ServiceContainer
 from bot.states.admin import ContentPackageStates
-from bot.utils.pagination import Paginator, create_pagination_keyboard
+from bot.utils.pagination import QueryPaginator, create_pagination_keyboard
 from bot.utils.keyboards import create_inline_keyboard
 from typing import List, Optional
 from aiogram.types import InlineKeyboardMarkup
@@ -116,7 +116,8 @@ def _create_package_list_keyboard(
         ContentPackageStates.waiting_for_type,
         ContentPackageStates.waiting_for_price,
         ContentPackageStates.waiting_for_description,
-        ContentPackageStates.waiting_for_edit
+        ContentPackageStates.waiting_for_edit,
+        ContentPackageStates.waiting_for_search
     ])
 )
 async def callback_content_menu(callback: CallbackQuery, session: AsyncSession):
@@ -164,11 +165,12 @@ async def callback_content_list(callback: CallbackQuery, session: AsyncSession):
 
     container = ServiceContainer(session, callback.bot)
 
-    # Get all packages (in-memory pagination per RESEARCH.md recommendation)
-    all_packages = await container.content.list_packages(is_active=None)
+    # Paginate in SQL (only the rows of the page are loaded)
+    paginator = QueryPaginator(session, container.content.build_packages_query(), page_size=10)
+    page = await paginator.get_page(1)
 
     # Check if empty
-    if not all_packages:
+    if page.is_empty:
         text, keyboard = container.message.admin.content.content_list_empty()
         try:
             await callback.message.edit_text(
@@ -183,10 +185,6 @@ async def callback_content_list(callback: CallbackQuery, session: AsyncSession):
         await callback.answer()
         return
 
-    # Paginate
-    paginator = Paginator(items=all_packages, page_size=10)
-    page = paginator.get_first_page()
-
     # Get header text
     text, _ = container.message.admin.content.content_list_header()
 
@@ -234,17 +232,14 @@ async def callback_content_page(callback: CallbackQuery, session: AsyncSession):
 
     container = ServiceContainer(session, callback.bot)
 
-    # Get all packages (in-memory pagination per RESEARCH.md recommendation)
-    all_packages = await container.content.list_packages(is_active=None)
-    paginator = Paginator(items=all_packages, page_size=10)
-
-    # Validate page number
-    if page_num < 1 or page_num > paginator.total_pages:
+    # Validate page number (pages past the end are clamped to the last one)
+    if page_num < 1:
         logger.warning(f"⚠️ Número de página fuera de rango: {page_num}")
         await callback.answer("❌ Página fuera de rango", show_alert=True)
         return
 
-    page = paginator.get_page(page_num)
+    paginator = QueryPaginator(session, container.content.build_packages_query(), page_size=10)
+    page = await paginator.get_page(page_num)
 
     # Get header text
     text, _ = container.message.admin.content.content_list_header()
@@ -272,6 +267,102 @@ async def callback_content_page(callback: CallbackQuery, session: AsyncSession):
     await callback.answer()
 
 
+# ===== SEARCH PACKAGES =====
+
+@content_router.callback_query(F.data == "admin:content:search")
+async def callback_content_search_start(callback: CallbackQuery, state: FSMContext, session: AsyncSession):
+    """
+    Ask for the package search text.
+
+    Args:
+        callback: Callback query
+        state: FSM context
+        session: Sesión de BD
+    """
+    await state.set_state(ContentPackageStates.waiting_for_search)
+
+    container = ServiceContainer(session, callback.bot)
+    text, keyboard = container.message.admin.content.search_prompt()
+    try:
+        await callback.message.edit_text(text=text, reply_markup=keyboard, parse_mode="HTML")
+    except Exception as e:
+        if "message is not modified" not in str(e):
+            logger.error(f"❌ Error editando mensaje de búsqueda: {e}")
+
+    await callback.answer()
+
+
+@content_router.message(ContentPackageStates.waiting_for_search)
+async def process_content_search(message: Message, state: FSMContext, session: AsyncSession):
+    """
+    Run the package search and show the first page of results.
+
+    The query is kept in FSM data so result pages can be browsed.
+
+    Args:
+        message: Message with the search text
+        state: FSM context
+        session: Sesión de BD
+    """
+    query = (message.text or "").strip()[:100]
+    if not query:
+        return
+
+    await state.clear()
+    await state.update_data(content_search_query=query)
+
+    logger.debug(f"🔍 Usuario {message.from_user.id} buscando paquetes: '{query}'")
+
+    container = ServiceContainer(session, message.bot)
+    text, keyboard = await _render_search_page(container, query, page_num=1)
+    await message.answer(text=text, reply_markup=keyboard, parse_mode="HTML")
+
+
+@content_router.callback_query(F.data.startswith("admin:content:search:page:"))
+async def callback_content_search_page(callback: CallbackQuery, state: FSMContext, session: AsyncSession):
+    """
+    Show a specific page of package search results.
+
+    Args:
+        callback: Callback query
+        state: FSM context
+        session: Sesión de BD
+    """
+    try:
+        page_num = max(1, int(callback.data.split(":")[-1]))
+    except (ValueError, IndexError):
+        await callback.answer("❌ Página inválida", show_alert=True)
+        return
+
+    query = (await state.get_data()).get("content_search_query")
+    if not query:
+        await callback.answer("❌ La búsqueda expiró, inicie una nueva", show_alert=True)
+        return
+
+    container = ServiceContainer(session, callback.bot)
+    text, keyboard = await _render_search_page(container, query, page_num)
+    try:
+        await callback.message.edit_text(text=text, reply_markup=keyboard, parse_mode="HTML")
+    except Exception as e:
+        if "message is not modified" not in str(e):
+            logger.error(f"❌ Error editando resultados de búsqueda: {e}")
+
+    await callback.answer()
+
+
+async def _render_search_page(container: ServiceContainer, query: str, page_num: int):
+    """Build (text, keyboard) for a page of package search results."""
+    page = await container.content_search.search_packages(query, page=page_num, page_size=10)
+    text = container.message.admin.content.search_results_header(query, page.total_items)
+    keyboard = _create_package_list_keyboard(
+        packages=page.items,
+        page=page,
+        callback_pattern="admin:content:search:page:{page}",
+        back_callback="admin:content"
+    )
+    return text, keyboard
+
+
 # ===== PACKAGE DETAIL VIEW =====
 
 @content_router.callback_query(F.data.startswith("admin:content:view:"))
@@ -859,7 +950,8 @@ async def callback_content_reactivate(callback: CallbackQuery, session: AsyncSes
         ContentPackageStates.waiting_for_type,
         ContentPackageStates.waiting_for_price,
         ContentPackageStates.waiting_for_description,
-        ContentPackageStates.waiting_for_edit
+        ContentPackageStates.waiting_for_edit,
+        ContentPackageStates.waiting_for_search
     ])
 )
 async def callback_content_create_cancel(callback: CallbackQuery, state: FSMContext, session: AsyncSession):
@@ -21,10 +21,11 @@ from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.services.container import ServiceContainer
+from bot.utils.formatters import escape_html
 from bot.utils.keyboards import create_inline_keyboard
 from bot.database.enums import ContentType, ContentTier
 from bot.database.models import ContentSet
-from bot.states.admin import ContentSetCreateState
+from bot.states.admin import ContentSetCreateState, ContentSetSearchState
 
 logger = logging.getLogger(__name__)
 
@@ -75,6 +76,7 @@ async def callback_admin_content_sets(callback: CallbackQuery, session: AsyncSes
     keyboard = create_inline_keyboard([
         [{"text": "➕ Crear ContentSet", "callback_data": "admin:content_sets:create:start"}],
         [{"text": "📋 Listar ContentSets", "callback_data": "admin:content_sets:list"}],
+        [{"text": "🔍 Buscar ContentSets", "callback_data": "admin:content_sets:search"}],
         [{"text": "🔙 Volver", "callback_data": "admin:main"}]
     ])
 
@@ -452,6 +454,170 @@ async def callback_content_set_delete_confirm(callback: CallbackQuery, session:
         await callback.answer("❌ Error al eliminar ContentSet", show_alert=True)
 
 
+# ============================================================================
+# ContentSet Search
+# ============================================================================
+
+@content_set_router.callback_query(F.data == "admin:content_sets:search")
+async def callback_content_set_search_start(callback: CallbackQuery, state: FSMContext):
+    """
+    Pide el texto de búsqueda de ContentSets.
+
+    Args:
+        callback: Callback query
+        state: FSM context
+    """
+    await state.set_state(ContentSetSearchState.waiting_for_query)
+
+    text = (
+        "🎩 <b>Buscar ContentSets</b>\n\n"
+        "Envíe una o varias palabras del nombre o la descripción:\n"
+        "<i>(se buscan como prefijo: \"vera\" encuentra \"verano\")</i>"
+    )
+    keyboard = create_inline_keyboard([
+        [{"text": "❌ Cancelar", "callback_data": "admin:content_sets:search:cancel"}]
+    ])
+
+    try:
+        await callback.message.edit_text(text=text, reply_markup=keyboard, parse_mode="HTML")
+    except Exception as e:
+        if "message is not modified" not in str(e):
+            logger.error(f"❌ Error iniciando búsqueda: {e}")
+
+    await callback.answer()
+
+
+@content_set_router.callback_query(F.data == "admin:content_sets:search:cancel")
+async def callback_content_set_search_cancel(
+    callback: CallbackQuery,
+    state: FSMContext,
+    session: AsyncSession
+):
+    """
+    Cancela la búsqueda y vuelve al menú de ContentSets.
+
+    Args:
+        callback: Callback query
+        state: FSM context
+        session: Sesión de BD
+    """
+    await state.clear()
+    await callback_admin_content_sets(callback, session)
+
+
+@content_set_router.message(ContentSetSearchState.waiting_for_query)
+async def process_content_set_search(message: Message, state: FSMContext, session: AsyncSession):
+    """
+    Ejecuta la búsqueda y muestra la primera página de resultados.
+
+    Args:
+        message: Mensaje con el texto de búsqueda
+        state: FSM context
+        session: Sesión de BD
+    """
+    query = (message.text or "").strip()[:100]
+    if not query:
+        return
+
+    await state.clear()
+    await state.update_data(content_set_search_query=query)
+
+    container = ServiceContainer(session, message.bot)
+    text, keyboard = await _render_content_set_search(container, query, page=1)
+    await message.answer(text=text, reply_markup=keyboard, parse_mode="HTML")
+
+
+@content_set_router.callback_query(F.data.startswith("admin:content_sets:search:page:"))
+async def callback_content_set_search_page(
+    callback: CallbackQuery,
+    state: FSMContext,
+    session: AsyncSession
+):
+    """
+    Navega las páginas de resultados de búsqueda.
+
+    Args:
+        callback: Callback query con formato "admin:content_sets:search:page:{n}"
+        state: FSM context
+        session: Sesión de BD
+    """
+    try:
+        page = max(1, int(callback.data.split(":")[-1]))
+    except ValueError:
+        page = 1
+
+    query = (await state.get_data()).get("content_set_search_query")
+    if not query:
+        await callback.answer("❌ La búsqueda expiró, inicie una nueva", show_alert=True)
+        return
+
+    container = ServiceContainer(session, callback.bot)
+    text, keyboard = await _render_content_set_search(container, query, page)
+
+    try:
+        await callback.message.edit_text(text=text, reply_markup=keyboard, parse_mode="HTML")
+    except Exception as e:
+        if "message is not modified" not in str(e):
+            logger.error(f"❌ Error mostrando resultados de búsqueda: {e}")
+
+    await callback.answer()
+
+
+async def _render_content_set_search(container: ServiceContainer, query: str, page: int):
+    """
+    Construye (texto, teclado) de una página de resultados.
+
+    Args:
+        container: Service container
+        query: Texto buscado
+        page: Número de página (1-indexed)
+    """
+    results = await container.content_search.search_content_sets(
+        query, page=page, page_size=CONTENT_SETS_PER_PAGE
+    )
+
+    lines = [f"🎩 <b>Resultados para</b> <code>{escape_html(query)}</code>", ""]
+    if results.is_empty:
+        lines.append("<i>Ningún ContentSet coincide con la búsqueda.</i>")
+
+    buttons = []
+    for cs in results.items:
+        status_emoji = "🟢" if cs.is_active else "🔴"
+        type_emoji = CONTENT_TYPE_EMOJIS.get(cs.content_type, "📁")
+        tier_emoji = TIER_EMOJIS.get(cs.tier, "⚪")
+        lines.append(f"{type_emoji} {cs.name} - {tier_emoji} {cs.file_count} archivos {status_emoji}")
+        buttons.append([{
+            "text": f"📁 {cs.name}",
+            "callback_data": f"admin:content_set:details:{cs.id}"
+        }])
+
+    if not results.is_empty:
+        lines.append("")
+        lines.append(
+            f"<i>Página {results.current_page} de {results.total_pages} "
+            f"({results.total_items} conjuntos)</i>"
+        )
+
+    nav_buttons = []
+    if results.has_previous:
+        nav_buttons.append({
+            "text": "⬅️",
+            "callback_data": f"admin:content_sets:search:page:{results.current_page - 1}"
+        })
+    if results.has_next:
+        nav_buttons.append({
+            "text": "➡️",
+            "callback_data": f"admin:content_sets:search:page:{results.current_page + 1}"
+        })
+    if nav_buttons:
+        buttons.append(nav_buttons)
+
+    buttons.append([{"text": "🔍 Nueva búsqueda", "callback_data": "admin:content_sets:search"}])
+    buttons.append([{"text": "🔙 Volver", "callback_data": "admin:content_sets"}])
+
+    return "\n".join(lines), create_inline_keyboard(buttons)
+
+
 # ============================================================================
 # FSM States for ContentSet Creation
 # ============================================================================
@@ -281,6 +281,8 @@ def _format_dashboard_message(data: dict) -> str:
     if scheduler["running"]:
         message += f"\n┃ Estado: 🟢 Corriendo"
         message += f"\n┃ Jobs: {scheduler['jobs_count']}"
+        leader_text = "👑 Esta réplica" if scheduler.get("leader") else "⏸️ Otra réplica"
+        message += f"\n┃ Líder: {leader_text}"
 
         # Próxima ejecución
         if scheduler["jobs"]:
@@ -20,7 +20,7 @@ from bot.handlers.admin.main import admin_router
 from bot.database.models import VIPSubscriber, FreeChannelRequest
 from bot.services.container import ServiceContainer
 from bot.utils.pagination import (
-    paginate_query_results,
+    QueryPaginator,
     create_pagination_keyboard,
     format_page_header,
     format_items_list,
@@ -150,7 +150,10 @@ async def _show_vip_subscribers_page(
         filter_status: Filtro a aplicar (active, expired, expiring_soon, all)
     """
     # Construir query según filtro
-    query = select(VIPSubscriber).order_by(VIPSubscriber.expiry_date.desc())
+    query = select(VIPSubscriber).order_by(
+        VIPSubscriber.expiry_date.desc(),
+        VIPSubscriber.id  # Desempate: orden estable entre páginas
+    )
 
     if filter_status == "active":
         query = query.where(VIPSubscriber.status == "active")
@@ -168,16 +171,8 @@ async def _show_vip_subscribers_page(
         )
     # "all" no aplica filtro adicional
 
-    # Ejecutar query
-    result = await session.execute(query)
-    subscribers = result.scalars().all()
-
-    # Paginar resultados
-    page = paginate_query_results(
-        results=list(subscribers),
-        page_number=page_number,
-        page_size=10
-    )
+    # Paginar en SQL (solo se cargan las filas de la página)
+    page = await QueryPaginator(session, query, page_size=10).get_page(page_number)
 
     # Formatear mensaje
     filter_name = _get_filter_name(filter_status)
@@ -595,7 +590,8 @@ async def _show_free_queue_page(
 
     # Construir query según filtro
     query = select(FreeChannelRequest).order_by(
-        FreeChannelRequest.request_date.asc()  # Más antiguas primero
+        FreeChannelRequest.request_date.asc(),  # Más antiguas primero
+        FreeChannelRequest.id
     )
 
     if filter_status == "pending":
@@ -613,16 +609,8 @@ async def _show_free_queue_page(
         query = query.where(FreeChannelRequest.processed == True)
     # "all" no aplica filtro adicional
 
-    # Ejecutar query
-    result = await session.execute(query)
-    requests = result.scalars().all()
-
-    # Paginar resultados
-    page = paginate_query_results(
-        results=list(requests),
-        page_number=page_number,
-        page_size=10
-    )
+    # Paginar en SQL (solo se cargan las filas de la página)
+    page = await QueryPaginator(session, query, page_size=10).get_page(page_number)
 
     # Formatear mensaje
     filter_name = _get_free_filter_name(filter_status)
@@ -13,24 +13,31 @@ from typing import Dict, Any
 from aiogram.types import Message, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
-from bot.utils.keyboards import create_inline_keyboard
+from bot.utils.keyboards import static_keyboard
 from bot.database.enums import UserRole
 
 logger = logging.getLogger(__name__)
 
 
-async def show_admin_menu(message: Message, data: Dict[str, Any]):
-    """
-    Muestra el menú de administrador.
+# Parte fija del mensaje de bienvenida (pre-renderizada una vez)
+_ADMIN_MENU_OPTIONS_TEXT = (
+    "*Opciones disponibles:*\n"
+    "• Gestión de usuarios VIP\n"
+    "• Gestión de contenido\n"
+    "• Configuración del bot\n"
+    "• Estadísticas y reportes\n\n"
+    "Selecciona una opción:"
+)
 
-    Args:
-        message: Mensaje de Telegram
-        data: Data del handler (incluye container, session, etc.)
+
+@static_keyboard
+def _admin_menu_keyboard() -> InlineKeyboardMarkup:
     """
-    user = message.from_user
-    container = data.get("container")
+    Teclado del menú de administrador (construido una sola vez).
 
-    # Crear teclado inline con opciones de admin
+    Returns:
+        InlineKeyboardMarkup compartido (no mutar)
+    """
     keyboard = InlineKeyboardBuilder()
 
     # Sección VIP Management
@@ -55,24 +62,32 @@ async def show_admin_menu(message: Message, data: Dict[str, Any]):
     # Ajustar layout (3 columnas)
     keyboard.adjust(3, 3, 3, 2)
 
-    # Mensaje de bienvenida
+    return keyboard.as_markup()
+
+
+async def show_admin_menu(message: Message, data: Dict[str, Any]):
+    """
+    Muestra el menú de administrador.
+
+    Args:
+        message: Mensaje de Telegram
+        data: Data del handler (incluye container, session, etc.)
+    """
+    user = message.from_user
+
+    # Mensaje de bienvenida (solo el encabezado depende del usuario)
     welcome_text = (
         f"👑 *Menú de Administrador*\n\n"
         f"Hola, {user.first_name}!\n"
         f"ID: `{user.id}`\n"
         f"Rol: {UserRole.ADMIN.value.upper()}\n\n"
-        f"*Opciones disponibles:*\n"
-        f"• Gestión de usuarios VIP\n"
-        f"• Gestión de contenido\n"
-        f"• Configuración del bot\n"
-        f"• Estadísticas y reportes\n\n"
-        f"Selecciona una opción:"
+        f"{_ADMIN_MENU_OPTIONS_TEXT}"
     )
 
     await message.answer(
         welcome_text,
         parse_mode="Markdown",
-        reply_markup=keyboard.as_markup()
+        reply_markup=_admin_menu_keyboard()
     )
 
     logger.info(f"👑 Menú admin mostrado a {user.id} (@{user.username or 'sin username'})")
@@ -9,13 +9,20 @@ import logging
 import tempfile
 from pathlib import Path
 
-from aiogram import Router, F
+from aiogram import Dispatcher, Router, F
 from aiogram.filters import Command
 from aiogram.types import Message, CallbackQuery, FSInputFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.middlewares import AdminAuthMiddleware
-from bot.utils.profiler import AsyncProfiler, HandlerProfiler
+from bot.middlewares.profiling import registered_handler_labels, send_live_report
+from bot.utils.profiler import (
+    AsyncProfiler,
+    HandlerProfiler,
+    LiveProfiler,
+    get_live_profiler,
+    handler_matches,
+)
 from bot.utils.query_analyzer import analyze_queries, QueryOptimizationSuggestions
 
 logger = logging.getLogger(__name__)
@@ -27,12 +34,11 @@ profile_router.callback_query.middleware(AdminAuthMiddleware())
 # Registry of profilable handlers
 HANDLER_REGISTRY = {
     "admin": "bot.handlers.admin.main.cmd_admin",
-    "vip_panel": "bot.handlers.admin.vip.cmd_vip_panel",
-    "free_panel": "bot.handlers.admin.free.cmd_free_panel",
-    "users": "bot.handlers.admin.users.cmd_users",
+    "vip_panel": "bot.handlers.admin.vip.callback_vip_menu",
+    "free_panel": "bot.handlers.admin.free.callback_free_menu",
+    "users": "bot.handlers.admin.users.callback_users_menu",
     "start": "bot.handlers.user.start.cmd_start",
-    "vip_entry": "bot.handlers.user.vip_entry.cmd_vip",
-    "free_flow": "bot.handlers.user.free_flow.cmd_free",
+    "vip_entry": "bot.handlers.user.vip_entry.handle_vip_entry_stage_transition",
 }
 
 
@@ -205,6 +211,100 @@ async def callback_profile_html(callback: CallbackQuery):
     )
 
 
+@profile_router.message(Command("profile_live"))
+async def cmd_profile_live(message: Message, dispatcher: Dispatcher):
+    """
+    Arma el profiling en vivo de los próximos updates reales de un handler.
+
+    A diferencia de /profile (mocks), envuelve updates de producción con
+    pyinstrument y el contador de queries, y envía el reporte como
+    documento al completar la captura.
+
+    Uso:
+        /profile_live - Estado de la captura actual
+        /profile_live shop - Próximos 5 updates de handlers que contengan "shop"
+        /profile_live start 10 --html - 10 updates del handler registrado "start", en HTML
+        /profile_live stop - Desarma y envía lo capturado hasta ahora
+
+    Solo se arma si el patrón coincide con algún handler registrado en
+    el dispatcher; si no, la captura nunca se dispararía.
+
+    Args:
+        message: Mensaje del comando
+        dispatcher: Dispatcher (inyectado por aiogram)
+    """
+    args = message.text.split()[1:] if message.text else []
+    live = get_live_profiler()
+
+    if not args:
+        capture = live.capture
+        if capture is None:
+            await message.answer(
+                "🔬 <b>Profiling en vivo:</b> inactivo\n\n"
+                "<i>Uso: /profile_live &lt;handler&gt; [N] [--html]</i>\n"
+                f"<i>Máximo {LiveProfiler.MAX_UPDATES} updates por captura.</i>",
+                parse_mode="HTML"
+            )
+        else:
+            await message.answer(
+                f"🔬 <b>Profiling en vivo:</b> <code>{capture.pattern}</code>\n"
+                f"Capturados: {len(capture.samples)}/{capture.target}\n"
+                f"Formato: {'HTML' if capture.html else 'texto'}",
+                parse_mode="HTML"
+            )
+        return
+
+    if args[0] == "stop":
+        capture = live.disarm()
+        if capture is None:
+            await message.answer("ℹ️ No hay captura armada.")
+        elif capture.samples:
+            await send_live_report(message.bot, capture)
+        else:
+            await message.answer("🛑 Captura desarmada sin updates capturados.")
+        return
+
+    pattern = args[0]
+    html = "--html" in args[1:]
+    counts = [arg for arg in args[1:] if arg.isdigit()]
+    target = int(counts[0]) if counts else LiveProfiler.DEFAULT_UPDATES
+
+    labels = registered_handler_labels(dispatcher)
+
+    # Las claves de HANDLER_REGISTRY apuntan a un handler exacto; si no está
+    # registrado se cae a substring con la clave
+    exact = False
+    if pattern in HANDLER_REGISTRY:
+        registered = HANDLER_REGISTRY[pattern].removeprefix("bot.handlers.")
+        if registered in labels:
+            pattern, exact = registered, True
+
+    matched = [label for label in labels if handler_matches(pattern, label, exact=exact)]
+    if not matched:
+        await message.answer(
+            f"❌ <b>Ningún handler registrado coincide con:</b> <code>{pattern}</code>\n\n"
+            f"<i>Use parte del módulo o de la función, p.ej. "
+            f"<code>shop</code> o <code>user.start</code>.</i>",
+            parse_mode="HTML"
+        )
+        return
+
+    capture = live.arm(pattern, target, message.chat.id, html=html, exact=exact)
+    handlers_text = "\n".join(f"  • <code>{label}</code>" for label in matched[:10])
+    if len(matched) > 10:
+        handlers_text += f"\n  … y {len(matched) - 10} más"
+
+    await message.answer(
+        f"🔬 <b>Profiling en vivo armado</b>\n\n"
+        f"Handler: <code>{capture.pattern}</code>\n"
+        f"{handlers_text}\n"
+        f"Updates: {capture.target}\n"
+        f"Formato: {'HTML' if capture.html else 'texto'}\n\n"
+        f"<i>El reporte llegará a este chat al completar la captura.</i>",
+        parse_mode="HTML"
+    )
+
+
 @profile_router.message(Command("profile_stats"))
 async def cmd_profile_stats(message: Message):
     """
@@ -6,6 +6,7 @@ Handlers para administración de productos de la tienda:
 - Crear nuevos productos (FSM flow)
 - Ver detalles de producto
 - Activar/Desactivar productos
+- Ver la cola de entregas de contenido y reencolar las fallidas
 
 Voice: Lucien (🎩) - Formal, elegante, mayordomo
 """
@@ -19,9 +20,12 @@ from aiogram.fsm.context import FSMContext
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from bot.background.content_delivery import start_delivery
 from bot.services.container import ServiceContainer
+from bot.services.content_delivery import ContentDeliveryService
+from bot.services.shop_catalog import get_shop_catalog_cache
 from bot.utils.keyboards import create_inline_keyboard
-from bot.database.enums import ContentTier
+from bot.database.enums import ContentDeliveryStatus, ContentTier
 from bot.database.models import ShopProduct, ContentSet
 
 logger = logging.getLogger(__name__)
@@ -58,13 +62,15 @@ async def callback_admin_shop(callback: CallbackQuery, session: AsyncSession):
         "<b>Acciones disponibles:</b>\n"
         "• Crear nuevo producto\n"
         "• Ver/Editar productos existentes\n"
-        "• Activar/Desactivar productos\n\n"
+        "• Activar/Desactivar productos\n"
+        "• Revisar entregas de contenido\n\n"
         "<i>Seleccione una opción...</i>"
     )
 
     keyboard = create_inline_keyboard([
         [{"text": "➕ Crear Producto", "callback_data": "admin:shop:create:start"}],
         [{"text": "📋 Listar Productos", "callback_data": "admin:shop:list"}],
+        [{"text": "📦 Entregas", "callback_data": "admin:shop:deliveries"}],
         [{"text": "🔙 Volver", "callback_data": "admin:main"}]
     ])
 
@@ -328,6 +334,7 @@ async def callback_shop_toggle(callback: CallbackQuery, session: AsyncSession):
         # Toggle status
         product.is_active = not product.is_active
         await session.commit()
+        get_shop_catalog_cache().invalidate_catalog()
 
         status_text = "activado 🟢" if product.is_active else "desactivado 🔴"
         logger.info(f"✅ Producto {product_id} ({product.name}) {status_text}")
@@ -342,6 +349,90 @@ async def callback_shop_toggle(callback: CallbackQuery, session: AsyncSession):
         await callback.answer("❌ Error al cambiar estado", show_alert=True)
 
 
+@shop_router.callback_query(F.data == "admin:shop:deliveries")
+async def callback_shop_deliveries(callback: CallbackQuery, session: AsyncSession):
+    """
+    Handler de la cola de entregas de contenido comprado.
+
+    Muestra el conteo por estado y las últimas entregas fallidas, con
+    botón para reencolar cada una.
+
+    Args:
+        callback: Callback query
+        session: Sesión de BD
+    """
+    logger.debug(f"📦 Usuario {callback.from_user.id} revisó la cola de entregas")
+
+    service = ContentDeliveryService(session)
+    counts = await service.get_queue_counts()
+    failed = await service.get_failed_deliveries(limit=5)
+
+    text = (
+        "🎩 <b>Entregas de Contenido</b>\n\n"
+        f"{ContentDeliveryStatus.PENDING.emoji} En camino: <b>{counts['pending']}</b>\n"
+        f"{ContentDeliveryStatus.DELIVERED.emoji} Entregadas: <b>{counts['delivered']}</b>\n"
+        f"{ContentDeliveryStatus.FAILED.emoji} Fallidas: <b>{counts['failed']}</b>\n"
+    )
+
+    rows = []
+    if failed:
+        text += "\n<b>Últimas fallidas:</b>\n"
+        for delivery in failed:
+            text += (
+                f"• <code>#{delivery.id}</code> user <code>{delivery.user_id}</code> — "
+                f"{delivery.chunks_sent}/{delivery.total_chunks} álbumes, "
+                f"<code>{delivery.last_error or 'unknown'}</code>\n"
+            )
+            rows.append([{
+                "text": f"🔁 Reintentar #{delivery.id}",
+                "callback_data": f"admin:shop:delivery:retry:{delivery.id}"
+            }])
+
+    rows.append([{"text": "🔄 Actualizar", "callback_data": "admin:shop:deliveries"}])
+    rows.append([{"text": "🔙 Volver", "callback_data": "admin:shop"}])
+
+    try:
+        await callback.message.edit_text(
+            text=text,
+            reply_markup=create_inline_keyboard(rows),
+            parse_mode="HTML"
+        )
+    except Exception as e:
+        if "message is not modified" not in str(e):
+            logger.error(f"❌ Error mostrando cola de entregas: {e}")
+
+    await callback.answer()
+
+
+@shop_router.callback_query(F.data.startswith("admin:shop:delivery:retry:"))
+async def callback_shop_delivery_retry(callback: CallbackQuery, session: AsyncSession):
+    """
+    Handler para reencolar una entrega fallida.
+
+    Args:
+        callback: Callback query con formato "admin:shop:delivery:retry:{id}"
+        session: Sesión de BD
+    """
+    try:
+        delivery_id = int(callback.data.split(":")[-1])
+    except ValueError:
+        await callback.answer("❌ Error: ID inválido", show_alert=True)
+        return
+
+    success, status = await ContentDeliveryService(session).requeue(delivery_id)
+    if not success:
+        message = "❌ Entrega no encontrada" if status == "not_found" else "ℹ️ La entrega ya no está fallida"
+        await callback.answer(message, show_alert=True)
+        return
+
+    # El runner usa sus propias sesiones: la entrega debe estar persistida
+    await session.commit()
+    start_delivery(callback.bot, delivery_id)
+    logger.info(f"🔁 Admin {callback.from_user.id} reencoló la entrega #{delivery_id}")
+
+    await callback_shop_deliveries(callback, session)
+
+
 # ============================================================================
 # FSM States for Product Creation
 # ============================================================================
@@ -742,6 +833,7 @@ async def process_product_creation(
 
         session.add(product)
         await session.commit()
+        get_shop_catalog_cache().invalidate_catalog()
 
         logger.info(
             f"✅ Producto creado: {product.name} (ID: {product.id}) "
@@ -5,19 +5,24 @@ Handlers para:
 - Submenú VIP
 - Configuración del canal VIP
 - Generación de tokens de invitación con deep links
+- Generación de lotes de tokens exportados como CSV (/tokens)
 
 All messages now use centralized AdminVIPMessages provider for voice consistency.
 """
+import csv
+import io
 import logging
 from datetime import timedelta
 
 from aiogram import F
+from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
-from aiogram.types import CallbackQuery, Message
+from aiogram.types import BufferedInputFile, CallbackQuery, Message
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.handlers.admin.main import admin_router
 from bot.services.container import ServiceContainer
+from bot.services.subscription import MAX_TOKEN_BATCH
 from bot.states.admin import ChannelSetupStates
 from bot.utils.keyboards import create_inline_keyboard
 from config import Config
@@ -371,6 +376,103 @@ async def callback_generate_token_with_plan(
         )
 
 
+def build_tokens_document(tokens: list, bot_username: str, plan_name: str) -> BufferedInputFile:
+    """
+    Construye el CSV con los tokens de un lote y sus deep links.
+
+    Args:
+        tokens: Tokens generados
+        bot_username: Username del bot para los deep links
+        plan_name: Nombre de la tarifa (para el nombre del archivo)
+
+    Returns:
+        BufferedInputFile: Documento listo para enviar
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["token", "deep_link"])
+    for token_str in tokens:
+        writer.writerow([token_str, f"https://t.me/{bot_username}?start={token_str}"])
+
+    slug = "".join(c if c.isalnum() else "_" for c in plan_name.lower()).strip("_")
+    filename = f"tokens_{slug or 'vip'}_{len(tokens)}.csv"
+    return BufferedInputFile(buffer.getvalue().encode("utf-8"), filename=filename)
+
+
+@admin_router.message(Command("tokens"))
+async def cmd_generate_tokens_batch(message: Message, session: AsyncSession):
+    """
+    Genera un lote de tokens VIP para una tarifa y lo exporta como CSV.
+
+    Uso:
+        /tokens <plan_id> <cantidad>
+
+    Args:
+        message: Mensaje del comando
+        session: Sesión de BD
+    """
+    args = message.text.split()[1:] if message.text else []
+
+    if len(args) != 2 or not all(arg.isdigit() for arg in args):
+        await message.answer(
+            "🎩 <b>Lucien:</b>\n\n"
+            "🎟️ <b>Lote de tokens VIP</b>\n\n"
+            "<code>/tokens &lt;plan_id&gt; &lt;cantidad&gt;</code>\n\n"
+            f"<i>Máximo {MAX_TOKEN_BATCH} tokens por lote.</i>",
+            parse_mode="HTML"
+        )
+        return
+
+    plan_id, count = int(args[0]), int(args[1])
+    if not 1 <= count <= MAX_TOKEN_BATCH:
+        await message.answer(
+            f"❌ La cantidad debe estar entre 1 y {MAX_TOKEN_BATCH}.",
+            parse_mode="HTML"
+        )
+        return
+
+    container = ServiceContainer(session, message.bot)
+
+    plan = await container.pricing.get_plan_by_id(plan_id)
+    if not plan or not plan.active:
+        await message.answer("❌ Tarifa no disponible", parse_mode="HTML")
+        return
+
+    try:
+        tokens = await container.subscription.generate_vip_tokens(
+            count=count,
+            plan_id=plan.id,
+            generated_by=message.from_user.id,
+            duration_hours=plan.duration_days * 24
+        )
+        await session.commit()
+    except Exception as e:
+        logger.error(f"❌ Error generando lote de tokens: {e}", exc_info=True)
+        await message.answer(
+            container.message.common.error(context="al generar el lote de invitaciones"),
+            parse_mode="HTML"
+        )
+        return
+
+    bot_username = (await message.bot.me()).username
+    document = build_tokens_document(tokens, bot_username, plan.name)
+
+    await message.answer_document(
+        document,
+        caption=(
+            f"🎩 <b>Lucien:</b>\n\n"
+            f"🎟️ {len(tokens)} invitaciones para <b>{plan.name}</b> "
+            f"({plan.duration_days} días)."
+        ),
+        parse_mode="HTML"
+    )
+
+    logger.info(
+        f"✅ Lote de {len(tokens)} tokens generado por admin {message.from_user.id} | "
+        f"Plan: {plan.name}"
+    )
+
+
 # ===== SUBMENÚ DE CONFIGURACIÓN VIP =====
 
 @admin_router.callback_query(F.data == "vip:config")
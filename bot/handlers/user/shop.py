@@ -3,6 +3,7 @@ Shop Handlers - Gestión de tienda y compra de contenido.
 
 Handlers:
 - shop_catalog_handler: Muestra catálogo de productos
+- shop_search_start_handler / process_shop_search: Búsqueda de productos
 - shop_product_detail_handler: Muestra detalle de producto con precios VIP/Free
 - shop_purchase_handler: Procesa confirmación de compra
 - shop_confirm_purchase_handler: Ejecuta compra confirmada
@@ -12,21 +13,23 @@ Handlers:
 Voz: Lucien (🎩) - Formal, elegante, mayordomo
 """
 import logging
-from typing import List, Optional
+from typing import AbstractSet, Dict, List, Optional
 
 from aiogram import Router, F
 from aiogram.types import (
-    Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton,
-    InputMediaPhoto, InputMediaVideo
+    Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 )
 from aiogram.fsm.context import FSMContext
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from bot.background.content_delivery import start_delivery
 from bot.services.container import ServiceContainer
-from bot.database.enums import ContentTier, ContentType, TransactionType
+from bot.database.enums import ContentDeliveryStatus, ContentTier, ContentType, TransactionType
 from bot.database.models import ShopProduct, UserContentAccess
+from bot.states.user import ShopSearchStates
+from bot.utils.formatters import escape_html
 from datetime import datetime, timezone
-from sqlalchemy import update as sa_update
+from sqlalchemy import select, update as sa_update
 
 logger = logging.getLogger(__name__)
 
@@ -73,6 +76,49 @@ def _get_empty_catalog_message() -> str:
 <i>Diana está preparando nuevo contenido. Vuelva más tarde.</i>"""
 
 
+def _get_search_prompt_message() -> str:
+    """Mensaje pidiendo el texto de búsqueda."""
+    return f"""{_get_lucien_header()}
+
+<i>¿Busca algo en particular?</i>
+
+Escriba el nombre o una palabra de la descripción
+(por ejemplo: <code>fotos verano</code>)."""
+
+
+def _get_search_results_header(query: str, total: int) -> str:
+    """
+    Encabezado de resultados de búsqueda.
+
+    Args:
+        query: Texto buscado
+        total: Total de resultados
+
+    Returns:
+        Mensaje con voz de Lucien
+    """
+    if total == 0:
+        return f"""{_get_lucien_header()}
+
+<i>No encontré nada que coincida con</i> «{escape_html(query)}».
+
+<i>Pruebe con otras palabras, o explore el catálogo completo.</i>"""
+
+    return f"""{_get_lucien_header()}
+
+🔍 <b>Resultados para</b> «{escape_html(query)}»: {total}"""
+
+
+def get_search_prompt_keyboard() -> InlineKeyboardMarkup:
+    """Teclado de la pantalla de búsqueda (cancelar)."""
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(
+            text="❌ Cancelar",
+            callback_data="shop_search_cancel"
+        )]
+    ])
+
+
 def _get_product_detail_message(
     name: str,
     description: str,
@@ -178,7 +224,8 @@ def _get_purchase_success_message(name: str, price: int, file_count: int) -> str
 💰 <b>Precio:</b> {price} besitos
 📁 <b>Archivos:</b> {file_count}
 
-<i>Enviando su contenido ahora...</i>"""
+<i>Su contenido está en camino; lo recibirá en este chat en unos instantes.</i>
+<i>Puede consultar el estado de la entrega en su historial.</i>"""
 
 
 def _get_purchase_error_message(reason: str) -> str:
@@ -252,6 +299,36 @@ def _get_empty_history_message() -> str:
 💡 <i>Visite nuestra tienda para explorar el contenido disponible.</i>"""
 
 
+def _format_history_entries(
+    purchases: List[dict],
+    statuses: Dict[int, ContentDeliveryStatus]
+) -> str:
+    """
+    Formatea las compras del historial con su estado de entrega.
+
+    Args:
+        purchases: Compras de ShopService.get_purchase_history()
+        statuses: access_id -> estado de la última entrega
+
+    Returns:
+        Líneas del historial (HTML)
+    """
+    text = ""
+    for purchase in purchases:
+        date_str = purchase["accessed_at"].strftime("%d/%m/%Y") if purchase["accessed_at"] else "Fecha desconocida"
+        status = statuses.get(purchase["id"])
+        if status is not None:
+            status_emoji = status.emoji
+        else:
+            status_emoji = "✅" if purchase["is_active"] else "⏳"
+        text += f"{status_emoji} <b>{purchase['product_name']}</b>\n"
+        text += f"   💰 {purchase['besitos_paid']} besitos | 📅 {date_str}\n"
+        if status is not None and status is not ContentDeliveryStatus.DELIVERED:
+            text += f"   📦 {status.display_name}\n"
+        text += "\n"
+    return text
+
+
 def _get_earn_besitos_message() -> str:
     """Mensaje de opciones para ganar besitos."""
     return f"""{_get_lucien_header()}
@@ -272,7 +349,9 @@ def get_catalog_keyboard(
     products: List,
     page: int,
     total_pages: int,
-    user_role: str
+    user_role: str,
+    page_callback: str = "shop_catalog_page",
+    owned_ids: AbstractSet[int] = frozenset()
 ) -> InlineKeyboardMarkup:
     """
     Genera teclado para el catálogo.
@@ -282,6 +361,8 @@ def get_catalog_keyboard(
         page: Página actual
         total_pages: Total de páginas
         user_role: Rol del usuario para mostrar precios
+        page_callback: Prefijo de los callbacks de navegación
+        owned_ids: content_set_id que el usuario ya posee (badge ✅)
 
     Returns:
         InlineKeyboardMarkup con productos y navegación
@@ -296,8 +377,10 @@ def get_catalog_keyboard(
         else:
             price_text = f"💰 {product.besitos_price}"
 
+        owned_badge = "✅ " if product.content_set_id in owned_ids else ""
+
         buttons.append([InlineKeyboardButton(
-            text=f"{product.name} ({price_text})",
+            text=f"{owned_badge}{product.name} ({price_text})",
             callback_data=f"shop_product:{product.id}"
         )])
 
@@ -306,16 +389,22 @@ def get_catalog_keyboard(
     if page > 1:
         nav_buttons.append(InlineKeyboardButton(
             text="◀️ Anterior",
-            callback_data=f"shop_catalog_page:{page - 1}"
+            callback_data=f"{page_callback}:{page - 1}"
         ))
     if page < total_pages:
         nav_buttons.append(InlineKeyboardButton(
             text="Siguiente ▶️",
-            callback_data=f"shop_catalog_page:{page + 1}"
+            callback_data=f"{page_callback}:{page + 1}"
         ))
     if nav_buttons:
         buttons.append(nav_buttons)
 
+    # Search button
+    buttons.append([InlineKeyboardButton(
+        text="🔍 Buscar",
+        callback_data="shop_search"
+    )])
+
     # History button
     buttons.append([InlineKeyboardButton(
         text="📜 Ver historial",
@@ -543,8 +632,9 @@ async def shop_catalog_handler(
         # Build message
         text = _get_catalog_header(balance)
 
-        # Build keyboard
-        keyboard = get_catalog_keyboard(products, 1, total_pages, user_role)
+        # Build keyboard (owned products get a badge)
+        owned_ids = await container.shop.get_owned_content_set_ids(user_id)
+        keyboard = get_catalog_keyboard(products, 1, total_pages, user_role, owned_ids=owned_ids)
 
         # Send/update message
         if isinstance(event, CallbackQuery):
@@ -595,7 +685,10 @@ async def shop_catalog_page_handler(
 
         # Build message and keyboard
         text = _get_catalog_header(balance)
-        keyboard = get_catalog_keyboard(products, page, total_pages, user_role)
+        owned_ids = await container.shop.get_owned_content_set_ids(user_id)
+        keyboard = get_catalog_keyboard(
+            products, page, total_pages, user_role, owned_ids=owned_ids
+        )
 
         await callback.message.edit_text(text=text, reply_markup=keyboard, parse_mode="HTML")
         await callback.answer()
@@ -605,6 +698,129 @@ async def shop_catalog_page_handler(
         await callback.answer("❌ Error al cambiar de página", show_alert=True)
 
 
+async def _render_shop_search(
+    container: ServiceContainer,
+    user_id: int,
+    query: str,
+    page_num: int
+) -> tuple:
+    """
+    Construye la página de resultados de búsqueda de la tienda.
+
+    Args:
+        container: Service container
+        user_id: ID del usuario (para precios según rol)
+        query: Texto buscado
+        page_num: Página solicitada
+
+    Returns:
+        Tuple[str, InlineKeyboardMarkup]: (texto, teclado)
+    """
+    user_role = (await container.role_detection.get_user_role(user_id)).value
+    page = await container.content_search.search_products(query, page=page_num, page_size=5)
+
+    text = _get_search_results_header(query, page.total_items)
+    if page.is_empty:
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="🔍 Buscar de nuevo", callback_data="shop_search")],
+            [InlineKeyboardButton(text="🔙 Volver al catálogo", callback_data="shop_catalog")]
+        ])
+    else:
+        keyboard = get_catalog_keyboard(
+            page.items, page.current_page, page.total_pages, user_role,
+            page_callback="shop_search_page",
+            owned_ids=await container.shop.get_owned_content_set_ids(user_id)
+        )
+        keyboard.inline_keyboard.append([InlineKeyboardButton(
+            text="🔙 Volver al catálogo",
+            callback_data="shop_catalog"
+        )])
+
+    return text, keyboard
+
+
+@shop_router.callback_query(F.data == "shop_search")
+async def shop_search_start_handler(
+    callback: CallbackQuery,
+    state: FSMContext
+) -> None:
+    """Inicia la búsqueda de productos (pide el texto)."""
+    await state.set_state(ShopSearchStates.waiting_for_query)
+    await callback.message.edit_text(
+        text=_get_search_prompt_message(),
+        reply_markup=get_search_prompt_keyboard(),
+        parse_mode="HTML"
+    )
+    await callback.answer()
+
+
+@shop_router.callback_query(F.data == "shop_search_cancel")
+async def shop_search_cancel_handler(
+    callback: CallbackQuery,
+    state: FSMContext,
+    container: ServiceContainer
+) -> None:
+    """Cancela la búsqueda y vuelve al catálogo."""
+    await state.clear()
+    await shop_catalog_handler(callback, state, container)
+    await callback.answer()
+
+
+@shop_router.message(ShopSearchStates.waiting_for_query, F.text)
+async def process_shop_search(
+    message: Message,
+    state: FSMContext,
+    container: ServiceContainer
+) -> None:
+    """Procesa el texto de búsqueda y muestra la primera página de resultados."""
+    user_id = message.from_user.id
+    query = message.text.strip()[:100]
+
+    # La query queda en FSM data para la paginación
+    await state.clear()
+    await state.update_data(shop_search_query=query)
+
+    logger.info(f"🔍 Usuario {user_id} buscando en tienda: '{query}'")
+
+    try:
+        text, keyboard = await _render_shop_search(container, user_id, query, 1)
+        await message.answer(text=text, reply_markup=keyboard, parse_mode="HTML")
+    except Exception as e:
+        logger.error(f"❌ Error en búsqueda de tienda: {e}", exc_info=True)
+        await message.answer(
+            text=f"{_get_lucien_header()}\n\n<i>Ha ocurrido un inconveniente con la búsqueda...</i>",
+            parse_mode="HTML"
+        )
+
+
+@shop_router.callback_query(F.data.startswith("shop_search_page:"))
+async def shop_search_page_handler(
+    callback: CallbackQuery,
+    state: FSMContext,
+    container: ServiceContainer
+) -> None:
+    """Handle search results pagination."""
+    user_id = callback.from_user.id
+
+    query = (await state.get_data()).get("shop_search_query")
+    if not query:
+        # La búsqueda expiró (FSM limpiado): volver al catálogo
+        await shop_catalog_handler(callback, state, container)
+        await callback.answer()
+        return
+
+    try:
+        page = int(callback.data.split(":")[1])
+        text, keyboard = await _render_shop_search(container, user_id, query, page)
+
+        await callback.message.edit_text(text=text, reply_markup=keyboard, parse_mode="HTML")
+        await callback.answer()
+
+    except Exception as e:
+        logger.error(f"❌ Error en paginación de búsqueda: {e}", exc_info=True)
+        await callback.answer("❌ Error al cambiar de página", show_alert=True)
+
+
 @shop_router.callback_query(F.data.startswith("shop_product:"))
 async def shop_product_detail_handler(
     callback: CallbackQuery,
@@ -774,27 +990,6 @@ async def shop_purchase_handler(
         await callback.answer("❌ Error al procesar la compra", show_alert=True)
 
 
-def _get_delivery_error_with_refund_message(product_name: str) -> str:
-    """
-    Mensaje de error en entrega con notificación de reembolso.
-
-    Args:
-        product_name: Nombre del producto
-
-    Returns:
-        Mensaje con voz de Lucien informando del reembolso
-    """
-    return f"""{_get_lucien_header()}
-
-<i>Ha ocurrido un inconveniente técnico al entregar su contenido.</i>
-
-🎁 <b>{product_name}</b>
-
-💰 <b>Su saldo ha sido restaurado completamente.</b>
-
-<i>Por favor, inténtelo nuevamente más tarde o contacte a Diana si el problema persiste.</i>"""
-
-
 @shop_router.callback_query(F.data.startswith("shop_confirm:"))
 async def shop_confirm_purchase_handler(
     callback: CallbackQuery,
@@ -802,14 +997,15 @@ async def shop_confirm_purchase_handler(
     container: ServiceContainer
 ) -> None:
     """
-    Execute confirmed purchase with atomic delivery and automatic refund.
+    Execute confirmed purchase and queue content delivery.
 
     Flow:
     1. Validate purchase (product exists, user has balance, etc.)
     2. Spend besitos (atomic operation)
-    3. Create access record
-    4. Deliver content
-    5. If delivery fails: refund besitos automatically
+    3. Create (or reactivate) access record and enqueue a ContentDelivery
+    4. Commit and start the delivery runner in background
+    5. Answer immediately; albums arrive from the runner, which retries
+       failed sends with backoff (see bot/background/content_delivery.py)
     """
     user_id = callback.from_user.id
 
@@ -887,91 +1083,56 @@ async def shop_confirm_purchase_handler(
             await callback.answer("❌ Compra fallida", show_alert=True)
             return
 
-        # Get file_ids for delivery
-        file_ids = product.content_set.file_ids if product.content_set else []
-        content_type = product.content_set.content_type.value if product.content_set else "mixed"
-
-        # Step 3: Deliver content ANTES de crear el registro de acceso en DB.
-        # Si el delivery falla, solo se necesita reembolsar los besitos,
-        # sin necesidad de rollback de registros de acceso que aún no existen.
-        delivery_success = True
-        try:
-            await deliver_purchased_content(
-                bot=callback.bot,
-                user_id=user_id,
-                file_ids=file_ids,
-                content_type=content_type
+        # Step 3: Registrar acceso y encolar la entrega.
+        # El envío corre en background (cola persistente con reintentos):
+        # un error de Telegram ya no deja al usuario con besitos gastados
+        # y sin contenido, y el handler responde sin esperar los álbumes.
+        content_set = product.content_set
+        file_ids = list(content_set.file_ids or []) if content_set else []
+        content_type = content_set.content_type.value if content_set else ContentType.MIXED.value
+
+        session = container.shop.session
+        access_record = await session.scalar(
+            select(UserContentAccess).where(
+                UserContentAccess.user_id == user_id,
+                UserContentAccess.content_set_id == product.content_set_id
             )
-        except Exception as e:
-            delivery_success = False
-            logger.error(
-                f"❌ Content delivery failed for user {user_id}, product {product_id}: {e}",
-                exc_info=True
+        )
+        if access_record is None:
+            access_record = UserContentAccess(
+                user_id=user_id,
+                content_set_id=product.content_set_id,
+                shop_product_id=product.id,
+                access_type="shop_purchase",
+                besitos_paid=price_to_pay,
+                is_active=True,
+                accessed_at=datetime.now(timezone.utc).replace(tzinfo=None),
+                access_metadata={
+                    "product_name": product.name,
+                    "is_repurchase": is_owned
+                }
             )
-
-        if not delivery_success:
-            # Reembolsar besitos — el acceso nunca fue creado, no hay rollback de DB necesario
-            try:
-                refund_success, refund_msg, _ = await container.wallet.admin_credit(
-                    user_id=user_id,
-                    amount=price_to_pay,
-                    reason="reembolso_automatico_fallo_entrega",
-                    admin_id=0
-                )
-                if refund_success:
-                    logger.error(
-                        f"🔄 Automatic refund executed for user {user_id}: {price_to_pay} besitos "
-                        f"(product {product_id}, reason: delivery failure)"
-                    )
-                else:
-                    logger.critical(
-                        f"🚨 REFUND FAILED for user {user_id}: {price_to_pay} besitos "
-                        f"(product {product_id}, refund error: {refund_msg}). "
-                        f"Manual intervention required!"
-                    )
-            except Exception as refund_error:
-                logger.critical(
-                    f"🚨 REFUND EXCEPTION for user {user_id}: {price_to_pay} besitos "
-                    f"(product {product_id}, error: {refund_error}). "
-                    f"Manual intervention required!"
-                )
-
-            text = _get_delivery_error_with_refund_message(product.name)
-            keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(
-                    text="🛍️ Volver a la tienda",
-                    callback_data="shop_catalog"
-                )]
-            ])
-            await callback.message.edit_text(text=text, reply_markup=keyboard, parse_mode="HTML")
-            await callback.answer("❌ Error en entrega - Saldo restaurado", show_alert=True)
-            return
-
-        # Step 4: Delivery exitoso — crear registro de acceso y actualizar contador
-        access_record = UserContentAccess(
-            user_id=user_id,
-            content_set_id=product.content_set_id,
-            shop_product_id=product.id,
-            access_type="shop_purchase",
-            besitos_paid=price_to_pay,
-            is_active=True,
-            accessed_at=datetime.now(timezone.utc).replace(tzinfo=None),
-            access_metadata={
-                "product_name": product.name,
-                "is_repurchase": is_owned
+            session.add(access_record)
+        else:
+            # Recompra: un registro por usuario/ContentSet (índice único)
+            access_record.is_active = True
+            access_record.access_metadata = {
+                **(access_record.access_metadata or {}),
+                "is_repurchase": True
             }
+
+        delivery = await container.content_delivery.enqueue(
+            access_record, content_type=content_type, file_ids=file_ids
         )
-        container.shop.session.add(access_record)
 
         # Actualizar contador de compras de forma atómica
-        await container.shop.session.execute(
+        await session.execute(
             sa_update(ShopProduct)
             .where(ShopProduct.id == product_id)
             .values(purchase_count=ShopProduct.purchase_count + 1)
         )
-        await container.shop.session.flush()
+        await session.flush()
 
-        # Delivery successful - continue with rewards and success message
         price_paid = price_to_pay
 
         # Check for unlocked rewards after purchase
@@ -981,6 +1142,10 @@ async def shop_confirm_purchase_handler(
             event_data={"product_id": product_id, "price_paid": price_paid}
         )
 
+        # El runner usa sus propias sesiones: compra y entrega deben estar persistidas
+        await session.commit()
+        start_delivery(callback.bot, delivery.id)
+
         # Build success message
         base_text = _get_purchase_success_message(
             name=product.name,
@@ -1045,79 +1210,6 @@ async def shop_confirm_purchase_handler(
         await callback.answer("❌ Error al confirmar la compra", show_alert=True)
 
 
-async def deliver_purchased_content(
-    bot,
-    user_id: int,
-    file_ids: List[str],
-    content_type: str
-) -> None:
-    """
-    Send content files to user chat.
-
-    Uses bot.send_photo/video/audio for each file_id.
-    Groups photos into media group if multiple photos.
-    """
-    if not file_ids:
-        logger.warning(f"No file_ids to deliver for user {user_id}")
-        return
-
-    try:
-        caption = "🎩 <i>Aquí está su contenido adquirido.</i>"
-
-        if content_type == "photo_set" and len(file_ids) > 1:
-            # Send as media group
-            media = []
-            for i, file_id in enumerate(file_ids):
-                if i == 0:
-                    media.append(InputMediaPhoto(media=file_id, caption=caption, parse_mode="HTML"))
-                else:
-                    media.append(InputMediaPhoto(media=file_id))
-            await bot.send_media_group(chat_id=user_id, media=media)
-
-        elif content_type == "video":
-            # Send video
-            await bot.send_video(
-                chat_id=user_id,
-                video=file_ids[0],
-                caption=caption,
-                parse_mode="HTML"
-            )
-
-        elif content_type == "audio":
-            # Send audio
-            await bot.send_audio(
-                chat_id=user_id,
-                audio=file_ids[0],
-                caption=caption,
-                parse_mode="HTML"
-            )
-
-        else:
-            # Mixed or single photo - send individually
-            for i, file_id in enumerate(file_ids):
-                file_caption = caption if i == 0 else None
-                await bot.send_photo(
-                    chat_id=user_id,
-                    photo=file_id,
-                    caption=file_caption,
-                    parse_mode="HTML"
-                )
-
-        logger.info(f"✅ Content delivered to user {user_id}: {len(file_ids)} files")
-
-    except Exception as e:
-        logger.error(f"❌ Error delivering content to user {user_id}: {e}", exc_info=True)
-        # Send error message to user
-        try:
-            await bot.send_message(
-                chat_id=user_id,
-                text=f"🎩 <b>Lucien:</b>\n\n<i>Hubo un problema al enviar su contenido. Por favor, contacte a Diana.</i>",
-                parse_mode="HTML"
-            )
-        except Exception:
-            pass
-
-
 @shop_router.callback_query(F.data == "shop_history")
 @shop_router.message(F.text == "📜 Historial")
 async def shop_history_handler(
@@ -1147,13 +1239,10 @@ async def shop_history_handler(
             ])
         else:
             # Build history message
-            text = _get_history_header() + "\n\n"
-
-            for purchase in purchases:
-                date_str = purchase["accessed_at"].strftime("%d/%m/%Y") if purchase["accessed_at"] else "Fecha desconocida"
-                status_emoji = "✅" if purchase["is_active"] else "⏳"
-                text += f"{status_emoji} <b>{purchase['product_name']}</b>\n"
-                text += f"   💰 {purchase['besitos_paid']} besitos | 📅 {date_str}\n\n"
+            statuses = await container.content_delivery.get_status_by_access(
+                [purchase["id"] for purchase in purchases]
+            )
+            text = _get_history_header() + "\n\n" + _format_history_entries(purchases, statuses)
 
             total_pages = (total + 4) // 5 if total > 0 else 1
             keyboard = get_history_keyboard(1, total_pages, True)
@@ -1197,13 +1286,10 @@ async def shop_history_page_handler(
         )
 
         # Build history message
-        text = _get_history_header() + "\n\n"
-
-        for purchase in purchases:
-            date_str = purchase["accessed_at"].strftime("%d/%m/%Y") if purchase["accessed_at"] else "Fecha desconocida"
-            status_emoji = "✅" if purchase["is_active"] else "⏳"
-            text += f"{status_emoji} <b>{purchase['product_name']}</b>\n"
-            text += f"   💰 {purchase['besitos_paid']} besitos | 📅 {date_str}\n\n"
+        statuses = await container.content_delivery.get_status_by_access(
+            [purchase["id"] for purchase in purchases]
+        )
+        text = _get_history_header() + "\n\n" + _format_history_entries(purchases, statuses)
 
         total_pages = (total + 4) // 5 if total > 0 else 1
         keyboard = get_history_keyboard(page, total_pages, len(purchases) > 0)
@@ -16,6 +16,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.database.enums import UserRole
 from bot.services.container import ServiceContainer
+from bot.services.token_guard import get_token_guard
 from bot.utils.formatters import format_currency
 from config import Config
 
@@ -141,6 +142,9 @@ async def _activate_token_from_deeplink(
         is_valid, msg_result, token = await container.subscription.validate_token(token_string)
 
         if not is_valid:
+            # Cuenta para el limitador de intentos por usuario
+            get_token_guard().record_failure(user.user_id)
+
             # Token invalid - delegate to provider
             error_text = container.message.user.start.deep_link_activation_error(
                 error_type="invalid",
@@ -198,6 +202,7 @@ async def _activate_token_from_deeplink(
         # Commit de la transacción
         await session.commit()
         await session.refresh(subscriber)
+        get_token_guard().reset(user.user_id)
 
         logger.info(
             f"✅ Usuario {user.user_id} activó suscripción VIP vía deep link | "
@@ -8,9 +8,10 @@ import logging
 from typing import Dict
 
 from fastapi import FastAPI, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from bot.health.check import get_health_summary
+from bot.utils.metrics import CONTENT_TYPE, render_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +22,8 @@ def create_health_app() -> FastAPI:
 
     The app provides:
     - GET /health: Comprehensive health check with component status
+    - GET /metrics: Prometheus text exposition (handlers, SQL, Bot API, pool,
+      scheduler jobs, background queues)
     - GET /: Basic service info for connectivity testing
 
     Returns:
@@ -98,5 +101,27 @@ def create_health_app() -> FastAPI:
             status_code=http_status
         )
 
+    @app.get("/metrics")
+    async def metrics() -> PlainTextResponse:
+        """
+        Prometheus metrics endpoint.
+
+        The metrics are rendered on the bot's event loop (the health server
+        runs in its own thread), so scraping never reads bot state concurrently.
+
+        Returns:
+            PlainTextResponse in Prometheus text format 0.0.4
+            503 if the bot loop does not answer in time
+        """
+        try:
+            body = await render_metrics()
+        except Exception as e:
+            logger.warning(f"Metrics render failed: {e}")
+            return PlainTextResponse(
+                "# metrics unavailable\n",
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        return PlainTextResponse(body, media_type=CONTENT_TYPE)
+
     logger.info("FastAPI health app created")
     return app
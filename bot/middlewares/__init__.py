@@ -3,16 +3,28 @@ Middlewares module - Procesamiento pre/post handlers.
 """
 from bot.middlewares.admin_auth import AdminAuthMiddleware
 from bot.middlewares.database import DatabaseMiddleware
+from bot.middlewares.deep_link_guard import DeepLinkGuardMiddleware
+from bot.middlewares.metrics import HandlerMetricsMiddleware, UpdateMetricsMiddleware
+from bot.middlewares.profiling import LiveProfilingMiddleware
 from bot.middlewares.role_detection import RoleDetectionMiddleware
 from bot.middlewares.simulation import SimulationMiddleware
+from bot.middlewares.throttling import ThrottleRule, ThrottlingMiddleware
+from bot.middlewares.update_dedup import DuplicateUpdateMiddleware
 from bot.middlewares.user_registration import UserRegistrationMiddleware
 from bot.middlewares.webhook_auth import TelegramIPValidationMiddleware
 
 __all__ = [
     "AdminAuthMiddleware",
     "DatabaseMiddleware",
+    "DeepLinkGuardMiddleware",
+    "DuplicateUpdateMiddleware",
+    "HandlerMetricsMiddleware",
+    "LiveProfilingMiddleware",
     "RoleDetectionMiddleware",
     "SimulationMiddleware",
+    "ThrottleRule",
+    "ThrottlingMiddleware",
+    "UpdateMetricsMiddleware",
     "UserRegistrationMiddleware",
     "TelegramIPValidationMiddleware",
 ]
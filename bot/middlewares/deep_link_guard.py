@@ -0,0 +1,113 @@
+"""
+Deep Link Guard Middleware - Rechaza floods de tokens inválidos sin tocar la BD.
+
+Se registra como outer middleware de dp.update para ejecutarse ANTES de
+DatabaseMiddleware y UserRegistrationMiddleware: un /start <token> de un
+usuario bloqueado, con formato imposible o recién rechazado se responde
+desde memoria, sin abrir sesión ni registrar al usuario.
+"""
+import logging
+from typing import Callable, Dict, Any, Awaitable, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import Message, TelegramObject, Update
+
+from bot.services.token_guard import get_token_guard
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def extract_start_token(message: Message) -> Optional[str]:
+    """
+    Extrae el parámetro de un /start con deep link.
+
+    Args:
+        message: Mensaje recibido
+
+    Returns:
+        str: Token del deep link, o None si no es "/start <token>"
+    """
+    if not message.text:
+        return None
+
+    parts = message.text.split(maxsplit=1)
+    command = parts[0].split("@", 1)[0]
+    if command != "/start" or len(parts) < 2:
+        return None
+
+    return parts[1].strip()
+
+
+class DeepLinkGuardMiddleware(BaseMiddleware):
+    """
+    Middleware que filtra /start <token> contra el TokenGuard.
+
+    Uso:
+        # Outer middleware: corre antes que los middlewares de BD
+        dp.update.outer_middleware(DeepLinkGuardMiddleware())
+
+    Comportamiento:
+        - Usuario con intentos agotados → mensaje de espera, update descartado
+        - Token mal formado o en la cache negativa → mensaje de invitación
+          inválida, intento registrado, update descartado
+        - Cualquier otro caso → continúa al handler normalmente
+        - Admins nunca se filtran
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        """
+        Ejecuta el middleware.
+
+        Args:
+            handler: Handler a ejecutar si el token puede ser válido
+            event: Update de Telegram
+            data: Data del handler
+
+        Returns:
+            Resultado del handler, o None si el update fue rechazado
+        """
+        message = event.message if isinstance(event, Update) else event
+        if not isinstance(message, Message) or message.from_user is None:
+            return await handler(event, data)
+
+        token_str = extract_start_token(message)
+        if token_str is None:
+            return await handler(event, data)
+
+        user_id = message.from_user.id
+        if Config.is_admin(user_id):
+            return await handler(event, data)
+
+        guard = get_token_guard()
+
+        if guard.is_blocked(user_id):
+            logger.info(f"🚫 /start con token descartado: usuario {user_id} bloqueado")
+            await self._reply(data, message, "rate_limited")
+            return None
+
+        if not guard.is_well_formed(token_str) or guard.is_known_invalid(token_str):
+            guard.record_failure(user_id)
+            logger.info(f"🚫 /start con token inválido descartado en memoria (user {user_id})")
+            await self._reply(data, message, "invalid")
+            return None
+
+        return await handler(event, data)
+
+    @staticmethod
+    async def _reply(data: Dict[str, Any], message: Message, error_type: str) -> None:
+        """Responde con el error de deep link en la voz de Lucien."""
+        from bot.services.message import LucienVoiceService
+
+        text = LucienVoiceService().user.start.deep_link_activation_error(error_type=error_type)
+        bot = data.get("bot") or message.bot
+
+        try:
+            await bot.send_message(message.chat.id, text, parse_mode="HTML")
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo responder rechazo de token: {e}")
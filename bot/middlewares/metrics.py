@@ -0,0 +1,127 @@
+"""
+Metrics Middlewares - Instrumentación de updates y handlers para /metrics.
+
+- UpdateMetricsMiddleware (outer de dp.update): duración total del update
+  y queries SQL ejecutadas durante su procesamiento
+- HandlerMetricsMiddleware (inner de cada tipo de evento): duración y
+  errores por handler, con el handler resuelto por aiogram
+
+Las métricas viven en bot/utils/metrics.py.
+"""
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.event.bases import CancelHandler, SkipHandler
+from aiogram.types import TelegramObject, Update
+
+from bot.utils.metrics import (
+    HANDLER_DURATION,
+    HANDLER_ERRORS,
+    UPDATE_DURATION,
+    UPDATE_SQL_QUERIES,
+    UPDATE_SQL_SECONDS,
+    reset_update_queries,
+    track_update_queries,
+)
+
+
+def handler_label(data: Dict[str, Any]) -> str:
+    """
+    Nombre del handler resuelto para el evento (módulo relativo + función).
+
+    Args:
+        data: Data del middleware (aiogram pone el HandlerObject en "handler")
+
+    Returns:
+        str: p.ej. "user.shop.shop_confirm_purchase_handler"
+    """
+    return callback_label(getattr(data.get("handler"), "callback", None))
+
+
+def callback_label(callback: Any) -> str:
+    """
+    Label de un callback de handler (módulo relativo a bot.handlers + función).
+
+    Args:
+        callback: Función del handler (HandlerObject.callback)
+
+    Returns:
+        str: Label, o "unknown" si no hay callback
+    """
+    if callback is None:
+        return "unknown"
+
+    module = getattr(callback, "__module__", "") or ""
+    name = getattr(callback, "__qualname__", None) or getattr(callback, "__name__", "handler")
+    if module.startswith("bot.handlers."):
+        module = module[len("bot.handlers."):]
+    return f"{module}.{name}" if module else name
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """
+    Mide cada update: duración total y queries SQL.
+
+    Uso:
+        # Último outer middleware: solo cuenta los updates que pasaron los filtros
+        dp.update.outer_middleware(UpdateMetricsMiddleware())
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        try:
+            event_type = event.event_type if isinstance(event, Update) else "unknown"
+        except LookupError:
+            event_type = "unknown"
+
+        queries, token = track_update_queries()
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            UPDATE_DURATION.observe(time.perf_counter() - started, event_type)
+            UPDATE_SQL_QUERIES.observe(queries.count, event_type)
+            UPDATE_SQL_SECONDS.observe(queries.seconds, event_type)
+            reset_update_queries(token)
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """
+    Mide la duración y los errores de cada handler.
+
+    Uso:
+        # Inner middleware de cada observer (message, callback_query, ...)
+        for name, observer in dp.observers.items():
+            if name not in ("update", "error"):
+                observer.middleware(HandlerMetricsMiddleware(name))
+    """
+
+    def __init__(self, event_type: str):
+        """
+        Args:
+            event_type: Tipo de evento del observer (label "event")
+        """
+        self.event_type = event_type
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        label = handler_label(data)
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except (SkipHandler, CancelHandler):
+            raise
+        except Exception:
+            HANDLER_ERRORS.inc(self.event_type, label)
+            raise
+        finally:
+            HANDLER_DURATION.observe(time.perf_counter() - started, self.event_type, label)
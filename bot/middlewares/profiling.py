@@ -0,0 +1,144 @@
+"""
+Live Profiling Middleware - Profiling bajo demanda de updates reales.
+
+Inner middleware de cada tipo de evento: si un admin armó una captura
+(/profile_live) y el handler resuelto coincide, ejecuta el update dentro
+de pyinstrument y del contador de queries, y al completar la captura
+envía el reporte al chat del admin como documento.
+
+Sin captura armada solo lee LiveProfiler.armed.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from aiogram import BaseMiddleware, Bot, Router
+from aiogram.dispatcher.event.bases import CancelHandler, SkipHandler
+from aiogram.types import BufferedInputFile, TelegramObject
+from pyinstrument import Profiler
+
+from bot.middlewares.metrics import callback_label, handler_label
+from bot.utils.metrics import reset_update_queries, track_update_queries
+from bot.utils.profiler import LiveCapture, LiveProfiler, LiveSample, get_live_profiler
+
+logger = logging.getLogger(__name__)
+
+# Referencias a los envíos en curso (evita que el GC cancele las tasks)
+_pending_reports: Set[asyncio.Task] = set()
+
+
+def registered_handler_labels(router: Router) -> List[str]:
+    """
+    Labels de todos los handlers registrados bajo un router (o el dispatcher).
+
+    Son los mismos labels que ve LiveProfilingMiddleware, así que sirven
+    para validar el patrón de una captura antes de armarla.
+
+    Args:
+        router: Router raíz (normalmente el Dispatcher)
+
+    Returns:
+        List[str]: Labels ordenados, sin duplicados
+    """
+    labels = set()
+    for sub_router in router.chain_tail:
+        for event_type, observer in sub_router.observers.items():
+            if event_type in ("update", "error"):
+                continue
+            labels.update(callback_label(handler.callback) for handler in observer.handlers)
+    return sorted(labels)
+
+
+async def send_live_report(bot: Bot, capture: LiveCapture) -> None:
+    """
+    Envía el reporte de una captura al chat del admin que la armó.
+
+    Args:
+        bot: Instancia del bot
+        capture: Captura (completa o parcial)
+    """
+    filename, content = capture.report()
+    try:
+        await bot.send_document(
+            capture.chat_id,
+            BufferedInputFile(content, filename=filename),
+            caption=f"🔬 Profiling en vivo: {capture.pattern} "
+                    f"({len(capture.samples)}/{capture.target} updates)"
+        )
+    except Exception as e:
+        logger.error(f"❌ No se pudo enviar el reporte de profiling en vivo: {e}")
+
+
+class LiveProfilingMiddleware(BaseMiddleware):
+    """
+    Profilea los updates reservados por una captura de LiveProfiler.
+
+    Uso:
+        # Inner middleware de cada observer, después de HandlerMetricsMiddleware
+        observer.middleware(LiveProfilingMiddleware())
+    """
+
+    def __init__(self, live_profiler: Optional[LiveProfiler] = None):
+        """
+        Args:
+            live_profiler: LiveProfiler a consultar (default: el global)
+        """
+        self.live_profiler = live_profiler or get_live_profiler()
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        if not self.live_profiler.armed:
+            return await handler(event, data)
+
+        label = handler_label(data)
+        capture = self.live_profiler.claim(label)
+        if capture is None:
+            return await handler(event, data)
+
+        profiler = Profiler(async_mode="enabled")
+        try:
+            profiler.start()
+        except RuntimeError as e:
+            # Otro profiler activo en este contexto (p.ej. PROFILE_HANDLERS)
+            logger.warning(f"⚠️ No se pudo iniciar el profiling en vivo: {e}")
+            self.live_profiler.release(capture, None)
+            return await handler(event, data)
+
+        queries, token = track_update_queries()
+        error = None
+        skipped = False
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except (SkipHandler, CancelHandler):
+            skipped = True
+            raise
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            session = profiler.stop()
+            reset_update_queries(token)
+            sample = None if skipped else LiveSample(
+                handler=label,
+                duration_ms=duration_ms,
+                query_count=queries.count,
+                query_time_ms=queries.seconds * 1000,
+                session=session,
+                error=error
+            )
+            self._finish(capture, sample, data.get("bot"))
+
+    def _finish(self, capture: LiveCapture, sample: Optional[LiveSample], bot: Optional[Bot]) -> None:
+        """Registra la muestra y, si la captura se completó, envía el reporte."""
+        if not self.live_profiler.release(capture, sample) or bot is None:
+            return
+        task = asyncio.create_task(send_live_report(bot, capture))
+        _pending_reports.add(task)
+        task.add_done_callback(_pending_reports.discard)
@@ -0,0 +1,174 @@
+"""
+Throttling Middleware - Anti-flood de botones por usuario.
+
+Un usuario que martillea los botones de un menú dispara, por cada toque,
+la cadena DatabaseMiddleware → UserRegistrationMiddleware →
+RoleDetectionMiddleware y el handler. Este middleware corre como outer
+middleware de dp.update (antes de abrir sesión) y descarta el exceso con
+un callback.answer() vacío, que solo detiene el spinner del botón.
+
+Los límites se definen por grupo de callbacks: las reglas se eligen por
+prefijo de callback_data (el filtro con el que cada router recibe sus
+botones), ya que en la capa outer todavía no se resolvió el router.
+Por defecto:
+- Reacciones (router de reacciones: "react:", "r:"): estricto
+- Resto de botones: límite general
+- Admins: exentos
+
+Los mensajes de texto no se limitan: los álbumes llegan como ráfagas de
+mensajes y los flujos FSM dependen de recibirlos todos.
+"""
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, TelegramObject, Update
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ThrottleRule:
+    """
+    Límite de un grupo de callbacks.
+
+    Attributes:
+        name: Nombre del grupo (clave del bucket y de las estadísticas)
+        rate: Callbacks por segundo sostenidos
+        burst: Ráfaga máxima
+        prefixes: Prefijos de callback_data del grupo (vacío = regla por defecto)
+    """
+    name: str
+    rate: float
+    burst: int
+    prefixes: Tuple[str, ...] = ()
+
+
+def default_rules() -> Tuple[ThrottleRule, ...]:
+    """Reglas por defecto según Config (la última es la general)."""
+    return (
+        ThrottleRule(
+            "reactions",
+            Config.THROTTLE_REACTION_RATE,
+            Config.THROTTLE_REACTION_BURST,
+            prefixes=("react:", "r:")
+        ),
+        ThrottleRule("callbacks", Config.THROTTLE_CALLBACK_RATE, Config.THROTTLE_CALLBACK_BURST),
+    )
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Middleware con un token bucket en memoria por usuario y grupo.
+
+    Uso:
+        # Outer middleware: corre antes que los middlewares de BD
+        dp.update.outer_middleware(ThrottlingMiddleware())
+
+    Los buckets viven en un LRU acotado a MAX_TRACKED_USERS entradas: un
+    usuario inactivo que sale del LRU vuelve con el bucket lleno, que es
+    lo mismo que tendría tras esperar.
+    """
+
+    MAX_TRACKED_USERS = 10_000
+
+    def __init__(
+        self,
+        rules: Optional[Sequence[ThrottleRule]] = None,
+        max_tracked: Optional[int] = None
+    ):
+        """
+        Args:
+            rules: Reglas por prefijo; la primera sin prefijos es la general
+                (default: default_rules())
+            max_tracked: Tope de buckets en memoria (default: MAX_TRACKED_USERS)
+        """
+        self.rules = tuple(rules if rules is not None else default_rules())
+        self.max_tracked = max_tracked if max_tracked is not None else self.MAX_TRACKED_USERS
+        self._default_rule = next((rule for rule in self.rules if not rule.prefixes), None)
+        # (user_id, regla) -> (tokens, último refill)
+        self._buckets: "OrderedDict[Tuple[int, str], Tuple[float, float]]" = OrderedDict()
+        self._throttled: Dict[str, int] = {rule.name: 0 for rule in self.rules}
+
+    def rule_for(self, callback_data: Optional[str]) -> Optional[ThrottleRule]:
+        """Regla que aplica a un callback_data (None si ninguna)."""
+        if callback_data:
+            for rule in self.rules:
+                if rule.prefixes and callback_data.startswith(rule.prefixes):
+                    return rule
+        return self._default_rule
+
+    def allow(self, user_id: int, rule: ThrottleRule) -> bool:
+        """
+        Consume un token del bucket del usuario para la regla.
+
+        Args:
+            user_id: ID del usuario
+            rule: Regla aplicada
+
+        Returns:
+            bool: True si hay presupuesto, False si excede el límite
+        """
+        key = (user_id, rule.name)
+        now = time.monotonic()
+
+        tokens, updated = self._buckets.pop(key, (float(rule.burst), now))
+        tokens = min(float(rule.burst), tokens + (now - updated) * rule.rate)
+        allowed = tokens >= 1.0
+        if allowed:
+            tokens -= 1.0
+
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_tracked:
+            self._buckets.popitem(last=False)
+
+        return allowed
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        """
+        Ejecuta el middleware.
+
+        Args:
+            handler: Handler a ejecutar si el usuario está dentro del límite
+            event: Update de Telegram
+            data: Data del handler
+
+        Returns:
+            Resultado del handler, o None si el callback fue descartado
+        """
+        callback = event.callback_query if isinstance(event, Update) else event
+        if not isinstance(callback, CallbackQuery):
+            return await handler(event, data)
+
+        user_id = callback.from_user.id
+        rule = self.rule_for(callback.data)
+        if rule is None or Config.is_admin(user_id) or self.allow(user_id, rule):
+            return await handler(event, data)
+
+        self._throttled[rule.name] += 1
+        logger.debug(f"🐢 Callback de usuario {user_id} descartado por anti-flood ({rule.name})")
+
+        try:
+            await callback.answer()
+        except Exception as e:
+            logger.debug(f"No se pudo responder callback descartado: {e}")
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Estadísticas del anti-flood.
+
+        Returns:
+            Dict con throttled (descartes por regla) y tracked (buckets en memoria)
+        """
+        return {"throttled": dict(self._throttled), "tracked": len(self._buckets)}
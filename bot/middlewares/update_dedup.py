@@ -0,0 +1,137 @@
+"""
+Update Dedup Middleware - Descarta updates repetidos por update_id.
+
+Telegram reenvía un update del webhook cuando el bot tarda en responder,
+y un reinicio en polling puede volver a entregar updates ya procesados.
+Sin este filtro un callback_query repetido vuelve a ejecutar una reacción,
+el reclamo del regalo diario o la confirmación de una compra.
+
+Se registra como el PRIMER outer middleware de dp.update: el duplicado se
+descarta antes de abrir sesión de BD o registrar al usuario.
+
+La memoria es por proceso: con varias réplicas sin afinidad un reintento
+puede llegar a otra réplica (los handlers críticos siguen siendo
+idempotentes en BD).
+"""
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+logger = logging.getLogger(__name__)
+
+
+class RecentUpdateIds:
+    """
+    Conjunto acotado y con ventana de tiempo de update_ids vistos.
+
+    Ring buffer (deque en orden de llegada) + set para la consulta O(1).
+    Un id sale al superar WINDOW_SECONDS o al pasar de MAX_IDS entradas.
+
+    Args:
+        window_seconds: Tiempo que se recuerda cada id
+        max_ids: Máximo de ids recordados
+    """
+
+    WINDOW_SECONDS = 600
+    MAX_IDS = 10_000
+
+    def __init__(self, window_seconds: Optional[float] = None, max_ids: Optional[int] = None):
+        self.window_seconds = window_seconds if window_seconds is not None else self.WINDOW_SECONDS
+        self.max_ids = max_ids if max_ids is not None else self.MAX_IDS
+        self._order: Deque[Tuple[float, int]] = deque()
+        self._ids: Set[int] = set()
+
+    def _evict(self, now: float) -> None:
+        """Saca los ids vencidos y los que exceden el tope (los más antiguos)."""
+        cutoff = now - self.window_seconds
+        while self._order and (self._order[0][0] < cutoff or len(self._order) > self.max_ids):
+            _, update_id = self._order.popleft()
+            self._ids.discard(update_id)
+
+    def check_and_add(self, update_id: int) -> bool:
+        """
+        Registra un update_id.
+
+        Args:
+            update_id: ID del update
+
+        Returns:
+            bool: True si es nuevo, False si ya se vio dentro de la ventana
+        """
+        now = time.monotonic()
+        self._evict(now)
+
+        if update_id in self._ids:
+            return False
+
+        self._ids.add(update_id)
+        self._order.append((now, update_id))
+        if len(self._order) > self.max_ids:
+            self._evict(now)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+class DuplicateUpdateMiddleware(BaseMiddleware):
+    """
+    Middleware que descarta updates con un update_id ya procesado.
+
+    Uso:
+        # Primer outer middleware: corre antes que cualquier otro
+        dp.update.outer_middleware(DuplicateUpdateMiddleware())
+
+    Comportamiento:
+        - update_id nuevo → continúa al handler
+        - update_id visto en la ventana → descartado (contado en stats)
+    """
+
+    def __init__(self, window_seconds: Optional[float] = None, max_ids: Optional[int] = None):
+        """
+        Args:
+            window_seconds: Ventana de deduplicación (default: RecentUpdateIds.WINDOW_SECONDS)
+            max_ids: Máximo de ids recordados (default: RecentUpdateIds.MAX_IDS)
+        """
+        self.seen = RecentUpdateIds(window_seconds, max_ids)
+        self.suppressed = 0
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        """
+        Ejecuta el middleware.
+
+        Args:
+            handler: Handler a ejecutar si el update es nuevo
+            event: Update de Telegram
+            data: Data del handler
+
+        Returns:
+            Resultado del handler, o None si el update era un duplicado
+        """
+        if not isinstance(event, Update) or self.seen.check_and_add(event.update_id):
+            return await handler(event, data)
+
+        self.suppressed += 1
+        logger.info(
+            f"🔁 Update {event.update_id} duplicado descartado "
+            f"({self.suppressed} duplicados desde el arranque)"
+        )
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Estadísticas del filtro.
+
+        Returns:
+            Dict con suppressed (duplicados descartados) y tracked (ids en memoria)
+        """
+        return {"suppressed": self.suppressed, "tracked": len(self.seen)}
@@ -0,0 +1,347 @@
+"""
+Broadcast Service - Broadcasts por mensaje directo a segmentos de usuarios.
+
+Responsabilidades:
+- Resolución de segmentos (FREE, VIP activos, VIP por expirar, intereses pendientes)
+- Materialización idempotente de destinatarios en broadcast_deliveries
+- Streaming de entregas pendientes con cursor del lado del servidor
+- Persistencia por lotes del resultado de cada entrega
+
+El envío en sí (worker pool + token bucket) vive en bot/background/broadcast.py.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, update, func, literal, exists, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.database.dialect import dialect_insert
+from bot.database.enums import BroadcastSegment, DeliveryStatus, UserRole
+from bot.database.models import (
+    Broadcast, BroadcastDelivery, User, VIPSubscriber, UserInterest
+)
+
+logger = logging.getLogger(__name__)
+
+# Filas por lote al leer destinatarios pendientes (server-side cursor)
+BROADCAST_STREAM_BATCH = 500
+
+# Días de anticipación del segmento VIP_EXPIRING
+VIP_EXPIRING_DAYS = 7
+
+# Tipos de contenido soportados por el envío
+BROADCAST_CONTENT_TYPES = ("text", "photo", "video")
+
+# Resultado de una entrega: (user_id, status, error_code)
+DeliveryResult = Tuple[int, DeliveryStatus, Optional[str]]
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class BroadcastService:
+    """
+    Service para broadcasts por DM con estado de entrega persistente.
+
+    Flujo:
+    1. Admin crea el broadcast → create_broadcast()
+    2. Se materializan los destinatarios → enqueue_recipients()
+    3. El runner recorre stream_pending_user_ids() y envía
+    4. Los resultados se guardan por lotes → record_results()
+    5. Al agotarse los pendientes → finish_broadcast()
+
+    Un broadcast interrumpido se reanuda desde el paso 3: las entregas
+    ya registradas no se reenvían.
+    """
+
+    def __init__(self, session: AsyncSession):
+        """
+        Inicializa el service.
+
+        Args:
+            session: Sesión de base de datos
+        """
+        self.session = session
+        logger.debug("✅ BroadcastService inicializado")
+
+    # ===== BROADCASTS =====
+
+    async def create_broadcast(
+        self,
+        segment: BroadcastSegment,
+        content_type: str,
+        text: Optional[str],
+        admin_id: int,
+        file_id: Optional[str] = None,
+        protect_content: bool = False,
+        progress_chat_id: Optional[int] = None,
+        progress_message_id: Optional[int] = None
+    ) -> Tuple[bool, str, Optional[Broadcast]]:
+        """
+        Registra un broadcast nuevo (sin destinatarios aún).
+
+        Args:
+            segment: Segmento objetivo
+            content_type: "text", "photo" o "video"
+            text: Texto o caption
+            admin_id: Admin que lo lanza
+            file_id: file_id de la foto/video (requerido si no es texto)
+            protect_content: Si el contenido se envía protegido
+            progress_chat_id: Chat donde reportar progreso
+            progress_message_id: Mensaje a editar con el progreso
+
+        Returns:
+            Tuple[bool, str, Optional[Broadcast]]:
+                - bool: True si se creó
+                - str: "created", "invalid_content_type" o "missing_content"
+                - Optional[Broadcast]: Broadcast creado
+        """
+        if content_type not in BROADCAST_CONTENT_TYPES:
+            return False, "invalid_content_type", None
+
+        if content_type == "text" and not text:
+            return False, "missing_content", None
+        if content_type != "text" and not file_id:
+            return False, "missing_content", None
+
+        broadcast = Broadcast(
+            segment=BroadcastSegment(segment).value,
+            content_type=content_type,
+            file_id=file_id,
+            text=text,
+            protect_content=protect_content,
+            admin_id=admin_id,
+            status="pending",
+            progress_chat_id=progress_chat_id,
+            progress_message_id=progress_message_id
+        )
+        self.session.add(broadcast)
+        await self.session.flush()
+
+        logger.info(
+            f"📨 Broadcast #{broadcast.id} creado por admin {admin_id} "
+            f"(segmento={broadcast.segment}, tipo={content_type})"
+        )
+        return True, "created", broadcast
+
+    async def get_broadcast(self, broadcast_id: int) -> Optional[Broadcast]:
+        """
+        Obtiene un broadcast por ID.
+
+        Args:
+            broadcast_id: ID del broadcast
+
+        Returns:
+            Broadcast o None si no existe
+        """
+        result = await self.session.execute(
+            select(Broadcast).where(Broadcast.id == broadcast_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_unfinished_broadcast_ids(self) -> List[int]:
+        """
+        Obtiene los broadcasts interrumpidos (pending/running).
+
+        Returns:
+            List[int]: IDs en orden de creación
+        """
+        result = await self.session.execute(
+            select(Broadcast.id)
+            .where(Broadcast.status.in_(("pending", "running")))
+            .order_by(Broadcast.id)
+        )
+        return list(result.scalars().all())
+
+    # ===== DESTINATARIOS =====
+
+    def _segment_query(self, segment: BroadcastSegment):
+        """
+        Construye el SELECT de user_id del segmento.
+
+        Args:
+            segment: Segmento objetivo
+
+        Returns:
+            Select de user_id únicos
+        """
+        segment = BroadcastSegment(segment)
+
+        if segment == BroadcastSegment.ALL_FREE:
+            return select(User.user_id).where(User.role == UserRole.FREE)
+
+        if segment == BroadcastSegment.ACTIVE_VIP:
+            return select(VIPSubscriber.user_id).where(VIPSubscriber.status == "active")
+
+        if segment == BroadcastSegment.VIP_EXPIRING:
+            now = _utc_now()
+            return select(VIPSubscriber.user_id).where(
+                VIPSubscriber.status == "active",
+                VIPSubscriber.expiry_date > now,
+                VIPSubscriber.expiry_date <= now + timedelta(days=VIP_EXPIRING_DAYS)
+            )
+
+        # PENDING_INTERESTS
+        return select(User.user_id).where(
+            exists().where(
+                UserInterest.user_id == User.user_id,
+                UserInterest.is_attended == False  # noqa: E712
+            )
+        )
+
+    async def enqueue_recipients(self, broadcast: Broadcast) -> int:
+        """
+        Materializa los destinatarios del segmento como entregas pendientes.
+
+        Un único INSERT ... SELECT ... ON CONFLICT DO NOTHING: es idempotente,
+        por lo que llamarlo de nuevo al reanudar no duplica entregas.
+
+        Args:
+            broadcast: Broadcast a poblar
+
+        Returns:
+            int: Total de destinatarios del broadcast
+        """
+        recipients = self._segment_query(BroadcastSegment(broadcast.segment)).subquery()
+
+        stmt = (
+            dialect_insert(self.session, BroadcastDelivery)
+            .from_select(
+                ["broadcast_id", "user_id", "status"],
+                select(
+                    literal(broadcast.id),
+                    recipients.c.user_id,
+                    literal(DeliveryStatus.PENDING.value)
+                ).where(true())  # SQLite exige WHERE en INSERT ... SELECT ... ON CONFLICT
+            )
+            .on_conflict_do_nothing(index_elements=["broadcast_id", "user_id"])
+        )
+        await self.session.execute(stmt)
+
+        total = await self.session.scalar(
+            select(func.count(BroadcastDelivery.id))
+            .where(BroadcastDelivery.broadcast_id == broadcast.id)
+        )
+
+        broadcast.total_recipients = total
+        if broadcast.status == "pending":
+            broadcast.status = "running"
+            broadcast.started_at = _utc_now()
+        await self.session.flush()
+
+        logger.info(f"📨 Broadcast #{broadcast.id}: {total} destinatarios en cola")
+        return total
+
+    async def stream_pending_user_ids(
+        self,
+        broadcast_id: int,
+        batch_size: int = BROADCAST_STREAM_BATCH
+    ) -> AsyncIterator[int]:
+        """
+        Recorre los destinatarios pendientes con un cursor del lado del servidor.
+
+        La memoria usada es O(batch_size) sin importar el tamaño del segmento.
+
+        Args:
+            broadcast_id: ID del broadcast
+            batch_size: Filas por fetch del cursor
+
+        Yields:
+            int: user_id pendiente, en orden ascendente
+        """
+        result = await self.session.stream_scalars(
+            select(BroadcastDelivery.user_id)
+            .where(
+                BroadcastDelivery.broadcast_id == broadcast_id,
+                BroadcastDelivery.status == DeliveryStatus.PENDING.value
+            )
+            .order_by(BroadcastDelivery.user_id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for user_id in result:
+            yield user_id
+
+    # ===== RESULTADOS =====
+
+    async def record_results(self, broadcast_id: int, results: Iterable[DeliveryResult]) -> None:
+        """
+        Persiste por lotes el resultado de varias entregas.
+
+        Agrupa por (status, error_code) para emitir un UPDATE por grupo y
+        actualiza los contadores del broadcast con una sola sentencia.
+
+        Args:
+            broadcast_id: ID del broadcast
+            results: Tuplas (user_id, status, error_code)
+        """
+        groups: Dict[Tuple[DeliveryStatus, Optional[str]], List[int]] = defaultdict(list)
+        for user_id, status, error_code in results:
+            groups[(DeliveryStatus(status), error_code)].append(user_id)
+
+        if not groups:
+            return
+
+        now = _utc_now()
+        counters = {DeliveryStatus.SENT: 0, DeliveryStatus.FAILED: 0, DeliveryStatus.BLOCKED: 0}
+
+        for (status, error_code), user_ids in groups.items():
+            await self.session.execute(
+                update(BroadcastDelivery)
+                .where(
+                    BroadcastDelivery.broadcast_id == broadcast_id,
+                    BroadcastDelivery.user_id.in_(user_ids)
+                )
+                .values(status=status.value, error_code=error_code, sent_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            if status in counters:
+                counters[status] += len(user_ids)
+
+        await self.session.execute(
+            update(Broadcast)
+            .where(Broadcast.id == broadcast_id)
+            .values(
+                sent_count=Broadcast.sent_count + counters[DeliveryStatus.SENT],
+                failed_count=Broadcast.failed_count + counters[DeliveryStatus.FAILED],
+                blocked_count=Broadcast.blocked_count + counters[DeliveryStatus.BLOCKED]
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def get_delivery_counts(self, broadcast_id: int) -> Dict[str, int]:
+        """
+        Cuenta entregas por estado.
+
+        Args:
+            broadcast_id: ID del broadcast
+
+        Returns:
+            Dict[str, int]: status -> cantidad (incluye todos los estados)
+        """
+        result = await self.session.execute(
+            select(BroadcastDelivery.status, func.count(BroadcastDelivery.id))
+            .where(BroadcastDelivery.broadcast_id == broadcast_id)
+            .group_by(BroadcastDelivery.status)
+        )
+        counts = {status.value: 0 for status in DeliveryStatus}
+        counts.update({status: count for status, count in result.all()})
+        return counts
+
+    async def finish_broadcast(self, broadcast_id: int, status: str = "completed") -> None:
+        """
+        Marca el broadcast como terminado.
+
+        Args:
+            broadcast_id: ID del broadcast
+            status: "completed" o "failed"
+        """
+        await self.session.execute(
+            update(Broadcast)
+            .where(Broadcast.id == broadcast_id)
+            .values(status=status, completed_at=_utc_now())
+            .execution_options(synchronize_session=False)
+        )
+        logger.info(f"📨 Broadcast #{broadcast_id} finalizado ({status})")
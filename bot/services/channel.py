@@ -7,8 +7,9 @@ Responsabilidades:
 - Envío de publicaciones a canales
 - Validación de que canales estén configurados
 """
+import asyncio
 import logging
-from typing import Optional, Tuple
+from typing import AsyncIterator, Optional, Sequence, Tuple
 
 from aiogram import Bot
 from aiogram.types import Message, Chat
@@ -22,6 +23,20 @@ from bot.utils.keyboards import get_reaction_keyboard
 
 logger = logging.getLogger(__name__)
 
+# Resultado por canal de send_to_channels: (nombre, éxito, mensaje, enviado)
+ChannelSendResult = Tuple[str, bool, str, Optional[Message]]
+
+
+def _sent_media_file_id(message: Optional[Message]) -> Optional[str]:
+    """Extrae el file_id del media de un mensaje enviado (foto o video)."""
+    if message is None:
+        return None
+    if message.photo:
+        return message.photo[-1].file_id
+    if message.video:
+        return message.video.file_id
+    return None
+
 
 class ChannelService:
     """
@@ -30,7 +45,7 @@ class ChannelService:
     Flujo típico:
     1. Admin configura canal → setup_channel()
     2. Bot verifica permisos → verify_bot_permissions()
-    3. Admin envía publicación → send_to_channel()
+    3. Admin envía publicación → send_to_channel() / send_to_channels()
     """
 
     def __init__(self, session: AsyncSession, bot: Bot):
@@ -367,6 +382,68 @@ class ChannelService:
             logger.error(f"Error al enviar mensaje a {channel_id}: {e}")
             return False, f"❌ Error inesperado: {str(e)}", None
 
+    async def send_to_channels(
+        self,
+        channels: Sequence[Tuple[str, str]],
+        text: Optional[str] = None,
+        photo: Optional[str] = None,
+        video: Optional[str] = None,
+        add_reactions: bool = True,
+        protect_content: bool = False,
+        **kwargs
+    ) -> AsyncIterator[ChannelSendResult]:
+        """
+        Publica el mismo contenido en varios canales en paralelo.
+
+        Los resultados se entregan en orden de finalización, para que el
+        llamador pueda informar cada canal en cuanto termina. La duración
+        total es la del envío más lento.
+
+        Si el media es una URL, Telegram tendría que descargarla una vez por
+        canal: en ese caso se publica primero en un canal y el file_id que
+        devuelve se reutiliza en el resto. Un file_id se envía en paralelo
+        directamente (ya vive en los servidores de Telegram).
+
+        Args:
+            channels: Pares (nombre, channel_id)
+            text: Texto o caption
+            photo: File ID o URL de foto
+            video: File ID o URL de video
+            add_reactions: Si agregar botones de reacción
+            protect_content: Si proteger contenido contra descargas
+            **kwargs: Parámetros adicionales (parse_mode, etc)
+
+        Yields:
+            Tuple[str, bool, str, Optional[Message]]: (nombre, éxito, mensaje, enviado)
+        """
+        pending = list(channels)
+        media = {"photo": photo, "video": video}
+
+        async def send(name: str, channel_id: str) -> ChannelSendResult:
+            success, msg, sent = await self.send_to_channel(
+                channel_id=channel_id,
+                text=text,
+                add_reactions=add_reactions,
+                protect_content=protect_content,
+                **media,
+                **kwargs
+            )
+            return name, success, msg, sent
+
+        media_url = photo or video
+        if media_url and media_url.startswith(("http://", "https://")):
+            # Primer envío secuencial hasta obtener un file_id reutilizable
+            while pending:
+                result = await send(*pending.pop(0))
+                yield result
+                file_id = _sent_media_file_id(result[3])
+                if file_id:
+                    media = {"photo": file_id} if photo else {"video": file_id}
+                    break
+
+        for task in asyncio.as_completed([send(name, cid) for name, cid in pending]):
+            yield await task
+
     async def forward_to_channel(
         self,
         channel_id: str,
@@ -787,15 +787,9 @@ class ConfigService:
         logger.info(f"⭐ max_reward_vip_days updated: {value}")
         return True, "value_updated"
 
-    # ===== RATE LIMITING CONFIGURATION =====
-
-    async def get_telegram_rate_limit_delay(self) -> float:
-        """Get delay between Telegram API calls for rate limiting.
-
-        Returns:
-            Delay in seconds (~30 requests per second)
-        """
-        return 0.033  # ~30 requests per second
+    # ===== BULK OPERATIONS CONFIGURATION =====
+    # El ritmo de llamadas a la Bot API lo controla TelegramRateLimiter
+    # (bot/utils/rate_limit.py), registrado en la sesión del bot.
 
     async def get_bulk_batch_size(self) -> int:
         """Get batch size for bulk operations.
@@ -804,11 +798,3 @@ class ConfigService:
             Maximum records to process per batch
         """
         return 100
-
-    async def get_bulk_rate_limit_delay(self) -> float:
-        """Get delay between bulk operation API calls.
-
-        Returns:
-            Delay in seconds (100ms between calls)
-        """
-        return 0.1  # 100ms between calls
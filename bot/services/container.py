@@ -62,7 +62,11 @@ class ServiceContainer:
         self._wallet_service = None
         self._reaction_service = None
         self._streak_service = None
+        self._broadcast_service = None
+        self._scheduled_post_service = None
+        self._content_search_service = None
         self._shop_service = None
+        self._content_delivery_service = None
         self._reward_service = None
         self._simulation_service = None
 
@@ -215,7 +219,8 @@ class ServiceContainer:
         """
         Servicio de historial de sesión para selección de variantes consciente del contexto.
 
-        Se carga lazy (solo en primer acceso).
+        Se carga lazy (solo en primer acceso). Es compartido por todo el
+        proceso (get_session_history), no por container.
 
         Returns:
             SessionMessageHistory: Instancia del servicio de historial
@@ -230,10 +235,10 @@ class ServiceContainer:
             # Provider internamente llama _choose_variant con session_history
         """
         if self._session_history is None:
-            from bot.services.message.session_history import SessionMessageHistory
+            from bot.services.message.session_history import get_session_history
             logger.debug("🔄 Lazy loading: SessionMessageHistory")
-            # TTL 5 minutos, máximo 5 entradas por usuario
-            self._session_history = SessionMessageHistory(ttl_seconds=300, max_entries=5)
+            # Instancia de proceso: el container vive un solo update
+            self._session_history = get_session_history()
 
         return self._session_history
 
@@ -496,6 +501,83 @@ class ServiceContainer:
 
         return self._streak_service
 
+    # ===== BROADCAST SERVICE =====
+
+    @property
+    def broadcast(self):
+        """
+        Service de broadcasts por DM a segmentos de usuarios.
+
+        Se carga lazy (solo en primer acceso).
+
+        Returns:
+            BroadcastService: Instancia del service
+
+        Usage:
+            success, status, broadcast = await container.broadcast.create_broadcast(
+                segment=BroadcastSegment.ACTIVE_VIP,
+                content_type="text",
+                text="Hola",
+                admin_id=admin_id
+            )
+        """
+        if self._broadcast_service is None:
+            from bot.services.broadcast import BroadcastService
+            logger.debug("🔄 Lazy loading: BroadcastService")
+            self._broadcast_service = BroadcastService(self._session)
+
+        return self._broadcast_service
+
+    # ===== SCHEDULED POST SERVICE =====
+
+    @property
+    def scheduled_post(self):
+        """
+        Service de publicaciones programadas a canales.
+
+        Se carga lazy (solo en primer acceso).
+
+        Returns:
+            ScheduledPostService: Instancia del service
+
+        Usage:
+            success, status, post = await container.scheduled_post.create_post(
+                target_channel="both",
+                content_type="text",
+                scheduled_at=run_at,
+                created_by=admin_id,
+                caption="Hola"
+            )
+        """
+        if self._scheduled_post_service is None:
+            from bot.services.scheduled_post import ScheduledPostService
+            logger.debug("🔄 Lazy loading: ScheduledPostService")
+            self._scheduled_post_service = ScheduledPostService(self._session)
+
+        return self._scheduled_post_service
+
+    # ===== CONTENT SEARCH SERVICE =====
+
+    @property
+    def content_search(self):
+        """
+        Service de búsqueda full-text de paquetes, content sets y productos.
+
+        Se carga lazy (solo en primer acceso).
+
+        Returns:
+            ContentSearchService: Instancia del service
+
+        Usage:
+            page = await container.content_search.search_products("fotos verano", page=1)
+        """
+        if self._content_search_service is None:
+            from bot.services.search import ContentSearchService
+            logger.debug("🔄 Lazy loading: ContentSearchService")
+            self._content_search_service = ContentSearchService(self._session)
+
+        return self._content_search_service
+
     # ===== SHOP SERVICE =====
 
     @property
@@ -531,6 +613,30 @@ class ServiceContainer:
 
         return self._shop_service
 
+    # ===== CONTENT DELIVERY SERVICE =====
+
+    @property
+    def content_delivery(self):
+        """
+        Service de la cola de entregas de contenido comprado.
+
+        Se carga lazy (solo en primer acceso).
+
+        Returns:
+            ContentDeliveryService: Instancia del service
+
+        Usage:
+            delivery = await container.content_delivery.enqueue(
+                access, content_type="photo_set", file_ids=file_ids
+            )
+        """
+        if self._content_delivery_service is None:
+            from bot.services.content_delivery import ContentDeliveryService
+            logger.debug("🔄 Lazy loading: ContentDeliveryService")
+            self._content_delivery_service = ContentDeliveryService(self._session)
+
+        return self._content_delivery_service
+
     # ===== REWARD SERVICE =====
 
     @property
@@ -648,8 +754,16 @@ class ServiceContainer:
             loaded.append("reaction")
         if self._streak_service is not None:
             loaded.append("streak")
+        if self._broadcast_service is not None:
+            loaded.append("broadcast")
+        if self._scheduled_post_service is not None:
+            loaded.append("scheduled_post")
+        if self._content_search_service is not None:
+            loaded.append("content_search")
         if self._shop_service is not None:
             loaded.append("shop")
+        if self._content_delivery_service is not None:
+            loaded.append("content_delivery")
         if self._reward_service is not None:
             loaded.append("reward")
         if self._simulation_service is not None:
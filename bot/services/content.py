@@ -16,11 +16,12 @@ from datetime import datetime
 from decimal import Decimal
 from typing import List, Optional, Tuple
 
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import Select, select, and_, or_, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.database.models import ContentPackage
 from bot.database.enums import ContentCategory, PackageType
+from bot.services.search import ContentSearchService
 
 logger = logging.getLogger(__name__)
 
@@ -141,30 +142,28 @@ class ContentService:
 
         return package
 
-    async def list_packages(
+    def build_packages_query(
         self,
         category: Optional[ContentCategory] = None,
         package_type: Optional[PackageType] = None,
-        is_active: Optional[bool] = None,
-        limit: int = 100,
-        offset: int = 0
-    ) -> List[ContentPackage]:
+        is_active: Optional[bool] = None
+    ) -> Select:
         """
-        Lista paquetes con filtros opcionales.
+        Construye la query de listado de paquetes (sin paginar).
 
         Args:
             category: Filtrar por categoría (opcional)
             package_type: Filtrar por tipo (opcional)
             is_active: Filtrar por estado (True=activos, False=inactivos, None=todos)
-            limit: Máximo de resultados (default: 100)
-            offset: Desplazamiento para paginación (default: 0)
 
         Returns:
-            Lista de ContentPackage (ordenada por created_at DESC)
+            Select ordenado por created_at DESC (id como desempate)
         """
-        query = select(ContentPackage).order_by(ContentPackage.created_at.desc())
+        query = select(ContentPackage).order_by(
+            ContentPackage.created_at.desc(),
+            ContentPackage.id.desc()
+        )
 
-        # Aplicar filtros
         if category is not None:
             query = query.where(ContentPackage.category == category)
 
@@ -174,6 +173,31 @@ class ContentService:
         if is_active is not None:
             query = query.where(ContentPackage.is_active == is_active)
 
+        return query
+
+    async def list_packages(
+        self,
+        category: Optional[ContentCategory] = None,
+        package_type: Optional[PackageType] = None,
+        is_active: Optional[bool] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[ContentPackage]:
+        """
+        Lista paquetes con filtros opcionales.
+
+        Args:
+            category: Filtrar por categoría (opcional)
+            package_type: Filtrar por tipo (opcional)
+            is_active: Filtrar por estado (True=activos, False=inactivos, None=todos)
+            limit: Máximo de resultados (default: 100)
+            offset: Desplazamiento para paginación (default: 0)
+
+        Returns:
+            Lista de ContentPackage (ordenada por created_at DESC)
+        """
+        query = self.build_packages_query(category, package_type, is_active)
+
         # Aplicar paginación
         query = query.limit(limit).offset(offset)
 
@@ -383,7 +407,7 @@ class ContentService:
         limit: int = 50
     ) -> List[ContentPackage]:
         """
-        Busca paquetes por nombre o descripción.
+        Busca paquetes por nombre o descripción (índice full-text).
 
         Args:
             search_term: Término de búsqueda
@@ -391,25 +415,9 @@ class ContentService:
             limit: Máximo de resultados (default: 50)
 
         Returns:
-            Lista de ContentPackage que coinciden con la búsqueda
+            Lista de ContentPackage ordenada por relevancia
         """
-        search_pattern = f"%{search_term}%"
-
-        query = select(ContentPackage).where(
-            or_(
-                ContentPackage.name.ilike(search_pattern),
-                ContentPackage.description.ilike(search_pattern)
-            )
-        ).order_by(ContentPackage.created_at.desc())
-
-        if is_active is not None:
-            query = query.where(ContentPackage.is_active == is_active)
-
-        query = query.limit(limit)
-
-        result = await self.session.execute(query)
-        packages = list(result.scalars().all())
-
-        logger.debug(f"📦 Búsqueda '{search_term}': {len(packages)} resultados")
-
-        return packages
+        page = await ContentSearchService(self.session).search_packages(
+            search_term, is_active=is_active, page_size=limit
+        )
+        return page.items
@@ -0,0 +1,376 @@
+"""
+Content Delivery Service - Cola persistente de entregas de contenido comprado.
+
+Responsabilidades:
+- Encolar una entrega por compra (copia de file_ids y tipo de contenido)
+- Partir los file_ids en álbumes de hasta MEDIA_GROUP_MAX_SIZE archivos
+- Registrar el progreso por álbum, los fallos y el backoff de reintentos
+- Exponer el estado de entrega al usuario (historial) y a los admins
+
+El envío en sí vive en bot/background/content_delivery.py.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.database.enums import ContentDeliveryStatus
+from bot.database.models import ContentDelivery, UserContentAccess
+
+logger = logging.getLogger(__name__)
+
+# Límite de Telegram para send_media_group
+MEDIA_GROUP_MAX_SIZE = 10
+
+# Intentos fallidos antes de marcar la entrega como fallida
+MAX_DELIVERY_ATTEMPTS = 6
+
+# Backoff exponencial entre reintentos: 30s, 1m, 2m, 4m... hasta 1h
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+
+# Entregas vencidas que procesa el runner por pasada
+DUE_BATCH_SIZE = 50
+
+# Lease de un runner sobre una entrega reclamada (se renueva por álbum).
+# Si el proceso muere, la entrega vuelve a vencer al expirar el lease
+CLAIM_LEASE_SECONDS = 300
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def chunk_file_ids(file_ids: Sequence[str], size: int = MEDIA_GROUP_MAX_SIZE) -> List[List[str]]:
+    """
+    Parte los file_ids en álbumes de hasta `size` archivos.
+
+    Args:
+        file_ids: file_ids de Telegram
+        size: Archivos por álbum (default: límite de send_media_group)
+
+    Returns:
+        List[List[str]]: Álbumes en orden
+    """
+    return [list(file_ids[i:i + size]) for i in range(0, len(file_ids), size)]
+
+
+def retry_delay(attempts: int, retry_after: Optional[int] = None) -> timedelta:
+    """
+    Calcula la espera antes del próximo intento.
+
+    Args:
+        attempts: Intentos fallidos acumulados (>= 1)
+        retry_after: retry_after de Telegram, si lo hubo (tiene precedencia si es mayor)
+
+    Returns:
+        timedelta: Espera hasta el próximo intento
+    """
+    seconds = min(RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), RETRY_MAX_SECONDS)
+    if retry_after:
+        seconds = max(seconds, retry_after)
+    return timedelta(seconds=seconds)
+
+
+class ContentDeliveryService:
+    """
+    Service para la cola de entregas de contenido comprado.
+
+    Flujo:
+    1. La compra crea el UserContentAccess y encola la entrega → enqueue()
+    2. El runner toma las vencidas (get_due_delivery_ids), reclama cada una
+       (claim_delivery) y envía por álbum
+    3. Cada álbum enviado se confirma → record_chunk_sent()
+    4. Al terminar → mark_delivered(); si falla → record_failure() (backoff)
+
+    Una entrega interrumpida se reanuda desde el álbum siguiente al último
+    confirmado (garantía at-least-once por álbum).
+    """
+
+    def __init__(self, session: AsyncSession):
+        """
+        Inicializa el service.
+
+        Args:
+            session: Sesión de base de datos
+        """
+        self.session = session
+        logger.debug("✅ ContentDeliveryService inicializado")
+
+    # ===== COLA =====
+
+    async def enqueue(
+        self,
+        access: UserContentAccess,
+        content_type: str,
+        file_ids: Sequence[str]
+    ) -> ContentDelivery:
+        """
+        Encola la entrega de un contenido comprado.
+
+        Args:
+            access: Registro de acceso de la compra (flusheado o no)
+            content_type: ContentType.value del set
+            file_ids: file_ids a enviar
+
+        Returns:
+            ContentDelivery: Entrega pendiente (ya con ID)
+        """
+        if access.id is None:
+            await self.session.flush()
+
+        file_ids = list(file_ids or [])
+        now = _utc_now()
+        delivery = ContentDelivery(
+            access_id=access.id,
+            user_id=access.user_id,
+            content_type=content_type,
+            file_ids=file_ids,
+            status=ContentDeliveryStatus.PENDING.value,
+            total_chunks=len(chunk_file_ids(file_ids)),
+            next_attempt_at=now,
+            created_at=now
+        )
+        self.session.add(delivery)
+        await self.session.flush()
+
+        logger.info(
+            f"📦 Entrega #{delivery.id} encolada para user {access.user_id} "
+            f"({len(file_ids)} archivos, {delivery.total_chunks} álbumes)"
+        )
+        return delivery
+
+    async def get_delivery(self, delivery_id: int) -> Optional[ContentDelivery]:
+        """
+        Obtiene una entrega por ID.
+
+        Args:
+            delivery_id: ID de la entrega
+
+        Returns:
+            ContentDelivery o None si no existe
+        """
+        result = await self.session.execute(
+            select(ContentDelivery).where(ContentDelivery.id == delivery_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_due_delivery_ids(self, limit: int = DUE_BATCH_SIZE) -> List[int]:
+        """
+        Obtiene las entregas pendientes cuyo próximo intento ya venció.
+
+        Args:
+            limit: Máximo de entregas a retornar
+
+        Returns:
+            List[int]: IDs en orden de vencimiento
+        """
+        result = await self.session.execute(
+            select(ContentDelivery.id)
+            .where(
+                ContentDelivery.status == ContentDeliveryStatus.PENDING.value,
+                ContentDelivery.next_attempt_at <= _utc_now()
+            )
+            .order_by(ContentDelivery.next_attempt_at, ContentDelivery.id)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def claim_delivery(self, delivery_id: int) -> bool:
+        """
+        Reclama una entrega vencida para enviarla (lease sobre next_attempt_at).
+
+        El UPDATE condicional garantiza que solo un runner la envíe aunque
+        el handler de compra y el job del scheduler (quizá en otra réplica)
+        la tomen a la vez. El lease se renueva con cada álbum confirmado.
+
+        Args:
+            delivery_id: ID de la entrega
+
+        Returns:
+            bool: True si este runner la reclamó
+        """
+        now = _utc_now()
+        result = await self.session.execute(
+            update(ContentDelivery)
+            .where(
+                ContentDelivery.id == delivery_id,
+                ContentDelivery.status == ContentDeliveryStatus.PENDING.value,
+                ContentDelivery.next_attempt_at <= now
+            )
+            .values(next_attempt_at=now + timedelta(seconds=CLAIM_LEASE_SECONDS))
+            .returning(ContentDelivery.id)
+            .execution_options(synchronize_session=False)
+        )
+        return result.scalar_one_or_none() is not None
+
+    # ===== PROGRESO =====
+
+    async def record_chunk_sent(self, delivery_id: int, chunks_sent: int) -> None:
+        """
+        Registra los álbumes entregados hasta ahora y renueva el lease.
+
+        Args:
+            delivery_id: ID de la entrega
+            chunks_sent: Álbumes entregados (acumulado)
+        """
+        await self.session.execute(
+            update(ContentDelivery)
+            .where(ContentDelivery.id == delivery_id)
+            .values(
+                chunks_sent=chunks_sent,
+                next_attempt_at=_utc_now() + timedelta(seconds=CLAIM_LEASE_SECONDS)
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def mark_delivered(self, delivery_id: int) -> None:
+        """
+        Marca la entrega como completada.
+
+        Args:
+            delivery_id: ID de la entrega
+        """
+        await self.session.execute(
+            update(ContentDelivery)
+            .where(ContentDelivery.id == delivery_id)
+            .values(
+                status=ContentDeliveryStatus.DELIVERED.value,
+                chunks_sent=ContentDelivery.total_chunks,
+                last_error=None,
+                delivered_at=_utc_now()
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def record_failure(
+        self,
+        delivery_id: int,
+        error_code: str,
+        permanent: bool = False,
+        retry_after: Optional[int] = None
+    ) -> ContentDeliveryStatus:
+        """
+        Registra un intento fallido y agenda el reintento con backoff.
+
+        Args:
+            delivery_id: ID de la entrega
+            error_code: Código del error (_classify_notification_error)
+            permanent: True si reintentar no tiene sentido (usuario inalcanzable)
+            retry_after: retry_after de Telegram, si lo hubo
+
+        Returns:
+            ContentDeliveryStatus: PENDING si se reintentará, FAILED si no
+        """
+        delivery = await self.get_delivery(delivery_id)
+        if delivery is None:
+            return ContentDeliveryStatus.FAILED
+
+        delivery.attempts += 1
+        delivery.last_error = (error_code or "unknown")[:30]
+
+        if permanent or delivery.attempts >= MAX_DELIVERY_ATTEMPTS:
+            delivery.status = ContentDeliveryStatus.FAILED.value
+            logger.warning(
+                f"⚠️ Entrega #{delivery_id} fallida tras {delivery.attempts} intento(s): {error_code}"
+            )
+        else:
+            delivery.next_attempt_at = _utc_now() + retry_delay(delivery.attempts, retry_after)
+            logger.info(
+                f"🔁 Entrega #{delivery_id}: reintento {delivery.attempts} "
+                f"agendado para {delivery.next_attempt_at:%H:%M:%S} UTC ({error_code})"
+            )
+
+        await self.session.flush()
+        return ContentDeliveryStatus(delivery.status)
+
+    async def requeue(self, delivery_id: int) -> Tuple[bool, str]:
+        """
+        Reencola una entrega fallida (acción de admin).
+
+        Reinicia los intentos y conserva los álbumes ya entregados.
+
+        Args:
+            delivery_id: ID de la entrega
+
+        Returns:
+            Tuple[bool, str]: (éxito, "requeued" | "not_found" | "not_failed")
+        """
+        delivery = await self.get_delivery(delivery_id)
+        if delivery is None:
+            return False, "not_found"
+        if delivery.status != ContentDeliveryStatus.FAILED.value:
+            return False, "not_failed"
+
+        delivery.status = ContentDeliveryStatus.PENDING.value
+        delivery.attempts = 0
+        delivery.next_attempt_at = _utc_now()
+        await self.session.flush()
+
+        logger.info(f"🔁 Entrega #{delivery_id} reencolada manualmente")
+        return True, "requeued"
+
+    # ===== CONSULTAS =====
+
+    async def get_status_by_access(
+        self,
+        access_ids: Iterable[int]
+    ) -> Dict[int, ContentDeliveryStatus]:
+        """
+        Obtiene el estado de la última entrega de cada acceso.
+
+        Args:
+            access_ids: IDs de UserContentAccess
+
+        Returns:
+            Dict[int, ContentDeliveryStatus]: access_id -> estado (sin clave si no hubo entrega)
+        """
+        access_ids = list(access_ids)
+        if not access_ids:
+            return {}
+
+        latest = (
+            select(func.max(ContentDelivery.id))
+            .where(ContentDelivery.access_id.in_(access_ids))
+            .group_by(ContentDelivery.access_id)
+        )
+        result = await self.session.execute(
+            select(ContentDelivery.access_id, ContentDelivery.status)
+            .where(ContentDelivery.id.in_(latest))
+        )
+        return {access_id: ContentDeliveryStatus(status) for access_id, status in result.all()}
+
+    async def get_queue_counts(self) -> Dict[str, int]:
+        """
+        Cuenta entregas por estado.
+
+        Returns:
+            Dict[str, int]: status -> cantidad (incluye todos los estados)
+        """
+        result = await self.session.execute(
+            select(ContentDelivery.status, func.count(ContentDelivery.id))
+            .group_by(ContentDelivery.status)
+        )
+        counts = {status.value: 0 for status in ContentDeliveryStatus}
+        counts.update({status: count for status, count in result.all()})
+        return counts
+
+    async def get_failed_deliveries(self, limit: int = 10) -> List[ContentDelivery]:
+        """
+        Obtiene las entregas fallidas más recientes.
+
+        Args:
+            limit: Máximo de entregas a retornar
+
+        Returns:
+            List[ContentDelivery]: Entregas fallidas, más recientes primero
+        """
+        result = await self.session.execute(
+            select(ContentDelivery)
+            .where(ContentDelivery.status == ContentDeliveryStatus.FAILED.value)
+            .order_by(ContentDelivery.id.desc())
+            .limit(limit)
+        )
+        return list(result.scalars().all())
@@ -8,7 +8,7 @@ evitar spam en notificaciones a administradores.
 import logging
 from datetime import datetime, timedelta
 from typing import List, Optional, Tuple, Dict, Any
-from sqlalchemy import select, and_, or_, desc
+from sqlalchemy import select, and_, or_, desc, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -371,29 +371,25 @@ class InterestService:
             >>> print(f"Pendientes: {stats['total_pending']}")
         """
         try:
-            # Total pending
-            pending_stmt = select(UserInterest).where(UserInterest.is_attended == False)
-            pending_result = await self.session.execute(pending_stmt)
-            total_pending = len(pending_result.scalars().all())
-
-            # Total attended
-            attended_stmt = select(UserInterest).where(UserInterest.is_attended == True)
-            attended_result = await self.session.execute(attended_stmt)
-            total_attended = len(attended_result.scalars().all())
-
-            # By package type
-            stmt = select(UserInterest).options(
-                selectinload(UserInterest.package)
-            ).join(ContentPackage)
-            result = await self.session.execute(stmt)
-            all_interests = result.scalars().all()
+            # Pending / attended in a single aggregate (no rows loaded)
+            totals_stmt = select(
+                func.count(UserInterest.id).filter(UserInterest.is_attended == False),
+                func.count(UserInterest.id).filter(UserInterest.is_attended == True)
+            )
+            total_pending, total_attended = (await self.session.execute(totals_stmt)).one()
 
-            by_package_type = {}
-            for interest in all_interests:
-                pkg_type = interest.package.category.value if interest.package else "unknown"
-                by_package_type[pkg_type] = by_package_type.get(pkg_type, 0) + 1
+            # By package type: GROUP BY on the joined package category
+            by_type_stmt = (
+                select(ContentPackage.category, func.count(UserInterest.id))
+                .join(UserInterest.package)
+                .group_by(ContentPackage.category)
+            )
+            by_package_type = {
+                category.value: count
+                for category, count in (await self.session.execute(by_type_stmt)).all()
+            }
 
-            # Recent interests (last 5)
+            # Recent interests (last 5) - served by idx_interest_created_at
             recent_stmt = select(UserInterest).options(
                 selectinload(UserInterest.package),
                 selectinload(UserInterest.user)
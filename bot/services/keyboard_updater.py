@@ -24,6 +24,7 @@ from aiogram.exceptions import TelegramBadRequest
 from sqlalchemy import select, func
 
 from bot.utils.keyboards import get_reaction_keyboard, DEFAULT_REACTIONS
+from bot.utils.rate_limit import bulk_lane
 from bot.database.engine import get_session
 from bot.database.models import UserReaction
 
@@ -209,12 +210,14 @@ class KeyboardUpdateService:
                 current_counts=counts
             )
 
-            # Aplicar en Telegram
-            await self.bot.edit_message_reply_markup(
-                chat_id=pending.channel_id,
-                message_id=pending.content_id,
-                reply_markup=keyboard
-            )
+            # Aplicar en Telegram (carril BULK: no compite con respuestas a usuarios;
+            # el flood control lo reintenta TelegramRateLimiter)
+            async with bulk_lane():
+                await self.bot.edit_message_reply_markup(
+                    chat_id=pending.channel_id,
+                    message_id=pending.content_id,
+                    reply_markup=keyboard
+                )
 
             elapsed = (datetime.now(timezone.utc) - pending.first_reaction_at).total_seconds()
             self._logger.info(
@@ -226,11 +229,6 @@ class KeyboardUpdateService:
         except TelegramBadRequest as e:
             if "message is not modified" in str(e).lower():
                 pass  # OK
-            elif "flood control" in str(e).lower():
-                self._logger.warning(f"⚠️ Flood control en {key}, reintentando en 5s...")
-                # Reprogramar para reintentar
-                asyncio.create_task(self._retry_update(key, delay=5))
-                return  # No limpiar pending, se reintentará
             else:
                 self._logger.debug(f"No se pudo actualizar teclado {key}: {e}")
         except Exception as e:
@@ -244,13 +242,6 @@ class KeyboardUpdateService:
                 if not timer.done():
                     timer.cancel()
 
-    async def _retry_update(self, key: str, delay: int):
-        """Reintenta la actualización después de un delay."""
-        await asyncio.sleep(delay)
-        async with self._lock:
-            if key in self._pending:
-                await self._apply_update(key)
-
     async def force_update(self, content_id: int, channel_id: str) -> bool:
         """
         Fuerza la actualización inmediata de un teclado específico.
@@ -10,6 +10,7 @@ from aiogram.types import InlineKeyboardMarkup
 
 from bot.database.enums import ContentCategory
 from bot.services.message.base import BaseMessageProvider
+from bot.utils.formatters import escape_html
 from bot.utils.keyboards import create_inline_keyboard
 
 
@@ -312,6 +313,54 @@ class AdminContentMessages(BaseMessageProvider):
         ])
         return text, keyboard
 
+    def search_prompt(self) -> Tuple[str, InlineKeyboardMarkup]:
+        """
+        Generate prompt for package search input.
+
+        Returns:
+            Tuple of (text, keyboard) for search input
+        """
+        header = "🎩 <b>Lucien:</b>\n\n<i>¿Qué tesoro desea localizar, curador?</i>"
+
+        body = (
+            f"<b>🔍 Buscar Paquetes</b>\n\n"
+            f"<i>Envíe una o varias palabras. Buscaré en nombres y descripciones, "
+            f"incluso si solo recuerda el comienzo de cada palabra.</i>"
+        )
+
+        text = self._compose(header, body)
+        keyboard = create_inline_keyboard([
+            [{"text": "❌ Cancelar", "callback_data": "admin:content"}],
+        ])
+        return text, keyboard
+
+    def search_results_header(self, query: str, total: int) -> str:
+        """
+        Generate header for package search results.
+
+        Args:
+            query: Search text sent by the admin
+            total: Total number of matches
+
+        Returns:
+            HTML text for the results view
+        """
+        header = "🎩 <b>Lucien:</b>\n\n<i>He recorrido los estantes del reino...</i>"
+
+        if total == 0:
+            body = (
+                f"<b>🔍 Sin resultados para</b> <code>{escape_html(query)}</code>\n\n"
+                f"<i>Ningún paquete responde a esa descripción. "
+                f"Quizás con otras palabras, curador.</i>"
+            )
+        else:
+            body = (
+                f"<b>🔍 Resultados para</b> <code>{escape_html(query)}</code>\n\n"
+                f"<i>{total} paquete(s) encontrados, los más relevantes primero.</i>"
+            )
+
+        return self._compose(header, body)
+
     def create_step_name(self) -> Tuple[str, InlineKeyboardMarkup]:
         """
         Generate prompt for package name input.
@@ -642,6 +691,7 @@ class AdminContentMessages(BaseMessageProvider):
         """
         return create_inline_keyboard([
             [{"text": "📋 Ver Paquetes", "callback_data": "admin:content:list"}],
+            [{"text": "🔍 Buscar Paquetes", "callback_data": "admin:content:search"}],
             [{"text": "➕ Crear Paquete", "callback_data": "admin:content:create:start"}],
             [{"text": "🔙 Volver al Menú Principal", "callback_data": "admin:main"}],
         ])
@@ -295,7 +295,10 @@ class AdminFreeMessages(BaseMessageProvider):
     def _free_configured_keyboard(self) -> InlineKeyboardMarkup:
         """Keyboard for configured Free menu."""
         return create_inline_keyboard([
-            [{"text": "📤 Enviar Publicación", "callback_data": "free:broadcast"}],
+            [
+                {"text": "📤 Enviar Publicación", "callback_data": "free:broadcast"},
+                {"text": "📡 Ambos Canales", "callback_data": "broadcast:both"}
+            ],
             [{"text": "📋 Cola de Solicitudes", "callback_data": "admin:free_queue"}],
             [{"text": "⚙️ Configuración", "callback_data": "free:config"}],
             [{"text": "🔙 Volver", "callback_data": "admin:main"}]
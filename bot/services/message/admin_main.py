@@ -234,6 +234,8 @@ class AdminMainMessages(BaseMessageProvider):
             [{"text": "📊 Dashboard Completo", "callback_data": "admin:dashboard"}],
             [{"text": "👑 Círculo Exclusivo VIP", "callback_data": "admin:vip"}],
             [{"text": "📺 Vestíbulo de Acceso", "callback_data": "admin:free"}],
+            [{"text": "📨 Mensaje Directo", "callback_data": "broadcast:dm"}],
+            [{"text": "🗓️ Publicaciones Programadas", "callback_data": "broadcast:scheduled"}],
             [{"text": "📦 Paquetes de Contenido", "callback_data": "admin:content"}],
             [{"text": "📁 ContentSets", "callback_data": "admin:content_sets"}],
             [{"text": "🛍️ Tienda", "callback_data": "admin:shop"}],
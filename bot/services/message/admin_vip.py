@@ -394,7 +394,10 @@ class AdminVIPMessages(BaseMessageProvider):
                 {"text": "👥 Ver Privilegiados", "callback_data": "vip:list_subscribers"},
                 {"text": "📊 Observaciones", "callback_data": "admin:stats:vip"}
             ],
-            [{"text": "📤 Enviar Publicación", "callback_data": "vip:broadcast"}],
+            [
+                {"text": "📤 Enviar Publicación", "callback_data": "vip:broadcast"},
+                {"text": "📡 Ambos Canales", "callback_data": "broadcast:both"}
+            ],
             [{"text": "⚙️ Calibración", "callback_data": "vip:config"}],
             [{"text": "🔙 Volver", "callback_data": "admin:main"}]
         ])
@@ -5,8 +5,10 @@ Tracks recent messages per user session to enable context-aware variation select
 Prevents message repetition fatigue by excluding recently-seen variants from
 the selection pool.
 
-Uses in-memory storage (dict + deque) with TTL auto-cleanup.
-Approximately 200 bytes per active user.
+Uses in-memory storage (OrderedDict + deque) with TTL auto-cleanup.
+Approximately 200 bytes per active user, with a hard cap on tracked users
+(least recently active evicted first). One instance per process, obtained
+with get_session_history(), so history survives across updates.
 
 Voice Rationale:
     By tracking which message variants each user has seen recently, Lucien can
@@ -15,18 +17,23 @@ Voice Rationale:
 
 Architecture:
     - SessionHistoryEntry: Lightweight dataclass with slots for memory efficiency
-    - SessionMessageHistory: In-memory service with lazy cleanup
+    - SessionMessageHistory: In-memory LRU service with lazy cleanup
+    - sweep_expired(): Periodic sweep (background task) dropping idle sessions
     - No database dependency: Session loss is acceptable for this convenience feature
 """
 import logging
+import sys
 import time
-from collections import deque
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
-from typing import Deque, Dict, List
+from typing import Deque, Dict, List, Optional
 
 
 logger = logging.getLogger(__name__)
 
+# Hard cap on tracked users (~2 MB at 200 bytes per user)
+DEFAULT_MAX_USERS = 10_000
+
 
 @dataclass(slots=True)
 class SessionHistoryEntry:
@@ -52,7 +59,10 @@ class SessionMessageHistory:
     user by excluding recently-seen variants from the selection pool.
 
     Memory Usage:
-        ~200 bytes per active user (deque(maxlen=5) + slots dataclass)
+        ~200 bytes per active user (deque(maxlen=5) + slots dataclass),
+        bounded by max_users. Sessions are kept in least-recently-active
+        order: when the cap is reached the oldest session is evicted, and
+        sweep_expired() drops idle sessions from the front in O(expired).
 
     Thread Safety:
         Not required - bot is single-threaded async event loop
@@ -67,16 +77,29 @@ class SessionMessageHistory:
         >>> available_indices = [i for i in range(3) if i not in recent]
     """
 
-    def __init__(self, ttl_seconds: int = 300, max_entries: int = 5) -> None:
+    def __init__(
+        self,
+        ttl_seconds: int = 300,
+        max_entries: int = 5,
+        max_users: int = DEFAULT_MAX_USERS
+    ) -> None:
         """Initialize session history service.
 
         Args:
             ttl_seconds: How long entries remain valid (default 5 minutes)
             max_entries: Maximum entries per user session (default 5)
+            max_users: Maximum tracked users before LRU eviction
         """
         self._ttl_seconds: int = ttl_seconds
         self._max_entries: int = max_entries
-        self._sessions: Dict[int, Deque[SessionHistoryEntry]] = {}
+        self._max_users: int = max_users
+        # Least recently active first
+        self._sessions: "OrderedDict[int, Deque[SessionHistoryEntry]]" = OrderedDict()
+
+        # Metrics
+        self._evicted_users: int = 0
+        self._expired_users: int = 0
+        self._sweeps: int = 0
 
     def add_entry(
         self,
@@ -99,7 +122,13 @@ class SessionMessageHistory:
             self._cleanup_user(user_id)
 
         # Get or create user's session deque with maxlen
-        if user_id not in self._sessions:
+        if user_id in self._sessions:
+            self._sessions.move_to_end(user_id)
+        else:
+            if len(self._sessions) >= self._max_users:
+                # LRU eviction: drop the least recently active session
+                self._sessions.popitem(last=False)
+                self._evicted_users += 1
             self._sessions[user_id] = deque(maxlen=self._max_entries)
 
         # Append new entry (deque handles maxlen automatically)
@@ -209,6 +238,51 @@ class SessionMessageHistory:
 
         return removed_count
 
+    def sweep_expired(self) -> int:
+        """Drop sessions whose most recent entry has expired.
+
+        Sessions are ordered by last activity, so the sweep walks from the
+        least recently active end and stops at the first live session:
+        cost is proportional to the sessions removed, not to the total.
+        Expired entries inside live sessions are ignored by
+        get_recent_variants() and age out of their bounded deque.
+
+        Returns:
+            Number of sessions removed
+        """
+        cutoff = time.time() - self._ttl_seconds
+        removed = 0
+
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session and session[-1].timestamp >= cutoff:
+                break
+            self._sessions.popitem(last=False)
+            removed += 1
+
+        self._expired_users += removed
+        self._sweeps += 1
+
+        if removed > 0:
+            logger.debug("Session sweep: removed %d idle sessions", removed)
+
+        return removed
+
+    def estimated_memory_bytes(self) -> int:
+        """Approximate memory held by the sessions (containers + entries).
+
+        Shallow sizes via sys.getsizeof: method names are interned
+        literals shared across entries and are not counted.
+
+        Returns:
+            Estimated bytes
+        """
+        total = sys.getsizeof(self._sessions)
+        for session in self._sessions.values():
+            total += sys.getsizeof(session)
+            total += sum(sys.getsizeof(entry) for entry in session)
+        return total
+
     def get_stats(self) -> Dict[str, int]:
         """Get statistics about session memory usage.
 
@@ -217,13 +291,18 @@ class SessionMessageHistory:
                 - total_users: Number of users with sessions
                 - total_entries: Total entries (including expired)
                 - active_entries: Entries within TTL window
+                - max_users: Cap on tracked users
+                - evicted_users: Sessions evicted by the cap (LRU)
+                - expired_users: Sessions removed by sweep_expired()
+                - sweeps: Number of sweeps run
+                - memory_bytes: Estimated memory (estimated_memory_bytes())
 
         Example:
             >>> history = SessionMessageHistory()
             >>> history.add_entry(12345, "greeting", 0)
             >>> stats = history.get_stats()
-            >>> stats
-            {'total_users': 1, 'total_entries': 1, 'active_entries': 1}
+            >>> stats["total_users"], stats["active_entries"]
+            (1, 1)
         """
         total_users = len(self._sessions)
         total_entries = sum(len(session) for session in self._sessions.values())
@@ -238,5 +317,37 @@ class SessionMessageHistory:
         return {
             "total_users": total_users,
             "total_entries": total_entries,
-            "active_entries": active_entries
+            "active_entries": active_entries,
+            "max_users": self._max_users,
+            "evicted_users": self._evicted_users,
+            "expired_users": self._expired_users,
+            "sweeps": self._sweeps,
+            "memory_bytes": self.estimated_memory_bytes()
         }
+
+
+# Process-wide instance (shared by every ServiceContainer)
+_session_history: Optional[SessionMessageHistory] = None
+
+
+def get_session_history() -> SessionMessageHistory:
+    """Get the process-wide session history.
+
+    A ServiceContainer lives for a single update, so the history must
+    outlive it for variant selection to see previous messages.
+
+    Returns:
+        SessionMessageHistory: Shared instance (TTL 5 minutes, 5 entries
+        per user, capped at Config.SESSION_HISTORY_MAX_USERS users)
+    """
+    global _session_history
+
+    if _session_history is None:
+        from config import Config
+        _session_history = SessionMessageHistory(
+            ttl_seconds=300,
+            max_entries=5,
+            max_users=Config.SESSION_HISTORY_MAX_USERS
+        )
+
+    return _session_history
@@ -16,10 +16,13 @@ import random
 from datetime import datetime
 from typing import Tuple, List, Optional, Dict, Any
 
-from aiogram.types import InlineKeyboardMarkup
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
 from bot.services.message.base import BaseMessageProvider
-from bot.utils.keyboards import create_inline_keyboard, create_menu_navigation, create_content_with_navigation
+from bot.utils.keyboards import (
+    create_inline_keyboard, create_menu_navigation, create_content_with_navigation,
+    get_cached_keyboard
+)
 from bot.utils.formatters import escape_html
 from bot.database.models import ContentPackage
 
@@ -561,6 +564,46 @@ class UserMenuMessages(BaseMessageProvider):
 
     # ===== PRIVATE KEYBOARD FACTORY METHODS =====
 
+    def _main_menu_with_gift_row(
+        self,
+        content_buttons: List[List[dict]],
+        streak_info: Optional[Dict[str, Any]] = None
+    ) -> InlineKeyboardMarkup:
+        """
+        Build a main menu keyboard with the daily gift row on top.
+
+        Only static rows are memoized (content plus the claim button). The
+        countdown changes every minute and per user, so it is added to a new
+        markup on each call instead of fragmenting the keyboard cache.
+
+        Args:
+            content_buttons: Static content rows of the menu
+            streak_info: Optional dict with streak data (can_claim, next_claim_time)
+
+        Returns:
+            InlineKeyboardMarkup (the memoized one when there is no countdown)
+        """
+        streak_info = streak_info or {}
+
+        if streak_info.get("can_claim", False):
+            content_buttons = [
+                [{"text": "🎁 Reclamar regalo diario", "callback_data": "streak:claim_daily"}],
+                *content_buttons
+            ]
+
+        keyboard = get_cached_keyboard(content_buttons)
+
+        next_claim_time = streak_info.get("next_claim_time")
+        if streak_info.get("can_claim", False) or not next_claim_time:
+            return keyboard
+
+        time_str = self._format_time_until_next_claim(next_claim_time)
+        countdown = InlineKeyboardButton(
+            text=f"⏳ Próximo regalo en {time_str}", callback_data="streak:status"
+        )
+        # The memoized markup is shared: build a new one rather than mutating it
+        return InlineKeyboardMarkup(inline_keyboard=[[countdown], *keyboard.inline_keyboard])
+
     def _vip_main_menu_keyboard(self, streak_info: Optional[Dict[str, Any]] = None) -> InlineKeyboardMarkup:
         """
         Generate keyboard for VIP main menu.
@@ -584,21 +627,8 @@ class UserMenuMessages(BaseMessageProvider):
             [{"text": "📊 Estado de la Membresía", "callback_data": "vip:status"}],
         ]
 
-        # Add streak/daily gift button if streak info provided
-        if streak_info:
-            can_claim = streak_info.get("can_claim", False)
-            next_claim_time = streak_info.get("next_claim_time")
-
-            if can_claim:
-                content_buttons.insert(0, [{"text": "🎁 Reclamar regalo diario", "callback_data": "streak:claim_daily"}])
-            elif next_claim_time:
-                time_str = self._format_time_until_next_claim(next_claim_time)
-                content_buttons.insert(0, [{"text": f"⏳ Próximo regalo en {time_str}", "callback_data": "streak:status"}])
-
-        return create_content_with_navigation(
-            content_buttons,
-            include_back=False  # Main menu has no navigation buttons (content only)
-        )
+        # Main menu has no navigation buttons (content only)
+        return self._main_menu_with_gift_row(content_buttons, streak_info)
 
     def _free_main_menu_keyboard(self, streak_info: Optional[Dict[str, Any]] = None) -> InlineKeyboardMarkup:
         """
@@ -625,18 +655,5 @@ class UserMenuMessages(BaseMessageProvider):
             [{"text": "🔗 Mis redes", "callback_data": "menu:free:social"}],
         ]
 
-        # Add streak/daily gift button if streak info provided
-        if streak_info:
-            can_claim = streak_info.get("can_claim", False)
-            next_claim_time = streak_info.get("next_claim_time")
-
-            if can_claim:
-                content_buttons.insert(0, [{"text": "🎁 Reclamar regalo diario", "callback_data": "streak:claim_daily"}])
-            elif next_claim_time:
-                time_str = self._format_time_until_next_claim(next_claim_time)
-                content_buttons.insert(0, [{"text": f"⏳ Próximo regalo en {time_str}", "callback_data": "streak:status"}])
-
-        return create_content_with_navigation(
-            content_buttons,
-            include_back=False  # Main menu has no navigation buttons (content only)
-        )
\ No newline at end of file
+        # Main menu has no navigation buttons (content only)
+        return self._main_menu_with_gift_row(content_buttons, streak_info)
\ No newline at end of file
@@ -276,9 +276,10 @@ class UserStartMessages(BaseMessageProvider):
         - "used": Token already redeemed
         - "expired": Token expired
         - "no_plan": Token has no plan associated
+        - "rate_limited": Too many failed attempts (TokenGuard)
 
         Args:
-            error_type: Type of error (invalid, used, expired, no_plan)
+            error_type: Type of error (invalid, used, expired, no_plan, rate_limited)
             details: Optional additional details to append
 
         Returns:
@@ -325,6 +326,12 @@ class UserStartMessages(BaseMessageProvider):
                 "La invitación no tiene un plan asociado.\n\n"
                 "Esto puede ocurrir con invitaciones antiguas.\n\n"
                 "Consulte con el administrador para obtener una invitación actualizada."
+            ),
+            "rate_limited": (
+                "🎩 Lucien:\n\n"
+                "Demasiados intentos con invitaciones inválidas.\n\n"
+                "Diana prefiere la paciencia a la insistencia.\n\n"
+                "Espere unos minutos antes de intentarlo de nuevo."
             )
         }
 
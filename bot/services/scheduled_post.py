@@ -0,0 +1,262 @@
+"""
+Scheduled Post Service - Publicaciones programadas a canales.
+
+Responsabilidades:
+- Registro de publicaciones capturadas por el flujo de broadcasting
+- Reclamo atómico de un post al vencer (evita publicarlo dos veces)
+- Registro del resultado y cancelación
+
+La ejecución a la hora indicada la hace el scheduler de
+bot/background/tasks.py (ver schedule_post / restore_scheduled_posts); el
+líder además barre los posts vencidos (publish_due_posts).
+"""
+import logging
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.database.models import ScheduledPost
+
+logger = logging.getLogger(__name__)
+
+# Destinos válidos de una publicación programada
+SCHEDULED_POST_TARGETS = ("vip", "free", "both")
+
+# Tipos de contenido soportados
+SCHEDULED_POST_CONTENT_TYPES = ("text", "photo", "video")
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class ScheduledPostService:
+    """
+    Service para publicaciones programadas.
+
+    Flujo:
+    1. Admin programa el post → create_post()
+    2. El scheduler agenda un job para scheduled_at
+    3. Al vencer, el job reclama el post → claim_post()
+    4. Publica y registra el resultado → mark_result()
+    """
+
+    def __init__(self, session: AsyncSession):
+        """
+        Inicializa el service.
+
+        Args:
+            session: Sesión de base de datos
+        """
+        self.session = session
+        logger.debug("✅ ScheduledPostService inicializado")
+
+    async def create_post(
+        self,
+        target_channel: str,
+        content_type: str,
+        scheduled_at: datetime,
+        created_by: int,
+        caption: Optional[str] = None,
+        file_id: Optional[str] = None,
+        add_reactions: bool = True,
+        protect_content: bool = False
+    ) -> Tuple[bool, str, Optional[ScheduledPost]]:
+        """
+        Registra una publicación programada.
+
+        Args:
+            target_channel: "vip", "free" o "both"
+            content_type: "text", "photo" o "video"
+            scheduled_at: Momento de publicación (UTC naive)
+            created_by: Admin que la programa
+            caption: Texto o caption
+            file_id: file_id de la foto/video
+            add_reactions: Si se agregan botones de reacción
+            protect_content: Si el contenido se publica protegido
+
+        Returns:
+            Tuple[bool, str, Optional[ScheduledPost]]:
+                - bool: True si se creó
+                - str: "created", "invalid_target", "invalid_content_type",
+                  "missing_content" o "in_past"
+                - Optional[ScheduledPost]: Post creado
+        """
+        if target_channel not in SCHEDULED_POST_TARGETS:
+            return False, "invalid_target", None
+
+        if content_type not in SCHEDULED_POST_CONTENT_TYPES:
+            return False, "invalid_content_type", None
+
+        if (content_type == "text" and not caption) or (content_type != "text" and not file_id):
+            return False, "missing_content", None
+
+        if scheduled_at <= _utc_now():
+            return False, "in_past", None
+
+        post = ScheduledPost(
+            target_channel=target_channel,
+            content_type=content_type,
+            file_id=file_id,
+            caption=caption,
+            add_reactions=add_reactions,
+            protect_content=protect_content,
+            scheduled_at=scheduled_at,
+            status="pending",
+            created_by=created_by
+        )
+        self.session.add(post)
+        await self.session.flush()
+
+        logger.info(
+            f"🕒 Post #{post.id} programado por admin {created_by} "
+            f"para {scheduled_at:%Y-%m-%d %H:%M} UTC ({target_channel})"
+        )
+        return True, "created", post
+
+    async def get_post(self, post_id: int) -> Optional[ScheduledPost]:
+        """
+        Obtiene un post programado por ID.
+
+        Args:
+            post_id: ID del post
+
+        Returns:
+            ScheduledPost o None si no existe
+        """
+        result = await self.session.execute(
+            select(ScheduledPost).where(ScheduledPost.id == post_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_pending_posts(self, limit: Optional[int] = None) -> List[ScheduledPost]:
+        """
+        Obtiene los posts pendientes en orden de publicación.
+
+        Args:
+            limit: Máximo de posts a retornar (None = todos)
+
+        Returns:
+            List[ScheduledPost]: Posts con status "pending"
+        """
+        query = (
+            select(ScheduledPost)
+            .where(ScheduledPost.status == "pending")
+            .order_by(ScheduledPost.scheduled_at, ScheduledPost.id)
+        )
+        if limit is not None:
+            query = query.limit(limit)
+
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    async def get_due_post_ids(self, limit: Optional[int] = None) -> List[int]:
+        """
+        Obtiene los IDs de los posts pendientes cuya hora ya pasó.
+
+        Args:
+            limit: Máximo de IDs a retornar (None = todos)
+
+        Returns:
+            List[int]: IDs en orden de publicación
+        """
+        query = (
+            select(ScheduledPost.id)
+            .where(ScheduledPost.status == "pending", ScheduledPost.scheduled_at <= _utc_now())
+            .order_by(ScheduledPost.scheduled_at, ScheduledPost.id)
+        )
+        if limit is not None:
+            query = query.limit(limit)
+
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    async def claim_post(self, post_id: int) -> Optional[ScheduledPost]:
+        """
+        Reclama un post pendiente para publicarlo (pending → sending).
+
+        El UPDATE condicional garantiza que solo un job lo publique aunque
+        el post se haya agendado dos veces.
+
+        Args:
+            post_id: ID del post
+
+        Returns:
+            ScheduledPost reclamado, o None si ya no estaba pendiente
+        """
+        result = await self.session.execute(
+            update(ScheduledPost)
+            .where(ScheduledPost.id == post_id, ScheduledPost.status == "pending")
+            .values(status="sending")
+            .returning(ScheduledPost.id)
+            .execution_options(synchronize_session=False)
+        )
+        if result.scalar_one_or_none() is None:
+            return None
+
+        post = await self.get_post(post_id)
+        await self.session.refresh(post)
+        return post
+
+    async def mark_result(self, post_id: int, success: bool, error: Optional[str] = None) -> None:
+        """
+        Registra el resultado de la publicación.
+
+        Args:
+            post_id: ID del post
+            success: True si se publicó en todos los canales
+            error: Detalle de los canales fallidos
+        """
+        await self.session.execute(
+            update(ScheduledPost)
+            .where(ScheduledPost.id == post_id)
+            .values(
+                status="sent" if success else "failed",
+                sent_at=_utc_now(),
+                error=error[:255] if error else None
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def cancel_post(self, post_id: int) -> bool:
+        """
+        Cancela un post que aún no se publicó.
+
+        Args:
+            post_id: ID del post
+
+        Returns:
+            bool: True si estaba pendiente y se canceló
+        """
+        result = await self.session.execute(
+            update(ScheduledPost)
+            .where(ScheduledPost.id == post_id, ScheduledPost.status == "pending")
+            .values(status="cancelled")
+            .execution_options(synchronize_session=False)
+        )
+        cancelled = result.rowcount > 0
+        if cancelled:
+            logger.info(f"🕒 Post programado #{post_id} cancelado")
+        return cancelled
+
+    async def fail_interrupted_posts(self) -> int:
+        """
+        Marca como fallidos los posts que quedaron en "sending" por un reinicio.
+
+        No se reintentan: el envío pudo haber llegado al canal y una
+        publicación duplicada es peor que una que el admin reprograma.
+
+        Returns:
+            int: Posts marcados
+        """
+        result = await self.session.execute(
+            update(ScheduledPost)
+            .where(ScheduledPost.status == "sending")
+            .values(status="failed", error="interrupted")
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            logger.warning(f"⚠️ {result.rowcount} post(s) programados interrumpidos por reinicio")
+        return result.rowcount
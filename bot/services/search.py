@@ -0,0 +1,222 @@
+"""
+Content Search Service - Búsqueda full-text de paquetes, content sets y productos.
+
+Responsabilidades:
+- Búsqueda rankeada y paginada sobre name + description
+- SQLite: índice FTS5 compartido (bm25); PostgreSQL: tsvector + GIN (ts_rank)
+- Fallback a ILIKE si el índice no existe en la base de datos
+
+El índice se mantiene de forma incremental (triggers en SQLite, índice de
+expresión en PostgreSQL): ver bot/database/search_index.py.
+"""
+import logging
+import re
+import weakref
+from typing import List, Optional, Type
+
+from sqlalchemy import Integer, Select, func, literal_column, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import column, table
+
+from bot.database.enums import ContentTier
+from bot.database.models import ContentPackage, ContentSet, ShopProduct
+from bot.database.search_index import (
+    CONTENT_SEARCH_FTS_TABLE,
+    CONTENT_SEARCH_KINDS,
+    CONTENT_SEARCH_KIND_SLOTS,
+    CONTENT_SEARCH_TS_CONFIG,
+    content_search_document_sql,
+    has_content_search_index,
+)
+from bot.utils.pagination import Page, QueryPaginator
+
+logger = logging.getLogger(__name__)
+
+# Engine → índice de contenido disponible (se verifica una vez por engine)
+_content_index_available: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+_fts = table(CONTENT_SEARCH_FTS_TABLE, column("rowid", Integer))
+_fts_ref = literal_column(CONTENT_SEARCH_FTS_TABLE)
+
+
+def _search_terms(query: str) -> List[str]:
+    """Tokeniza la query (palabras alfanuméricas, sin operadores)."""
+    return re.findall(r"\w+", query.lower())
+
+
+class ContentSearchService:
+    """
+    Service de búsqueda full-text de contenido.
+
+    Ranking:
+    - SQLite: bm25 con más peso en name que en description
+    - PostgreSQL: ts_rank sobre el tsvector indexado
+
+    Cada término se busca como prefijo y todos deben aparecer
+    ("foto verano" encuentra "Fotos de verano 2026").
+    """
+
+    def __init__(self, session: AsyncSession):
+        """
+        Inicializa el service.
+
+        Args:
+            session: Sesión de base de datos
+        """
+        self.session = session
+        logger.debug("✅ ContentSearchService inicializado")
+
+    async def _has_index(self) -> bool:
+        """Verifica (una vez por engine) si existe el índice de contenido."""
+        engine = self.session.bind.sync_engine
+        available = _content_index_available.get(engine)
+        if available is None:
+            available = await self.session.run_sync(
+                lambda sync_session: has_content_search_index(sync_session.connection())
+            )
+            _content_index_available[engine] = available
+        return available
+
+    async def _build_query(self, model: Type, kind: str, terms: List[str]) -> Select:
+        """
+        Construye el Select rankeado para un tipo de documento.
+
+        Args:
+            model: Modelo origen (ContentPackage, ContentSet, ShopProduct)
+            kind: Clave en CONTENT_SEARCH_KINDS
+            terms: Términos de búsqueda (no vacío)
+
+        Returns:
+            Select de `model` ordenado por relevancia
+        """
+        table_name, code = CONTENT_SEARCH_KINDS[kind]
+        dialect = self.session.bind.dialect.name
+
+        if dialect == "sqlite" and await self._has_index():
+            match = " ".join(f'"{term}"*' for term in terms)
+            return (
+                select(model)
+                .select_from(_fts)
+                # El FTS conduce la query; el modelo se busca por PK
+                .join(model, model.id == (_fts.c.rowid - code) // CONTENT_SEARCH_KIND_SLOTS)
+                .where(
+                    _fts_ref.op("MATCH")(match),
+                    _fts.c.rowid % CONTENT_SEARCH_KIND_SLOTS == code
+                )
+                .order_by(func.bm25(_fts_ref, 2.0, 1.0), model.id)
+            )
+
+        if dialect == "postgresql" and await self._has_index():
+            document = literal_column(content_search_document_sql(table_name))
+            ts_query = func.to_tsquery(
+                CONTENT_SEARCH_TS_CONFIG, " & ".join(f"{term}:*" for term in terms)
+            )
+            return (
+                select(model)
+                .where(document.op("@@")(ts_query))
+                .order_by(func.ts_rank(document, ts_query).desc(), model.id)
+            )
+
+        # Sin índice: ILIKE (cada término en name o description)
+        query = select(model)
+        for term in terms:
+            pattern = f"%{term}%"
+            query = query.where(or_(model.name.ilike(pattern), model.description.ilike(pattern)))
+        return query.order_by(model.id.desc())
+
+    async def _search(
+        self,
+        model: Type,
+        kind: str,
+        query: str,
+        page: int,
+        page_size: int,
+        *filters
+    ) -> Page:
+        """Ejecuta la búsqueda paginada (página vacía si no hay términos)."""
+        terms = _search_terms(query)
+        if not terms:
+            return Page(
+                items=[], current_page=1, total_pages=1, total_items=0,
+                has_previous=False, has_next=False, page_size=page_size
+            )
+
+        stmt = await self._build_query(model, kind, terms)
+        if filters:
+            stmt = stmt.where(*filters)
+
+        result = await QueryPaginator(self.session, stmt, page_size=page_size).get_page(page)
+        logger.debug(f"🔍 Búsqueda {kind} '{query}': {result.total_items} resultados")
+        return result
+
+    async def search_packages(
+        self,
+        query: str,
+        is_active: Optional[bool] = None,
+        page: int = 1,
+        page_size: int = 10
+    ) -> Page:
+        """
+        Busca paquetes de contenido.
+
+        Args:
+            query: Texto a buscar
+            is_active: Filtrar por estado (None = todos)
+            page: Página (1-indexed)
+            page_size: Resultados por página
+
+        Returns:
+            Page[ContentPackage] ordenada por relevancia
+        """
+        filters = [] if is_active is None else [ContentPackage.is_active == is_active]
+        return await self._search(ContentPackage, "package", query, page, page_size, *filters)
+
+    async def search_content_sets(
+        self,
+        query: str,
+        is_active: Optional[bool] = None,
+        page: int = 1,
+        page_size: int = 5
+    ) -> Page:
+        """
+        Busca content sets.
+
+        Args:
+            query: Texto a buscar
+            is_active: Filtrar por estado (None = todos)
+            page: Página (1-indexed)
+            page_size: Resultados por página
+
+        Returns:
+            Page[ContentSet] ordenada por relevancia
+        """
+        filters = [] if is_active is None else [ContentSet.is_active == is_active]
+        return await self._search(ContentSet, "content_set", query, page, page_size, *filters)
+
+    async def search_products(
+        self,
+        query: str,
+        page: int = 1,
+        page_size: int = 5,
+        tier: Optional[ContentTier] = None,
+        active_only: bool = True
+    ) -> Page:
+        """
+        Busca productos de la tienda.
+
+        Args:
+            query: Texto a buscar
+            page: Página (1-indexed)
+            page_size: Resultados por página
+            tier: Filtrar por tier (opcional)
+            active_only: Solo productos activos (default: True, vista de usuario)
+
+        Returns:
+            Page[ShopProduct] ordenada por relevancia
+        """
+        filters = []
+        if active_only:
+            filters.append(ShopProduct.is_active == True)
+        if tier is not None:
+            filters.append(ShopProduct.tier == tier)
+        return await self._search(ShopProduct, "shop_product", query, page, page_size, *filters)
@@ -2,7 +2,7 @@
 Shop Service - Gestión de tienda y compras de contenido.
 
 Responsabilidades:
-- Catálogo de productos con paginación y filtros
+- Catálogo de productos con paginación y filtros (cacheado en memoria)
 - Validación de compras (balance, tier, ownership)
 - Transacciones atómicas de compra (deducir besitos + crear acceso)
 - Entrega de contenido (file_ids para Telegram)
@@ -11,19 +11,23 @@ Responsabilidades:
 Patrones:
 - Integración con WalletService para gasto atómico
 - Verificación de ownership para prevenir compras duplicadas
+  (set de content_set_id poseídos por usuario, cacheado)
+- ShopCatalogCache (bot/services/shop_catalog.py): navegar el catálogo
+  cuesta 0-1 queries por tap
 - Soporte para repurchase con confirmación
 - Precios diferenciados FREE vs VIP
 """
 import logging
 from datetime import datetime, timezone
-from typing import List, Optional, Tuple, Dict, Any
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 
 from sqlalchemy import select, func, update
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.database.models import ContentSet, ShopProduct, UserContentAccess
 from bot.database.enums import ContentTier, TransactionType
+from bot.services.shop_catalog import CatalogProduct, get_shop_catalog_cache
 from bot.services.simulation import SimulationStore
 
 logger = logging.getLogger(__name__)
@@ -67,10 +71,14 @@ class ShopService:
         page: int = 1,
         per_page: int = 5,
         tier: Optional[ContentTier] = None
-    ) -> Tuple[List[ShopProduct], int]:
+    ) -> Tuple[List[CatalogProduct], int]:
         """
         Browse shop catalog with pagination, ordered by price ascending.
 
+        Served from the in-memory catalog (ShopCatalogCache): pages are
+        slices of the cached, per-tier sorted product list. Only a cold or
+        invalidated cache costs a query.
+
         Args:
             user_role: "FREE" or "VIP" for price display context
             page: Page number (1-indexed)
@@ -78,41 +86,23 @@ class ShopService:
             tier: Optional filter by content tier
 
         Returns:
-            Tuple of (products list, total count)
+            Tuple of (products list, total count). Products are immutable
+            CatalogProduct snapshots (same listing attributes as ShopProduct,
+            including vip_price); use get_product_details for the ORM object.
         """
-        # Build base query for active products
-        base_query = select(ShopProduct).where(ShopProduct.is_active == True)
-
-        # Apply tier filter if provided
-        if tier is not None:
-            base_query = base_query.where(ShopProduct.tier == tier)
-
-        # Get total count
-        count_query = select(func.count(ShopProduct.id)).where(ShopProduct.is_active == True)
-        if tier is not None:
-            count_query = count_query.where(ShopProduct.tier == tier)
-
-        count_result = await self.session.execute(count_query)
-        total = count_result.scalar_one_or_none() or 0
+        catalog = await get_shop_catalog_cache().get_catalog(self.session)
+        products = catalog.for_tier(tier)
+        total = len(products)
 
-        # Apply ordering (by price ascending) and pagination
         offset = (page - 1) * per_page
-        query = (
-            base_query
-            .order_by(ShopProduct.besitos_price.asc())
-            .offset(offset)
-            .limit(per_page)
-        )
-
-        result = await self.session.execute(query)
-        products = list(result.scalars().all())
+        page_products = list(products[offset:offset + per_page])
 
         self.logger.debug(
             f"Catalog browse: role={user_role}, page={page}, "
-            f"tier={tier.value if tier else 'all'}, found={len(products)}/{total}"
+            f"tier={tier.value if tier else 'all'}, found={len(page_products)}/{total}"
         )
 
-        return products, total
+        return page_products, total
 
     async def get_product_details(
         self,
@@ -189,9 +179,10 @@ class ShopService:
                         "insufficient_funds", "vip_only", "already_owned"
             details_dict: includes product, price_to_pay, user_balance, is_owned
         """
-        # Get product
+        # Get product + content set in a single query
         result = await self.session.execute(
             select(ShopProduct)
+            .options(joinedload(ShopProduct.content_set))
             .where(ShopProduct.id == product_id)
         )
         product = result.scalar_one_or_none()
@@ -203,15 +194,10 @@ class ShopService:
             return False, "product_inactive", None
 
         # Verificar que el ContentSet asociado esté activo
-        if product.content_set_id:
-            cs_result = await self.session.execute(
-                select(ContentSet.id).where(
-                    ContentSet.id == product.content_set_id,
-                    ContentSet.is_active == True
-                )
-            )
-            if cs_result.scalar_one_or_none() is None:
-                return False, "product_inactive", None
+        if product.content_set_id and (
+            product.content_set is None or not product.content_set.is_active
+        ):
+            return False, "product_inactive", None
 
         # Check tier restrictions
         if product.tier == ContentTier.VIP and user_role == "FREE":
@@ -359,6 +345,21 @@ class ShopService:
             "is_repurchase": is_owned
         }
 
+    async def get_owned_content_set_ids(self, user_id: int) -> FrozenSet[int]:
+        """
+        Get the content sets the user has active access to.
+
+        Loaded once per user from user_content_access and cached
+        (invalidated when the user's access records change).
+
+        Args:
+            user_id: ID of the user
+
+        Returns:
+            frozenset of content_set_id
+        """
+        return await get_shop_catalog_cache().get_owned_content_set_ids(self.session, user_id)
+
     async def check_ownership(
         self,
         user_id: int,
@@ -374,15 +375,7 @@ class ShopService:
         Returns:
             True if user has active access to the content
         """
-        result = await self.session.execute(
-            select(UserContentAccess)
-            .where(UserContentAccess.user_id == user_id)
-            .where(UserContentAccess.content_set_id == content_set_id)
-            .where(UserContentAccess.is_active == True)
-        )
-        access = result.scalar_one_or_none()
-
-        return access is not None
+        return content_set_id in await self.get_owned_content_set_ids(user_id)
 
     async def deliver_content(
         self,
@@ -530,23 +523,19 @@ class ShopService:
             - unique_content_owned: int
             - last_purchase_at: Optional[datetime]
         """
-        # Get all shop purchases for user
+        # Aggregate in SQL (idx_user_content_access_type covers the filter)
         result = await self.session.execute(
-            select(UserContentAccess)
+            select(
+                func.count(UserContentAccess.id),
+                func.coalesce(func.sum(UserContentAccess.besitos_paid), 0),
+                func.count(func.distinct(UserContentAccess.content_set_id)),
+                func.max(UserContentAccess.accessed_at)
+            )
             .where(UserContentAccess.user_id == user_id)
             .where(UserContentAccess.access_type == "shop_purchase")
             .where(UserContentAccess.is_active == True)
         )
-        purchases = list(result.scalars().all())
-
-        total_purchases = len(purchases)
-        total_besitos_spent = sum(p.besitos_paid or 0 for p in purchases)
-        unique_content_owned = len(set(p.content_set_id for p in purchases))
-
-        # Get last purchase date
-        last_purchase_at = None
-        if purchases:
-            last_purchase_at = max(p.accessed_at for p in purchases)
+        total_purchases, total_besitos_spent, unique_content_owned, last_purchase_at = result.one()
 
         return {
             "total_purchases": total_purchases,
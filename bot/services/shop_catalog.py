@@ -0,0 +1,335 @@
+"""
+Shop Catalog Cache - Catálogo en memoria y contenido poseído por usuario.
+
+Navegar la tienda repetía en cada tap un COUNT + SELECT paginado del
+catálogo y una query de ownership por producto. Este módulo mantiene:
+
+- Catálogo: snapshot inmutable de los productos activos, ordenado por
+  precio y agrupado por tier. Las páginas son slices, sin queries.
+- Ownership: set de content_set_id poseídos por usuario (LRU), cargado con
+  una sola query desde user_content_access.
+
+Invalidación:
+- Automática: los flush de ShopProduct/ContentSet descartan el catálogo, y
+  los de UserContentAccess el set del usuario afectado (también al
+  commit/rollback, para no retener estado no confirmado)
+- Explícita: invalidate_catalog() tras writes que no pasan por el ORM
+  (UPDATE masivos) y desde shop_management
+- TTL como red de seguridad (otros procesos escribiendo la misma BD)
+
+Los caches se separan por engine (una BD = un catálogo).
+"""
+import logging
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, noload
+
+from bot.database.enums import ContentTier
+from bot.database.models import ContentSet, ShopProduct, UserContentAccess
+
+logger = logging.getLogger(__name__)
+
+# Segundos de vida del catálogo y de los sets de ownership
+CATALOG_TTL = 300.0
+OWNERSHIP_TTL = 600.0
+
+# Usuarios con set de ownership en memoria (LRU)
+MAX_OWNERSHIP_ENTRIES = 10_000
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogProduct:
+    """
+    Snapshot inmutable de un producto activo (independiente de la sesión).
+
+    Expone los mismos atributos que ShopProduct usados para listar el
+    catálogo, incluido vip_price ya calculado.
+    """
+    id: int
+    name: str
+    description: Optional[str]
+    content_set_id: int
+    besitos_price: int
+    vip_discount_percentage: int
+    vip_price: int
+    tier: ContentTier
+    sort_order: int
+    is_active: bool = True
+
+    @property
+    def has_vip_discount(self) -> bool:
+        """True si tiene descuento VIP."""
+        return self.vip_discount_percentage > 0
+
+    @classmethod
+    def from_model(cls, product: ShopProduct) -> "CatalogProduct":
+        return cls(
+            id=product.id,
+            name=product.name,
+            description=product.description,
+            content_set_id=product.content_set_id,
+            besitos_price=product.besitos_price,
+            vip_discount_percentage=product.vip_discount_percentage,
+            vip_price=product.vip_price,
+            tier=product.tier,
+            sort_order=product.sort_order,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogSnapshot:
+    """Catálogo activo ordenado por precio: completo y por tier."""
+    products: Tuple[CatalogProduct, ...]
+    by_tier: Dict[ContentTier, Tuple[CatalogProduct, ...]]
+    by_id: Dict[int, CatalogProduct]
+    loaded_at: float
+
+    def for_tier(self, tier: Optional[ContentTier]) -> Tuple[CatalogProduct, ...]:
+        if tier is None:
+            return self.products
+        return self.by_tier.get(tier, ())
+
+
+class _EngineCache:
+    """Caches de una base de datos (engine)."""
+
+    def __init__(self):
+        self.catalog: Optional[CatalogSnapshot] = None
+        self.owned: "OrderedDict[int, Tuple[float, FrozenSet[int]]]" = OrderedDict()
+
+
+class ShopCatalogCache:
+    """
+    Cache de proceso del catálogo de la tienda y del contenido poseído.
+
+    Thread Safety:
+        No requerido - event loop async único. Los loaders no bloquean
+        lectores: si dos taps cargan a la vez, gana el último (mismo dato).
+    """
+
+    def __init__(
+        self,
+        catalog_ttl: float = CATALOG_TTL,
+        ownership_ttl: float = OWNERSHIP_TTL,
+        max_ownership_entries: int = MAX_OWNERSHIP_ENTRIES
+    ):
+        """
+        Inicializa la cache.
+
+        Args:
+            catalog_ttl: Segundos de vida del catálogo
+            ownership_ttl: Segundos de vida de un set de ownership
+            max_ownership_entries: Usuarios en memoria antes de evictar (LRU)
+        """
+        self.catalog_ttl = catalog_ttl
+        self.ownership_ttl = ownership_ttl
+        self.max_ownership_entries = max_ownership_entries
+        self._engines: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self._stats = {
+            "catalog_hits": 0, "catalog_loads": 0,
+            "ownership_hits": 0, "ownership_loads": 0,
+        }
+
+    def _for(self, engine) -> _EngineCache:
+        cache = self._engines.get(engine)
+        if cache is None:
+            cache = self._engines[engine] = _EngineCache()
+        return cache
+
+    @staticmethod
+    def _engine_of(session: AsyncSession):
+        return session.bind.sync_engine
+
+    # ===== CATALOG =====
+
+    async def get_catalog(self, session: AsyncSession) -> CatalogSnapshot:
+        """
+        Obtiene el catálogo activo (una query si no está en cache).
+
+        Args:
+            session: Sesión de BD (solo se usa para cargar)
+
+        Returns:
+            CatalogSnapshot
+        """
+        cache = self._for(self._engine_of(session))
+        snapshot = cache.catalog
+        if snapshot is not None and time.monotonic() - snapshot.loaded_at < self.catalog_ttl:
+            self._stats["catalog_hits"] += 1
+            return snapshot
+
+        result = await session.execute(
+            select(ShopProduct)
+            .options(noload(ShopProduct.content_set))  # El snapshot no lo usa
+            .where(ShopProduct.is_active == True)
+            .order_by(ShopProduct.besitos_price.asc(), ShopProduct.id.asc())
+        )
+        products = tuple(CatalogProduct.from_model(p) for p in result.scalars().all())
+
+        by_tier: Dict[ContentTier, List[CatalogProduct]] = {}
+        for product in products:
+            by_tier.setdefault(product.tier, []).append(product)
+
+        snapshot = CatalogSnapshot(
+            products=products,
+            by_tier={tier: tuple(items) for tier, items in by_tier.items()},
+            by_id={product.id: product for product in products},
+            loaded_at=time.monotonic()
+        )
+        cache.catalog = snapshot
+        self._stats["catalog_loads"] += 1
+        logger.debug(f"🛍️ Catálogo cargado: {len(products)} productos activos")
+        return snapshot
+
+    def invalidate_catalog(self, engine=None) -> None:
+        """
+        Descarta el catálogo cacheado.
+
+        Args:
+            engine: Engine (sync) de la BD; None = todas
+        """
+        caches = [self._engines.get(engine)] if engine is not None else list(self._engines.values())
+        for cache in caches:
+            if cache is not None:
+                cache.catalog = None
+
+    # ===== OWNERSHIP =====
+
+    async def get_owned_content_set_ids(self, session: AsyncSession, user_id: int) -> FrozenSet[int]:
+        """
+        Obtiene los content_set_id con acceso activo del usuario.
+
+        Args:
+            session: Sesión de BD (solo se usa para cargar)
+            user_id: ID del usuario
+
+        Returns:
+            frozenset de content_set_id
+        """
+        cache = self._for(self._engine_of(session))
+        entry = cache.owned.get(user_id)
+        if entry is not None and time.monotonic() - entry[0] < self.ownership_ttl:
+            cache.owned.move_to_end(user_id)
+            self._stats["ownership_hits"] += 1
+            return entry[1]
+
+        result = await session.execute(
+            select(UserContentAccess.content_set_id)
+            .where(UserContentAccess.user_id == user_id)
+            .where(UserContentAccess.is_active == True)
+        )
+        owned = frozenset(result.scalars().all())
+
+        cache.owned[user_id] = (time.monotonic(), owned)
+        cache.owned.move_to_end(user_id)
+        while len(cache.owned) > self.max_ownership_entries:
+            cache.owned.popitem(last=False)
+
+        self._stats["ownership_loads"] += 1
+        return owned
+
+    def invalidate_ownership(self, user_ids: Iterable[int], engine=None) -> None:
+        """
+        Descarta los sets de ownership de los usuarios indicados.
+
+        Args:
+            user_ids: IDs de usuario
+            engine: Engine (sync) de la BD; None = todas
+        """
+        caches = [self._engines.get(engine)] if engine is not None else list(self._engines.values())
+        for cache in caches:
+            if cache is None:
+                continue
+            for user_id in user_ids:
+                cache.owned.pop(user_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Métricas de la cache.
+
+        Returns:
+            dict: hits/loads de catálogo y ownership, usuarios en memoria
+        """
+        return {
+            **self._stats,
+            "ownership_entries": sum(len(c.owned) for c in self._engines.values()),
+        }
+
+    def clear(self) -> None:
+        """Vacía la cache y las métricas (útil en tests)."""
+        self._engines = weakref.WeakKeyDictionary()
+        for key in self._stats:
+            self._stats[key] = 0
+
+
+_shop_catalog_cache = ShopCatalogCache()
+
+
+def get_shop_catalog_cache() -> ShopCatalogCache:
+    """
+    Obtiene la cache de catálogo de proceso.
+
+    Returns:
+        ShopCatalogCache: Instancia única
+    """
+    return _shop_catalog_cache
+
+
+# ===== INVALIDACIÓN AUTOMÁTICA (eventos de sesión ORM) =====
+
+_PENDING_KEY = "shop_catalog_dirty"
+
+
+def _invalidate_pending(session: Session, clear: bool) -> None:
+    pending = session.info.get(_PENDING_KEY)
+    if not pending:
+        return
+    catalog_dirty, user_ids = pending
+    try:
+        engine = session.get_bind()
+    except Exception:
+        engine = None  # Sin bind: invalidar en todas las BD
+    if catalog_dirty:
+        _shop_catalog_cache.invalidate_catalog(engine)
+    if user_ids:
+        _shop_catalog_cache.invalidate_ownership(user_ids, engine)
+    if clear:
+        session.info.pop(_PENDING_KEY, None)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_shop_writes(session: Session, flush_context) -> None:
+    """Registra e invalida los writes ORM que afectan al catálogo u ownership."""
+    catalog_dirty = False
+    user_ids: Set[int] = set()
+
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (ShopProduct, ContentSet)):
+            catalog_dirty = True
+        elif isinstance(obj, UserContentAccess):
+            user_ids.add(obj.user_id)
+
+    if not catalog_dirty and not user_ids:
+        return
+
+    pending = session.info.setdefault(_PENDING_KEY, [False, set()])
+    pending[0] = pending[0] or catalog_dirty
+    pending[1].update(user_ids)
+    # Invalidar ya (lecturas en la misma transacción) y otra vez al cerrar
+    _invalidate_pending(session, clear=False)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    _invalidate_pending(session, clear=True)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _invalidate_on_rollback(session: Session, previous_transaction) -> None:
+    _invalidate_pending(session, clear=True)
@@ -16,7 +16,7 @@ import logging
 from datetime import datetime, date, timedelta, timezone
 from typing import Optional, Tuple, Dict, Any
 
-from sqlalchemy import select, update
+from sqlalchemy import select, update, case, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.database.models import UserStreak
@@ -219,13 +219,62 @@ class StreakService:
 
         return base, bonus, total
 
+    def _build_claim_update(self, user_id: int, now: datetime):
+        """
+        Construye el UPDATE condicional que reclama el regalo diario.
+
+        La condición last_claim_date < hoy (UTC) prueba la elegibilidad y el
+        mismo UPDATE avanza la racha: +1 si el último reclamo fue ayer,
+        1 en otro caso. RETURNING devuelve los valores ya actualizados.
+
+        Args:
+            user_id: ID del usuario
+            now: Momento del reclamo (UTC naive)
+
+        Returns:
+            Update: Sentencia lista para ejecutar
+        """
+        today_start = datetime.combine(now.date(), datetime.min.time())
+        yesterday_start = today_start - timedelta(days=1)
+
+        new_streak = case(
+            (UserStreak.last_claim_date >= yesterday_start, UserStreak.current_streak + 1),
+            else_=1
+        )
+
+        return (
+            update(UserStreak)
+            .where(
+                UserStreak.user_id == user_id,
+                UserStreak.streak_type == StreakType.DAILY_GIFT,
+                # Atomic condition: last_claim_date must be before today
+                or_(
+                    UserStreak.last_claim_date < today_start,
+                    UserStreak.last_claim_date.is_(None)
+                )
+            )
+            .values(
+                current_streak=new_streak,
+                longest_streak=case(
+                    (new_streak > UserStreak.longest_streak, new_streak),
+                    else_=UserStreak.longest_streak
+                ),
+                last_claim_date=now,
+                updated_at=now
+            )
+            .returning(UserStreak.current_streak, UserStreak.longest_streak)
+        )
+
     async def claim_daily_gift(self, user_id: int) -> Tuple[bool, Dict[str, Any]]:
         """
         Procesa el reclamo del regalo diario.
 
-        Usa UPDATE atómico con condición WHERE para prevenir race conditions
-        en reclamos concurrentes. Si el UPDATE no afecta filas, el usuario
-        ya reclamó hoy.
+        Camino rápido: un único UPDATE condicional (last_claim_date < hoy)
+        prueba la elegibilidad y avanza la racha en un solo round-trip; el
+        crédito de besitos va en la misma transacción (savepoint), de modo
+        que si el crédito falla la racha no avanza. Solo cuando el UPDATE no
+        afecta filas (primer reclamo o ya reclamó hoy) se consulta el estado.
+        Dos reclamos concurrentes producen un único reclamo.
 
         Args:
             user_id: ID del usuario
@@ -242,175 +291,66 @@ class StreakService:
                     - longest_streak: int
                     - error: str (opcional, si falló)
         """
-        from bot.database.models import UserStreak
-
-        # First check if can claim to get proper error message (e.g., "next_claim_in_Xh_Ym")
-        can_claim, status = await self.can_claim_daily_gift(user_id)
-
-        if not can_claim:
-            # Return error with proper message from can_claim_daily_gift
-            # Get streak info for current streak values in error response
-            streak_info = await self._get_streak_for_claim(user_id)
-            longest_streak = streak_info[3] if streak_info else 0
-
-            return False, {
-                "success": False,
-                "error": status,  # Contains "next_claim_in_Xh_Ym" or other status
-                "base_amount": 0,
-                "streak_bonus": 0,
-                "total": 0,
-                "new_streak": 0,  # Default for failed claim
-                "longest_streak": longest_streak
-            }
+        now = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+        error = None
+        new_streak = base = bonus = total = 0
 
-        # Get streak info first (for calculations)
-        streak_info = await self._get_streak_for_claim(user_id)
-
-        if streak_info is None:
-            # No streak record exists yet - need to create one
-            streak = await self._get_or_create_streak(user_id, StreakType.DAILY_GIFT)
-            if streak is None:
-                # User doesn't exist
-                return False, {
-                    "success": False,
-                    "error": "user_not_found",
-                    "base_amount": 0,
-                    "streak_bonus": 0,
-                    "total": 0,
-                    "new_streak": 0,
-                    "longest_streak": 0
-                }
-            new_streak = 1
-        else:
-            streak_id, current_streak, last_claim_date, longest_streak = streak_info
+        async with self.session.begin_nested() as savepoint:
+            result = await self.session.execute(self._build_claim_update(user_id, now))
+            row = result.one_or_none()
 
-            # Calculate new streak value
-            today = self._get_utc_date()
+            if row is None:
+                # Sin racha previa o ya reclamó hoy: resolver el motivo
+                can_claim, error = await self.can_claim_daily_gift(user_id)
 
-            if last_claim_date is None:
-                new_streak = 1
-            else:
-                last_claim = self._get_utc_date(last_claim_date)
-                yesterday = today - timedelta(days=1)
-
-                if last_claim == yesterday:
-                    new_streak = current_streak + 1
-                elif last_claim == today:
-                    # Should not happen due to can_claim check above, but handle anyway
-                    return False, {
-                        "success": False,
-                        "error": status,  # Use status from can_claim_daily_gift
-                        "base_amount": 0,
-                        "streak_bonus": 0,
-                        "total": 0,
-                        "new_streak": current_streak,
-                        "longest_streak": longest_streak
-                    }
-                else:
-                    new_streak = 1
-
-        # Calcular besitos antes del update atómico
-        base, bonus, total = self.calculate_streak_bonus(new_streak)
-        now = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
-        today_start = datetime.combine(self._get_utc_date(), datetime.min.time()).replace(microsecond=0)
-
-        # ATOMIC UPDATE: Only succeeds if user hasn't claimed today
-        # This prevents race conditions from concurrent requests
-        if streak_info is not None:
-            # Update existing streak atomically
-            result = await self.session.execute(
-                update(UserStreak)
-                .where(
-                    UserStreak.user_id == user_id,
-                    UserStreak.streak_type == StreakType.DAILY_GIFT,
-                    # Atomic condition: last_claim_date must be before today
-                    (
-                        (UserStreak.last_claim_date < today_start) |
-                        (UserStreak.last_claim_date.is_(None))
+                if can_claim:
+                    # La racha se acaba de crear: reintentar el UPDATE una vez
+                    result = await self.session.execute(
+                        self._build_claim_update(user_id, now)
+                    )
+                    row = result.one_or_none()
+                    # Another concurrent request claimed first
+                    error = None if row is not None else "already_claimed"
+
+            if row is not None:
+                new_streak, longest = row
+                base, bonus, total = self.calculate_streak_bonus(new_streak)
+
+                # Credit besitos via wallet service (same transaction)
+                if self.wallet_service is not None:
+                    success, msg, transaction = await self.wallet_service.earn_besitos(
+                        user_id=user_id,
+                        amount=total,
+                        transaction_type=TransactionType.EARN_DAILY,
+                        reason=f"Daily gift claim - streak day {new_streak}",
+                        metadata={
+                            "streak_day": new_streak,
+                            "base_amount": base,
+                            "streak_bonus": bonus
+                        }
                     )
-                )
-                .values(
-                    current_streak=new_streak,
-                    last_claim_date=now,
-                    longest_streak=UserStreak.longest_streak if new_streak <= streak_info[3] else new_streak,
-                    updated_at=now
-                )
-            )
 
-            if result.rowcount == 0:
-                # Another concurrent request claimed first
-                return False, {
-                    "success": False,
-                    "error": "already_claimed",
-                    "base_amount": 0,
-                    "streak_bonus": 0,
-                    "total": 0,
-                    "new_streak": new_streak,
-                    "longest_streak": streak_info[3]
-                }
-        else:
-            # New streak - was created by _get_or_create_streak above
-            # Need to update it atomically
-            result = await self.session.execute(
-                update(UserStreak)
-                .where(
-                    UserStreak.user_id == user_id,
-                    UserStreak.streak_type == StreakType.DAILY_GIFT,
-                    UserStreak.last_claim_date.is_(None)
-                )
-                .values(
-                    current_streak=1,
-                    last_claim_date=now,
-                    longest_streak=1,
-                    updated_at=now
-                )
-            )
+                    if not success:
+                        self.logger.error(
+                            f"❌ Failed to credit besitos for daily gift to user {user_id}: {msg}"
+                        )
+                        error = f"credit_failed: {msg}"
 
-            if result.rowcount == 0:
-                # Another concurrent request claimed first
-                return False, {
-                    "success": False,
-                    "error": "already_claimed",
-                    "base_amount": 0,
-                    "streak_bonus": 0,
-                    "total": 0,
-                    "new_streak": 0,
-                    "longest_streak": 0
-                }
-
-        # Credit besitos via wallet service
-        if self.wallet_service is not None:
-            success, msg, transaction = await self.wallet_service.earn_besitos(
-                user_id=user_id,
-                amount=total,
-                transaction_type=TransactionType.EARN_DAILY,
-                reason=f"Daily gift claim - streak day {new_streak}",
-                metadata={
-                    "streak_day": new_streak,
-                    "base_amount": base,
-                    "streak_bonus": bonus
-                }
-            )
+            if error is not None:
+                # Deshacer el avance de la racha: el reclamo no ocurrió
+                await savepoint.rollback()
 
-            if not success:
-                self.logger.error(
-                    f"❌ Failed to credit besitos for daily gift to user {user_id}: {msg}"
-                )
-                return False, {
-                    "success": False,
-                    "error": f"credit_failed: {msg}",
-                    "base_amount": base,
-                    "streak_bonus": bonus,
-                    "total": total,
-                    "new_streak": new_streak,
-                    "longest_streak": max(streak_info[3] if streak_info else 0, new_streak)
-                }
-
-        # Refresh streak data for return
-        longest = max(
-            (streak_info[3] if streak_info else 0),
-            new_streak
-        )
+        if error is not None:
+            streak_info = await self._get_streak_for_claim(user_id)
+            return False, {
+                "success": False,
+                "error": error,  # "next_claim_in_Xh_Ym", "user_not_found", "credit_failed: ..."
+                "base_amount": base,
+                "streak_bonus": bonus,
+                "total": total,
+                "new_streak": new_streak,  # 0 si no llegó a reclamar
+                "longest_streak": streak_info[3] if streak_info else 0
+            }
 
         self.logger.info(
             f"✅ User {user_id} claimed daily gift: {total} besitos "
@@ -626,12 +566,17 @@ class StreakService:
 
         return True, streak.current_streak
 
-    async def process_streak_expirations(self) -> int:
+    async def _expire_streaks(self, streak_type: StreakType, date_column) -> int:
         """
-        Procesa expiraciones de rachas DAILY_GIFT que no reclamaron hoy.
+        Resetea a 0 las rachas de un tipo cuya última actividad es anterior a hoy.
 
-        Busca todas las rachas DAILY_GIFT donde last_claim_date < hoy (UTC)
-        y resetea current_streak a 0. Preserva longest_streak como histórico.
+        Ejecuta un único UPDATE set-based (sin cargar filas en memoria).
+        Solo si el logger está en DEBUG se pide RETURNING user_id para
+        loguear cada usuario afectado.
+
+        Args:
+            streak_type: Tipo de racha a expirar
+            date_column: Columna de última actividad (last_claim_date o last_reaction_date)
 
         Returns:
             int: Cantidad de rachas reseteadas
@@ -642,78 +587,60 @@ class StreakService:
         # para evitar inconsistencias en registros con microsecond != 0
         today_boundary = datetime.combine(today, datetime.min.time()).replace(microsecond=0)
 
-        # Find all DAILY_GIFT streaks where last_claim_date < today
-        result = await self.session.execute(
-            select(UserStreak).where(
-                UserStreak.streak_type == StreakType.DAILY_GIFT,
+        stmt = (
+            update(UserStreak)
+            .where(
+                UserStreak.streak_type == streak_type,
                 UserStreak.current_streak > 0,
-                UserStreak.last_claim_date < today_boundary
+                date_column < today_boundary
             )
+            .values(current_streak=0)
         )
-        expired_streaks = result.scalars().all()
-
-        reset_count = 0
-        for streak in expired_streaks:
-            old_streak = streak.current_streak
-            streak.current_streak = 0
 
-            self.logger.info(
-                f"🔄 Reset DAILY_GIFT streak for user {streak.user_id} "
-                f"(was {old_streak}, missed day)"
-            )
-            reset_count += 1
+        if self.logger.isEnabledFor(logging.DEBUG):
+            result = await self.session.execute(stmt.returning(UserStreak.user_id))
+            user_ids = result.scalars().all()
+            for user_id in user_ids:
+                self.logger.debug(
+                    f"🔄 Reset {streak_type.value} streak for user {user_id} (missed day)"
+                )
+            reset_count = len(user_ids)
+        else:
+            result = await self.session.execute(stmt)
+            reset_count = result.rowcount
 
         if reset_count > 0:
-            await self.session.flush()
             self.logger.info(
-                f"✅ Processed {reset_count} expired DAILY_GIFT streaks"
+                f"✅ Processed {reset_count} expired {streak_type.value} streaks"
             )
 
         return reset_count
 
-    async def process_reaction_streak_expirations(self) -> int:
+    async def process_streak_expirations(self) -> int:
         """
-        Procesa expiraciones de rachas REACTION que no reaccionaron hoy.
+        Procesa expiraciones de rachas DAILY_GIFT que no reclamaron hoy.
 
-        Busca todas las rachas REACTION donde last_reaction_date < hoy (UTC)
-        y resetea current_streak a 0. Preserva longest_streak como histórico.
+        Resetea current_streak a 0 en todas las rachas DAILY_GIFT donde
+        last_claim_date < hoy (UTC) con un único UPDATE.
+        Preserva longest_streak como histórico.
 
         Returns:
             int: Cantidad de rachas reseteadas
         """
-        today = self._get_utc_date()
+        return await self._expire_streaks(StreakType.DAILY_GIFT, UserStreak.last_claim_date)
 
-        # Boundary exacto al inicio del día UTC, sin microsegundos
-        today_boundary = datetime.combine(today, datetime.min.time()).replace(microsecond=0)
-
-        # Find all REACTION streaks where last_reaction_date < today
-        result = await self.session.execute(
-            select(UserStreak).where(
-                UserStreak.streak_type == StreakType.REACTION,
-                UserStreak.current_streak > 0,
-                UserStreak.last_reaction_date < today_boundary
-            )
-        )
-        expired_streaks = result.scalars().all()
-
-        reset_count = 0
-        for streak in expired_streaks:
-            old_streak = streak.current_streak
-            streak.current_streak = 0
-
-            self.logger.info(
-                f"🔄 Reset REACTION streak for user {streak.user_id} "
-                f"(was {old_streak}, missed day)"
-            )
-            reset_count += 1
+    async def process_reaction_streak_expirations(self) -> int:
+        """
+        Procesa expiraciones de rachas REACTION que no reaccionaron hoy.
 
-        if reset_count > 0:
-            await self.session.flush()
-            self.logger.info(
-                f"✅ Processed {reset_count} expired REACTION streaks"
-            )
+        Resetea current_streak a 0 en todas las rachas REACTION donde
+        last_reaction_date < hoy (UTC) con un único UPDATE.
+        Preserva longest_streak como histórico.
 
-        return reset_count
+        Returns:
+            int: Cantidad de rachas reseteadas
+        """
+        return await self._expire_streaks(StreakType.REACTION, UserStreak.last_reaction_date)
 
     async def get_reaction_streak(self, user_id: int) -> int:
         """
@@ -14,7 +14,6 @@ Security considerations:
 - Database transactions are separated from slow API calls
 - All datetime operations use timezone-aware datetimes
 """
-import asyncio
 import logging
 import secrets
 from datetime import datetime, timedelta, timezone
@@ -43,10 +42,16 @@ from bot.database.models import (
     UserRoleChangeLog
 )
 from bot.services.container import ServiceContainer
+from bot.database.dialect import dialect_insert
+from bot.services.token_guard import get_token_guard
+from bot.utils.rate_limit import bulk_lane
 from bot.database.enums import UserRole, RoleChangeReason
 
 logger = logging.getLogger(__name__)
 
+# Máximo de tokens por lote en generate_vip_tokens
+MAX_TOKEN_BATCH = 1000
+
 
 def _mask_token(token: str) -> str:
     """Enmascara un token mostrando solo los primeros 4 caracteres.
@@ -253,6 +258,7 @@ class SubscriptionService:
         )
 
         self.session.add(token)
+        get_token_guard().forget(token_str)
         # No commit - dejar que el handler maneje la transacción
 
         logger.info(
@@ -262,6 +268,97 @@ class SubscriptionService:
 
         return token
 
+    async def generate_vip_tokens(
+        self,
+        count: int,
+        plan_id: Optional[int],
+        generated_by: int,
+        duration_hours: int = 24
+    ) -> List[str]:
+        """
+        Genera un lote de tokens VIP únicos (revendedores).
+
+        Los candidatos se generan en memoria y se insertan con un único
+        INSERT multi-fila ... ON CONFLICT DO NOTHING RETURNING: el índice
+        único de token descarta colisiones y solo esas se reintentan.
+        1000 tokens = 1 sentencia (2 en el caso improbable de colisión).
+
+        Args:
+            count: Cantidad de tokens (1..MAX_TOKEN_BATCH)
+            plan_id: ID del plan de suscripción (opcional)
+            generated_by: User ID del admin que genera el lote
+            duration_hours: Duración de cada token en horas (default: 24h)
+
+        Returns:
+            List[str]: Tokens generados, en orden de inserción
+
+        Raises:
+            ValueError: Si algún parámetro es inválido
+            RuntimeError: Si no se completa el lote después de 10 intentos
+        """
+        if not isinstance(count, int) or count <= 0 or count > MAX_TOKEN_BATCH:
+            raise ValueError(f"count must be an integer between 1 and {MAX_TOKEN_BATCH}")
+        if not isinstance(generated_by, int) or generated_by <= 0:
+            raise ValueError("generated_by must be a positive integer")
+        if not isinstance(duration_hours, int) or duration_hours <= 0:
+            raise ValueError("duration_hours must be a positive integer")
+        if duration_hours > 8760:  # Max 1 year
+            raise ValueError("duration_hours cannot exceed 8760 (1 year)")
+        if plan_id is not None and (not isinstance(plan_id, int) or plan_id <= 0):
+            raise ValueError("plan_id must be a positive integer or None")
+
+        created_at = utc_now()
+        tokens: List[str] = []
+        max_attempts = 10
+
+        for attempt in range(max_attempts):
+            missing = count - len(tokens)
+            # set() descarta duplicados dentro del propio lote
+            candidates = set()
+            while len(candidates) < missing:
+                candidates.add(secrets.token_urlsafe(12)[:16])
+
+            stmt = (
+                dialect_insert(self.session, InvitationToken)
+                .values([
+                    {
+                        "token": token_str,
+                        "generated_by": generated_by,
+                        "created_at": created_at,
+                        "duration_hours": duration_hours,
+                        "used": False,
+                        "plan_id": plan_id,
+                    }
+                    for token_str in candidates
+                ])
+                .on_conflict_do_nothing(index_elements=["token"])
+                .returning(InvitationToken.token)
+            )
+            result = await self.session.execute(stmt)
+            tokens.extend(result.scalars().all())
+
+            if len(tokens) == count:
+                break
+
+            logger.warning(
+                f"⚠️ {count - len(tokens)} tokens duplicados en lote (intento {attempt + 1})"
+            )
+        else:
+            raise RuntimeError(
+                f"No se pudo generar lote de {count} tokens después de {max_attempts} intentos"
+            )
+        guard = get_token_guard()
+        for token_str in tokens:
+            guard.forget(token_str)
+        # No commit - dejar que el handler maneje la transacción
+
+        logger.info(
+            f"✅ Lote de {count} tokens VIP generado "
+            f"(válidos por {duration_hours}h, plan_id: {plan_id}, generado por admin_id={generated_by})"
+        )
+
+        return tokens
+
     async def validate_token(
         self,
         token_str: str
@@ -283,6 +380,12 @@ class SubscriptionService:
                 - str: Mensaje de error/éxito
                 - Optional[InvitationToken]: Token si existe, None si no
         """
+        guard = get_token_guard()
+
+        # Rechazos recientes se resuelven en memoria, sin consultar la BD
+        if guard.is_known_invalid(token_str):
+            return False, "❌ Token no encontrado", None
+
         # Buscar token
         result = await self.session.execute(
             select(InvitationToken).where(
@@ -292,12 +395,15 @@ class SubscriptionService:
         token = result.scalar_one_or_none()
 
         if token is None:
+            guard.remember_invalid(token_str)
             return False, "❌ Token no encontrado", None
 
         if token.used:
+            guard.remember_invalid(token_str)
             return False, "❌ Este token ya fue usado", token
 
         if token.is_expired():
+            guard.remember_invalid(token_str)
             return False, "❌ Token expirado", token
 
         return True, "✅ Token válido", token
@@ -336,6 +442,10 @@ class SubscriptionService:
         if not isinstance(user_id, int) or user_id <= 0:
             return (False, "ID de usuario inválido", None)
 
+        guard = get_token_guard()
+        if guard.is_known_invalid(token_str):
+            return False, "❌ Token inválido, expirado o ya fue usado", None
+
         # ATOMIC UPDATE: Marcar token como usado SOLO si no está usado y no expiró
         # El rowcount indica si el UPDATE afectó alguna fila
         # Expiration check: created_at + duration_hours > now()
@@ -360,6 +470,7 @@ class SubscriptionService:
                 f"⚠️ Token {_mask_token(token_str)} race condition o inválido "
                 f"para user {_mask_user_id(user_id)}"
             )
+            guard.remember_invalid(token_str)
             return False, "❌ Token inválido, expirado o ya fue usado", None
 
         # Token marcado como usado exitosamente - obtener datos para la suscripción
@@ -720,37 +831,33 @@ class SubscriptionService:
         failed_user_ids = []
         already_out_user_ids = []
 
-        RATE_LIMIT_DELAY = 0.1  # 100ms between API calls
-
-        for i, (vip_id, user_id) in enumerate(expired_vips):
-            try:
-                # Intentar banear del canal
-                await self.bot.ban_chat_member(
-                    chat_id=channel_id,
-                    user_id=user_id
-                )
-
-                kicked_user_ids.append((vip_id, user_id))
-                logger.info(f"🚫 Usuario baneado de VIP (suscripción expirada): {_mask_user_id(user_id)}")
+        # Ritmo de llamadas: TelegramRateLimiter (carril BULK, cede ante respuestas interactivas)
+        async with bulk_lane():
+            for vip_id, user_id in expired_vips:
+                try:
+                    # Intentar banear del canal
+                    await self.bot.ban_chat_member(
+                        chat_id=channel_id,
+                        user_id=user_id
+                    )
 
-                # Rate limiting: sleep between API calls (but not after the last one)
-                if i < len(expired_vips) - 1:
-                    await asyncio.sleep(RATE_LIMIT_DELAY)
+                    kicked_user_ids.append((vip_id, user_id))
+                    logger.info(f"🚫 Usuario baneado de VIP (suscripción expirada): {_mask_user_id(user_id)}")
 
-            except Exception as e:
-                error_str = str(e).lower()
+                except Exception as e:
+                    error_str = str(e).lower()
 
-                # Verificar si el usuario ya no está en el canal (éxito parcial)
-                if "user not found" in error_str or "user is not a member" in error_str:
-                    # Usuario ya no está en el canal - marcar como hecho
-                    already_out_user_ids.append((vip_id, user_id))
-                    logger.info(f"✅ Usuario {_mask_user_id(user_id)} ya no estaba en el canal")
-                else:
-                    # Error real - se reintentará en la próxima ejecución
-                    failed_user_ids.append(user_id)
-                    logger.warning(
-                        f"⚠️ No se pudo banear a user {_mask_user_id(user_id)}: {e}"
-                    )
+                    # Verificar si el usuario ya no está en el canal (éxito parcial)
+                    if "user not found" in error_str or "user is not a member" in error_str:
+                        # Usuario ya no está en el canal - marcar como hecho
+                        already_out_user_ids.append((vip_id, user_id))
+                        logger.info(f"✅ Usuario {_mask_user_id(user_id)} ya no estaba en el canal")
+                    else:
+                        # Error real - se reintentará en la próxima ejecución
+                        failed_user_ids.append(user_id)
+                        logger.warning(
+                            f"⚠️ No se pudo banear a user {_mask_user_id(user_id)}: {e}"
+                        )
 
         # PHASE 3: Update kicked status (explicit commit)
         # Update each VIP individually to track success/failure
@@ -1289,124 +1396,120 @@ class SubscriptionService:
         # Las solicitudes fueron marcadas como procesadas en el UPDATE anterior
         claimed_request_ids = candidate_ids[:update_result.rowcount] if update_result.rowcount > 0 else []
 
-        RATE_LIMIT_DELAY = 0.1  # 100ms between API calls
-
-        for i, request_id in enumerate(claimed_request_ids):
-            user_id = user_id_map[request_id]
-            try:
-                # 1. Aprobar ChatJoinRequest directamente
-                await self.bot.approve_chat_join_request(
-                    chat_id=free_channel_id,
-                    user_id=user_id
-                )
+        # Ritmo de llamadas: TelegramRateLimiter (carril BULK, cede ante respuestas interactivas)
+        async with bulk_lane():
+            for request_id in claimed_request_ids:
+                user_id = user_id_map[request_id]
+                try:
+                    # 1. Aprobar ChatJoinRequest directamente
+                    await self.bot.approve_chat_join_request(
+                        chat_id=free_channel_id,
+                        user_id=user_id
+                    )
 
-                # 2. Obtener enlace del canal
-                from bot.services.message.user_flows import UserFlowMessages
-                from bot.services.channel import ChannelService
+                    # 2. Obtener enlace del canal
+                    from bot.services.message.user_flows import UserFlowMessages
+                    from bot.services.channel import ChannelService
 
-                channel_service = ChannelService(self.session, self.bot)
-                channel_link = await channel_service.get_or_create_free_channel_invite_link()
+                    channel_service = ChannelService(self.session, self.bot)
+                    channel_link = await channel_service.get_or_create_free_channel_invite_link()
 
-                if not channel_link:
-                    config_result = await self.session.execute(
-                        select(BotConfig).where(BotConfig.id == 1)
-                    )
-                    bot_config = config_result.scalar_one_or_none()
-
-                    if bot_config and bot_config.free_channel_invite_link:
-                        channel_link = bot_config.free_channel_invite_link
-                    elif free_channel_id.startswith('@'):
-                        channel_link = f"t.me/{free_channel_id[1:]}"
-                        logger.warning("⚠️ Usando fallback t.me URL para canal público")
-
-                # 3. Enviar mensaje de aprobación
-                if channel_link:
-                    try:
-                        flows = UserFlowMessages()
-                        approval_text, keyboard = flows.free_request_approved(
-                            channel_name=channel_name,
-                            channel_link=channel_link
+                    if not channel_link:
+                        config_result = await self.session.execute(
+                            select(BotConfig).where(BotConfig.id == 1)
                         )
+                        bot_config = config_result.scalar_one_or_none()
 
-                        await self.bot.send_message(
-                            chat_id=user_id,
-                            text=approval_text,
-                            reply_markup=keyboard,
-                            parse_mode="HTML"
-                        )
+                        if bot_config and bot_config.free_channel_invite_link:
+                            channel_link = bot_config.free_channel_invite_link
+                        elif free_channel_id.startswith('@'):
+                            channel_link = f"t.me/{free_channel_id[1:]}"
+                            logger.warning("⚠️ Usando fallback t.me URL para canal público")
 
-                        logger.info(
-                            f"✅ Aprobación enviada a user {_mask_user_id(user_id)} con enlace al canal"
-                        )
-                    except Exception as notify_error:
-                        error_type = _classify_notification_error(notify_error)
-                        masked_uid = _mask_user_id(user_id)
-
-                        if error_type == "blocked":
-                            logger.warning(
-                                f"⚠️ Usuario {masked_uid} bloqueó el bot, "
-                                f"no se pudo enviar confirmación de acceso Free"
-                            )
-                        elif error_type == "deactivated":
-                            logger.warning(
-                                f"⚠️ Usuario {masked_uid} tiene cuenta desactivada/eliminada"
+                    # 3. Enviar mensaje de aprobación
+                    if channel_link:
+                        try:
+                            flows = UserFlowMessages()
+                            approval_text, keyboard = flows.free_request_approved(
+                                channel_name=channel_name,
+                                channel_link=channel_link
                             )
-                        elif error_type == "chat_not_found":
-                            # Expected: user never started the bot. Approval succeeded; DM not sent.
-                            # The Telegram Bot API 5.5 DM window (from ChatJoinRequest) expires
-                            # before the background task runs. User can still enter the channel.
-                            logger.info(
-                                f"ℹ️ Usuario {masked_uid} aprobado al canal Free. "
-                                f"Notificación por DM no enviada: usuario nunca inició conversación con el bot "
-                                f"(ventana ChatJoinRequest expirada - comportamiento esperado)"
+
+                            await self.bot.send_message(
+                                chat_id=user_id,
+                                text=approval_text,
+                                reply_markup=keyboard,
+                                parse_mode="HTML"
                             )
-                        elif error_type == "cant_initiate":
-                            # Expected: user never started the bot. Approval succeeded; DM not sent.
-                            # The Telegram Bot API 5.5 DM window (from ChatJoinRequest) expires
-                            # before the background task runs. User can still enter the channel.
+
                             logger.info(
-                                f"ℹ️ Usuario {masked_uid} aprobado al canal Free. "
-                                f"Notificación por DM no enviada: ventana ChatJoinRequest expirada "
-                                f"(usuario no ha iniciado conversación con el bot - comportamiento esperado)"
-                            )
-                        elif error_type == "kicked":
-                            logger.warning(
-                                f"⚠️ El bot fue expulsado del chat privado con user {masked_uid}"
+                                f"✅ Aprobación enviada a user {_mask_user_id(user_id)} con enlace al canal"
                             )
-                        else:
-                            logger.warning(
-                                f"⚠️ No se pudo notificar a user {masked_uid}: "
-                                f"[{error_type}] {notify_error}"
-                            )
-
-                success_count += 1
-                logger.info(f"✅ Solicitud Free aprobada: user {_mask_user_id(user_id)}")
+                        except Exception as notify_error:
+                            error_type = _classify_notification_error(notify_error)
+                            masked_uid = _mask_user_id(user_id)
 
-                # Rate limiting: sleep between API calls (but not after the last one)
-                if i < len(claimed_request_ids) - 1:
-                    await asyncio.sleep(RATE_LIMIT_DELAY)
+                            if error_type == "blocked":
+                                logger.warning(
+                                    f"⚠️ Usuario {masked_uid} bloqueó el bot, "
+                                    f"no se pudo enviar confirmación de acceso Free"
+                                )
+                            elif error_type == "deactivated":
+                                logger.warning(
+                                    f"⚠️ Usuario {masked_uid} tiene cuenta desactivada/eliminada"
+                                )
+                            elif error_type == "chat_not_found":
+                                # Expected: user never started the bot. Approval succeeded; DM not sent.
+                                # The Telegram Bot API 5.5 DM window (from ChatJoinRequest) expires
+                                # before the background task runs. User can still enter the channel.
+                                logger.info(
+                                    f"ℹ️ Usuario {masked_uid} aprobado al canal Free. "
+                                    f"Notificación por DM no enviada: usuario nunca inició conversación con el bot "
+                                    f"(ventana ChatJoinRequest expirada - comportamiento esperado)"
+                                )
+                            elif error_type == "cant_initiate":
+                                # Expected: user never started the bot. Approval succeeded; DM not sent.
+                                # The Telegram Bot API 5.5 DM window (from ChatJoinRequest) expires
+                                # before the background task runs. User can still enter the channel.
+                                logger.info(
+                                    f"ℹ️ Usuario {masked_uid} aprobado al canal Free. "
+                                    f"Notificación por DM no enviada: ventana ChatJoinRequest expirada "
+                                    f"(usuario no ha iniciado conversación con el bot - comportamiento esperado)"
+                                )
+                            elif error_type == "kicked":
+                                logger.warning(
+                                    f"⚠️ El bot fue expulsado del chat privado con user {masked_uid}"
+                                )
+                            else:
+                                logger.warning(
+                                    f"⚠️ No se pudo notificar a user {masked_uid}: "
+                                    f"[{error_type}] {notify_error}"
+                                )
 
-            except Exception as e:
-                error_count += 1
-                error_msg = str(e).lower()
+                    success_count += 1
+                    logger.info(f"✅ Solicitud Free aprobada: user {_mask_user_id(user_id)}")
 
-                # Verificar si es error de solicitud expirada
-                is_expired_error = any(
-                    keyword in error_msg
-                    for keyword in ["expired", "not found", "no pending", "request expired",
-                                   "user_not_participant", "user_already_participant"]
-                )
+                except Exception as e:
+                    error_count += 1
+                    error_msg = str(e).lower()
 
-                if is_expired_error:
-                    logger.warning(
-                        f"⚠️ Solicitud de user {_mask_user_id(user_id)} expiró o fue cancelada. "
-                        f"Ya marcada como procesada para evitar reintentos."
-                    )
-                else:
-                    logger.error(
-                        f"❌ Error aprobando solicitud de user {_mask_user_id(user_id)}: {e}"
+                    # Verificar si es error de solicitud expirada
+                    is_expired_error = any(
+                        keyword in error_msg
+                        for keyword in ["expired", "not found", "no pending", "request expired",
+                                       "user_not_participant", "user_already_participant"]
                     )
 
+                    if is_expired_error:
+                        logger.warning(
+                            f"⚠️ Solicitud de user {_mask_user_id(user_id)} expiró o fue cancelada. "
+                            f"Ya marcada como procesada para evitar reintentos."
+                        )
+                    else:
+                        logger.error(
+                            f"❌ Error aprobando solicitud de user {_mask_user_id(user_id)}: {e}"
+                        )
+
         logger.info(
             f"📊 Procesamiento Free completado: {success_count} aprobadas, "
             f"{error_count} errores (batch: {len(candidates)}, claimed: {update_result.rowcount})"
@@ -0,0 +1,228 @@
+"""
+Token Guard - Protección en memoria contra floods de tokens inválidos.
+
+Responsabilidades:
+- Cache negativa (LRU acotada con TTL) de tokens rechazados recientemente
+- Limitador de intentos fallidos por usuario (ventana deslizante)
+- Validación de formato antes de tocar la BD
+
+Pattern: Singleton store (como SimulationStore), consultado por
+DeepLinkGuardMiddleware antes de abrir sesión y por SubscriptionService
+antes de consultar invitation_tokens.
+Thread-safe: asyncio-safe ya que es single-threaded.
+"""
+import logging
+import re
+import time
+from collections import OrderedDict, deque
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Los tokens VIP son token_urlsafe recortados a 16 caracteres (String(16) en BD)
+TOKEN_PATTERN = re.compile(r"^[A-Za-z0-9_\-]{1,16}$")
+
+
+class TokenGuard:
+    """
+    Cache negativa de tokens + limitador de intentos por usuario.
+
+    Singleton pattern - una única instancia compartida por el proceso.
+
+    Cache negativa:
+        Tokens que no existen, ya fueron usados o expiraron se recuerdan
+        durante REJECTED_TTL_SECONDS. Un token recordado se rechaza sin
+        consultar la BD. La cache es un LRU acotado a MAX_REJECTED entradas.
+
+    Limitador:
+        Cada usuario puede fallar MAX_ATTEMPTS veces dentro de
+        ATTEMPT_WINDOW_SECONDS; después queda bloqueado hasta que los
+        intentos salen de la ventana. Un canje exitoso limpia el contador.
+    """
+
+    _instance: Optional["TokenGuard"] = None
+    _initialized: bool = False
+
+    MAX_REJECTED = 10_000
+    REJECTED_TTL_SECONDS = 3600
+    MAX_ATTEMPTS = 5
+    ATTEMPT_WINDOW_SECONDS = 600
+    MAX_TRACKED_USERS = 10_000
+
+    def __new__(cls) -> "TokenGuard":
+        """Singleton pattern - retorna instancia única."""
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        """Inicializa el guard (solo una vez)."""
+        if TokenGuard._initialized:
+            return
+
+        # token -> monotonic timestamp del rechazo (orden LRU)
+        self._rejected: "OrderedDict[str, float]" = OrderedDict()
+        # user_id -> timestamps de intentos fallidos (orden LRU)
+        self._attempts: "OrderedDict[int, deque]" = OrderedDict()
+
+        self.cache_hits = 0
+        self.blocked_attempts = 0
+
+        TokenGuard._initialized = True
+        logger.debug("✅ TokenGuard inicializado (singleton)")
+
+    # ===== CACHE NEGATIVA =====
+
+    @staticmethod
+    def is_well_formed(token_str: str) -> bool:
+        """
+        Verifica que el token tenga el formato de un token VIP.
+
+        Args:
+            token_str: Token recibido
+
+        Returns:
+            bool: True si podría existir en invitation_tokens
+        """
+        return bool(token_str) and TOKEN_PATTERN.match(token_str) is not None
+
+    def is_known_invalid(self, token_str: str) -> bool:
+        """
+        Verifica si el token fue rechazado recientemente.
+
+        Args:
+            token_str: Token a verificar
+
+        Returns:
+            bool: True si está en la cache negativa (y no expiró)
+        """
+        rejected_at = self._rejected.get(token_str)
+        if rejected_at is None:
+            return False
+
+        if time.monotonic() - rejected_at > self.REJECTED_TTL_SECONDS:
+            del self._rejected[token_str]
+            return False
+
+        self._rejected.move_to_end(token_str)
+        self.cache_hits += 1
+        return True
+
+    def remember_invalid(self, token_str: str) -> None:
+        """
+        Agrega un token rechazado a la cache negativa.
+
+        Args:
+            token_str: Token rechazado (no existe, usado o expirado)
+        """
+        self._rejected[token_str] = time.monotonic()
+        self._rejected.move_to_end(token_str)
+
+        while len(self._rejected) > self.MAX_REJECTED:
+            self._rejected.popitem(last=False)
+
+    def forget(self, token_str: str) -> None:
+        """
+        Quita un token de la cache negativa (ej: recién generado).
+
+        Args:
+            token_str: Token a olvidar
+        """
+        self._rejected.pop(token_str, None)
+
+    # ===== LIMITADOR POR USUARIO =====
+
+    def _recent_attempts(self, user_id: int) -> Optional[deque]:
+        """Retorna los intentos del usuario dentro de la ventana (poda los viejos)."""
+        attempts = self._attempts.get(user_id)
+        if attempts is None:
+            return None
+
+        cutoff = time.monotonic() - self.ATTEMPT_WINDOW_SECONDS
+        while attempts and attempts[0] < cutoff:
+            attempts.popleft()
+
+        if not attempts:
+            del self._attempts[user_id]
+            return None
+
+        return attempts
+
+    def is_blocked(self, user_id: int) -> bool:
+        """
+        Verifica si el usuario agotó sus intentos en la ventana actual.
+
+        Args:
+            user_id: ID del usuario
+
+        Returns:
+            bool: True si debe rechazarse sin procesar el token
+        """
+        attempts = self._recent_attempts(user_id)
+        blocked = attempts is not None and len(attempts) >= self.MAX_ATTEMPTS
+        if blocked:
+            self.blocked_attempts += 1
+        return blocked
+
+    def record_failure(self, user_id: int) -> None:
+        """
+        Registra un intento fallido de canje para el usuario.
+
+        Args:
+            user_id: ID del usuario
+        """
+        attempts = self._recent_attempts(user_id)
+        if attempts is None:
+            attempts = deque(maxlen=self.MAX_ATTEMPTS)
+            self._attempts[user_id] = attempts
+
+        attempts.append(time.monotonic())
+        self._attempts.move_to_end(user_id)
+
+        while len(self._attempts) > self.MAX_TRACKED_USERS:
+            self._attempts.popitem(last=False)
+
+        if len(attempts) >= self.MAX_ATTEMPTS:
+            logger.warning(f"🚫 Usuario {user_id} bloqueado por intentos de token fallidos")
+
+    def reset(self, user_id: int) -> None:
+        """
+        Limpia los intentos fallidos del usuario (tras un canje exitoso).
+
+        Args:
+            user_id: ID del usuario
+        """
+        self._attempts.pop(user_id, None)
+
+    # ===== MANTENIMIENTO =====
+
+    def stats(self) -> dict:
+        """
+        Estadísticas del guard.
+
+        Returns:
+            dict: Tamaños actuales y contadores de rechazos sin BD
+        """
+        return {
+            "rejected_tokens": len(self._rejected),
+            "tracked_users": len(self._attempts),
+            "cache_hits": self.cache_hits,
+            "blocked_attempts": self.blocked_attempts,
+        }
+
+    def clear(self) -> None:
+        """Vacía la cache y el limitador (útil en tests)."""
+        self._rejected.clear()
+        self._attempts.clear()
+        self.cache_hits = 0
+        self.blocked_attempts = 0
+
+
+def get_token_guard() -> TokenGuard:
+    """
+    Obtiene la instancia singleton del TokenGuard.
+
+    Returns:
+        TokenGuard: Instancia única
+    """
+    return TokenGuard()
@@ -6,14 +6,21 @@ bloquear/desbloquear, expulsar de canales, con validación de permisos y
 auditoría de cambios.
 """
 import logging
+import re
+import weakref
 from datetime import datetime
 from typing import List, Optional, Tuple, Dict, Any
-from sqlalchemy import select, and_, or_, desc, func
+from sqlalchemy import select, and_, or_, desc, func, literal, literal_column, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from bot.database.models import User, VIPSubscriber, UserRoleChangeLog, UserInterest
 from bot.database.enums import UserRole, RoleChangeReason
+from bot.database.search_index import (
+    USER_SEARCH_DOCUMENT_SQL,
+    USER_SEARCH_FTS_TABLE,
+    has_user_search_index,
+)
 from bot.services.role_change import RoleChangeService
 
 logger = logging.getLogger(__name__)
@@ -21,6 +28,35 @@ logger = logging.getLogger(__name__)
 # Pagination constants
 USER_LIST_PAGE_SIZE = 20
 
+# Search constants
+FUZZY_SEARCH_THRESHOLD = 0.6  # Igual a pg_trgm.word_similarity_threshold
+FUZZY_SEARCH_CANDIDATES_FACTOR = 10
+
+# Engine → índice de búsqueda disponible (se verifica una vez por engine)
+_search_index_available: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _escape_like(value: str) -> str:
+    """Escapa comodines de LIKE (se usa con escape='\\')."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _trigrams(value: str) -> set:
+    """Trigramas por palabra con el padding de pg_trgm."""
+    grams = set()
+    for word in re.findall(r"\w+", value.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _word_similarity(query: str, document: str) -> float:
+    """Fracción de trigramas de la query presentes en el documento."""
+    query_grams = _trigrams(query)
+    if not query_grams:
+        return 0.0
+    return len(query_grams & _trigrams(document)) / len(query_grams)
+
 
 class UserManagementService:
     """
@@ -558,16 +594,25 @@ class UserManagementService:
         limit: int = 10
     ) -> List[User]:
         """
-        Busca usuarios por username o user_id.
+        Busca usuarios por user_id, username, nombre o apellido.
+
+        Con el índice de búsqueda (ver bot/database/search_index.py) los
+        resultados salen rankeados: coincidencia exacta de username, luego
+        prefijo, luego relevancia; si faltan resultados se completan con
+        coincidencias aproximadas (trigramas). Sin índice se usa ILIKE.
 
         Args:
-            query: Query de búsqueda (username o user_id como string)
+            query: Query de búsqueda (username, nombre o user_id como string)
             limit: Máximo de resultados
 
         Returns:
             Lista de usuarios coincidentes
         """
         try:
+            query = query.strip().lstrip("@")
+            if not query:
+                return []
+
             # Try to parse as user_id
             try:
                 user_id = int(query)
@@ -577,21 +622,134 @@ class UserManagementService:
                 if user:
                     return [user]
             except ValueError:
-                pass  # Not a number, search by username
+                pass  # Not a number, search by text
 
-            # Search by username
-            username_query = f"%{query}%"
-            stmt = select(User).where(
-                User.username.ilike(username_query)
-            ).limit(limit)
+            dialect = self.session.bind.dialect.name
+            if await self._has_search_index():
+                if dialect == "sqlite" and all(len(term) >= 3 for term in query.split()):
+                    return await self._search_users_fts(query, limit)
+                if dialect == "postgresql":
+                    return await self._search_users_trgm(query, limit)
 
-            result = await self.session.execute(stmt)
-            return result.scalars().all()
+            return await self._search_users_like(query, limit)
 
         except Exception as e:
             logger.error(f"Error searching users with query '{query}': {e}", exc_info=True)
             return []
 
+    async def _has_search_index(self) -> bool:
+        """Verifica (una vez por engine) si existe el índice de búsqueda."""
+        engine = self.session.bind.sync_engine
+        available = _search_index_available.get(engine)
+        if available is None:
+            available = await self.session.run_sync(
+                lambda sync_session: has_user_search_index(sync_session.connection())
+            )
+            _search_index_available[engine] = available
+        return available
+
+    async def _load_users_in_order(self, user_ids: List[int]) -> List[User]:
+        """Carga usuarios por ID respetando el orden de ranking."""
+        if not user_ids:
+            return []
+        result = await self.session.execute(select(User).where(User.user_id.in_(user_ids)))
+        by_id = {user.user_id: user for user in result.scalars().all()}
+        return [by_id[user_id] for user_id in user_ids if user_id in by_id]
+
+    async def _search_users_fts(self, query: str, limit: int) -> List[User]:
+        """Búsqueda FTS5 (SQLite): substrings rankeados + completado fuzzy."""
+        terms = query.split()
+        match = " AND ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+        result = await self.session.execute(
+            text(
+                f"SELECT rowid FROM {USER_SEARCH_FTS_TABLE} "
+                f"WHERE {USER_SEARCH_FTS_TABLE} MATCH :match "
+                f"ORDER BY (lower(username) = lower(:exact)) DESC, "
+                f"(username LIKE :prefix ESCAPE '\\') DESC, "
+                f"bm25({USER_SEARCH_FTS_TABLE}, 3.0, 1.0, 1.0) "
+                f"LIMIT :limit"
+            ),
+            {"match": match, "exact": query, "prefix": f"{_escape_like(query)}%", "limit": limit}
+        )
+        user_ids = [row[0] for row in result]
+
+        if len(user_ids) < limit:
+            user_ids += await self._fuzzy_fts_candidates(query, limit - len(user_ids), set(user_ids))
+
+        return await self._load_users_in_order(user_ids)
+
+    async def _fuzzy_fts_candidates(self, query: str, limit: int, exclude: set) -> List[int]:
+        """Candidatos aproximados: comparten trigramas con la query (umbral tipo pg_trgm)."""
+        grams = {
+            word[i:i + 3]
+            for word in re.findall(r"\w+", query.lower())
+            for i in range(len(word) - 2)
+        }
+        if not grams:
+            return []
+
+        match = " OR ".join(f'"{gram}"' for gram in sorted(grams))
+        result = await self.session.execute(
+            text(
+                f"SELECT rowid, username, first_name, last_name FROM {USER_SEARCH_FTS_TABLE} "
+                f"WHERE {USER_SEARCH_FTS_TABLE} MATCH :match "
+                f"ORDER BY bm25({USER_SEARCH_FTS_TABLE}, 3.0, 1.0, 1.0) LIMIT :candidates"
+            ),
+            {"match": match, "candidates": limit * FUZZY_SEARCH_CANDIDATES_FACTOR}
+        )
+
+        scored = []
+        for row in result:
+            if row[0] in exclude:
+                continue
+            document = " ".join(filter(None, row[1:]))
+            similarity = _word_similarity(query, document)
+            if similarity >= FUZZY_SEARCH_THRESHOLD:
+                scored.append((similarity, row[0]))
+
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [user_id for _, user_id in scored[:limit]]
+
+    async def _search_users_trgm(self, query: str, limit: int) -> List[User]:
+        """Búsqueda pg_trgm (PostgreSQL): substring o similitud por palabra."""
+        document = literal_column(USER_SEARCH_DOCUMENT_SQL)
+        search = literal(query)
+
+        stmt = (
+            select(User)
+            .where(or_(
+                document.ilike(f"%{_escape_like(query)}%", escape="\\"),
+                search.op("<%")(document)
+            ))
+            .order_by(
+                (func.lower(User.username) == query.lower()).desc(),
+                User.username.ilike(f"{_escape_like(query)}%", escape="\\").desc(),
+                func.word_similarity(search, document).desc()
+            )
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def _search_users_like(self, query: str, limit: int) -> List[User]:
+        """Búsqueda sin índice (ILIKE sobre username y nombres)."""
+        pattern = f"%{_escape_like(query)}%"
+        prefix = f"{_escape_like(query)}%"
+
+        stmt = (
+            select(User)
+            .where(or_(
+                User.username.ilike(pattern, escape="\\"),
+                User.first_name.ilike(pattern, escape="\\"),
+                User.last_name.ilike(pattern, escape="\\")
+            ))
+            .order_by(User.username.ilike(prefix, escape="\\").desc(), User.user_id)
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
     def is_super_admin(self, user_id: int) -> bool:
         """
         Verifica si un usuario es el super admin.
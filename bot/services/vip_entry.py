@@ -18,6 +18,7 @@ from typing import Optional, Tuple
 from aiogram import Bot
 from aiogram.types import ChatInviteLink
 from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.database.models import VIPSubscriber, User
@@ -157,7 +158,7 @@ class VIPEntryService:
 
         El token:
         - Tiene 64 caracteres (token_urlsafe)
-        - Es único (verifica duplicados)
+        - Es único (garantizado por el índice único de vip_entry_token)
         - Se almacena en vip_entry_token field
         - Se usa para validar enlace de un solo uso
 
@@ -176,26 +177,25 @@ class VIPEntryService:
             # Generate random token (64 characters from token_urlsafe(48))
             token = secrets.token_urlsafe(48)
 
-            # Check uniqueness
-            result = await self.session.execute(
-                select(VIPSubscriber).where(VIPSubscriber.vip_entry_token == token)
-            )
-            existing = result.scalar_one_or_none()
-
-            if not existing:
-                # Token is unique - store it
-                subscriber_result = await self.session.execute(
-                    select(VIPSubscriber).where(VIPSubscriber.user_id == user_id)
-                )
-                subscriber = subscriber_result.scalar_one_or_none()
-
-                if subscriber:
-                    subscriber.vip_entry_token = token
-                    logger.info(f"✅ Entry token generated for user {user_id}")
-                    return token
-                else:
-                    logger.error(f"❌ VIPSubscriber not found for user {user_id}")
-                    raise RuntimeError("Subscriber not found")
+            # Uniqueness is enforced by the unique index: a single UPDATE
+            # stores the token, a collision rolls back only the savepoint
+            try:
+                async with self.session.begin_nested():
+                    result = await self.session.execute(
+                        update(VIPSubscriber)
+                        .where(VIPSubscriber.user_id == user_id)
+                        .values(vip_entry_token=token)
+                    )
+            except IntegrityError:
+                logger.warning(f"⚠️ Duplicate entry token generated (attempt {attempt + 1})")
+                continue
+
+            if result.rowcount == 0:
+                logger.error(f"❌ VIPSubscriber not found for user {user_id}")
+                raise RuntimeError("Subscriber not found")
+
+            logger.info(f"✅ Entry token generated for user {user_id}")
+            return token
 
         # Could not generate unique token
         logger.error(f"❌ Failed to generate unique token after {max_attempts} attempts")
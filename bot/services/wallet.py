@@ -6,6 +6,7 @@ Responsabilidades:
 - Registro de transacciones (audit trail)
 - Cálculo de niveles basado en total_earned
 - Historial de transacciones con paginación
+- Airdrops masivos de besitos a segmentos de usuarios
 
 Patrones:
 - Operaciones atómicas usando UPDATE SET (no read-modify-write)
@@ -15,19 +16,25 @@ Patrones:
 import logging
 import math
 import re
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Tuple, Any
 
-from sqlalchemy import select, update, func
+from sqlalchemy import select, update, insert, func, case
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from bot.database.models import UserGamificationProfile, Transaction
-from bot.database.enums import TransactionType
+from bot.database.dialect import dialect_insert
+from bot.database.models import (
+    UserGamificationProfile, Transaction, BesitosAirdrop, VIPSubscriber, UserReaction
+)
+from bot.database.enums import TransactionType, AirdropSegment
 from bot.services.simulation import SimulationStore
 
 logger = logging.getLogger(__name__)
 
+# Usuarios acreditados por statement en airdrops masivos
+AIRDROP_CHUNK_SIZE = 1000
+
 
 class WalletService:
     """
@@ -452,6 +459,328 @@ class WalletService:
         else:
             return False, msg, None
 
+    # ===== AIRDROPS MASIVOS =====
+
+    async def get_airdrop(self, campaign_key: str) -> Optional[BesitosAirdrop]:
+        """
+        Obtiene una campaña de airdrop por su clave.
+
+        Args:
+            campaign_key: Clave de idempotencia de la campaña
+
+        Returns:
+            BesitosAirdrop si existe, None si no
+        """
+        result = await self.session.execute(
+            select(BesitosAirdrop).where(BesitosAirdrop.campaign_key == campaign_key)
+        )
+        return result.scalar_one_or_none()
+
+    async def create_airdrop(
+        self,
+        campaign_key: str,
+        segment: AirdropSegment,
+        amount: int,
+        reason: str,
+        admin_id: int,
+        min_level: Optional[int] = None
+    ) -> Tuple[bool, str, Optional[BesitosAirdrop]]:
+        """
+        Registra una campaña de airdrop masivo (idempotente por clave).
+
+        Si ya existe una campaña con la misma clave se retorna la existente
+        sin crear otra: relanzarla reanuda desde su cursor y nunca acredita
+        dos veces al mismo usuario.
+
+        Args:
+            campaign_key: Clave única de la campaña
+            segment: Segmento de usuarios a acreditar
+            amount: Besitos por usuario (debe ser > 0)
+            reason: Descripción registrada en cada transacción
+            admin_id: Admin que lanza la campaña (para audit)
+            min_level: Nivel mínimo (requerido para AirdropSegment.MIN_LEVEL)
+
+        Returns:
+            Tuple[bool, str, Optional[BesitosAirdrop]]:
+                - bool: True si la campaña existe tras la llamada
+                - str: "created", "exists", "invalid_amount", "invalid_level"
+                  o mensaje de bloqueo por simulación
+                - Optional[BesitosAirdrop]: Campaña creada o existente
+        """
+        # Safety: Block during simulation (even for admins)
+        is_blocked, error_msg = self._check_simulation_block(admin_id, "lanzar airdrops")
+        if is_blocked:
+            logger.warning(f"Blocked create_airdrop for admin {admin_id} during simulation")
+            return False, error_msg, None
+
+        if amount <= 0:
+            return False, "invalid_amount", None
+
+        if segment == AirdropSegment.MIN_LEVEL and (min_level is None or min_level < 1):
+            return False, "invalid_level", None
+
+        existing = await self.get_airdrop(campaign_key)
+        if existing is not None:
+            return True, "exists", existing
+
+        airdrop = BesitosAirdrop(
+            campaign_key=campaign_key,
+            segment=segment.value,
+            min_level=min_level if segment == AirdropSegment.MIN_LEVEL else None,
+            amount=amount,
+            reason=reason,
+            admin_id=admin_id,
+            status="pending"
+        )
+        try:
+            # Savepoint: un duplicado solo revierte este INSERT, no la sesión del caller
+            async with self.session.begin_nested():
+                self.session.add(airdrop)
+                await self.session.flush()
+        except IntegrityError:
+            # Otro admin registró la misma clave concurrentemente
+            existing = await self.get_airdrop(campaign_key)
+            return existing is not None, "exists", existing
+
+        self.logger.info(
+            f"✅ Airdrop '{campaign_key}' registrado por admin {admin_id}: "
+            f"{amount} besitos a {segment.value}"
+        )
+        return True, "created", airdrop
+
+    async def claim_airdrop(self, campaign_key: str) -> Optional[BesitosAirdrop]:
+        """
+        Reclama una campaña para ejecutarla (pending/failed → running).
+
+        El UPDATE condicional garantiza que un solo runner acredite la
+        campaña aunque se lance desde dos procesos a la vez. Una campaña
+        fallida puede reclamarse de nuevo para reanudarla desde su cursor.
+
+        Args:
+            campaign_key: Clave de la campaña
+
+        Returns:
+            BesitosAirdrop reclamado, o None si no existe o ya está en curso/completado
+        """
+        result = await self.session.execute(
+            update(BesitosAirdrop)
+            .where(
+                BesitosAirdrop.campaign_key == campaign_key,
+                BesitosAirdrop.status.in_(("pending", "failed"))
+            )
+            .values(status="running")
+            .returning(BesitosAirdrop.id)
+            .execution_options(synchronize_session=False)
+        )
+        if result.scalar_one_or_none() is None:
+            return None
+
+        airdrop = await self.get_airdrop(campaign_key)
+        await self.session.refresh(airdrop)
+        return airdrop
+
+    async def fail_interrupted_airdrops(self, exclude_keys: Optional[List[str]] = None) -> int:
+        """
+        Marca como fallidas las campañas que quedaron en "running" por un reinicio.
+
+        Un proceso que muere a mitad de campaña (SIGKILL, OOM, redeploy) no
+        pasa por el except del runner: sin esto la campaña quedaría reclamada
+        para siempre. Como el cursor se guarda con cada chunk, relanzar la
+        clave la reanuda sin acreditar dos veces.
+
+        Args:
+            exclude_keys: Campañas con runner vivo en este proceso
+
+        Returns:
+            int: Campañas marcadas
+        """
+        query = update(BesitosAirdrop).where(BesitosAirdrop.status == "running")
+        if exclude_keys:
+            query = query.where(BesitosAirdrop.campaign_key.not_in(exclude_keys))
+        result = await self.session.execute(
+            query
+            .values(status="failed")
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            self.logger.warning(f"⚠️ {result.rowcount} airdrop(s) interrumpidos por reinicio")
+        return result.rowcount
+
+    def _airdrop_recipients_query(self, airdrop: BesitosAirdrop):
+        """
+        Construye el SELECT de user_ids del segmento pendientes de acreditar.
+
+        Los user_ids salen ordenados y filtrados por el cursor keyset
+        (user_id > last_user_id) para recorrer el segmento por chunks.
+
+        Args:
+            airdrop: Campaña de airdrop
+
+        Returns:
+            Select de una columna user_id
+        """
+        segment = AirdropSegment(airdrop.segment)
+
+        if segment == AirdropSegment.ACTIVE_VIP:
+            user_id_col = VIPSubscriber.user_id
+            query = select(user_id_col).where(VIPSubscriber.status == "active")
+        elif segment == AirdropSegment.MIN_LEVEL:
+            user_id_col = UserGamificationProfile.user_id
+            query = select(user_id_col).where(
+                UserGamificationProfile.level >= airdrop.min_level
+            )
+        else:
+            # Ventana anclada a la creación: reanudar no cambia el segmento
+            since = airdrop.created_at - timedelta(days=7)
+            user_id_col = UserReaction.user_id
+            query = (
+                select(user_id_col)
+                .where(UserReaction.created_at >= since)
+                .group_by(user_id_col)
+            )
+
+        return query.where(user_id_col > airdrop.last_user_id).order_by(user_id_col)
+
+    async def count_airdrop_recipients(self, airdrop: BesitosAirdrop) -> int:
+        """
+        Cuenta los usuarios del segmento que aún no han sido acreditados.
+
+        Args:
+            airdrop: Campaña de airdrop
+
+        Returns:
+            int: Usuarios pendientes
+        """
+        pending = self._airdrop_recipients_query(airdrop).order_by(None).subquery()
+        result = await self.session.execute(select(func.count()).select_from(pending))
+        return result.scalar_one()
+
+    async def credit_airdrop_chunk(
+        self,
+        airdrop: BesitosAirdrop,
+        chunk_size: int = AIRDROP_CHUNK_SIZE
+    ) -> int:
+        """
+        Acredita el siguiente chunk de usuarios de una campaña.
+
+        Por chunk se ejecutan statements set-based, sin cargar perfiles:
+        1. SELECT de hasta chunk_size user_ids del segmento (keyset)
+        2. INSERT multi-fila de perfiles faltantes (ON CONFLICT DO NOTHING)
+        3. UPDATE único de balance/total_earned con RETURNING
+        4. UPDATE único de nivel (CASE) solo para quienes suben de nivel
+        5. INSERT multi-fila de transacciones EARN_ADMIN
+        6. Avance del cursor de la campaña
+
+        El caller debe hacer commit después de cada chunk para que créditos
+        y cursor se persistan juntos.
+
+        Args:
+            airdrop: Campaña de airdrop (se actualiza in-place)
+            chunk_size: Máximo de usuarios por chunk
+
+        Returns:
+            int: Usuarios acreditados en este chunk (0 = campaña completada)
+        """
+        if airdrop.is_completed:
+            return 0
+
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+        result = await self.session.execute(
+            self._airdrop_recipients_query(airdrop).limit(chunk_size)
+        )
+        user_ids = list(result.scalars().all())
+
+        if not user_ids:
+            airdrop.status = "completed"
+            airdrop.completed_at = now
+            await self.session.flush()
+            self.logger.info(
+                f"✅ Airdrop '{airdrop.campaign_key}' completado: "
+                f"{airdrop.credited_count} usuarios acreditados"
+            )
+            return 0
+
+        # Perfiles faltantes (usuarios VIP/reactores sin perfil todavía)
+        await self.session.execute(
+            dialect_insert(self.session, UserGamificationProfile)
+            .values([
+                {
+                    "user_id": user_id,
+                    "balance": 0,
+                    "total_earned": 0,
+                    "total_spent": 0,
+                    "level": 1,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for user_id in user_ids
+            ])
+            .on_conflict_do_nothing(index_elements=["user_id"])
+        )
+
+        result = await self.session.execute(
+            update(UserGamificationProfile)
+            .where(UserGamificationProfile.user_id.in_(user_ids))
+            .values(
+                balance=UserGamificationProfile.balance + airdrop.amount,
+                total_earned=UserGamificationProfile.total_earned + airdrop.amount,
+                updated_at=now
+            )
+            .returning(
+                UserGamificationProfile.user_id,
+                UserGamificationProfile.total_earned,
+                UserGamificationProfile.level
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        new_levels = {}
+        for user_id, total_earned, level in result.all():
+            new_level = self._evaluate_level_formula(total_earned, None)
+            if new_level != level:
+                new_levels[user_id] = new_level
+
+        if new_levels:
+            await self.session.execute(
+                update(UserGamificationProfile)
+                .where(UserGamificationProfile.user_id.in_(list(new_levels)))
+                .values(level=case(new_levels, value=UserGamificationProfile.user_id))
+                .execution_options(synchronize_session=False)
+            )
+
+        metadata = {
+            "admin_id": airdrop.admin_id,
+            "action": "airdrop",
+            "campaign_key": airdrop.campaign_key,
+        }
+        await self.session.execute(
+            insert(Transaction),
+            [
+                {
+                    "user_id": user_id,
+                    "amount": airdrop.amount,
+                    "type": TransactionType.EARN_ADMIN,
+                    "reason": airdrop.reason,
+                    "transaction_metadata": metadata,
+                    "created_at": now,
+                }
+                for user_id in user_ids
+            ]
+        )
+
+        airdrop.status = "running"
+        airdrop.credited_count += len(user_ids)
+        airdrop.last_user_id = user_ids[-1]
+        await self.session.flush()
+
+        self.logger.debug(
+            f"Airdrop '{airdrop.campaign_key}': chunk de {len(user_ids)} usuarios "
+            f"acreditado ({len(new_levels)} subidas de nivel)"
+        )
+
+        return len(user_ids)
+
     async def get_transaction_history(
         self,
         user_id: int,
@@ -61,6 +61,7 @@ class BroadcastStates(StatesGroup):
     5. Bot muestra preview y entra en waiting_for_confirmation
     6. Admin confirma o cancela
     7. Si confirma: Bot envía al canal(es) y sale del estado
+       (o, si programa, pasa a waiting_for_schedule_time)
     8. Si cancela: Bot vuelve a waiting_for_content o sale
 
     Estados adicionales para reacciones (ONDA 2):
@@ -86,6 +87,9 @@ class BroadcastStates(StatesGroup):
     # Estado 4: Seleccionando reacciones a aplicar (NUEVO - T23)
     selecting_reactions = State()
 
+    # Estado 5: Esperando fecha/hora para programar la publicación
+    waiting_for_schedule_time = State()
+
 
 class ReactionSetupStates(StatesGroup):
     """
@@ -184,6 +188,7 @@ class ContentPackageStates(StatesGroup):
     - waiting_for_price: Esperando precio (número o /skip) - CREACIÓN
     - waiting_for_description: Esperando descripción (texto o /skip) - CREACIÓN
     - waiting_for_edit: Esperando nuevo valor de campo (inline prompt) - EDICIÓN
+    - waiting_for_search: Esperando texto de búsqueda - BÚSQUEDA
     """
 
     # ===== CREACIÓN (4-step wizard) =====
@@ -205,6 +210,11 @@ class ContentPackageStates(StatesGroup):
     # Para editar campos de paquetes existentes (name, price, description)
     waiting_for_edit = State()  # For inline prompt editing
 
+    # ===== BÚSQUEDA =====
+
+    # Esperando texto de búsqueda (full-text sobre nombre y descripción)
+    waiting_for_search = State()
+
 
 class UserManagementStates(StatesGroup):
     """
@@ -353,3 +363,17 @@ class ContentSetCreateState(StatesGroup):
     waiting_for_tier = State()
     waiting_for_files = State()
     waiting_for_confirmation = State()
+
+
+class ContentSetSearchState(StatesGroup):
+    """
+    States for ContentSet search.
+
+    Flujo:
+    1. Admin selecciona "Buscar ContentSets"
+    2. Bot entra en waiting_for_query
+    3. Admin envía el texto a buscar
+    4. Bot muestra resultados paginados y sale del estado
+       (la query queda en FSM data para navegar las páginas)
+    """
+    waiting_for_query = State()
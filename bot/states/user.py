@@ -74,3 +74,19 @@ class StreakStates(StatesGroup):
 
     # Regalo reclamado, mostrando tiempo hasta próximo reclamo
     daily_gift_claimed = State()
+
+
+class ShopSearchStates(StatesGroup):
+    """
+    Estados para la búsqueda en la tienda.
+
+    Flujo:
+    1. Usuario presiona "Buscar" en el catálogo
+    2. Bot entra en waiting_for_query
+    3. Usuario envía el texto a buscar
+    4. Bot muestra resultados paginados y sale del estado
+       (la query queda en FSM data para navegar las páginas)
+    """
+
+    # Esperando texto de búsqueda
+    waiting_for_query = State()
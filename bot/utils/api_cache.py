@@ -0,0 +1,171 @@
+"""
+API Cache - Coalescing y caché corto de lecturas idempotentes de la Bot API.
+
+En una ráfaga de updates varios handlers y middlewares piden el mismo dato
+remoto (get_chat_member del canal VIP en la detección de rol, get_chat del
+canal Free en las aprobaciones, get_chat/get_chat_member_count en los
+paneles de admin). Este módulo evita repetir esas llamadas:
+
+- Single-flight: llamadas idénticas concurrentes comparten una sola request
+- TTL: el resultado se reutiliza unos segundos
+- Invalidación: ban/unban/aprobación/promoción de un miembro descartan
+  su get_chat_member cacheado
+- Métricas hit/miss/coalesced por método
+
+Uso (main.py, antes del rate limiter para que un hit no consuma presupuesto):
+    session = AiohttpSession(timeout=10)
+    session.middleware(TelegramReadCache())
+    session.middleware(TelegramRateLimiter())
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+
+logger = logging.getLogger(__name__)
+
+
+class TelegramReadCache(BaseRequestMiddleware):
+    """
+    Request middleware con single-flight + TTL para lecturas de la Bot API.
+
+    Solo se cachean los métodos de CACHEABLE_METHODS; cualquier otra
+    request pasa directo. Los errores no se cachean, pero sí se comparten
+    entre las llamadas que estaban esperando la misma request.
+    """
+
+    # Método de la Bot API → TTL en segundos
+    CACHEABLE_METHODS: Dict[str, float] = {
+        "getChat": 60.0,
+        "getChatMember": 10.0,
+        "getChatMemberCount": 30.0,
+        "getChatAdministrators": 60.0,
+    }
+
+    # Métodos que cambian la membresía de (chat_id, user_id)
+    MEMBER_MUTATING_METHODS = frozenset({
+        "banChatMember", "unbanChatMember", "restrictChatMember",
+        "promoteChatMember", "approveChatJoinRequest", "declineChatJoinRequest",
+    })
+
+    MAX_ENTRIES = 5000
+
+    def __init__(self, ttl_overrides: Optional[Dict[str, float]] = None):
+        """
+        Inicializa la caché.
+
+        Args:
+            ttl_overrides: TTL por método que reemplaza los defaults
+                (un TTL de 0 desactiva la caché del método)
+        """
+        self.ttls = {**self.CACHEABLE_METHODS, **(ttl_overrides or {})}
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def _key(api_method: str, method: Any) -> Hashable:
+        """Clave estable de la request: método + parámetros."""
+        if api_method == "getChatMember":
+            return api_method, str(method.chat_id), str(method.user_id)
+        return api_method, method.model_dump_json(exclude_none=True)
+
+    def _count(self, api_method: str, field: str) -> None:
+        counters = self._stats.setdefault(api_method, {"hits": 0, "misses": 0, "coalesced": 0})
+        counters[field] += 1
+
+    def _get_fresh(self, key: Hashable) -> Tuple[bool, Any]:
+        """Retorna (True, valor) si la entrada existe y no venció."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False, None
+
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _store(self, key: Hashable, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.MAX_ENTRIES:
+            self._entries.popitem(last=False)
+
+    def invalidate_member(self, chat_id: Any, user_id: Any) -> None:
+        """
+        Descarta el get_chat_member cacheado de un usuario en un chat.
+
+        Args:
+            chat_id: ID del chat
+            user_id: ID del usuario
+        """
+        self._entries.pop(("getChatMember", str(chat_id), str(user_id)), None)
+
+    def clear(self) -> None:
+        """Vacía la caché (no afecta requests en vuelo)."""
+        self._entries.clear()
+
+    async def __call__(self, make_request, bot, method):
+        """
+        Resuelve la request desde la caché, una request en vuelo o la Bot API.
+
+        Args:
+            make_request: Siguiente eslabón de la cadena de middlewares
+            bot: Instancia del bot
+            method: Método de la Bot API
+
+        Returns:
+            Response de la Bot API
+        """
+        api_method = method.__api_method__
+
+        if api_method in self.MEMBER_MUTATING_METHODS:
+            try:
+                return await make_request(bot, method)
+            finally:
+                self.invalidate_member(getattr(method, "chat_id", None), getattr(method, "user_id", None))
+
+        ttl = self.ttls.get(api_method)
+        if not ttl:
+            return await make_request(bot, method)
+
+        key = self._key(api_method, method)
+
+        found, value = self._get_fresh(key)
+        if found:
+            self._count(api_method, "hits")
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._count(api_method, "coalesced")
+            return await asyncio.shield(inflight)
+
+        self._count(api_method, "misses")
+        # La request corre en su propia task: si el llamador que la originó
+        # se cancela, los demás que esperan el mismo resultado no se afectan
+        task = asyncio.ensure_future(make_request(bot, method))
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._finish(key, ttl, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, ttl: float, task: asyncio.Future) -> None:
+        """Cierra una request en vuelo y cachea el resultado si fue exitosa."""
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self._store(key, task.result(), ttl)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Métricas por método de la Bot API.
+
+        Returns:
+            Dict método → {hits, misses, coalesced}
+        """
+        return {method: dict(counters) for method, counters in self._stats.items()}
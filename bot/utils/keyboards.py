@@ -3,20 +3,139 @@ Keyboard Factory - Generador de teclados inline.
 
 Funciones:
 - create_inline_keyboard: Crea teclado a partir de estructura de botones
+- get_cached_keyboard: Igual, memoizado por contenido (menús frecuentes)
 - create_menu_navigation: Crea filas de navegación estándar (Volver/Salir)
 - create_content_with_navigation: Combina contenido con navegación
 - get_reaction_keyboard: Genera teclado de reacciones para contenido
 - get_simulation_mode_keyboard: Genera teclado selector de modo de simulación
 
 Centraliza la creación de keyboards para consistencia visual y navegación.
+
+Memoización:
+- Los teclados estáticos (menús admin, stats, config) se construyen una sola
+  vez por proceso (@static_keyboard)
+- Los parametrizados (reacciones, Sí/No, simulación) se cachean en un LRU
+  por sus entradas normalizadas
+- Los InlineKeyboardMarkup devueltos son compartidos: NO mutarlos.
+  Para añadir filas, construir un teclado nuevo.
 """
-from typing import List, Optional
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
 
 # Default reactions for content
 DEFAULT_REACTIONS = ["❤️", "🔥", "💋", "😈"]
 
+# Tamaño del LRU de teclados de reacción (uno por mensaje y conteos)
+REACTION_KEYBOARD_CACHE_SIZE = 2048
+
+# Builders memoizados registrados (nombre → función con cache_info/cache_clear)
+_keyboard_registry: Dict[str, Callable] = {}
+
+
+def static_keyboard(builder: Callable[[], InlineKeyboardMarkup]) -> Callable[[], InlineKeyboardMarkup]:
+    """
+    Decorador: construye el teclado una vez y devuelve siempre la misma instancia.
+
+    Args:
+        builder: Función sin argumentos que construye el teclado
+
+    Returns:
+        Función memoizada (registrada en keyboard_cache_stats)
+    """
+    return cached_keyboard(maxsize=None)(builder)
+
+
+def cached_keyboard(maxsize: Optional[int] = 128) -> Callable:
+    """
+    Decorador: cachea en un LRU los teclados por sus argumentos (hashables).
+
+    Args:
+        maxsize: Tamaño del LRU (None = sin límite, para dominios finitos)
+
+    Returns:
+        Decorador que memoiza y registra el builder
+    """
+    def decorator(builder: Callable) -> Callable:
+        cached = lru_cache(maxsize=maxsize)(builder)
+        _keyboard_registry[builder.__qualname__] = cached
+        return cached
+    return decorator
+
+
+def keyboard_cache_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Estadísticas de los teclados memoizados.
+
+    Returns:
+        Dict {builder: {hits, misses, size}}
+    """
+    stats = {}
+    for name, cached in _keyboard_registry.items():
+        info = cached.cache_info()
+        stats[name] = {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+    return stats
+
+
+def clear_keyboard_cache() -> None:
+    """Vacía todos los teclados memoizados (útil en tests)."""
+    for cached in _keyboard_registry.values():
+        cached.cache_clear()
+
+
+def _reaction_callback_data(channel_id: str, content_id: int, emoji: str) -> str:
+    """Callback data de un botón de reacción (formato corto si excede 64 bytes)."""
+    # Callback data format: react:{channel_id}:{content_id}:{emoji}
+    # Note: channel_id may contain -100 prefix, keep as-is
+    callback_data = f"react:{channel_id}:{content_id}:{emoji}"
+
+    # Telegram callback_data limit is 64 bytes
+    if len(callback_data.encode('utf-8')) > 64:
+        # Fallback: use shortened format
+        callback_data = f"r:{content_id}:{emoji}"
+
+    return callback_data
+
+
+@cached_keyboard(maxsize=REACTION_KEYBOARD_CACHE_SIZE)
+def _build_reaction_keyboard(
+    content_id: int,
+    channel_id: str,
+    reactions: Tuple[str, ...],
+    counts: Tuple[int, ...],
+    reacted: Tuple[bool, ...]
+) -> InlineKeyboardMarkup:
+    """
+    Construye el teclado de reacciones a partir de entradas normalizadas.
+
+    Args:
+        content_id: ID del mensaje/contenido
+        channel_id: ID del canal
+        reactions: Emojis en orden
+        counts: Conteo por emoji (mismo orden)
+        reacted: Si el usuario reaccionó con cada emoji (mismo orden)
+
+    Returns:
+        InlineKeyboardMarkup (compartido, no mutar)
+    """
+    buttons = []
+    for emoji, count, marked in zip(reactions, counts, reacted):
+        # Format: "✓❤️ 5" or "❤️ 5" or "✓❤️" or "❤️"
+        text = f"✓{emoji}" if marked else emoji
+        if count > 0:
+            text = f"{text} {count}"
+
+        buttons.append(InlineKeyboardButton(
+            text=text,
+            callback_data=_reaction_callback_data(channel_id, content_id, emoji)
+        ))
+
+    # Arrange in rows of 4 buttons
+    keyboard = [buttons[i:i+4] for i in range(0, len(buttons), 4)]
+
+    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+
 
 def get_reaction_keyboard(
     content_id: int,
@@ -34,7 +153,8 @@ def get_reaction_keyboard(
         current_counts: Dict {emoji: count} con conteos actuales
 
     Returns:
-        InlineKeyboardMarkup con botones de reacción
+        InlineKeyboardMarkup con botones de reacción (cacheado por
+        contenido, canal y conteos: no mutar)
 
     Example:
         keyboard = get_reaction_keyboard(
@@ -49,33 +169,15 @@ def get_reaction_keyboard(
     if current_counts is None:
         current_counts = {}
 
-    # Build buttons row
-    buttons = []
-    for emoji in reactions:
-        count = current_counts.get(emoji, 0)
-        # Format: "❤️ 5" or just "❤️" if no reactions
-        text = f"{emoji} {count}" if count > 0 else emoji
-
-        # Callback data format: react:{channel_id}:{content_id}:{emoji}
-        # Note: channel_id may contain -100 prefix, keep as-is
-        callback_data = f"react:{channel_id}:{content_id}:{emoji}"
-
-        # Telegram callback_data limit is 64 bytes
-        # If too long, use hash or shorter format
-        if len(callback_data.encode('utf-8')) > 64:
-            # Fallback: use shortened format
-            callback_data = f"r:{content_id}:{emoji}"
-
-        buttons.append(
-            InlineKeyboardButton(text=text, callback_data=callback_data)
-        )
-
-    # Arrange in rows of 4 buttons
-    keyboard = []
-    for i in range(0, len(buttons), 4):
-        keyboard.append(buttons[i:i+4])
-
-    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+    # Clave normalizada: solo los conteos de los emojis mostrados
+    reactions = tuple(reactions)
+    return _build_reaction_keyboard(
+        content_id,
+        str(channel_id),
+        reactions,
+        tuple(current_counts.get(emoji, 0) for emoji in reactions),
+        (False,) * len(reactions)
+    )
 
 
 def get_reaction_keyboard_with_counts(
@@ -97,43 +199,19 @@ def get_reaction_keyboard_with_counts(
 
     Returns:
         InlineKeyboardMarkup con indicación visual y conteos de reacciones
+        (cacheado: no mutar)
     """
     if counts is None:
         counts = {}
 
-    buttons = []
-    for emoji in reactions:
-        # Get count for this emoji
-        count = counts.get(emoji, 0)
-
-        # Build button text: show count and mark if user reacted
-        # Format: "✓❤️ 5" or "❤️ 5" or "✓❤️" or "❤️"
-        if emoji in user_reactions:
-            if count > 0:
-                text = f"✓{emoji} {count}"
-            else:
-                text = f"✓{emoji}"
-        else:
-            if count > 0:
-                text = f"{emoji} {count}"
-            else:
-                text = emoji
-
-        callback_data = f"react:{channel_id}:{content_id}:{emoji}"
-
-        # Handle length limit
-        if len(callback_data.encode('utf-8')) > 64:
-            callback_data = f"r:{content_id}:{emoji}"
-
-        buttons.append(
-            InlineKeyboardButton(text=text, callback_data=callback_data)
-        )
-
-    keyboard = []
-    for i in range(0, len(buttons), 4):
-        keyboard.append(buttons[i:i+4])
-
-    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+    reactions = tuple(reactions)
+    return _build_reaction_keyboard(
+        content_id,
+        str(channel_id),
+        reactions,
+        tuple(counts.get(emoji, 0) for emoji in reactions),
+        tuple(emoji in user_reactions for emoji in reactions)
+    )
 
 
 def create_inline_keyboard(
@@ -185,6 +263,7 @@ def create_inline_keyboard(
     return InlineKeyboardMarkup(inline_keyboard=inline_keyboard, **kwargs)
 
 
+@static_keyboard
 def admin_main_menu_keyboard() -> InlineKeyboardMarkup:
     """
     Keyboard del menú principal de admin.
@@ -210,6 +289,7 @@ def admin_main_menu_keyboard() -> InlineKeyboardMarkup:
     ])
 
 
+@static_keyboard
 def back_to_main_menu_keyboard() -> InlineKeyboardMarkup:
     """
     Keyboard con solo botón "Volver al menú principal".
@@ -224,6 +304,7 @@ def back_to_main_menu_keyboard() -> InlineKeyboardMarkup:
     ])
 
 
+@static_keyboard
 def stats_menu_keyboard() -> InlineKeyboardMarkup:
     """
     Keyboard del menú de estadísticas.
@@ -247,6 +328,7 @@ def stats_menu_keyboard() -> InlineKeyboardMarkup:
     ])
 
 
+@cached_keyboard(maxsize=256)
 def yes_no_keyboard(
     yes_callback: str,
     no_callback: str
@@ -269,6 +351,7 @@ def yes_no_keyboard(
     ])
 
 
+@static_keyboard
 def config_menu_keyboard() -> InlineKeyboardMarkup:
     """
     Keyboard del menú de configuración.
@@ -292,6 +375,48 @@ def config_menu_keyboard() -> InlineKeyboardMarkup:
     ])
 
 
+@cached_keyboard(maxsize=256)
+def _build_keyboard_from_rows(
+    rows: Tuple[Tuple[Tuple[str, str, str], ...], ...]
+) -> InlineKeyboardMarkup:
+    """Construye el teclado desde filas normalizadas (text, tipo, valor)."""
+    return create_inline_keyboard([
+        [{"text": text, kind: value} for text, kind, value in row]
+        for row in rows
+    ])
+
+
+def get_cached_keyboard(buttons: List[List[dict]]) -> InlineKeyboardMarkup:
+    """
+    Como create_inline_keyboard, pero memoizado por el contenido de los botones.
+
+    Para menús que se muestran en cada tap con pocas variantes (menús por
+    rol, botón de reclamar regalo): los dicts se siguen armando por llamada,
+    pero el InlineKeyboardMarkup (validación pydantic) se construye una vez
+    por combinación. Los botones cuyo texto cambia por usuario o por minuto
+    (cuentas regresivas) no deben pasar por aquí: cada variante ocuparía una
+    entrada del LRU y desalojaría a las estáticas.
+
+    Args:
+        buttons: Mismo formato que create_inline_keyboard
+
+    Returns:
+        InlineKeyboardMarkup compartido (no mutar)
+    """
+    rows = []
+    for row in buttons:
+        normalized = []
+        for button in row:
+            kind = "callback_data" if "callback_data" in button else "url"
+            if kind not in button:
+                raise ValueError(
+                    f"Botón debe tener 'callback_data' o 'url': {button}"
+                )
+            normalized.append((button["text"], kind, button[kind]))
+        rows.append(tuple(normalized))
+    return _build_keyboard_from_rows(tuple(rows))
+
+
 def create_menu_navigation(
     include_back: bool = True,
     include_exit: bool = False,
@@ -376,6 +501,7 @@ def create_content_with_navigation(
     return create_inline_keyboard(all_buttons)
 
 
+@cached_keyboard(maxsize=8)
 def get_simulation_mode_keyboard(
     current_mode: Optional["SimulationMode"] = None
 ) -> InlineKeyboardMarkup:
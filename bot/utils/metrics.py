@@ -0,0 +1,456 @@
+"""
+Metrics - Métricas en formato de texto Prometheus (GET /metrics).
+
+Registro mínimo de counters e histogramas con labels, sin dependencias
+externas, más la instrumentación de cada capa:
+
+- Handlers: duración por handler y errores (bot/middlewares/metrics.py)
+- SQL: queries y tiempo por update, con los mismos hooks
+  before/after_cursor_execute que usa el profiler (install_query_timer)
+- Bot API: latencia y errores por método (TelegramMetricsMiddleware)
+- Pool de conexiones: checkouts y conexiones en uso (instrument_engine)
+- APScheduler: duración y errores por job (instrument_scheduler)
+- Colas y caches en memoria: collectors que leen los stats() existentes
+
+Todo se escribe desde el event loop del bot. El endpoint corre en el
+thread del health server, así que render_metrics() agenda el render en el
+loop del bot (bind_loop) y nunca lee las estructuras desde otro thread.
+
+Uso (main.py):
+    session.middleware(TelegramMetricsMiddleware())  # después del rate limiter
+    register_collector("telegram_rate_limiter", rate_limiter.stats)
+    register_collector("telegram_read_cache", read_cache.stats, label="method")
+"""
+import asyncio
+import logging
+import math
+import re
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from sqlalchemy import event
+
+from bot.utils.profiler import install_query_timer
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4"  # Starlette agrega charset=utf-8
+
+# Buckets de latencia (segundos) y de conteo de queries por update
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+JOB_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# Tiempo máximo esperando al loop del bot para renderizar
+RENDER_TIMEOUT_SECONDS = 5.0
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Counter monótono con labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """Incrementa la serie de los labels dados."""
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(self._values.items())
+        ]
+
+
+class Histogram:
+    """Histograma acumulativo con labels (buckets fijos)."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # labels -> (conteos por bucket, suma, total)
+        self._series: Dict[LabelValues, List[Any]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Registra una observación en la serie de los labels dados."""
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][index] += 1
+                break
+        series[1] += value
+        series[2] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def render(self) -> List[str]:
+        lines = []
+        for labels, (counts, total, observations) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {observations}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Registro de métricas y collectors.
+
+    Los collectors son callables sin argumentos que retornan el dict de
+    stats() de un componente. Cada valor numérico se expone como gauge
+    bot_<componente>_<clave>; un valor que es a su vez un dict de números
+    (p.ej. stats por método o por shard) se expone con la clave externa
+    como label.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._collectors: Dict[str, Tuple[Callable[[], Dict[str, Any]], str]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Obtiene o crea un counter."""
+        if name not in self._metrics:
+            self._metrics[name] = Counter(name, documentation, labelnames)
+        return self._metrics[name]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        """Obtiene o crea un histograma."""
+        if name not in self._metrics:
+            self._metrics[name] = Histogram(name, documentation, labelnames, buckets)
+        return self._metrics[name]
+
+    def register_collector(
+        self,
+        component: str,
+        collect: Callable[[], Dict[str, Any]],
+        label: str = "key"
+    ) -> None:
+        """
+        Registra (o reemplaza) el collector de un componente.
+
+        Args:
+            component: Nombre del componente (prefijo bot_<component>_)
+            collect: Callable que retorna el dict de stats del componente
+            label: Nombre del label para las claves de los dicts anidados
+        """
+        self._collectors[component] = (collect, label)
+
+    def bind_loop(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Fija el event loop del bot (donde se ejecuta el render)."""
+        self._loop = loop or asyncio.get_running_loop()
+
+    def _render_collectors(self) -> List[str]:
+        lines = []
+        for component, (collect, label) in sorted(self._collectors.items()):
+            try:
+                stats = collect()
+            except Exception as e:
+                logger.warning(f"⚠️ Collector de métricas '{component}' falló: {e}")
+                continue
+
+            gauges: Dict[str, List[str]] = {}
+            for key, value in stats.items():
+                if isinstance(value, dict):
+                    for inner_key, inner_value in value.items():
+                        if _is_number(inner_value):
+                            name = _metric_name(component, inner_key)
+                            gauges.setdefault(name, []).append(
+                                f"{name}{_format_labels([label], [key])} {_format_value(inner_value)}"
+                            )
+                elif _is_number(value):
+                    name = _metric_name(component, key)
+                    gauges.setdefault(name, []).append(f"{name} {_format_value(value)}")
+
+            for name, samples in sorted(gauges.items()):
+                lines.append(f"# HELP {name} {component}.stats()")
+                lines.append(f"# TYPE {name} gauge")
+                lines.extend(samples)
+        return lines
+
+    def render(self) -> str:
+        """Texto de exposición de Prometheus con todas las métricas."""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render())
+        lines.extend(self._render_collectors())
+        return "\n".join(lines) + "\n"
+
+    async def render_threadsafe(self) -> str:
+        """
+        Renderiza desde cualquier thread, ejecutando el render en el loop del bot.
+
+        Returns:
+            str: Texto de exposición
+        """
+        loop = self._loop
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if loop is None or loop is running or loop.is_closed():
+            return self.render()
+
+        async def _render() -> str:
+            return self.render()
+
+        future = asyncio.run_coroutine_threadsafe(_render(), loop)
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout=RENDER_TIMEOUT_SECONDS)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float))
+
+
+def _metric_name(component: str, key: Any) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", f"bot_{component}_{key}")
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Obtiene el registro global de métricas."""
+    return _registry
+
+
+def register_collector(
+    component: str,
+    collect: Callable[[], Dict[str, Any]],
+    label: str = "key"
+) -> None:
+    """Atajo de get_metrics_registry().register_collector()."""
+    _registry.register_collector(component, collect, label)
+
+
+async def render_metrics() -> str:
+    """Atajo de get_metrics_registry().render_threadsafe()."""
+    return await _registry.render_threadsafe()
+
+
+# ===== MÉTRICAS DE INSTRUMENTACIÓN =====
+
+HANDLER_DURATION = _registry.histogram(
+    "bot_handler_duration_seconds", "Duración de los handlers", ("event", "handler")
+)
+HANDLER_ERRORS = _registry.counter(
+    "bot_handler_errors_total", "Excepciones no manejadas por handler", ("event", "handler")
+)
+UPDATE_DURATION = _registry.histogram(
+    "bot_update_duration_seconds", "Duración total de un update (middlewares + handler)", ("event",)
+)
+UPDATE_SQL_QUERIES = _registry.histogram(
+    "bot_update_sql_queries", "Queries SQL ejecutadas por update", ("event",),
+    buckets=QUERY_COUNT_BUCKETS
+)
+UPDATE_SQL_SECONDS = _registry.histogram(
+    "bot_update_sql_seconds", "Tiempo en queries SQL por update", ("event",)
+)
+SQL_QUERIES = _registry.counter("bot_sql_queries_total", "Queries SQL ejecutadas")
+SQL_SECONDS = _registry.counter("bot_sql_seconds_total", "Tiempo total en queries SQL")
+DB_POOL_CHECKOUTS = _registry.counter(
+    "bot_db_pool_checkouts_total", "Conexiones tomadas del pool"
+)
+TELEGRAM_REQUEST_DURATION = _registry.histogram(
+    "bot_telegram_request_duration_seconds", "Latencia de la Bot API por método", ("method",)
+)
+TELEGRAM_REQUEST_ERRORS = _registry.counter(
+    "bot_telegram_request_errors_total", "Errores de la Bot API por método", ("method", "error")
+)
+SCHEDULER_JOB_DURATION = _registry.histogram(
+    "bot_scheduler_job_duration_seconds", "Duración de los jobs del scheduler", ("job",),
+    buckets=JOB_BUCKETS
+)
+SCHEDULER_JOB_ERRORS = _registry.counter(
+    "bot_scheduler_job_errors_total", "Jobs del scheduler terminados con excepción", ("job",)
+)
+
+
+# ===== SQL POR UPDATE =====
+
+class QueryStats:
+    """Acumulador de queries de un update (ver track_update_queries)."""
+
+    __slots__ = ("count", "seconds", "parent")
+
+    def __init__(self, parent: Optional["QueryStats"] = None):
+        self.count = 0
+        self.seconds = 0.0
+        self.parent = parent
+
+
+_update_queries: ContextVar[Optional[QueryStats]] = ContextVar("update_queries", default=None)
+
+
+def track_update_queries() -> Tuple[QueryStats, Any]:
+    """
+    Empieza a acumular las queries del update actual (contextvar).
+
+    Es anidable: un acumulador interno (p.ej. el del profiling en vivo de
+    un handler) también suma en el del update que lo contiene.
+
+    Returns:
+        Tuple (acumulador, token para reset_update_queries)
+    """
+    stats = QueryStats(_update_queries.get())
+    return stats, _update_queries.set(stats)
+
+
+def reset_update_queries(token: Any) -> None:
+    """Deja de acumular queries en el contexto actual."""
+    _update_queries.reset(token)
+
+
+def _on_query(seconds: float) -> None:
+    SQL_QUERIES.inc()
+    SQL_SECONDS.inc(amount=seconds)
+    stats = _update_queries.get()
+    while stats is not None:
+        stats.count += 1
+        stats.seconds += seconds
+        stats = stats.parent
+
+
+def instrument_engine(engine: Any) -> None:
+    """
+    Instrumenta un engine: queries (globales y por update) y pool.
+
+    Args:
+        engine: AsyncEngine (o Engine sync)
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if getattr(sync_engine, "_bot_metrics_installed", False):
+        return
+    sync_engine._bot_metrics_installed = True
+
+    install_query_timer(sync_engine, _on_query)
+    event.listen(sync_engine, "checkout", lambda *args: DB_POOL_CHECKOUTS.inc())
+
+    pool = sync_engine.pool
+
+    def pool_stats() -> Dict[str, int]:
+        stats = {}
+        for name in ("size", "checkedout", "overflow", "checkedin"):
+            getter = getattr(pool, name, None)
+            if callable(getter):
+                try:
+                    stats[name] = getter()
+                except Exception:
+                    pass
+        return stats
+
+    register_collector("db_pool", pool_stats)
+
+
+# ===== BOT API =====
+
+class TelegramMetricsMiddleware(BaseRequestMiddleware):
+    """
+    Request middleware que mide la latencia y los errores de la Bot API.
+
+    Registrarlo después de TelegramRateLimiter: queda más adentro en la
+    cadena, así mide cada intento real (no la espera del limitador) y los
+    hits de TelegramReadCache no cuentan.
+    """
+
+    async def __call__(self, make_request, bot, method):
+        api_method = method.__api_method__
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as e:
+            TELEGRAM_REQUEST_ERRORS.inc(api_method, type(e).__name__)
+            raise
+        finally:
+            TELEGRAM_REQUEST_DURATION.observe(time.perf_counter() - started, api_method)
+
+
+# ===== APSCHEDULER =====
+
+def job_label(job_id: str) -> str:
+    """Label del job (sin el ID de instancia: scheduled_post_12 → scheduled_post)."""
+    return re.sub(r"_\d+$", "", job_id)
+
+
+def instrument_scheduler(scheduler: Any) -> None:
+    """
+    Registra listeners de APScheduler que miden cada ejecución de job.
+
+    Args:
+        scheduler: Instancia de APScheduler (antes o después de start())
+    """
+    from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_SUBMITTED
+
+    started: Dict[str, float] = {}
+
+    def on_submitted(event_) -> None:
+        started[event_.job_id] = time.monotonic()
+
+    def on_finished(event_) -> None:
+        label = job_label(event_.job_id)
+        start = started.pop(event_.job_id, None)
+        if start is not None:
+            SCHEDULER_JOB_DURATION.observe(time.monotonic() - start, label)
+        if event_.exception is not None:
+            SCHEDULER_JOB_ERRORS.inc(label)
+
+    scheduler.add_listener(on_submitted, EVENT_JOB_SUBMITTED)
+    scheduler.add_listener(on_finished, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
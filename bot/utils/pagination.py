@@ -5,15 +5,30 @@ in a paginated format, including keyboard navigation and content formatting.
 """
 import math
 import re
-from typing import List, TypeVar, Generic, Callable, Optional
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Sequence, Tuple, TypeVar, Generic, Callable, Optional
 from dataclasses import dataclass
 
 from aiogram.types import InlineKeyboardMarkup
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from bot.utils.keyboards import create_inline_keyboard
 
 
 T = TypeVar('T')  # Generic type for elements
 
+# Seconds a COUNT(*) result is reused between page flips of the same query
+COUNT_CACHE_TTL = 30.0
+
+# Max cached counts; filters with volatile params (search text, time
+# cutoffs) add a key per call, so the cache is an LRU
+COUNT_CACHE_MAX_ENTRIES = 256
+
+# Cached counts, oldest first: (compiled SQL, params) -> (expires_at, count)
+_count_cache: "OrderedDict[Tuple[str, Tuple], Tuple[float, int]]" = OrderedDict()
+
 
 @dataclass
 class Page(Generic[T]):
@@ -172,6 +187,217 @@ class Paginator(Generic[T]):
         return self.get_page(self.total_pages)
 
 
+@dataclass
+class KeysetPage(Generic[T]):
+    """Represents a page fetched by keyset (seek) pagination.
+
+    Keyset pages have no page number: the next page starts right after
+    `next_cursor`, so deep pages cost the same as the first one.
+
+    Attributes:
+        items: List of elements in this page
+        next_cursor: Key values of the last item (None if there is no next page)
+        page_size: Number of elements per page
+    """
+
+    items: List[T]
+    next_cursor: Optional[Tuple]
+    page_size: int
+
+    @property
+    def has_next(self) -> bool:
+        """Check if there is a next page."""
+        return self.next_cursor is not None
+
+
+class QueryPaginator(Generic[T]):
+    """Paginator that pushes LIMIT/OFFSET (or keyset) into SQL.
+
+    Unlike Paginator, only the rows of the requested page are loaded.
+    The total count is cached for COUNT_CACHE_TTL seconds per query, and
+    the page itself fetches one extra row, so has_next is always exact
+    even when the cached count is slightly stale.
+
+    Usage:
+        query = select(VIPSubscriber).order_by(VIPSubscriber.expiry_date.desc(), VIPSubscriber.id)
+        paginator = QueryPaginator(session, query, page_size=10)
+        page = await paginator.get_page(3)
+
+        # Sequential scans (exports, jobs): keyset pagination
+        page = await paginator.get_page_after([VIPSubscriber.id])
+        while page.has_next:
+            page = await paginator.get_page_after([VIPSubscriber.id], page.next_cursor)
+
+    Attributes:
+        session: Database session
+        query: Select statement with a deterministic ORDER BY
+        page_size: Number of elements per page (default: 10)
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        query: Select,
+        page_size: int = 10,
+        count_ttl: float = COUNT_CACHE_TTL
+    ):
+        """Initialize the paginator.
+
+        Args:
+            session: Database session
+            query: Select statement (should end its ORDER BY with a unique column)
+            page_size: Number of elements per page (default: 10)
+            count_ttl: Seconds to reuse the cached count (0 disables the cache)
+
+        Raises:
+            ValueError: If page_size < 1
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be >= 1")
+
+        self.session = session
+        self.query = query
+        self.page_size = page_size
+        self.count_ttl = count_ttl
+
+    def _count_key(self) -> Tuple[str, Tuple]:
+        compiled = self.query.compile()
+        return str(compiled), tuple(sorted((k, repr(v)) for k, v in compiled.params.items()))
+
+    async def count(self, refresh: bool = False) -> int:
+        """Count the rows matched by the query (cached).
+
+        Args:
+            refresh: Ignore the cached value
+
+        Returns:
+            Total number of rows
+        """
+        key = self._count_key()
+        now = time.monotonic()
+
+        cached = _count_cache.get(key)
+        if cached is not None and cached[0] > now and not refresh:
+            _count_cache.move_to_end(key)
+            return cached[1]
+
+        count_query = select(func.count()).select_from(self.query.order_by(None).subquery())
+        total = (await self.session.execute(count_query)).scalar_one()
+
+        self._store_count(key, total)
+        return total
+
+    def _store_count(self, key: Tuple[str, Tuple], total: int) -> None:
+        if self.count_ttl <= 0:
+            return
+
+        now = time.monotonic()
+        expired = [k for k, (expires_at, _) in _count_cache.items() if expires_at <= now]
+        for k in expired:
+            del _count_cache[k]
+
+        _count_cache[key] = (now + self.count_ttl, total)
+        _count_cache.move_to_end(key)
+        while len(_count_cache) > COUNT_CACHE_MAX_ENTRIES:
+            _count_cache.popitem(last=False)
+
+    async def _fetch(self, query: Select) -> Tuple[List[T], bool]:
+        """Fetch one page plus a probe row; returns (items, has_more)."""
+        result = await self.session.execute(query.limit(self.page_size + 1))
+        rows = list(result.scalars().all())
+        return rows[:self.page_size], len(rows) > self.page_size
+
+    async def get_page(self, page_number: int) -> Page[T]:
+        """Get a specific page using LIMIT/OFFSET.
+
+        Out-of-range page numbers are clamped to the last page (the list
+        may have shrunk since the keyboard was rendered).
+
+        Args:
+            page_number: Page number (1-indexed)
+
+        Returns:
+            Page object containing the elements for that page
+
+        Raises:
+            ValueError: If page_number < 1
+        """
+        if page_number < 1:
+            raise ValueError(f"page_number must be >= 1 (received: {page_number})")
+
+        total = await self.count()
+        total_pages = max(1, math.ceil(total / self.page_size))
+        page_number = min(page_number, total_pages)
+
+        offset = (page_number - 1) * self.page_size
+        items, has_next = await self._fetch(self.query.offset(offset))
+
+        if not items and page_number > 1:
+            # Cached count was stale (rows deleted): recount and retry once
+            total = await self.count(refresh=True)
+            total_pages = max(1, math.ceil(total / self.page_size))
+            page_number = min(page_number, total_pages)
+            offset = (page_number - 1) * self.page_size
+            items, has_next = await self._fetch(self.query.offset(offset))
+
+        # The probe row makes the boundaries exact even with a stale count
+        seen = offset + len(items)
+        exact_total = max(total, seen + 1) if has_next else seen
+        if exact_total != total:
+            total = exact_total
+            self._store_count(self._count_key(), total)
+        total_pages = max(1, math.ceil(total / self.page_size))
+
+        return Page(
+            items=items,
+            current_page=page_number,
+            total_pages=total_pages,
+            total_items=total,
+            has_previous=page_number > 1,
+            has_next=has_next,
+            page_size=self.page_size
+        )
+
+    async def get_page_after(
+        self,
+        key_columns: Sequence[Any],
+        cursor: Optional[Tuple] = None,
+        descending: bool = False
+    ) -> KeysetPage[T]:
+        """Get the page that follows `cursor` using keyset pagination.
+
+        The query's ORDER BY must match `key_columns` (same columns and
+        direction) and the last key column must be unique.
+
+        Args:
+            key_columns: Ordering columns, e.g. [VIPSubscriber.expiry_date, VIPSubscriber.id]
+            cursor: next_cursor of the previous page (None for the first page)
+            descending: True if the query is ordered DESC by the key columns
+
+        Returns:
+            KeysetPage with items and the cursor of the next page
+        """
+        query = self.query
+        if cursor is not None:
+            key = tuple_(*key_columns) if len(key_columns) > 1 else key_columns[0]
+            value = tuple_(*cursor) if len(key_columns) > 1 else cursor[0]
+            query = query.where(key < value if descending else key > value)
+
+        items, has_next = await self._fetch(query)
+
+        next_cursor = None
+        if has_next:
+            last = items[-1]
+            next_cursor = tuple(getattr(last, column.key) for column in key_columns)
+
+        return KeysetPage(items=items, next_cursor=next_cursor, page_size=self.page_size)
+
+
+def clear_count_cache() -> None:
+    """Drop every cached count (e.g. after bulk deletes)."""
+    _count_cache.clear()
+
+
 def create_pagination_keyboard(
     page: Page,
     callback_pattern: str,
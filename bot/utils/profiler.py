@@ -3,6 +3,9 @@ Performance Profiler Utilities
 
 Wrapper para pyinstrument con soporte async, integracion con
 SQLAlchemy para conteo de queries, y formateo de resultados.
+
+LiveProfiler captura updates reales en producción bajo demanda
+(comando /profile_live, ver bot/middlewares/profiling.py).
 """
 
 import asyncio
@@ -11,7 +14,7 @@ import logging
 import time
 from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional, TypeVar
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
 
 from pyinstrument import Profiler
 from sqlalchemy import event
@@ -22,6 +25,26 @@ logger = logging.getLogger(__name__)
 F = TypeVar("F", bound=Callable[..., Any])
 
 
+def install_query_timer(sync_engine, on_query: Callable[[float], None]) -> None:
+    """
+    Registra hooks before/after_cursor_execute que miden cada query.
+
+    Compartido por el profiler y por las métricas (bot/utils/metrics.py).
+
+    Args:
+        sync_engine: Engine sync (AsyncEngine.sync_engine)
+        on_query: Callback con la duración de la query en segundos
+    """
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def on_before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_start_time = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def on_after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if hasattr(context, '_query_start_time'):
+            on_query(time.perf_counter() - context._query_start_time)
+
+
 @dataclass
 class ProfileResult:
     """Resultado de una sesion de profiling."""
@@ -57,6 +80,10 @@ class AsyncProfiler:
         self._profiler = Profiler()
         self._query_stats = {"count": 0, "time_ms": 0.0}
 
+    def _record_query(self, seconds: float) -> None:
+        self._query_stats["count"] += 1
+        self._query_stats["time_ms"] += seconds * 1000
+
     def _attach_query_monitor(self, session: Optional[AsyncSession] = None):
         """Attach SQLAlchemy event listeners para contar queries."""
         # For async sessions, we use the sync events since they run in the same thread
@@ -79,16 +106,7 @@ class AsyncProfiler:
 
             # Verify this is a real async engine by checking for dispatch attribute
             if hasattr(sync_engine, 'dispatch') and not isinstance(sync_engine.dispatch, (MagicMock, NonCallableMagicMock)):
-                @event.listens_for(sync_engine, "before_cursor_execute")
-                def on_before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-                    self._query_stats["count"] += 1
-                    context._query_start_time = time.perf_counter()
-
-                @event.listens_for(sync_engine, "after_cursor_execute")
-                def on_after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-                    if hasattr(context, '_query_start_time'):
-                        query_time = (time.perf_counter() - context._query_start_time) * 1000
-                        self._query_stats["time_ms"] += query_time
+                install_query_timer(sync_engine, self._record_query)
         except (AttributeError, TypeError, ImportError):
             # Session is a mock or doesn't have proper engine setup
             pass
@@ -260,3 +278,207 @@ class HandlerProfiler:
             for name, times in self.stats.items()
         ]
         return sorted(averages, key=lambda x: x["avg_ms"], reverse=True)[:limit]
+
+
+# ===== PROFILING EN VIVO =====
+
+@dataclass
+class LiveSample:
+    """Un update real profileado por LiveProfilingMiddleware."""
+    handler: str
+    duration_ms: float
+    query_count: int
+    query_time_ms: float
+    session: Any  # pyinstrument Session
+    error: Optional[str] = None
+
+
+def handler_matches(pattern: str, label: str, exact: bool = False) -> bool:
+    """
+    True si el label de un handler coincide con el patrón de una captura.
+
+    Args:
+        pattern: Label exacto o substring
+        label: Label del handler (bot.middlewares.metrics.callback_label)
+        exact: True para comparar el label completo
+    """
+    if label.startswith(LiveProfiler.EXCLUDED_PREFIX):
+        return False
+    return label == pattern if exact else pattern in label
+
+
+@dataclass
+class LiveCapture:
+    """Captura armada por un admin: los próximos N updates de un handler."""
+    pattern: str
+    target: int
+    chat_id: int
+    html: bool = False
+    exact: bool = False
+    armed_at: float = field(default_factory=time.monotonic)
+    samples: List[LiveSample] = field(default_factory=list)
+
+    def matches(self, label: str) -> bool:
+        """True si el handler (label de handler_label) entra en la captura."""
+        return handler_matches(self.pattern, label, exact=self.exact)
+
+    @property
+    def done(self) -> bool:
+        return len(self.samples) >= self.target
+
+    def summary(self) -> str:
+        """Resumen en texto plano de los updates capturados."""
+        lines = [f"Live profile: {self.pattern} ({len(self.samples)}/{self.target} updates)", ""]
+        for i, sample in enumerate(self.samples, 1):
+            error = f" ERROR {sample.error}" if sample.error else ""
+            lines.append(
+                f"{i:>3}. {sample.handler}: {sample.duration_ms:.2f}ms, "
+                f"{sample.query_count} queries ({sample.query_time_ms:.2f}ms){error}"
+            )
+        if self.samples:
+            durations = sorted(sample.duration_ms for sample in self.samples)
+            lines.extend([
+                "",
+                f"p50: {durations[len(durations) // 2]:.2f}ms  max: {durations[-1]:.2f}ms",
+            ])
+        return "\n".join(lines)
+
+    def report(self) -> Tuple[str, bytes]:
+        """
+        Genera el reporte de la captura.
+
+        Texto: resumen + árbol de pyinstrument de cada update.
+        HTML: sesiones combinadas en un solo reporte interactivo.
+
+        Returns:
+            Tuple (nombre de archivo, contenido)
+        """
+        from pyinstrument.renderers import ConsoleRenderer, HTMLRenderer
+        from pyinstrument.session import Session
+
+        name = "".join(c if c.isalnum() else "_" for c in self.pattern)
+        sessions = [sample.session for sample in self.samples if sample.session is not None]
+
+        if self.html and sessions:
+            combined = functools.reduce(Session.combine, sessions)
+            return f"live_profile_{name}.html", HTMLRenderer().render(combined).encode()
+
+        parts = [self.summary()]
+        renderer = ConsoleRenderer(unicode=True, color=False)
+        for i, sample in enumerate(self.samples, 1):
+            if sample.session is not None:
+                parts.append(f"\n{'=' * 60}\n#{i} {sample.handler}\n{renderer.render(sample.session)}")
+        return f"live_profile_{name}.txt", "\n".join(parts).encode()
+
+
+class LiveProfiler:
+    """
+    Profiling bajo demanda de updates reales en producción.
+
+    Un admin arma una captura ("los próximos N updates del handler X") y
+    LiveProfilingMiddleware envuelve solo esos updates con pyinstrument y
+    el contador de queries. Sin captura armada el middleware no hace nada
+    más que leer `armed`, así que el sampling no cuesta nada por defecto.
+
+    Se profilea un update a la vez: los que coinciden mientras otro está
+    en curso pasan sin profilear y no cuentan para la captura.
+    """
+
+    DEFAULT_UPDATES = 5
+    MAX_UPDATES = 20
+    TTL_SECONDS = 3600  # Una captura olvidada se desarma sola
+    EXCLUDED_PREFIX = "admin.profile."  # Los propios comandos de profiling
+
+    def __init__(self):
+        self._capture: Optional[LiveCapture] = None
+        self._in_flight = False
+
+    @property
+    def armed(self) -> bool:
+        return self._capture is not None
+
+    @property
+    def capture(self) -> Optional[LiveCapture]:
+        return self._capture
+
+    def arm(
+        self,
+        pattern: str,
+        target: int,
+        chat_id: int,
+        html: bool = False,
+        exact: bool = False
+    ) -> LiveCapture:
+        """
+        Arma una captura (reemplaza la anterior si existía).
+
+        Args:
+            pattern: Handler a capturar (substring del label, o label exacto)
+            target: Updates a capturar (acotado a MAX_UPDATES)
+            chat_id: Chat del admin que recibe el reporte
+            html: True para reporte HTML, False para texto
+            exact: True si pattern es el label exacto del handler
+
+        Returns:
+            LiveCapture armada
+        """
+        target = max(1, min(target, self.MAX_UPDATES))
+        self._capture = LiveCapture(pattern, target, chat_id, html=html, exact=exact)
+        logger.info(f"🔬 Profiling en vivo armado: {pattern} ({target} updates)")
+        return self._capture
+
+    def disarm(self) -> Optional[LiveCapture]:
+        """Desarma la captura actual y la retorna (con lo capturado hasta ahora)."""
+        capture, self._capture = self._capture, None
+        return capture
+
+    def claim(self, label: str) -> Optional[LiveCapture]:
+        """
+        Reserva el update actual para la captura si coincide.
+
+        Args:
+            label: Handler resuelto del update
+
+        Returns:
+            LiveCapture si el update debe profilearse (llamar a release después)
+        """
+        capture = self._capture
+        if capture is None or self._in_flight or not capture.matches(label):
+            return None
+        if time.monotonic() - capture.armed_at > self.TTL_SECONDS:
+            logger.info(f"🔬 Profiling en vivo expirado: {capture.pattern}")
+            self._capture = None
+            return None
+        self._in_flight = True
+        return capture
+
+    def release(self, capture: LiveCapture, sample: Optional[LiveSample]) -> bool:
+        """
+        Registra el resultado de un update reservado con claim().
+
+        Args:
+            capture: Captura devuelta por claim()
+            sample: Resultado, o None si el update no se completó
+
+        Returns:
+            bool: True si la captura se completó (y quedó desarmada)
+        """
+        self._in_flight = False
+        if sample is None or capture is not self._capture:
+            return False
+
+        capture.samples.append(sample)
+        if not capture.done:
+            return False
+
+        self._capture = None
+        logger.info(f"🔬 Profiling en vivo completo: {capture.pattern}")
+        return True
+
+
+_live_profiler = LiveProfiler()
+
+
+def get_live_profiler() -> LiveProfiler:
+    """Obtiene el LiveProfiler global."""
+    return _live_profiler
@@ -0,0 +1,288 @@
+"""
+Rate Limit - Control central de envíos salientes a la Bot API.
+
+Telegram limita los envíos a ~30 msg/s por bot, ~1 msg/s por chat privado
+y ~20 msg/min por grupo o canal. Este módulo centraliza esos límites:
+
+- TokenBucket: bucket asíncrono con prioridades y pausa por retry_after
+- bulk_lane(): marca las corutinas de trabajos masivos (carril de baja prioridad)
+- TelegramRateLimiter: request middleware de la sesión aiogram que aplica
+  el bucket global + buckets por chat y reintenta TelegramRetryAfter
+
+Uso (main.py):
+    session = AiohttpSession(timeout=10)
+    session.middleware(TelegramRateLimiter())
+
+Uso (trabajos masivos):
+    async with bulk_lane():
+        for user_id in user_ids:
+            await bot.send_message(user_id, text)  # cede ante respuestas interactivas
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, Dict, Optional
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.exceptions import TelegramRetryAfter
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Carriles de prioridad para el presupuesto de la Bot API."""
+    INTERACTIVE = 0  # Respuestas a usuarios (default)
+    BULK = 1         # Broadcasts, airdrops, colas, tareas programadas
+
+
+_current_priority: ContextVar[Priority] = ContextVar(
+    "telegram_request_priority", default=Priority.INTERACTIVE
+)
+
+
+@asynccontextmanager
+async def bulk_lane():
+    """
+    Ejecuta las requests del bloque en el carril BULK.
+
+    Las tasks creadas dentro del bloque heredan el carril (contextvars).
+    """
+    token = _current_priority.set(Priority.BULK)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> Priority:
+    """Retorna el carril de la corutina actual."""
+    return _current_priority.get()
+
+
+class TokenBucket:
+    """
+    Token bucket compartido entre corutinas, con prioridades.
+
+    Los pedidos BULK ceden mientras haya pedidos INTERACTIVE esperando,
+    y compiten de a uno (FIFO entre ellos). Sin tráfico interactivo, BULK
+    puede consumir todo el presupuesto.
+
+    Args:
+        rate: Tokens repuestos por segundo
+        capacity: Ráfaga máxima (default: rate)
+
+    Usage:
+        bucket = TokenBucket(rate=30)
+        await bucket.acquire()  # espera hasta que haya presupuesto
+        ...
+        bucket.pause(e.retry_after)  # TelegramRetryAfter: frena a todos
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._interactive_waiting = 0
+        self._bulk_lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        """Repone tokens según el tiempo transcurrido."""
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    async def _wait_for_tokens(self, tokens: float, priority: Priority) -> None:
+        """Espera y consume tokens (sin awaits entre chequeo y consumo)."""
+        while True:
+            now = time.monotonic()
+
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+
+            if priority is Priority.BULK and self._interactive_waiting:
+                await asyncio.sleep(1 / self.rate)
+                continue
+
+            self._refill(now)
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return
+
+            await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+    async def acquire(self, tokens: float = 1.0, priority: Priority = Priority.INTERACTIVE) -> None:
+        """
+        Espera hasta poder consumir `tokens` del bucket.
+
+        Args:
+            tokens: Tokens a consumir (default: 1 = un mensaje)
+            priority: Carril del pedido (default: INTERACTIVE)
+        """
+        if priority is Priority.BULK:
+            async with self._bulk_lock:
+                await self._wait_for_tokens(tokens, priority)
+            return
+
+        self._interactive_waiting += 1
+        try:
+            await self._wait_for_tokens(tokens, priority)
+        finally:
+            self._interactive_waiting -= 1
+
+    def pause(self, seconds: float) -> None:
+        """
+        Detiene el bucket durante `seconds` (retry_after de Telegram).
+
+        Al reanudar el bucket arranca vacío para no disparar una ráfaga.
+
+        Args:
+            seconds: Segundos a esperar antes del próximo envío
+        """
+        until = time.monotonic() + max(0.0, seconds)
+        if until > self._paused_until:
+            self._paused_until = until
+            self._tokens = 0.0
+            self._updated = until
+
+
+class TelegramRateLimiter(BaseRequestMiddleware):
+    """
+    Request middleware que agenda todas las llamadas salientes del bot.
+
+    - Bucket global (Config.TELEGRAM_RATE_LIMIT_RPS) para toda request
+      salvo las exentas (polling, webhooks, answerCallbackQuery)
+    - Bucket por chat para los métodos que publican mensajes:
+      1 msg/s en privados, 20 msg/min en grupos y canales
+    - TelegramRetryAfter: pausa el bucket global y reintenta la request
+    - Carril de la corutina (bulk_lane) para priorizar respuestas interactivas
+    """
+
+    # Métodos que no consumen presupuesto
+    EXEMPT_METHODS = frozenset({
+        "getUpdates", "getMe", "setWebhook", "deleteWebhook", "getWebhookInfo",
+        "answerCallbackQuery", "close", "logOut",
+    })
+
+    # Métodos que publican un mensaje nuevo en el chat (límite por chat)
+    CHAT_SEND_METHODS = frozenset({
+        "sendMessage", "sendPhoto", "sendVideo", "sendAnimation", "sendAudio",
+        "sendDocument", "sendVoice", "sendVideoNote", "sendSticker", "sendMediaGroup",
+        "sendLocation", "sendContact", "sendPoll", "sendDice", "sendInvoice",
+        "sendPaidMedia", "copyMessage", "copyMessages", "forwardMessage", "forwardMessages",
+    })
+
+    PRIVATE_CHAT_RATE = 1.0
+    PRIVATE_CHAT_BURST = 3
+    GROUP_CHAT_RATE = 20 / 60
+    GROUP_CHAT_BURST = 5
+
+    MAX_CHAT_BUCKETS = 10000
+    MAX_RETRY_AFTER_ATTEMPTS = 3
+    MAX_RETRY_AFTER_SECONDS = 60
+
+    def __init__(self, rate: Optional[float] = None):
+        """
+        Inicializa el limitador.
+
+        Args:
+            rate: Requests por segundo globales (default: Config.TELEGRAM_RATE_LIMIT_RPS)
+        """
+        self.global_bucket = TokenBucket(rate=rate or Config.TELEGRAM_RATE_LIMIT_RPS)
+        self._chat_buckets: "OrderedDict[int, TokenBucket]" = OrderedDict()
+        self._stats = {"requests": 0, "retry_after": 0, "bulk_requests": 0}
+
+    @staticmethod
+    def _chat_key(method: Any) -> Optional[int]:
+        """Extrae el chat_id numérico de la request (None si no aplica)."""
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return None
+        try:
+            return int(chat_id)
+        except (TypeError, ValueError):
+            # @username de canal: se agrupa como grupo con clave estable
+            return -abs(hash(chat_id))
+
+    def _chat_bucket(self, chat_key: int) -> TokenBucket:
+        """Obtiene (o crea) el bucket de un chat, con tope LRU."""
+        bucket = self._chat_buckets.get(chat_key)
+        if bucket is not None:
+            self._chat_buckets.move_to_end(chat_key)
+            return bucket
+
+        if chat_key > 0:
+            bucket = TokenBucket(self.PRIVATE_CHAT_RATE, capacity=self.PRIVATE_CHAT_BURST)
+        else:
+            bucket = TokenBucket(self.GROUP_CHAT_RATE, capacity=self.GROUP_CHAT_BURST)
+
+        self._chat_buckets[chat_key] = bucket
+        while len(self._chat_buckets) > self.MAX_CHAT_BUCKETS:
+            self._chat_buckets.popitem(last=False)
+        return bucket
+
+    async def __call__(self, make_request, bot, method):
+        """
+        Ejecuta la request respetando los buckets y reintentando flood control.
+
+        Args:
+            make_request: Siguiente eslabón de la cadena de middlewares
+            bot: Instancia del bot
+            method: Método de la Bot API
+
+        Returns:
+            Response de la Bot API
+        """
+        api_method = method.__api_method__
+        if api_method in self.EXEMPT_METHODS:
+            return await make_request(bot, method)
+
+        priority = current_priority()
+        self._stats["requests"] += 1
+        if priority is Priority.BULK:
+            self._stats["bulk_requests"] += 1
+
+        chat_bucket = None
+        if api_method in self.CHAT_SEND_METHODS:
+            chat_key = self._chat_key(method)
+            if chat_key is not None:
+                chat_bucket = self._chat_bucket(chat_key)
+
+        for attempt in range(self.MAX_RETRY_AFTER_ATTEMPTS + 1):
+            if chat_bucket is not None:
+                await chat_bucket.acquire(priority=priority)
+            await self.global_bucket.acquire(priority=priority)
+
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                self._stats["retry_after"] += 1
+                if attempt == self.MAX_RETRY_AFTER_ATTEMPTS or e.retry_after > self.MAX_RETRY_AFTER_SECONDS:
+                    raise
+
+                logger.warning(
+                    f"⏳ Flood control en {api_method}: pausando {e.retry_after}s "
+                    f"(intento {attempt + 1}, carril {priority.name})"
+                )
+                self.global_bucket.pause(e.retry_after)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Estadísticas del limitador.
+
+        Returns:
+            Dict con requests, bulk_requests, retry_after y chat_buckets
+        """
+        return {**self._stats, "chat_buckets": len(self._chat_buckets)}
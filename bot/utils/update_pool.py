@@ -0,0 +1,331 @@
+"""
+Update Pool - Procesamiento de updates del webhook fuera de la request HTTP.
+
+Con SimpleRequestHandler cada update se procesa dentro de la request de
+Telegram (o en una task suelta sin orden ni límite). Un handler lento
+(evaluación de recompensas, entrega de contenido) retiene la conexión y
+Telegram termina reintentando. Este módulo separa la recepción del
+procesamiento:
+
+- ShardedRequestHandler: responde 200 al webhook de inmediato y encola el
+  update en el pool
+- UpdateWorkerPool: N shards (cola acotada + un worker cada uno) elegidos
+  por hash(user_id). Los updates de un mismo usuario se procesan en orden;
+  los de usuarios distintos, en paralelo
+- Load shedding: con la cola del shard llena el update se descarta (y se
+  cuenta) en lugar de acumular memoria y latencia sin límite
+- stats(): profundidad, descartes y latencias (espera en cola y proceso)
+  por shard
+
+Uso (main.py, modo webhook):
+    webhook_handler = ShardedRequestHandler(dispatcher=dp, bot=bot, secret_token=...)
+    webhook_handler.register(app, path=Config.WEBHOOK_PATH)
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler
+from aiohttp import web
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Cada cuántos descartes de un shard se emite un warning (evita inundar el log)
+SHED_LOG_EVERY = 50
+
+# Tiempo máximo para vaciar las colas en el shutdown (segundos)
+DRAIN_TIMEOUT_SECONDS = 10.0
+
+# Eventos de Update en los que el autor está en "from" (o "user")
+_USER_EVENT_KEYS = (
+    "message",
+    "edited_message",
+    "callback_query",
+    "inline_query",
+    "chosen_inline_result",
+    "shipping_query",
+    "pre_checkout_query",
+    "chat_join_request",
+    "chat_member",
+    "my_chat_member",
+    "message_reaction",
+    "poll_answer",
+    "business_message",
+    "edited_business_message",
+)
+
+# Eventos sin autor: se ordenan por chat
+_CHAT_EVENT_KEYS = (
+    "channel_post",
+    "edited_channel_post",
+    "message_reaction_count",
+    "chat_boost",
+    "removed_chat_boost",
+)
+
+
+def extract_shard_key(update: Dict[str, Any]) -> int:
+    """
+    Obtiene la clave de orden de un update crudo (JSON del webhook).
+
+    Args:
+        update: Update tal como lo envía Telegram
+
+    Returns:
+        int: user_id del autor; si no hay, chat_id; si tampoco, update_id
+    """
+    for key in _USER_EVENT_KEYS:
+        event = update.get(key)
+        if not isinstance(event, dict):
+            continue
+        user = event.get("from") or event.get("user")
+        if isinstance(user, dict) and "id" in user:
+            return int(user["id"])
+        chat = event.get("chat")
+        if isinstance(chat, dict) and "id" in chat:
+            return int(chat["id"])
+
+    for key in _CHAT_EVENT_KEYS:
+        event = update.get(key)
+        if isinstance(event, dict):
+            chat = event.get("chat")
+            if isinstance(chat, dict) and "id" in chat:
+                return int(chat["id"])
+
+    return int(update.get("update_id", 0))
+
+
+class _Shard:
+    """Cola acotada de un shard y sus métricas."""
+
+    def __init__(self, index: int, max_queue: int):
+        self.index = index
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.worker: Optional[asyncio.Task] = None
+        self.processed = 0
+        self.failed = 0
+        self.shed = 0
+        self.max_depth = 0
+        self.wait_seconds_total = 0.0
+        self.run_seconds_total = 0.0
+        self.run_seconds_max = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        done = self.processed + self.failed
+        return {
+            "shard": self.index,
+            "depth": self.queue.qsize(),
+            "max_depth": self.max_depth,
+            "processed": self.processed,
+            "failed": self.failed,
+            "shed": self.shed,
+            "avg_wait_ms": round(self.wait_seconds_total / done * 1000, 2) if done else 0.0,
+            "avg_run_ms": round(self.run_seconds_total / done * 1000, 2) if done else 0.0,
+            "max_run_ms": round(self.run_seconds_max * 1000, 2),
+        }
+
+
+class UpdateWorkerPool:
+    """
+    Pool de workers con un shard (cola + worker) por hash de usuario.
+
+    Args:
+        process: Corutina que procesa un update crudo
+        shards: Cantidad de shards (default: Config.WEBHOOK_WORKER_SHARDS)
+        max_queue: Updates encolados por shard (default: Config.WEBHOOK_SHARD_QUEUE_SIZE)
+
+    Usage:
+        pool = UpdateWorkerPool(process_update)
+        pool.start()
+        pool.submit(update)  # False si el shard está lleno (descartado)
+        await pool.close()   # vacía las colas (con timeout) y detiene workers
+    """
+
+    def __init__(
+        self,
+        process: Callable[[Dict[str, Any]], Awaitable[Any]],
+        shards: Optional[int] = None,
+        max_queue: Optional[int] = None
+    ):
+        shards = shards if shards is not None else Config.WEBHOOK_WORKER_SHARDS
+        max_queue = max_queue if max_queue is not None else Config.WEBHOOK_SHARD_QUEUE_SIZE
+        if shards < 1 or max_queue < 1:
+            raise ValueError("shards and max_queue must be positive")
+
+        self._process = process
+        self._shards = [_Shard(index, max_queue) for index in range(shards)]
+        self._closing = False
+
+    @property
+    def running(self) -> bool:
+        """True si los workers están activos."""
+        return any(shard.worker is not None for shard in self._shards)
+
+    def start(self) -> None:
+        """Crea un worker por shard (idempotente; requiere event loop activo)."""
+        if self.running:
+            return
+        self._closing = False
+        for shard in self._shards:
+            shard.worker = asyncio.create_task(
+                self._work(shard), name=f"update-shard-{shard.index}"
+            )
+        logger.info(f"✅ Pool de updates iniciado ({len(self._shards)} shards)")
+
+    def shard_for(self, update: Dict[str, Any]) -> int:
+        """Índice del shard que procesa el update."""
+        return hash(extract_shard_key(update)) % len(self._shards)
+
+    def submit(self, update: Dict[str, Any]) -> bool:
+        """
+        Encola un update sin esperar.
+
+        Args:
+            update: Update crudo del webhook
+
+        Returns:
+            bool: False si se descartó (pool cerrándose o shard lleno)
+        """
+        if self._closing:
+            return False
+        if not self.running:
+            self.start()
+
+        shard = self._shards[self.shard_for(update)]
+        try:
+            shard.queue.put_nowait((time.monotonic(), update))
+        except asyncio.QueueFull:
+            shard.shed += 1
+            if shard.shed % SHED_LOG_EVERY == 1:
+                logger.warning(
+                    f"⚠️ Shard {shard.index} saturado: update {update.get('update_id')} "
+                    f"descartado ({shard.shed} descartes)"
+                )
+            return False
+
+        shard.max_depth = max(shard.max_depth, shard.queue.qsize())
+        return True
+
+    async def _work(self, shard: _Shard) -> None:
+        """Consume la cola de un shard procesando un update a la vez."""
+        while True:
+            enqueued_at, update = await shard.queue.get()
+            started = time.monotonic()
+            try:
+                await self._process(update)
+                shard.processed += 1
+            except Exception as e:
+                shard.failed += 1
+                logger.error(
+                    f"❌ Error procesando update {update.get('update_id')} "
+                    f"(shard {shard.index}): {e}",
+                    exc_info=True
+                )
+            finally:
+                finished = time.monotonic()
+                shard.wait_seconds_total += started - enqueued_at
+                run_seconds = finished - started
+                shard.run_seconds_total += run_seconds
+                shard.run_seconds_max = max(shard.run_seconds_max, run_seconds)
+                shard.queue.task_done()
+
+    async def close(self, timeout: float = DRAIN_TIMEOUT_SECONDS) -> None:
+        """
+        Deja de aceptar updates, vacía las colas y detiene los workers.
+
+        Args:
+            timeout: Segundos máximos esperando que las colas se vacíen
+        """
+        self._closing = True
+        if not self.running:
+            return
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(shard.queue.join() for shard in self._shards)),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            pending = sum(shard.queue.qsize() for shard in self._shards)
+            logger.warning(f"⚠️ Pool de updates cerrado con {pending} update(s) sin procesar")
+
+        workers = [shard.worker for shard in self._shards if shard.worker is not None]
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        for shard in self._shards:
+            shard.worker = None
+        logger.info("✅ Pool de updates detenido")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Estadísticas del pool.
+
+        Returns:
+            Dict con totales (depth, processed, failed, shed) y la lista
+            "shards" con profundidad, descartes y latencias de cada uno
+        """
+        shards: List[Dict[str, Any]] = [shard.stats() for shard in self._shards]
+        return {
+            "shards": shards,
+            "depth": sum(s["depth"] for s in shards),
+            "processed": sum(s["processed"] for s in shards),
+            "failed": sum(s["failed"] for s in shards),
+            "shed": sum(s["shed"] for s in shards),
+        }
+
+
+class ShardedRequestHandler(SimpleRequestHandler):
+    """
+    Request handler de webhook que responde al instante y procesa en el pool.
+
+    Args:
+        dispatcher: Dispatcher de aiogram
+        bot: Instancia del bot
+        secret_token: Secret del webhook (header X-Telegram-Bot-Api-Secret-Token)
+        pool: Pool a usar (default: uno nuevo con la configuración)
+        **data: Datos extra para los handlers (como en SimpleRequestHandler)
+    """
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        secret_token: Optional[str] = None,
+        pool: Optional[UpdateWorkerPool] = None,
+        **data: Any
+    ):
+        super().__init__(
+            dispatcher=dispatcher,
+            bot=bot,
+            handle_in_background=True,
+            secret_token=secret_token,
+            **data
+        )
+        self.pool = pool or UpdateWorkerPool(self._process_update)
+
+    async def _process_update(self, update: Dict[str, Any]) -> None:
+        """Alimenta el dispatcher con un update (ejecutado por el worker del shard)."""
+        await self._background_feed_update(bot=self.bot, update=update)
+
+    async def _handle_request_background(self, bot: Bot, request: web.Request) -> web.Response:
+        """Encola el update y confirma a Telegram (también si se descarta)."""
+        self.pool.submit(await request.json(loads=bot.session.json_loads))
+        return web.json_response({}, dumps=bot.session.json_dumps)
+
+    def register(self, app: web.Application, /, path: str, **kwargs: Any) -> None:
+        """Registra la ruta y arranca los workers junto con la aplicación."""
+        super().register(app, path=path, **kwargs)
+        app.on_startup.append(self._start_pool)
+
+    async def _start_pool(self, *args: Any, **kwargs: Any) -> None:
+        self.pool.start()
+
+    async def close(self) -> None:
+        """Vacía el pool antes de cerrar la sesión del bot."""
+        await self.pool.close()
+        await super().close()
@@ -5,10 +5,16 @@ Validadores para:
 - Emojis
 - IDs de canales
 - Tokens
+- Fechas de programación
 - Etc.
 """
 import re
-from typing import List, Tuple
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+# "+30m", "+2h", "+1d"
+_RELATIVE_TIME_RE = re.compile(r"^\+(\d{1,4})\s*([mhd])$", re.IGNORECASE)
+_RELATIVE_UNITS = {"m": "minutes", "h": "hours", "d": "days"}
 
 
 def validate_emoji_list(text: str) -> Tuple[bool, str, List[str]]:
@@ -134,3 +140,54 @@ def is_valid_channel_id(channel_id: str) -> bool:
         return True
     except ValueError:
         return False
+
+
+def parse_schedule_time(text: str, now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Parsea el momento de publicación indicado por un admin (UTC).
+
+    Formatos aceptados:
+    - Relativo: "+30m", "+2h", "+1d"
+    - Hora: "HH:MM" (hoy, o mañana si esa hora ya pasó)
+    - Fecha y hora: "YYYY-MM-DD HH:MM"
+
+    Args:
+        text: Texto enviado por el admin
+        now: Momento de referencia UTC naive (default: ahora)
+
+    Returns:
+        datetime UTC naive en el futuro, o None si el formato es inválido
+        o la fecha ya pasó
+
+    Ejemplos:
+        >>> parse_schedule_time("+2h", datetime(2026, 1, 1, 10, 0))
+        datetime.datetime(2026, 1, 1, 12, 0)
+
+        >>> parse_schedule_time("09:00", datetime(2026, 1, 1, 10, 0))
+        datetime.datetime(2026, 1, 2, 9, 0)
+    """
+    if now is None:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    text = (text or "").strip()
+
+    match = _RELATIVE_TIME_RE.match(text)
+    if match:
+        amount, unit = int(match.group(1)), match.group(2).lower()
+        result = now + timedelta(**{_RELATIVE_UNITS[unit]: amount})
+        return result if amount > 0 else None
+
+    try:
+        clock = datetime.strptime(text, "%H:%M")
+    except ValueError:
+        pass
+    else:
+        result = now.replace(hour=clock.hour, minute=clock.minute, second=0, microsecond=0)
+        return result if result > now else result + timedelta(days=1)
+
+    try:
+        result = datetime.strptime(text, "%Y-%m-%d %H:%M")
+    except ValueError:
+        return None
+
+    return result if result > now else None
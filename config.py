@@ -59,6 +59,13 @@ class Config:
     # Host donde el servidor web escucha (default: 0.0.0.0)
     WEBHOOK_HOST: str = os.getenv("WEBHOOK_HOST", "0.0.0.0")
 
+    # Workers que procesan los updates del webhook (shard = hash(user_id))
+    # Updates del mismo usuario en orden; usuarios distintos en paralelo
+    WEBHOOK_WORKER_SHARDS: int = int(os.getenv("WEBHOOK_WORKER_SHARDS", "8"))
+
+    # Updates encolados por shard antes de descartar (load shedding)
+    WEBHOOK_SHARD_QUEUE_SIZE: int = int(os.getenv("WEBHOOK_SHARD_QUEUE_SIZE", "100"))
+
     # ===== DATABASE =====
     # Auto-detect testing mode to prevent database contamination
     # If TESTING=true, force in-memory database regardless of .env
@@ -103,6 +110,22 @@ class Config:
         os.getenv("MAX_VIP_SUBSCRIBERS", "1000")
     )
 
+    # Máximo de usuarios en el historial de mensajes en memoria
+    # (LRU: se descarta la sesión inactiva más antigua, ~200 bytes por usuario)
+    SESSION_HISTORY_MAX_USERS: int = int(
+        os.getenv("SESSION_HISTORY_MAX_USERS", "10000")
+    )
+
+    # ===== FSM STORAGE =====
+    # Estados de conversación persistidos en BD (bot/database/fsm_storage.py)
+    # Claves en la cache en memoria (LRU)
+    FSM_CACHE_MAX_ENTRIES: int = int(os.getenv("FSM_CACHE_MAX_ENTRIES", "10000"))
+    # Segundos que se confía en la cache antes de releer la fila
+    # (0 con varias réplicas sin afinidad por usuario)
+    FSM_CACHE_TTL_SECONDS: float = float(os.getenv("FSM_CACHE_TTL_SECONDS", "30"))
+    # Horas sin actividad tras las que un flujo se considera abandonado
+    FSM_STATE_TTL_HOURS: float = float(os.getenv("FSM_STATE_TTL_HOURS", "24"))
+
     # Tamaño máximo de token (caracteres)
     TOKEN_LENGTH: int = 16
 
@@ -122,6 +145,13 @@ class Config:
         os.getenv("PROCESS_FREE_QUEUE_MINUTES", "1")
     )
 
+    # Vigencia del lease de líder del scheduler (segundos)
+    # Con varias réplicas solo el líder ejecuta los jobs; si cae, otra
+    # réplica toma el relevo como mucho tras este tiempo
+    SCHEDULER_LEASE_TTL_SECONDS: float = float(
+        os.getenv("SCHEDULER_LEASE_TTL_SECONDS", "30")
+    )
+
     # ===== FREE CHANNEL SETTINGS =====
     # Ventana anti-spam para solicitudes Free (minutos)
     # Previene que usuarios soliciten acceso repetidamente en corto tiempo
@@ -129,12 +159,19 @@ class Config:
         os.getenv("FREE_REQUEST_SPAM_WINDOW_MINUTES", "5")
     )
 
-    # ===== RATE LIMITING FOR BULK OPERATIONS =====
-    # Rate limiting for Telegram API bulk operations
-    TELEGRAM_RATE_LIMIT_RPS: int = 30  # Requests per second (Telegram allows ~30 msg/sec)
-    TELEGRAM_RATE_LIMIT_DELAY: float = 1.0 / TELEGRAM_RATE_LIMIT_RPS  # Delay between requests
+    # ===== RATE LIMITING =====
+    # Presupuesto global de la Bot API, aplicado por TelegramRateLimiter
+    # (bot/utils/rate_limit.py) a todas las requests salientes del bot
+    TELEGRAM_RATE_LIMIT_RPS: int = int(os.getenv("TELEGRAM_RATE_LIMIT_RPS", "30"))
     BULK_OPERATION_BATCH_SIZE: int = 100  # Max records per batch
-    BULK_OPERATION_RATE_LIMIT_DELAY: float = 0.1  # 100ms between bulk API calls
+
+    # Anti-flood de botones por usuario (ThrottlingMiddleware, admins exentos)
+    # Callbacks por segundo sostenidos y ráfaga permitida
+    THROTTLE_CALLBACK_RATE: float = float(os.getenv("THROTTLE_CALLBACK_RATE", "2"))
+    THROTTLE_CALLBACK_BURST: int = int(os.getenv("THROTTLE_CALLBACK_BURST", "5"))
+    # Reacciones a publicaciones (más estricto: cada una otorga besitos)
+    THROTTLE_REACTION_RATE: float = float(os.getenv("THROTTLE_REACTION_RATE", "0.5"))
+    THROTTLE_REACTION_BURST: int = int(os.getenv("THROTTLE_REACTION_BURST", "3"))
 
     # ===== HEALTH CHECK =====
     # Puerto para el endpoint de health check (FastAPI)
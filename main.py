@@ -8,19 +8,26 @@ import sys
 import signal
 import threading
 import os
+from aiohttp import web
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.exceptions import TelegramNetworkError
 from aiogram.client.default import DefaultBotProperties
 from aiogram.client.session.aiohttp import AiohttpSession
-from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiogram.webhook.aiohttp_server import setup_application
 
 from config import Config
 from bot.database import init_db, close_db
+from bot.database.fsm_storage import SQLAlchemyStorage
 from bot.database.migrations import run_migrations_if_needed
-from bot.background import start_background_tasks, stop_background_tasks
+from bot.background import (
+    start_background_tasks, stop_background_tasks, release_leadership
+)
 from bot.health.runner import start_health_server
 from bot.middlewares import TelegramIPValidationMiddleware
+from bot.utils.api_cache import TelegramReadCache
+from bot.utils.metrics import TelegramMetricsMiddleware, get_metrics_registry, register_collector
+from bot.utils.rate_limit import TelegramRateLimiter
+from bot.utils.update_pool import ShardedRequestHandler
 
 # Flag global para señalizar shutdown
 _shutdown_requested = False
@@ -107,7 +114,8 @@ async def on_startup_webhook(bot: Bot, dispatcher: Dispatcher) -> None:
         logger.error(f"❌ Error al inicializar BD: {e}")
         sys.exit(1)
 
-    # Iniciar background tasks (incluye limpieza de solicitudes expiradas post-reinicio)
+    # Iniciar background tasks (la réplica líder limpia solicitudes expiradas
+    # y reanuda publicaciones y broadcasts interrumpidos)
     await start_background_tasks(bot)
 
     # Configurar webhook
@@ -181,7 +189,8 @@ async def on_startup(bot: Bot, dispatcher: Dispatcher) -> None:
         logger.error(f"❌ Error al inicializar BD: {e}")
         sys.exit(1)
 
-    # Iniciar background tasks (incluye limpieza de solicitudes expiradas post-reinicio)
+    # Iniciar background tasks (la réplica líder limpia solicitudes expiradas
+    # y reanuda publicaciones y broadcasts interrumpidos)
     await start_background_tasks(bot)
 
     # Inicializar servicio de batching para actualizaciones de teclado
@@ -254,6 +263,9 @@ async def on_shutdown(bot: Bot, dispatcher: Dispatcher) -> None:
     # Detener background tasks (sin bloquear)
     stop_background_tasks()
 
+    # Liberar el lease de líder: otra réplica toma los jobs sin esperar el TTL
+    await release_leadership()
+
     # Stop Telegram alert handler queue listener (drains in-flight alerts)
     import logging as _logging
     _root_logger = _logging.getLogger()
@@ -288,6 +300,12 @@ async def on_shutdown(bot: Bot, dispatcher: Dispatcher) -> None:
         except Exception as e:
             logger.warning(f"⚠️ No se pudo notificar shutdown a admin {admin_id}: {e}")
 
+    # Guardar estados FSM pendientes (antes de cerrar la BD)
+    try:
+        await dispatcher.storage.close()
+    except Exception as e:
+        logger.warning(f"⚠️ Error guardando estados FSM: {e}")
+
     # Cerrar base de datos
     await close_db()
 
@@ -304,6 +322,46 @@ async def on_shutdown(bot: Bot, dispatcher: Dispatcher) -> None:
     logger.info("✅ Bot cerrado correctamente")
 
 
+def _register_metrics_collectors(
+    rate_limiter: TelegramRateLimiter,
+    read_cache: TelegramReadCache,
+    storage: SQLAlchemyStorage,
+    dedup_middleware,
+    throttling_middleware
+) -> None:
+    """
+    Registra los stats() en memoria como gauges de GET /metrics.
+
+    Args:
+        rate_limiter: Limitador de la sesión del bot
+        read_cache: Caché de lecturas de la sesión del bot
+        storage: Storage FSM del dispatcher
+        dedup_middleware: DuplicateUpdateMiddleware registrado
+        throttling_middleware: ThrottlingMiddleware registrado
+    """
+    from bot.background.tasks import get_background_queue_stats
+    from bot.services.message.session_history import get_session_history
+    from bot.services.shop_catalog import get_shop_catalog_cache
+    from bot.utils.keyboards import keyboard_cache_stats
+
+    def throttling_stats() -> dict:
+        stats = throttling_middleware.stats()
+        return {
+            "tracked": stats["tracked"],
+            **{rule: {"throttled": count} for rule, count in stats["throttled"].items()}
+        }
+
+    register_collector("telegram_rate_limiter", rate_limiter.stats)
+    register_collector("telegram_read_cache", read_cache.stats, label="method")
+    register_collector("fsm_storage", storage.stats)
+    register_collector("update_dedup", dedup_middleware.stats)
+    register_collector("throttling", throttling_stats, label="rule")
+    register_collector("background", get_background_queue_stats)
+    register_collector("session_history", lambda: get_session_history().get_stats())
+    register_collector("shop_catalog_cache", lambda: get_shop_catalog_cache().stats())
+    register_collector("keyboard_cache", keyboard_cache_stats, label="builder")
+
+
 async def main() -> None:
     """
     Función principal que ejecuta el bot.
@@ -319,6 +377,23 @@ async def main() -> None:
     # Un timeout más corto permite que el bot responda a Ctrl+C rápidamente
     session = AiohttpSession(timeout=10)
 
+    # /metrics se sirve desde el thread del health server pero se renderiza aquí
+    get_metrics_registry().bind_loop()
+
+    # Lecturas idempotentes (get_chat, get_chat_member...): single-flight + TTL.
+    # Va primero para que un hit de caché no consuma presupuesto del limitador
+    read_cache = TelegramReadCache()
+    session.middleware(read_cache)
+
+    # Rate limiting central de la Bot API: bucket global + por chat,
+    # prioridad a respuestas interactivas y reintento de TelegramRetryAfter
+    rate_limiter = TelegramRateLimiter()
+    session.middleware(rate_limiter)
+
+    # Métricas de la Bot API: el más interno, mide cada intento real
+    # (sin la espera del limitador ni los hits de la caché)
+    session.middleware(TelegramMetricsMiddleware())
+
     bot = Bot(
         token=Config.BOT_TOKEN,
         session=session,
@@ -328,7 +403,8 @@ async def main() -> None:
     )
 
     # Crear storage para FSM (estados de conversación)
-    storage = MemoryStorage()
+    # Persistido en BD: los flujos sobreviven a redeploys y se comparten entre réplicas
+    storage = SQLAlchemyStorage()
 
     # Crear dispatcher
     dp = Dispatcher(storage=storage)
@@ -338,7 +414,22 @@ async def main() -> None:
     # 2. SimulationMiddleware: inyecta user_context para simulación de roles
     # 3. UserRegistrationMiddleware: registra usuario si no existe (requiere session)
     # 4. RoleDetectionMiddleware: detecta rol del usuario (requiere user_context si existe)
-    from bot.middlewares import DatabaseMiddleware, SimulationMiddleware, RoleDetectionMiddleware, UserRegistrationMiddleware
+    # 0. DuplicateUpdateMiddleware (outer, primero): descarta updates reenviados por update_id
+    # 0. ThrottlingMiddleware (outer): anti-flood de botones por usuario, sin tocar la BD
+    # 0. DeepLinkGuardMiddleware (outer): descarta floods de tokens inválidos sin tocar la BD
+    from bot.middlewares import DatabaseMiddleware, SimulationMiddleware, RoleDetectionMiddleware, UserRegistrationMiddleware, DeepLinkGuardMiddleware, DuplicateUpdateMiddleware, ThrottlingMiddleware, UpdateMetricsMiddleware, HandlerMetricsMiddleware, LiveProfilingMiddleware
+    dedup_middleware = DuplicateUpdateMiddleware()
+    throttling_middleware = ThrottlingMiddleware()
+    dp.update.outer_middleware(dedup_middleware)
+    dp.update.outer_middleware(throttling_middleware)
+    dp.update.outer_middleware(DeepLinkGuardMiddleware())
+    # Métricas por update (duración + queries SQL) y por handler
+    dp.update.outer_middleware(UpdateMetricsMiddleware())
+    for event_type, observer in dp.observers.items():
+        if event_type not in ("update", "error"):
+            observer.middleware(HandlerMetricsMiddleware(event_type))
+            # Profiling en vivo bajo demanda (/profile_live); inerte si no hay captura
+            observer.middleware(LiveProfilingMiddleware())
     # IMPORTANT: In aiogram 3, dp.update.middleware and dp.message.middleware are
     # SEPARATE middleware managers. Middleware on dp.update only runs for the raw
     # Update handler, NOT for specific event handlers. The real middlewares need to
@@ -365,6 +456,11 @@ async def main() -> None:
     from bot.handlers import register_all_handlers
     register_all_handlers(dp)
 
+    # Collectors de /metrics: stats() de caches, colas y middlewares en memoria
+    _register_metrics_collectors(
+        rate_limiter, read_cache, storage, dedup_middleware, throttling_middleware
+    )
+
     # Detectar modo de operación
     use_webhook = should_use_webhook()
 
@@ -386,7 +482,9 @@ async def main() -> None:
         logger.info(f"🔒 Middleware de validación de IPs activado (trust_proxy={trust_proxy})")
 
         # Crear handler de aiogram para webhooks
-        webhook_handler = SimpleRequestHandler(
+        # Responde a Telegram al instante; los updates se procesan en un pool
+        # de workers por hash(user_id) (orden por usuario, cola acotada)
+        webhook_handler = ShardedRequestHandler(
             dispatcher=dp,
             bot=bot,
             secret_token=Config.WEBHOOK_SECRET
@@ -394,6 +492,14 @@ async def main() -> None:
 
         # Registrar el handler en la ruta configurada
         webhook_handler.register(app, path=Config.WEBHOOK_PATH)
+        register_collector(
+            "update_pool",
+            lambda: {
+                str(shard.pop("shard")): shard
+                for shard in webhook_handler.pool.stats()["shards"]
+            },
+            label="shard"
+        )
 
         # Setup de la aplicación aiogram
         setup_application(app, dp, bot=bot)
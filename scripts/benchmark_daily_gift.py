@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Benchmark del reclamo de regalo diario.
+
+Compara claims/seg y sentencias SQL por reclamo entre:
+- legacy: can_claim -> _get_streak_for_claim -> UPDATE -> earn_besitos
+- single: claim_daily_gift (UPDATE condicional con RETURNING + crédito)
+
+Cada reclamo usa su propia sesión y commit, como un handler real. Todos
+los usuarios tienen una racha reclamada ayer (el caso más común).
+
+Uso:
+    python scripts/benchmark_daily_gift.py
+    python scripts/benchmark_daily_gift.py --users=2000
+    python scripts/benchmark_daily_gift.py --database-url=postgresql+asyncpg://...
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import event, delete, update
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
+
+from bot.database.enums import StreakType, TransactionType
+from bot.database.models import (
+    Base, User, UserStreak, UserGamificationProfile, Transaction
+)
+from bot.services.streak import StreakService
+from bot.services.wallet import WalletService
+
+DEFAULT_DB_PATH = "./benchmark_daily_gift.db"
+USER_ID_OFFSET = 9_000_000
+
+
+async def legacy_claim(service: StreakService, user_id: int) -> bool:
+    """Reproduce el flujo de reclamo previo (varios round-trips)."""
+    can_claim, _ = await service.can_claim_daily_gift(user_id)
+    if not can_claim:
+        return False
+
+    _, current_streak, last_claim_date, longest = await service._get_streak_for_claim(user_id)
+    today = service._get_utc_date()
+    if last_claim_date and service._get_utc_date(last_claim_date) == today - timedelta(days=1):
+        new_streak = current_streak + 1
+    else:
+        new_streak = 1
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+    today_start = datetime.combine(today, datetime.min.time())
+    result = await service.session.execute(
+        update(UserStreak)
+        .where(
+            UserStreak.user_id == user_id,
+            UserStreak.streak_type == StreakType.DAILY_GIFT,
+            UserStreak.last_claim_date < today_start
+        )
+        .values(
+            current_streak=new_streak,
+            longest_streak=max(longest, new_streak),
+            last_claim_date=now
+        )
+    )
+    if result.rowcount == 0:
+        return False
+
+    _, _, total = service.calculate_streak_bonus(new_streak)
+    success, _, _ = await service.wallet_service.earn_besitos(
+        user_id=user_id,
+        amount=total,
+        transaction_type=TransactionType.EARN_DAILY,
+        reason=f"Daily gift claim - streak day {new_streak}"
+    )
+    return success
+
+
+async def single_claim(service: StreakService, user_id: int) -> bool:
+    """Flujo actual: un UPDATE condicional prueba y avanza la racha."""
+    success, _ = await service.claim_daily_gift(user_id)
+    return success
+
+
+async def seed(session_factory, users: int) -> None:
+    """Crea usuarios con racha reclamada ayer y perfil de economía."""
+    yesterday = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=1)
+
+    async with session_factory() as session:
+        await session.execute(delete(Transaction))
+        await session.execute(delete(UserStreak))
+        await session.execute(delete(UserGamificationProfile))
+        await session.execute(delete(User).where(User.user_id >= USER_ID_OFFSET))
+
+        for i in range(users):
+            user_id = USER_ID_OFFSET + i
+            session.add(User(user_id=user_id, first_name=f"Bench{i}"))
+            session.add(UserGamificationProfile(user_id=user_id))
+            session.add(UserStreak(
+                user_id=user_id,
+                streak_type=StreakType.DAILY_GIFT,
+                current_streak=3,
+                longest_streak=3,
+                last_claim_date=yesterday
+            ))
+        await session.commit()
+
+
+async def run_scenario(name, claim_fn, engine, session_factory, users: int) -> dict:
+    """Ejecuta un reclamo por usuario y mide throughput y sentencias."""
+    await seed(session_factory, users)
+
+    statements = 0
+
+    def count_statement(*_args, **_kwargs):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_statement)
+    try:
+        claimed = 0
+        start = time.perf_counter()
+        for i in range(users):
+            async with session_factory() as session:
+                service = StreakService(session, wallet_service=WalletService(session))
+                if await claim_fn(service, USER_ID_OFFSET + i):
+                    claimed += 1
+                await session.commit()
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count_statement)
+
+    return {
+        "name": name,
+        "claimed": claimed,
+        "claims_per_sec": claimed / elapsed if elapsed else 0.0,
+        "statements_per_claim": statements / users if users else 0.0,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark del reclamo de regalo diario"
+    )
+    parser.add_argument("--users", type=int, default=500, help="Reclamos por escenario")
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help=f"URL async de BD (default: SQLite temporal en {DEFAULT_DB_PATH})"
+    )
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite+aiosqlite:///{DEFAULT_DB_PATH}"
+    engine = create_async_engine(database_url, poolclass=NullPool, echo=False)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    try:
+        results = [
+            await run_scenario("legacy", legacy_claim, engine, session_factory, args.users),
+            await run_scenario("single", single_claim, engine, session_factory, args.users),
+        ]
+    finally:
+        await engine.dispose()
+        if args.database_url is None and os.path.exists(DEFAULT_DB_PATH):
+            os.remove(DEFAULT_DB_PATH)
+
+    print(f"\n{'escenario':<10} {'reclamos':>9} {'claims/seg':>11} {'SQL/reclamo':>12}")
+    print("-" * 45)
+    for r in results:
+        print(
+            f"{r['name']:<10} {r['claimed']:>9} "
+            f"{r['claims_per_sec']:>11.1f} {r['statements_per_claim']:>12.1f}"
+        )
+
+    legacy, single = results
+    if legacy["claims_per_sec"]:
+        speedup = single["claims_per_sec"] / legacy["claims_per_sec"]
+        print(f"\nspeedup: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
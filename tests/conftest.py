@@ -30,6 +30,7 @@ import asyncio
 # Import all fixtures from the fixtures package
 from tests.fixtures import (
     test_db,
+    test_file_db,
     test_session,
     test_engine,
     test_invitation_token,
@@ -63,6 +64,16 @@ def event_loop_policy():
     return asyncio.get_event_loop_policy()
 
 
+@pytest.fixture(autouse=True)
+def reset_token_guard():
+    """Clear the process-wide token negative cache between tests."""
+    from bot.services.token_guard import get_token_guard
+
+    get_token_guard().clear()
+    yield
+    get_token_guard().clear()
+
+
 @pytest.fixture
 def assert_greeting_present():
     """Fixture: Returns assertion function that checks for Spanish greetings."""
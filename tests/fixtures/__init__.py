@@ -5,6 +5,7 @@ Import all fixtures to make them available via conftest.py.
 """
 from tests.fixtures.database import (
     test_db,
+    test_file_db,
     test_session,
     test_engine,
     test_invitation_token,
@@ -33,6 +34,7 @@ from tests.fixtures.telegram import (
 
 __all__ = [
     "test_db",
+    "test_file_db",
     "test_session",
     "test_engine",
     "test_invitation_token",
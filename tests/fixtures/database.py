@@ -71,6 +71,23 @@ async def test_db():
     await engine.dispose()
 
 
+@pytest_asyncio.fixture
+async def test_file_db(tmp_path):
+    """
+    Fixture: Isolated SQLite database in a temporary file.
+
+    test_db shares a single in-memory connection between sessions, so one
+    session's rollback (or a cancelled query) affects the others. Use this
+    one to test races between concurrent transactions.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
 @pytest_asyncio.fixture
 async def test_session(test_db):
     """
@@ -0,0 +1,103 @@
+"""
+Tests for single-flight + TTL caching of Bot API reads.
+
+Tests cover:
+- Concurrent identical reads share one request (coalesced)
+- Results are reused within the TTL and refetched after it
+- Errors are shared with waiters but not cached
+- Member-mutating calls invalidate the cached get_chat_member
+- Non-cacheable methods always hit the API
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiogram.methods import BanChatMember, GetChat, GetChatMember, SendMessage
+
+from bot.utils.api_cache import TelegramReadCache
+
+
+def _slow_request(result="chat", delay=0.05):
+    async def make_request(bot, method):
+        await asyncio.sleep(delay)
+        return result
+    return AsyncMock(side_effect=make_request)
+
+
+class TestTelegramReadCache:
+    """Tests for the read cache middleware."""
+
+    async def test_concurrent_reads_are_coalesced(self):
+        cache = TelegramReadCache()
+        make_request = _slow_request()
+
+        results = await asyncio.gather(*[
+            cache(make_request, MagicMock(), GetChat(chat_id=-100)) for _ in range(5)
+        ])
+
+        assert results == ["chat"] * 5
+        assert make_request.await_count == 1
+        assert cache.stats()["getChat"] == {"hits": 0, "misses": 1, "coalesced": 4}
+
+    async def test_result_cached_until_ttl(self):
+        cache = TelegramReadCache(ttl_overrides={"getChat": 0.05})
+        make_request = _slow_request(delay=0)
+
+        await cache(make_request, MagicMock(), GetChat(chat_id=-100))
+        await cache(make_request, MagicMock(), GetChat(chat_id=-100))
+        assert make_request.await_count == 1
+
+        await asyncio.sleep(0.06)
+        await cache(make_request, MagicMock(), GetChat(chat_id=-100))
+        assert make_request.await_count == 2
+
+    async def test_different_params_are_not_shared(self):
+        cache = TelegramReadCache()
+        make_request = _slow_request(delay=0)
+
+        await cache(make_request, MagicMock(), GetChat(chat_id=-100))
+        await cache(make_request, MagicMock(), GetChat(chat_id=-200))
+
+        assert make_request.await_count == 2
+
+    async def test_errors_are_shared_but_not_cached(self):
+        cache = TelegramReadCache()
+
+        async def failing(bot, method):
+            await asyncio.sleep(0.02)
+            raise RuntimeError("boom")
+
+        make_request = AsyncMock(side_effect=failing)
+
+        results = await asyncio.gather(
+            cache(make_request, MagicMock(), GetChat(chat_id=-100)),
+            cache(make_request, MagicMock(), GetChat(chat_id=-100)),
+            return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert make_request.await_count == 1
+
+        with pytest.raises(RuntimeError):
+            await cache(make_request, MagicMock(), GetChat(chat_id=-100))
+        assert make_request.await_count == 2
+
+    async def test_ban_invalidates_member(self):
+        cache = TelegramReadCache()
+        make_request = _slow_request(delay=0)
+        get_member = GetChatMember(chat_id=-100, user_id=7)
+
+        await cache(make_request, MagicMock(), get_member)
+        await cache(make_request, MagicMock(), BanChatMember(chat_id="-100", user_id=7))
+        await cache(make_request, MagicMock(), get_member)
+
+        assert make_request.await_count == 3
+
+    async def test_non_cacheable_methods_pass_through(self):
+        cache = TelegramReadCache()
+        make_request = _slow_request(delay=0)
+
+        for _ in range(2):
+            await cache(make_request, MagicMock(), SendMessage(chat_id=1, text="hola"))
+
+        assert make_request.await_count == 2
+        assert cache.stats() == {}
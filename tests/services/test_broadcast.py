@@ -0,0 +1,300 @@
+"""
+Tests for DM broadcasts to user segments.
+
+Tests cover:
+- Segment resolution (free, active VIP, expiring VIP, pending interests)
+- Idempotent recipient materialization
+- Batched result persistence and counters
+- Background runner: blocked users, persistent retry_after, resume after restart,
+  a failing flush cancels the remaining workers
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import pytest_asyncio
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+from sqlalchemy import select
+
+from bot.background.broadcast import run_broadcast, deliver
+from bot.database.enums import BroadcastSegment, DeliveryStatus, UserRole
+from bot.database.models import (
+    User, VIPSubscriber, InvitationToken, UserInterest, BroadcastDelivery
+)
+from bot.services.broadcast import BroadcastService
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@pytest_asyncio.fixture
+async def broadcast_service(test_session):
+    """Fixture: Provides BroadcastService with test session."""
+    return BroadcastService(test_session)
+
+
+@pytest_asyncio.fixture
+async def segment_users(test_session):
+    """Fixture: 3 free users (one with pending interest), 2 VIPs (one expiring soon)."""
+    test_session.add_all([
+        User(user_id=2000 + i, username=f"bc{i}", first_name=f"Bc{i}", role=role)
+        for i, role in enumerate([
+            UserRole.FREE, UserRole.FREE, UserRole.FREE, UserRole.VIP, UserRole.VIP
+        ])
+    ])
+    token = InvitationToken(token="BROADCASTTOKEN01", generated_by=1, duration_hours=24)
+    test_session.add(token)
+    await test_session.flush()
+
+    test_session.add_all([
+        VIPSubscriber(
+            user_id=2003, expiry_date=_now() + timedelta(days=30),
+            status="active", token_id=token.id
+        ),
+        VIPSubscriber(
+            user_id=2004, expiry_date=_now() + timedelta(days=3),
+            status="active", token_id=token.id
+        ),
+        UserInterest(user_id=2001, package_id=None, is_attended=False),
+        UserInterest(user_id=2002, package_id=None, is_attended=True),
+    ])
+    await test_session.commit()
+
+
+def _fake_session_factory(test_db):
+    @asynccontextmanager
+    async def fake_get_session():
+        async with test_db() as session:
+            yield session
+            await session.commit()
+    return fake_get_session
+
+
+def _retry_after(seconds=0):
+    return TelegramRetryAfter(method=MagicMock(), message="Flood control", retry_after=seconds)
+
+
+def _blocked():
+    return TelegramForbiddenError(
+        method=MagicMock(), message="Forbidden: bot was blocked by the user"
+    )
+
+
+class TestCreateBroadcast:
+    """Tests for broadcast creation."""
+
+    async def test_create_text_broadcast(self, broadcast_service):
+        success, status, broadcast = await broadcast_service.create_broadcast(
+            BroadcastSegment.ALL_FREE, "text", "Hola", admin_id=1
+        )
+        assert success is True
+        assert status == "created"
+        assert broadcast.status == "pending"
+        assert broadcast.segment == "all_free"
+
+    async def test_rejects_media_without_file_id(self, broadcast_service):
+        success, status, _ = await broadcast_service.create_broadcast(
+            BroadcastSegment.ALL_FREE, "photo", "caption", admin_id=1
+        )
+        assert success is False
+        assert status == "missing_content"
+
+    async def test_rejects_unknown_content_type(self, broadcast_service):
+        success, status, _ = await broadcast_service.create_broadcast(
+            BroadcastSegment.ALL_FREE, "sticker", "x", admin_id=1
+        )
+        assert success is False
+        assert status == "invalid_content_type"
+
+
+class TestSegments:
+    """Tests for recipient materialization."""
+
+    @pytest.mark.parametrize("segment,expected", [
+        (BroadcastSegment.ALL_FREE, [2000, 2001, 2002]),
+        (BroadcastSegment.ACTIVE_VIP, [2003, 2004]),
+        (BroadcastSegment.VIP_EXPIRING, [2004]),
+        (BroadcastSegment.PENDING_INTERESTS, [2001]),
+    ])
+    async def test_segment_recipients(
+        self, broadcast_service, test_session, segment_users, segment, expected
+    ):
+        _, _, broadcast = await broadcast_service.create_broadcast(segment, "text", "Hola", 1)
+
+        total = await broadcast_service.enqueue_recipients(broadcast)
+
+        pending = [
+            user_id async for user_id in broadcast_service.stream_pending_user_ids(broadcast.id)
+        ]
+        assert total == len(expected)
+        assert pending == expected
+        assert broadcast.status == "running"
+
+    async def test_enqueue_is_idempotent(self, broadcast_service, segment_users):
+        _, _, broadcast = await broadcast_service.create_broadcast(
+            BroadcastSegment.ALL_FREE, "text", "Hola", 1
+        )
+        await broadcast_service.enqueue_recipients(broadcast)
+        total = await broadcast_service.enqueue_recipients(broadcast)
+
+        assert total == 3
+
+
+class TestRecordResults:
+    """Tests for batched result persistence."""
+
+    async def test_results_update_deliveries_and_counters(
+        self, broadcast_service, test_session, segment_users
+    ):
+        _, _, broadcast = await broadcast_service.create_broadcast(
+            BroadcastSegment.ALL_FREE, "text", "Hola", 1
+        )
+        await broadcast_service.enqueue_recipients(broadcast)
+
+        await broadcast_service.record_results(broadcast.id, [
+            (2000, DeliveryStatus.SENT, None),
+            (2001, DeliveryStatus.BLOCKED, "blocked"),
+        ])
+        await test_session.refresh(broadcast)
+
+        counts = await broadcast_service.get_delivery_counts(broadcast.id)
+        assert counts == {"pending": 1, "sent": 1, "failed": 0, "blocked": 1}
+        assert broadcast.sent_count == 1
+        assert broadcast.blocked_count == 1
+
+        error_code = await test_session.scalar(
+            select(BroadcastDelivery.error_code).where(BroadcastDelivery.user_id == 2001)
+        )
+        assert error_code == "blocked"
+
+        pending = [
+            user_id async for user_id in broadcast_service.stream_pending_user_ids(broadcast.id)
+        ]
+        assert pending == [2002]
+
+
+class TestDeliver:
+    """Tests for a single delivery."""
+
+    async def test_persistent_retry_after_is_a_failed_delivery(self):
+        # Los retry_after cortos los reintenta el limitador de la sesión;
+        # uno que llega hasta aquí no se reintenta de nuevo
+        bot = MagicMock()
+        bot.send_message = AsyncMock(side_effect=_retry_after(0))
+
+        status, error_code = await deliver(
+            bot, {"content_type": "text", "file_id": None, "text": "Hola",
+                  "protect_content": False}, 1
+        )
+
+        assert status == DeliveryStatus.FAILED
+        assert error_code == "rate_limit"
+        assert bot.send_message.await_count == 1
+
+    async def test_blocked_user_is_classified(self):
+        bot = MagicMock()
+        bot.send_photo = AsyncMock(side_effect=_blocked())
+
+        status, error_code = await deliver(
+            bot,
+            {"content_type": "photo", "file_id": "FILE", "text": None, "protect_content": True}, 1
+        )
+
+        assert status == DeliveryStatus.BLOCKED
+        assert error_code == "blocked"
+        assert bot.send_photo.call_args.kwargs["protect_content"] is True
+
+
+class TestBroadcastRunner:
+    """Tests for the background runner."""
+
+    async def test_run_broadcast_reports_final_counts(self, test_db, test_session, segment_users):
+        _, _, broadcast = await BroadcastService(test_session).create_broadcast(
+            BroadcastSegment.ALL_FREE, "text", "Hola", 1,
+            progress_chat_id=1, progress_message_id=10
+        )
+        await test_session.commit()
+
+        async def send_message(chat_id, **kwargs):
+            if chat_id == 2001:
+                raise _blocked()
+
+        bot = MagicMock()
+        bot.send_message = AsyncMock(side_effect=send_message)
+        bot.edit_message_text = AsyncMock()
+
+        with patch("bot.background.broadcast.get_session", _fake_session_factory(test_db)):
+            counts = await run_broadcast(bot, broadcast.id, workers=2)
+
+        assert counts["sent"] == 2
+        assert counts["blocked"] == 1
+        assert counts["pending"] == 0
+
+        async with test_db() as session:
+            stored = await BroadcastService(session).get_broadcast(broadcast.id)
+            assert stored.status == "completed"
+            assert stored.sent_count == 2
+            assert stored.blocked_count == 1
+
+        final_text = bot.edit_message_text.call_args.kwargs["text"]
+        assert "completado" in final_text
+        assert "3</b> / 3" in final_text
+
+    async def test_resume_skips_delivered_recipients(self, test_db, test_session, segment_users):
+        service = BroadcastService(test_session)
+        _, _, broadcast = await service.create_broadcast(
+            BroadcastSegment.ALL_FREE, "text", "Hola", 1
+        )
+        await service.enqueue_recipients(broadcast)
+        await service.record_results(broadcast.id, [(2000, DeliveryStatus.SENT, None)])
+        await test_session.commit()
+
+        bot = MagicMock()
+        bot.send_message = AsyncMock()
+
+        with patch("bot.background.broadcast.get_session", _fake_session_factory(test_db)):
+            counts = await run_broadcast(bot, broadcast.id, workers=2)
+
+        sent_to = sorted(call.kwargs["chat_id"] for call in bot.send_message.await_args_list)
+        assert sent_to == [2001, 2002]
+        assert counts["sent"] == 3
+
+    async def test_failing_flush_cancels_other_workers(self, test_file_db):
+        # En archivo: cancelar el stream del productor invalida su conexión
+        async with test_file_db() as session:
+            session.add_all([
+                User(user_id=2000 + i, username=f"bc{i}", first_name=f"Bc{i}", role=UserRole.FREE)
+                for i in range(3)
+            ])
+            _, _, broadcast = await BroadcastService(session).create_broadcast(
+                BroadcastSegment.ALL_FREE, "text", "Hola", 1
+            )
+            await session.commit()
+
+        async def slow_send(**kwargs):
+            await asyncio.sleep(0.01)
+
+        bot = MagicMock()
+        bot.send_message = AsyncMock(side_effect=slow_send)
+
+        record_results = BroadcastService.record_results
+        calls = []
+
+        async def failing_once(self, broadcast_id, batch):
+            calls.append(batch)
+            if len(calls) == 1:
+                raise RuntimeError("db down")
+            return await record_results(self, broadcast_id, batch)
+
+        with patch("bot.background.broadcast.get_session", _fake_session_factory(test_file_db)), \
+                patch("bot.background.broadcast.RESULT_FLUSH_SIZE", 1), \
+                patch.object(BroadcastService, "record_results", failing_once):
+            await run_broadcast(bot, broadcast.id, workers=2)
+
+        # El segundo worker se cancela: el tercer destinatario no recibe nada
+        assert bot.send_message.await_count == 2
+        async with test_file_db() as session:
+            assert (await BroadcastService(session).get_broadcast(broadcast.id)).status == "failed"
@@ -0,0 +1,92 @@
+"""
+Tests for ChannelService.send_to_channels (multi-channel publishing).
+
+Tests cover:
+- Channels are published concurrently (total time ~ slowest send)
+- Results are yielded in completion order
+- A media URL is uploaded once and its file_id reused for the rest
+"""
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+from bot.services.channel import ChannelService
+
+CHANNELS = [("VIP", "-1001"), ("Free", "-1002")]
+
+
+def _sent_photo(file_id):
+    message = MagicMock()
+    message.photo = [MagicMock(file_id="small"), MagicMock(file_id=file_id)]
+    message.video = None
+    return message
+
+
+async def _collect(sends):
+    return [result async for result in sends]
+
+
+class TestSendToChannels:
+    """Tests for concurrent multi-channel publishing."""
+
+    async def test_sends_run_concurrently(self):
+        delays = {"-1001": 0.2, "-1002": 0.05}
+
+        async def send_message(chat_id, **kwargs):
+            await asyncio.sleep(delays[chat_id])
+            return MagicMock()
+
+        bot = MagicMock()
+        bot.send_message = AsyncMock(side_effect=send_message)
+        service = ChannelService(MagicMock(), bot)
+
+        started = time.monotonic()
+        results = await _collect(service.send_to_channels(CHANNELS, text="Hola", add_reactions=False))
+        elapsed = time.monotonic() - started
+
+        assert elapsed < 0.3
+        assert [name for name, *_ in results] == ["Free", "VIP"]
+        assert all(success for _, success, _, _ in results)
+
+    async def test_failure_in_one_channel_does_not_block_others(self):
+        async def send_message(chat_id, **kwargs):
+            if chat_id == "-1001":
+                raise RuntimeError("boom")
+            return MagicMock()
+
+        bot = MagicMock()
+        bot.send_message = AsyncMock(side_effect=send_message)
+        service = ChannelService(MagicMock(), bot)
+
+        results = dict(
+            (name, success)
+            for name, success, _, _ in await _collect(
+                service.send_to_channels(CHANNELS, text="Hola", add_reactions=False)
+            )
+        )
+
+        assert results == {"VIP": False, "Free": True}
+
+    async def test_file_id_is_sent_in_parallel_as_is(self):
+        bot = MagicMock()
+        bot.send_photo = AsyncMock(return_value=_sent_photo("NEWID"))
+        service = ChannelService(MagicMock(), bot)
+
+        await _collect(service.send_to_channels(
+            CHANNELS, text="c", photo="AgADFILEID", add_reactions=False
+        ))
+
+        photos = [call.kwargs["photo"] for call in bot.send_photo.await_args_list]
+        assert photos == ["AgADFILEID", "AgADFILEID"]
+
+    async def test_media_url_uploaded_once_then_file_id_reused(self):
+        bot = MagicMock()
+        bot.send_photo = AsyncMock(return_value=_sent_photo("UPLOADED"))
+        service = ChannelService(MagicMock(), bot)
+
+        await _collect(service.send_to_channels(
+            CHANNELS, text="c", photo="https://example.com/p.jpg", add_reactions=False
+        ))
+
+        photos = [call.kwargs["photo"] for call in bot.send_photo.await_args_list]
+        assert photos == ["https://example.com/p.jpg", "UPLOADED"]
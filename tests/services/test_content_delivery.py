@@ -0,0 +1,289 @@
+"""
+Tests for the purchased-content delivery queue.
+
+Tests cover:
+- Chunking into albums of at most 10 files and retry backoff
+- Enqueue, due selection, latest status per access and admin requeue
+- Runner: album sends, single-file chunks, resume from the last confirmed
+  album, permanent failures (blocked user) and exhausted retries
+- Failed deliveries alert the admins (retry is a manual requeue)
+- Claim: concurrent runners (purchase handler + scheduler job) send once
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest_asyncio
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+from aiogram.types import InputMediaVideo
+
+from bot.background.content_delivery import process_delivery, process_due_deliveries
+from bot.database.enums import ContentDeliveryStatus, ContentTier, ContentType
+from bot.database.models import ContentSet, User, UserContentAccess
+from bot.services.content_delivery import (
+    MAX_DELIVERY_ATTEMPTS,
+    RETRY_MAX_SECONDS,
+    ContentDeliveryService,
+    chunk_file_ids,
+    retry_delay,
+)
+from config import Config
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _fake_session_factory(test_db):
+    @asynccontextmanager
+    async def fake_get_session():
+        async with test_db() as session:
+            yield session
+            await session.commit()
+    return fake_get_session
+
+
+def _bad_request():
+    return TelegramBadRequest(method=MagicMock(), message="Bad Request: internal error")
+
+
+def _blocked():
+    return TelegramForbiddenError(
+        method=MagicMock(), message="Forbidden: bot was blocked by the user"
+    )
+
+
+def _bot():
+    bot = MagicMock()
+    bot.send_media_group = AsyncMock()
+    bot.send_photo = AsyncMock()
+    bot.send_video = AsyncMock()
+    bot.send_audio = AsyncMock()
+    bot.send_message = AsyncMock()
+    return bot
+
+
+async def _seed_access(session):
+    session.add(User(user_id=7001, username="buyer", first_name="Buyer"))
+    content_set = ContentSet(
+        name="Delivery Pack", file_ids=["f"], content_type=ContentType.PHOTO_SET,
+        tier=ContentTier.FREE
+    )
+    session.add(content_set)
+    await session.flush()
+
+    access = UserContentAccess(
+        user_id=7001, content_set_id=content_set.id,
+        access_type="shop_purchase", besitos_paid=10
+    )
+    session.add(access)
+    await session.commit()
+    return access
+
+
+@pytest_asyncio.fixture
+async def access(test_session):
+    """Fixture: buyer with an access record to a content set."""
+    return await _seed_access(test_session)
+
+
+async def _enqueue(test_session, access, count, content_type="photo_set"):
+    delivery = await ContentDeliveryService(test_session).enqueue(
+        access, content_type=content_type, file_ids=[f"file{i}" for i in range(count)]
+    )
+    await test_session.commit()
+    return delivery.id
+
+
+async def _get(test_db, delivery_id):
+    async with test_db() as session:
+        return await ContentDeliveryService(session).get_delivery(delivery_id)
+
+
+class TestChunkingAndBackoff:
+    """Tests for the pure helpers."""
+
+    def test_chunks_respect_media_group_limit(self):
+        chunks = chunk_file_ids([str(i) for i in range(23)])
+        assert [len(chunk) for chunk in chunks] == [10, 10, 3]
+        assert chunks[2] == ["20", "21", "22"]
+        assert chunk_file_ids([]) == []
+
+    def test_retry_delay_grows_and_caps(self):
+        assert retry_delay(1) < retry_delay(2) < retry_delay(3)
+        assert retry_delay(50) == timedelta(seconds=RETRY_MAX_SECONDS)
+        assert retry_delay(1, retry_after=600) == timedelta(seconds=600)
+
+
+class TestContentDeliveryService:
+    """Tests for queue bookkeeping."""
+
+    async def test_enqueue_counts_albums(self, test_session, access):
+        delivery_id = await _enqueue(test_session, access, 21)
+        delivery = await ContentDeliveryService(test_session).get_delivery(delivery_id)
+
+        assert delivery.status == "pending"
+        assert delivery.total_chunks == 3
+        assert delivery.user_id == 7001
+
+    async def test_due_selection_skips_future_retries(self, test_session, access):
+        service = ContentDeliveryService(test_session)
+        due_id = await _enqueue(test_session, access, 1)
+        later_id = await _enqueue(test_session, access, 1)
+        (await service.get_delivery(later_id)).next_attempt_at = _now() + timedelta(minutes=5)
+        await test_session.commit()
+
+        assert await service.get_due_delivery_ids() == [due_id]
+
+    async def test_status_by_access_uses_latest_delivery(self, test_session, access):
+        service = ContentDeliveryService(test_session)
+        first_id = await _enqueue(test_session, access, 1)
+        await service.mark_delivered(first_id)
+        await _enqueue(test_session, access, 1)  # Recompra: nueva entrega pendiente
+
+        assert await service.get_status_by_access([access.id]) == {
+            access.id: ContentDeliveryStatus.PENDING
+        }
+        assert await service.get_status_by_access([]) == {}
+
+    async def test_claim_is_exclusive_and_leased(self, test_session, access):
+        service = ContentDeliveryService(test_session)
+        delivery_id = await _enqueue(test_session, access, 1)
+
+        assert await service.claim_delivery(delivery_id) is True
+        assert await service.claim_delivery(delivery_id) is False
+        # Reclamada: deja de estar vencida hasta que expire el lease
+        assert await service.get_due_delivery_ids() == []
+
+    async def test_requeue_only_failed(self, test_session, access):
+        service = ContentDeliveryService(test_session)
+        delivery_id = await _enqueue(test_session, access, 1)
+
+        assert await service.requeue(delivery_id) == (False, "not_failed")
+
+        await service.record_failure(delivery_id, "blocked", permanent=True)
+        assert await service.requeue(delivery_id) == (True, "requeued")
+
+        delivery = await service.get_delivery(delivery_id)
+        assert delivery.status == "pending"
+        assert delivery.attempts == 0
+        assert (await service.get_queue_counts())["pending"] == 1
+
+
+class TestDeliveryRunner:
+    """Tests for the background sender."""
+
+    async def test_sends_albums_of_ten(self, test_db, test_session, access):
+        delivery_id = await _enqueue(test_session, access, 23)
+        bot = _bot()
+
+        with patch("bot.background.content_delivery.get_session", _fake_session_factory(test_db)):
+            status = await process_delivery(bot, delivery_id)
+
+        assert status is ContentDeliveryStatus.DELIVERED
+        albums = [call.kwargs["media"] for call in bot.send_media_group.await_args_list]
+        assert [len(album) for album in albums] == [10, 10, 3]
+        assert albums[0][0].caption is not None
+        assert albums[1][0].caption is None
+
+        delivery = await _get(test_db, delivery_id)
+        assert delivery.status == "delivered"
+        assert delivery.chunks_sent == 3
+        assert delivery.delivered_at is not None
+
+    async def test_single_file_chunk_and_video_albums(self, test_db, test_session, access):
+        photos_id = await _enqueue(test_session, access, 11)
+        videos_id = await _enqueue(test_session, access, 2, content_type="video")
+        bot = _bot()
+
+        with patch("bot.background.content_delivery.get_session", _fake_session_factory(test_db)):
+            await process_delivery(bot, photos_id)
+            await process_delivery(bot, videos_id)
+
+        # 11 fotos: álbum de 10 + send_photo suelto; 2 videos: álbum de videos
+        assert bot.send_photo.await_args.kwargs["photo"] == "file10"
+        video_album = bot.send_media_group.await_args_list[-1].kwargs["media"]
+        assert all(isinstance(item, InputMediaVideo) for item in video_album)
+
+    async def test_failure_resumes_from_last_album(self, test_db, test_session, access):
+        delivery_id = await _enqueue(test_session, access, 25)
+        bot = _bot()
+        bot.send_media_group.side_effect = [None, _bad_request()]
+
+        with patch("bot.background.content_delivery.get_session", _fake_session_factory(test_db)):
+            status = await process_delivery(bot, delivery_id)
+
+            assert status is ContentDeliveryStatus.PENDING
+            delivery = await _get(test_db, delivery_id)
+            assert (delivery.chunks_sent, delivery.attempts) == (1, 1)
+            assert delivery.next_attempt_at > _now()
+
+            # Aún no vence: el job no la toma
+            assert await process_due_deliveries(bot) == 0
+
+            async with test_db() as session:
+                (await ContentDeliveryService(session).get_delivery(delivery_id)).next_attempt_at = _now()
+                await session.commit()
+
+            bot.send_media_group.reset_mock(side_effect=True)
+            assert await process_due_deliveries(bot) == 1
+
+        # Reanuda en el segundo álbum: 10 + 5 archivos restantes
+        albums = [call.kwargs["media"] for call in bot.send_media_group.await_args_list]
+        assert [len(album) for album in albums] == [10, 5]
+        assert (await _get(test_db, delivery_id)).status == "delivered"
+
+    async def test_blocked_user_fails_without_retry(self, test_db, test_session, access):
+        delivery_id = await _enqueue(test_session, access, 3)
+        bot = _bot()
+        bot.send_media_group.side_effect = _blocked()
+
+        with patch("bot.background.content_delivery.get_session", _fake_session_factory(test_db)), \
+                patch.object(Config, "ADMIN_USER_IDS", [1]):
+            status = await process_delivery(bot, delivery_id)
+
+        assert status is ContentDeliveryStatus.FAILED
+        assert (await _get(test_db, delivery_id)).last_error == "blocked"
+        # Solo la alerta al admin: el usuario bloqueó al bot
+        bot.send_message.assert_awaited_once()
+        assert bot.send_message.await_args.kwargs["chat_id"] == 1
+        assert "reencólela" in bot.send_message.await_args.kwargs["text"]
+
+    async def test_exhausted_retries_notify_user_and_admins(self, test_db, test_session, access):
+        delivery_id = await _enqueue(test_session, access, 3)
+        async with test_db() as session:
+            (await ContentDeliveryService(session).get_delivery(delivery_id)).attempts = MAX_DELIVERY_ATTEMPTS - 1
+            await session.commit()
+
+        bot = _bot()
+        bot.send_media_group.side_effect = _bad_request()
+
+        with patch("bot.background.content_delivery.get_session", _fake_session_factory(test_db)), \
+                patch.object(Config, "ADMIN_USER_IDS", [1, 2]):
+            status = await process_delivery(bot, delivery_id)
+
+        assert status is ContentDeliveryStatus.FAILED
+        chats = [call.kwargs["chat_id"] for call in bot.send_message.await_args_list]
+        assert chats == [1, 2, 7001]
+
+    async def test_concurrent_runners_send_once(self, test_file_db):
+        async with test_file_db() as session:
+            delivery_id = await _enqueue(session, await _seed_access(session), 12)
+        bot = _bot()
+
+        async def slow_album(**kwargs):
+            await asyncio.sleep(0.01)
+
+        bot.send_media_group.side_effect = slow_album
+
+        with patch("bot.background.content_delivery.get_session", _fake_session_factory(test_file_db)):
+            # El handler de compra y el job del scheduler toman la misma entrega
+            await asyncio.gather(
+                process_delivery(bot, delivery_id),
+                process_due_deliveries(bot),
+            )
+
+        # 12 archivos = 2 álbumes, enviados una sola vez
+        assert bot.send_media_group.await_count == 2
+        assert (await _get(test_file_db, delivery_id)).status == "delivered"
@@ -0,0 +1,152 @@
+"""
+Tests for full-text content search (SQLite FTS5 path).
+
+Tests cover:
+- Existing rows are backfilled when the index is created
+- Prefix and accent-insensitive matching, all terms required
+- Name matches rank above description matches
+- Triggers keep the shared index in sync; kinds do not leak across tables
+- Product filters (active only, tier) and pagination
+- Fallback to ILIKE when the index does not exist
+"""
+import pytest_asyncio
+
+from bot.database.enums import ContentCategory, ContentTier
+from bot.database.models import ContentPackage, ContentSet, ShopProduct
+from bot.database.search_index import create_content_search_index
+from bot.services.search import ContentSearchService
+
+
+def _package(name, description=None, is_active=True):
+    return ContentPackage(
+        name=name, description=description,
+        category=ContentCategory.FREE_CONTENT, is_active=is_active
+    )
+
+
+@pytest_asyncio.fixture
+async def content_set(test_session):
+    """Fixture: content set backing the shop products."""
+    content_set = ContentSet(name="Sesión de playa", description="Fotos en la arena", file_ids=["f1"])
+    test_session.add(content_set)
+    await test_session.commit()
+    return content_set
+
+
+def _product(content_set, name, description=None, tier=ContentTier.FREE, is_active=True):
+    return ShopProduct(
+        name=name, description=description, content_set_id=content_set.id,
+        besitos_price=10, tier=tier, is_active=is_active
+    )
+
+
+@pytest_asyncio.fixture
+async def indexed_session(test_session):
+    """Fixture: session whose database has the content search index."""
+    test_session.add(_package("Paquete previo"))
+    await test_session.commit()
+
+    await test_session.run_sync(lambda s: create_content_search_index(s.connection()))
+    await test_session.commit()
+    return test_session
+
+
+def _names(page):
+    return [item.name for item in page.items]
+
+
+class TestContentSearchIndex:
+    """Tests for the FTS5 search path."""
+
+    async def test_existing_rows_are_backfilled(self, indexed_session):
+        page = await ContentSearchService(indexed_session).search_packages("previo")
+        assert _names(page) == ["Paquete previo"]
+
+    async def test_prefix_and_accents(self, indexed_session):
+        indexed_session.add_all([
+            _package("Canción de cuna"),
+            _package("Fotos de verano 2026"),
+        ])
+        await indexed_session.commit()
+        service = ContentSearchService(indexed_session)
+
+        assert _names(await service.search_packages("cancion")) == ["Canción de cuna"]
+        assert _names(await service.search_packages("foto veran")) == ["Fotos de verano 2026"]
+        assert _names(await service.search_packages("foto invierno")) == []
+
+    async def test_name_ranks_above_description(self, indexed_session):
+        indexed_session.add_all([
+            _package("Colección otoño", "Incluye un video exclusivo"),
+            _package("Video exclusivo", "Grabado en otoño"),
+        ])
+        await indexed_session.commit()
+
+        page = await ContentSearchService(indexed_session).search_packages("video")
+        assert _names(page) == ["Video exclusivo", "Colección otoño"]
+
+    async def test_triggers_follow_updates_and_deletes(self, indexed_session):
+        package = _package("Nombre anterior")
+        indexed_session.add(package)
+        await indexed_session.commit()
+        service = ContentSearchService(indexed_session)
+
+        package.name = "Nombre nuevo"
+        await indexed_session.commit()
+        assert _names(await service.search_packages("anterior")) == []
+        assert _names(await service.search_packages("nuevo")) == ["Nombre nuevo"]
+
+        await indexed_session.delete(package)
+        await indexed_session.commit()
+        assert _names(await service.search_packages("nuevo")) == []
+
+    async def test_kinds_do_not_leak(self, indexed_session, content_set):
+        indexed_session.add(_product(content_set, "Playa al atardecer"))
+        await indexed_session.commit()
+        service = ContentSearchService(indexed_session)
+
+        assert _names(await service.search_packages("playa")) == []
+        assert _names(await service.search_content_sets("playa")) == ["Sesión de playa"]
+        assert _names(await service.search_products("playa")) == ["Playa al atardecer"]
+
+    async def test_product_filters(self, indexed_session, content_set):
+        indexed_session.add_all([
+            _product(content_set, "Set libre"),
+            _product(content_set, "Set premium", tier=ContentTier.VIP),
+            _product(content_set, "Set retirado", is_active=False),
+        ])
+        await indexed_session.commit()
+        service = ContentSearchService(indexed_session)
+
+        assert set(_names(await service.search_products("set"))) == {"Set libre", "Set premium"}
+        assert _names(await service.search_products("set", tier=ContentTier.VIP)) == ["Set premium"]
+        assert len((await service.search_products("set", active_only=False)).items) == 3
+
+    async def test_pagination(self, indexed_session):
+        indexed_session.add_all([_package(f"Álbum {i}") for i in range(7)])
+        await indexed_session.commit()
+        service = ContentSearchService(indexed_session)
+
+        first = await service.search_packages("album", page_size=5)
+        second = await service.search_packages("album", page=2, page_size=5)
+        assert (first.total_items, first.total_pages) == (7, 2)
+        assert len(second.items) == 2
+        assert not set(_names(first)) & set(_names(second))
+
+    async def test_empty_query(self, indexed_session):
+        page = await ContentSearchService(indexed_session).search_packages("  !? ")
+        assert page.is_empty
+
+
+class TestContentSearchFallback:
+    """Tests for the ILIKE path (no index)."""
+
+    async def test_like_searches_name_and_description(self, test_session):
+        test_session.add_all([
+            _package("Primero", "Contenido de verano"),
+            _package("Verano intenso"),
+            _package("Otro"),
+        ])
+        await test_session.commit()
+
+        page = await ContentSearchService(test_session).search_packages("verano")
+        assert set(_names(page)) == {"Primero", "Verano intenso"}
@@ -0,0 +1,238 @@
+"""
+Tests for the database-backed FSM storage.
+
+Tests cover:
+- State and data round trip; project Enums and datetimes survive the DB
+- Writes are coalesced into one batched flush; cleared keys delete their row
+- Unserializable data fails in set_data and never reaches the flush
+- Cache hits, bounded LRU, cache_ttl re-reads (shared replicas)
+- A failed flush keeps its keys even if reads evicted around it
+- Abandoned states read empty and are purged
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.fsm.storage.base import StorageKey
+from sqlalchemy import func, select
+
+from bot.database.enums import ContentTier
+from bot.database.fsm_storage import SQLAlchemyStorage, purge_expired_states
+from bot.database.models import FSMRecord
+
+
+class _Flow(StatesGroup):
+    first = State()
+    second = State()
+
+
+def _key(user_id=1):
+    return StorageKey(bot_id=42, chat_id=user_id, user_id=user_id)
+
+
+@pytest_asyncio.fixture
+async def make_storage(test_db):
+    """Fixture: storage factory over the test database; closes every storage."""
+    storages = []
+
+    def factory(**kwargs):
+        kwargs.setdefault("cache_ttl", 60)
+        kwargs.setdefault("flush_interval", 60)  # Los tests llaman flush() explícitamente
+        storage = SQLAlchemyStorage(test_db, **kwargs)
+        storages.append(storage)
+        return storage
+
+    yield factory
+    for storage in storages:
+        await storage.close()
+
+
+async def _rows(test_db):
+    async with test_db() as session:
+        return await session.scalar(select(func.count()).select_from(FSMRecord))
+
+
+class TestRoundTrip:
+    """Tests for persistence and serialization."""
+
+    async def test_state_and_data_survive_restart(self, make_storage):
+        storage = make_storage()
+        created = datetime(2026, 10, 18, 12, 30)
+        await storage.set_state(_key(), _Flow.second)
+        await storage.update_data(_key(), {
+            "create_data": {"name": "Pack", "tier": ContentTier.VIP},
+            "created": created,
+            "file_ids": ["a", "b"],
+        })
+        await storage.close()
+
+        restarted = make_storage()
+        assert await restarted.get_state(_key()) == _Flow.second.state
+        data = await restarted.get_data(_key())
+        assert data["create_data"]["tier"] is ContentTier.VIP
+        assert data["created"] == created
+        assert data["file_ids"] == ["a", "b"]
+
+    async def test_get_data_returns_copy(self, make_storage):
+        storage = make_storage()
+        await storage.set_data(_key(), {"step": 1})
+
+        data = await storage.get_data(_key())
+        data["step"] = 2
+        assert await storage.get_data(_key()) == {"step": 1}
+
+
+class TestBatchedWrites:
+    """Tests for write coalescing."""
+
+    async def test_writes_coalesce_into_one_flush(self, test_db, make_storage):
+        storage = make_storage(flush_interval=0.3)
+        for user_id in (1, 2, 3):
+            await storage.set_state(_key(user_id), _Flow.first)
+            await storage.update_data(_key(user_id), {"user": user_id})
+        assert await _rows(test_db) == 0
+
+        for _ in range(100):
+            if not storage.stats()["pending"]:
+                break
+            await asyncio.sleep(0.02)
+
+        assert await _rows(test_db) == 3
+        assert storage.stats()["flushes"] == 1
+        assert storage.stats()["pending"] == 0
+
+    async def test_batch_size_forces_flush(self, test_db, make_storage):
+        storage = make_storage(flush_batch_size=2)
+        await storage.set_state(_key(1), _Flow.first)
+        assert await _rows(test_db) == 0
+
+        await storage.set_state(_key(2), _Flow.first)
+        assert await _rows(test_db) == 2
+
+    async def test_unserializable_data_fails_on_set(self, test_db, make_storage):
+        storage = make_storage()
+        await storage.set_data(_key(1), {"step": 1})
+
+        with pytest.raises(TypeError):
+            await storage.set_data(_key(1), {"step": 2, "bad": object()})
+        await storage.set_state(_key(2), _Flow.first)
+
+        assert await storage.get_data(_key(1)) == {"step": 1}
+        assert await storage.flush() == 2
+        assert await _rows(test_db) == 2
+
+    async def test_clear_deletes_row(self, test_db, make_storage):
+        storage = make_storage()
+        await storage.set_state(_key(), _Flow.first)
+        await storage.set_data(_key(), {"x": 1})
+        await storage.flush()
+        assert await _rows(test_db) == 1
+
+        await storage.set_state(_key(), None)
+        await storage.set_data(_key(), {})
+        await storage.flush()
+        assert await _rows(test_db) == 0
+
+
+class TestCache:
+    """Tests for the in-memory cache."""
+
+    async def test_reads_hit_cache(self, make_storage):
+        storage = make_storage()
+        await storage.get_state(_key())
+        await storage.get_state(_key())
+        await storage.get_data(_key())
+
+        stats = storage.stats()
+        assert (stats["loads"], stats["hits"]) == (1, 2)
+
+    async def test_cache_is_bounded_but_keeps_pending_writes(self, make_storage):
+        storage = make_storage(max_cached=2)
+        for user_id in (1, 2, 3):
+            await storage.set_state(_key(user_id), _Flow.first)
+        assert storage.stats()["cached"] == 3  # Escrituras pendientes no se evictan
+
+        await storage.flush()
+        await storage.get_state(_key(4))
+        assert storage.stats()["cached"] == 2
+        assert await storage.get_state(_key(1)) == _Flow.first.state
+
+    async def test_failed_flush_keeps_keys_through_evictions(self, test_db, make_storage):
+        storage = make_storage(max_cached=2)
+        await storage.set_state(_key(1), _Flow.first)
+        await storage.set_data(_key(2), {"step": 2})
+
+        calls = []
+
+        @asynccontextmanager
+        async def failing_session():
+            await asyncio.sleep(0.05)
+            raise ConnectionError("db down")
+            yield  # pragma: no cover
+
+        def factory():
+            calls.append(1)
+            return failing_session() if len(calls) == 1 else test_db()
+
+        storage._session_factory = factory
+        flush = asyncio.create_task(storage.flush())
+        await asyncio.sleep(0)
+        # Lecturas durante la escritura en vuelo: no deben evictar sus claves
+        await storage.get_state(_key(3))
+        await storage.get_state(_key(4))
+
+        with pytest.raises(ConnectionError):
+            await flush
+        assert storage.stats()["pending"] == 2
+
+        assert await storage.flush() == 2
+        assert await _rows(test_db) == 2
+        assert await storage.get_data(_key(2)) == {"step": 2}
+
+    async def test_zero_cache_ttl_sees_other_replica(self, make_storage):
+        replica_a = make_storage(cache_ttl=0)
+        replica_b = make_storage(cache_ttl=0)
+        assert await replica_a.get_state(_key()) is None
+
+        await replica_b.set_state(_key(), _Flow.second)
+        await replica_b.flush()
+
+        assert await replica_a.get_state(_key()) == _Flow.second.state
+
+
+class TestExpiry:
+    """Tests for abandoned states."""
+
+    async def _insert_old(self, test_db, key, hours_ago):
+        async with test_db() as session:
+            session.add(FSMRecord(
+                key=key, state=_Flow.first.state, data='{"x":1}',
+                updated_at=datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=hours_ago)
+            ))
+            await session.commit()
+
+    async def test_abandoned_state_reads_empty(self, test_db, make_storage):
+        storage = make_storage(state_ttl=3600)
+        await self._insert_old(test_db, storage.key_builder.build(_key()), hours_ago=2)
+
+        assert await storage.get_state(_key()) is None
+        assert await storage.get_data(_key()) == {}
+
+    async def test_purge_removes_only_expired_rows(self, test_db):
+        await self._insert_old(test_db, "fsm:old", hours_ago=48)
+        await self._insert_old(test_db, "fsm:recent", hours_ago=1)
+
+        @asynccontextmanager
+        async def fake_get_session():
+            async with test_db() as session:
+                yield session
+                await session.commit()
+
+        with patch("bot.database.fsm_storage.get_session", fake_get_session):
+            assert await purge_expired_states(state_ttl_hours=24) == 1
+
+        assert await _rows(test_db) == 1
@@ -0,0 +1,77 @@
+"""
+Tests for SQL-side interest statistics.
+
+Tests cover:
+- Pending/attended totals and per-category counts from aggregates
+- Recent interests ordered by creation date
+- Query count stays constant as interests grow
+"""
+from datetime import datetime, timedelta
+
+import pytest_asyncio
+from sqlalchemy import event
+
+from bot.database.enums import ContentCategory, UserRole
+from bot.database.models import ContentPackage, User, UserInterest
+from bot.services.interest import InterestService
+
+
+@pytest_asyncio.fixture
+async def interests(test_session):
+    """Fixture: 3 users interested in a free and a VIP package."""
+    free_pkg = ContentPackage(name="Libre", category=ContentCategory.FREE_CONTENT)
+    vip_pkg = ContentPackage(name="Premium", category=ContentCategory.VIP_CONTENT)
+    test_session.add_all([free_pkg, vip_pkg])
+    test_session.add_all([
+        User(user_id=8000 + i, first_name=f"Usuario {i}", role=UserRole.FREE) for i in range(3)
+    ])
+    await test_session.flush()
+
+    base = datetime(2026, 1, 1)
+    test_session.add_all([
+        UserInterest(user_id=8000, package_id=free_pkg.id, created_at=base),
+        UserInterest(user_id=8001, package_id=free_pkg.id, created_at=base + timedelta(hours=1)),
+        UserInterest(
+            user_id=8002, package_id=vip_pkg.id, created_at=base + timedelta(hours=2),
+            is_attended=True, attended_at=base + timedelta(hours=3)
+        ),
+    ])
+    await test_session.commit()
+
+
+class TestInterestStats:
+    """Tests for get_interest_stats."""
+
+    async def test_aggregates(self, test_session, mock_bot, interests):
+        stats = await InterestService(test_session, mock_bot).get_interest_stats()
+
+        assert (stats["total_pending"], stats["total_attended"]) == (2, 1)
+        assert stats["by_package_type"] == {
+            ContentCategory.FREE_CONTENT.value: 2,
+            ContentCategory.VIP_CONTENT.value: 1,
+        }
+        assert [i.user_id for i in stats["recent_interests"]] == [8002, 8001, 8000]
+
+    async def test_empty(self, test_session, mock_bot):
+        stats = await InterestService(test_session, mock_bot).get_interest_stats()
+
+        assert (stats["total_pending"], stats["total_attended"]) == (0, 0)
+        assert stats["by_package_type"] == {}
+        assert stats["recent_interests"] == []
+
+    async def test_no_full_table_loads(self, test_session, mock_bot, interests):
+        statements = []
+        engine = test_session.bind.sync_engine
+
+        def _count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", _count)
+        try:
+            await InterestService(test_session, mock_bot).get_interest_stats()
+        finally:
+            event.remove(engine, "before_cursor_execute", _count)
+
+        # totals + by category + recent (+ selectin package/user)
+        assert len(statements) == 5
+        assert sum("GROUP BY" in s for s in statements) == 1
@@ -0,0 +1,115 @@
+"""
+Tests for memoized keyboards.
+
+Tests cover:
+- Static menus are built once per process
+- Reaction keyboards cached by content, channel and counts
+- Counts for emojis not shown do not fragment the cache
+- Content-keyed cache for role menus (get_cached_keyboard)
+- Main menu countdown rows kept out of the cache
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from bot.services.message.user_menu import UserMenuMessages
+from bot.utils.keyboards import (
+    admin_main_menu_keyboard,
+    clear_keyboard_cache,
+    get_cached_keyboard,
+    get_reaction_keyboard,
+    get_reaction_keyboard_with_counts,
+    keyboard_cache_stats,
+    stats_menu_keyboard,
+)
+
+
+@pytest.fixture(autouse=True)
+def _reset_keyboard_cache():
+    clear_keyboard_cache()
+    yield
+    clear_keyboard_cache()
+
+
+class TestStaticKeyboards:
+    """Tests for keyboards built once."""
+
+    def test_same_instance_returned(self):
+        assert admin_main_menu_keyboard() is admin_main_menu_keyboard()
+        assert stats_menu_keyboard() is not admin_main_menu_keyboard()
+
+    def test_stats_report_hits(self):
+        admin_main_menu_keyboard()
+        admin_main_menu_keyboard()
+
+        stats = keyboard_cache_stats()["admin_main_menu_keyboard"]
+        assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+
+
+class TestReactionKeyboardCache:
+    """Tests for the reaction keyboard LRU."""
+
+    def test_cached_by_counts(self):
+        first = get_reaction_keyboard(10, "-100123", current_counts={"❤️": 2})
+        again = get_reaction_keyboard(10, "-100123", current_counts={"❤️": 2})
+        changed = get_reaction_keyboard(10, "-100123", current_counts={"❤️": 3})
+
+        assert first is again
+        assert changed is not first
+        assert changed.inline_keyboard[0][0].text == "❤️ 3"
+
+    def test_key_ignores_hidden_emojis_and_zero_counts(self):
+        base = get_reaction_keyboard(11, "-100123")
+        same = get_reaction_keyboard(11, "-100123", current_counts={"👍": 9, "🔥": 0})
+
+        assert base is same
+
+    def test_content_and_channel_are_part_of_key(self):
+        keyboard = get_reaction_keyboard(12, "-100123")
+
+        assert get_reaction_keyboard(13, "-100123") is not keyboard
+        assert get_reaction_keyboard(12, "-100999") is not keyboard
+
+    def test_user_marks(self):
+        keyboard = get_reaction_keyboard_with_counts(
+            14, "-100123", ["❤️", "🔥"], user_reactions=["🔥"], counts={"🔥": 1}
+        )
+
+        assert [b.text for b in keyboard.inline_keyboard[0]] == ["❤️", "✓🔥 1"]
+        assert keyboard is not get_reaction_keyboard(14, "-100123", ["❤️", "🔥"], {"🔥": 1})
+
+
+class TestCachedKeyboard:
+    """Tests for content-keyed keyboards."""
+
+    def test_equal_buttons_share_markup(self):
+        rows = [[{"text": "🛍️ Tienda", "callback_data": "shop_catalog"}]]
+
+        assert get_cached_keyboard(rows) is get_cached_keyboard([list(rows[0])])
+        assert get_cached_keyboard(rows + [[{"text": "Web", "url": "https://example.com"}]]) \
+            .inline_keyboard[1][0].url == "https://example.com"
+
+    def test_invalid_button(self):
+        with pytest.raises(ValueError):
+            get_cached_keyboard([[{"text": "Sin acción"}]])
+
+
+class TestMainMenuGiftRow:
+    """Tests for the daily gift row on role main menus."""
+
+    def test_countdown_not_cached(self):
+        menu = UserMenuMessages()
+        claim = {"can_claim": True}
+
+        for minutes in range(1, 6):
+            waiting = {"can_claim": False, "next_claim_time": datetime.now() + timedelta(minutes=minutes)}
+            vip = menu._vip_main_menu_keyboard(waiting)
+            assert vip.inline_keyboard[0][0].text.startswith("⏳ Próximo regalo en")
+            assert vip is not menu._vip_main_menu_keyboard(waiting)
+            menu._free_main_menu_keyboard(waiting)
+
+        # Static rows shared with the no-gift variant; one entry per static variant
+        assert vip.inline_keyboard[1:] == menu._vip_main_menu_keyboard().inline_keyboard
+        assert menu._vip_main_menu_keyboard(claim) is menu._vip_main_menu_keyboard(claim)
+        menu._free_main_menu_keyboard(claim)
+        assert keyboard_cache_stats()["_build_keyboard_from_rows"]["size"] == 4
@@ -0,0 +1,176 @@
+"""
+Tests for on-demand live profiling of production handlers.
+
+Tests cover:
+- LiveProfiler: matching, one update in flight, completion, clamping, expiry
+- Middleware inert while disarmed
+- Captured updates profiled with query counts and reported to the admin
+- Skipped handlers not counted; text and HTML reports
+- /profile_live arms only patterns that match a registered handler
+"""
+import asyncio
+import importlib
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from aiogram import Dispatcher, Router
+from aiogram.dispatcher.event.bases import SkipHandler
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from bot.handlers.admin.profile import HANDLER_REGISTRY, cmd_profile_live
+from bot.middlewares.profiling import LiveProfilingMiddleware, registered_handler_labels
+from bot.utils.metrics import instrument_engine
+from bot.utils.profiler import LiveProfiler, LiveSample, get_live_profiler
+
+
+async def shop_handler(event, data):
+    return "ok"
+
+
+def _data(bot=None):
+    return {"handler": SimpleNamespace(callback=shop_handler), "bot": bot}
+
+
+def _sample(label="user.shop.buy"):
+    return LiveSample(label, 1.0, 0, 0.0, session=None)
+
+
+class TestLiveProfiler:
+    """Tests for capture arming and claiming."""
+
+    def test_claim_matches_and_completes(self):
+        live = LiveProfiler()
+        capture = live.arm("shop", 2, chat_id=1)
+
+        assert live.claim("user.start.cmd_start") is None
+        assert live.claim("user.shop.buy") is capture
+        assert live.claim("user.shop.buy") is None  # Un update a la vez
+        assert live.release(capture, _sample()) is False
+
+        assert live.claim("user.shop.list") is capture
+        assert live.release(capture, _sample()) is True
+        assert live.armed is False
+        assert len(capture.samples) == 2
+
+    def test_exact_and_excluded(self):
+        live = LiveProfiler()
+        live.arm("user.start.cmd_start", 1, chat_id=1, exact=True)
+        assert live.claim("user.start.cmd_start_deeplink") is None
+
+        live.arm("profile", 1, chat_id=1)
+        assert live.claim("admin.profile.cmd_profile_live") is None
+
+    def test_target_clamped_and_expiry(self):
+        live = LiveProfiler()
+        assert live.arm("shop", 500, chat_id=1).target == LiveProfiler.MAX_UPDATES
+
+        with patch("bot.utils.profiler.time.monotonic", return_value=10_000_000.0):
+            assert live.claim("user.shop.buy") is None
+        assert live.armed is False
+
+    def test_skipped_update_not_counted(self):
+        live = LiveProfiler()
+        capture = live.arm("shop", 1, chat_id=1)
+
+        live.release(live.claim("user.shop.buy"), None)
+
+        assert capture.samples == []
+        assert live.claim("user.shop.buy") is capture
+
+
+class TestMiddleware:
+    """Tests for LiveProfilingMiddleware."""
+
+    async def test_inert_while_disarmed(self):
+        live = LiveProfiler()
+        live.claim = MagicMock()
+        middleware = LiveProfilingMiddleware(live)
+
+        assert await middleware(AsyncMock(return_value="ok"), object(), _data()) == "ok"
+        live.claim.assert_not_called()
+
+    async def test_captures_real_updates_and_reports(self):
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        instrument_engine(engine)
+
+        async def handler(event, data):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                await conn.execute(text("SELECT 2"))
+            return "ok"
+
+        live = LiveProfiler()
+        capture = live.arm("shop", 2, chat_id=42)
+        middleware = LiveProfilingMiddleware(live)
+        bot = MagicMock(send_document=AsyncMock())
+
+        try:
+            assert await middleware(handler, object(), _data(bot)) == "ok"
+            with pytest.raises(SkipHandler):
+                await middleware(AsyncMock(side_effect=SkipHandler()), object(), _data(bot))
+            assert await middleware(handler, object(), _data(bot)) == "ok"
+            await asyncio.sleep(0)  # El reporte se envía en una task aparte
+        finally:
+            await engine.dispose()
+
+        assert [sample.query_count for sample in capture.samples] == [2, 2]
+        assert capture.samples[0].handler.endswith("shop_handler")
+
+        bot.send_document.assert_awaited_once()
+        chat_id, document = bot.send_document.await_args.args
+        assert chat_id == 42
+        assert document.filename == "live_profile_shop.txt"
+        assert b"2 queries" in document.data
+
+    async def test_html_report_and_errors(self):
+        live = LiveProfiler()
+        capture = live.arm("shop", 1, chat_id=42, html=True)
+        middleware = LiveProfilingMiddleware(live)
+
+        with pytest.raises(ValueError):
+            await middleware(AsyncMock(side_effect=ValueError()), object(), _data())
+
+        assert capture.samples[0].error == "ValueError"
+        filename, content = capture.report()
+        assert filename == "live_profile_shop.html"
+        assert b"<html" in content.lower()
+
+
+class TestProfileLiveCommand:
+    """Tests for arming from the admin command."""
+
+    @pytest.fixture
+    def dispatcher(self):
+        router = Router()
+        router.callback_query.register(shop_handler)
+        dispatcher = Dispatcher()
+        dispatcher.include_router(router)
+        yield dispatcher
+        get_live_profiler().disarm()
+
+    @staticmethod
+    def _message(text):
+        return MagicMock(text=text, chat=MagicMock(id=42), answer=AsyncMock())
+
+    def test_registered_labels(self, dispatcher):
+        assert registered_handler_labels(dispatcher) == [f"{__name__}.shop_handler"]
+
+    def test_registry_paths_exist(self):
+        for path in HANDLER_REGISTRY.values():
+            module_path, func_name = path.rsplit(".", 1)
+            assert callable(getattr(importlib.import_module(module_path), func_name)), path
+
+    async def test_refuses_pattern_without_handlers(self, dispatcher):
+        message = self._message("/profile_live vip_panel")
+        await cmd_profile_live(message, dispatcher)
+
+        assert get_live_profiler().armed is False
+        assert "Ningún handler" in message.answer.await_args.args[0]
+
+    async def test_arms_matching_pattern(self, dispatcher):
+        await cmd_profile_live(self._message("/profile_live shop_hand 3"), dispatcher)
+
+        capture = get_live_profiler().capture
+        assert (capture.pattern, capture.target, capture.chat_id) == ("shop_hand", 3, 42)
@@ -0,0 +1,167 @@
+"""
+Tests for the Prometheus /metrics instrumentation.
+
+Tests cover:
+- Counter/histogram exposition format and collector gauges
+- Render from another thread scheduled on the bound loop
+- Per-update SQL query counting through the engine hooks
+- Handler and update middlewares (durations, errors, skips)
+- Bot API middleware error counting and scheduler job labels
+"""
+import asyncio
+import threading
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from aiogram.dispatcher.event.bases import SkipHandler
+from aiogram.types import Update
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from bot.middlewares.metrics import (
+    HandlerMetricsMiddleware,
+    UpdateMetricsMiddleware,
+    handler_label,
+)
+from bot.utils.metrics import (
+    HANDLER_ERRORS,
+    TELEGRAM_REQUEST_ERRORS,
+    UPDATE_SQL_QUERIES,
+    MetricsRegistry,
+    TelegramMetricsMiddleware,
+    instrument_engine,
+    job_label,
+    reset_update_queries,
+    track_update_queries,
+)
+
+
+async def _sample_handler(event, data):
+    return "ok"
+
+
+class TestRegistry:
+    """Tests for the exposition format."""
+
+    def test_counter_and_histogram(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("t_errors_total", "Errores", ("handler",))
+        histogram = registry.histogram("t_duration_seconds", "Duración", ("handler",), buckets=(0.1, 1.0))
+
+        counter.inc("start")
+        counter.inc("start", amount=2)
+        histogram.observe(0.05, "start")
+        histogram.observe(0.5, "start")
+
+        body = registry.render()
+        assert "# TYPE t_errors_total counter" in body
+        assert 't_errors_total{handler="start"} 3' in body
+        assert "# TYPE t_duration_seconds histogram" in body
+        assert 't_duration_seconds_bucket{handler="start",le="0.1"} 1' in body
+        assert 't_duration_seconds_bucket{handler="start",le="+Inf"} 2' in body
+        assert 't_duration_seconds_count{handler="start"} 2' in body
+        assert counter.value("start") == 3
+        assert histogram.count("start") == 2
+
+    def test_collectors_become_gauges(self):
+        registry = MetricsRegistry()
+        registry.register_collector("cache", lambda: {"size": 4, "name": "x"})
+        registry.register_collector(
+            "api", lambda: {"getChat": {"hits": 2}, "getMe": {"hits": 1}}, label="method"
+        )
+        registry.register_collector("broken", lambda: 1 / 0)
+
+        body = registry.render()
+        assert "# TYPE bot_cache_size gauge" in body
+        assert "bot_cache_size 4" in body
+        assert "bot_cache_name" not in body  # Solo valores numéricos
+        assert 'bot_api_hits{method="getChat"} 2' in body
+        assert 'bot_api_hits{method="getMe"} 1' in body
+
+    async def test_render_from_other_thread_runs_on_bound_loop(self):
+        registry = MetricsRegistry()
+        rendered_on = []
+        registry.register_collector(
+            "probe", lambda: rendered_on.append(threading.get_ident()) or {"value": 1}
+        )
+        registry.bind_loop()
+
+        body = await asyncio.to_thread(lambda: asyncio.run(registry.render_threadsafe()))
+
+        assert "bot_probe_value 1" in body
+        assert rendered_on == [threading.get_ident()]
+
+
+class TestQueries:
+    """Tests for per-update SQL counting."""
+
+    async def test_queries_counted_per_update(self):
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        instrument_engine(engine)
+        instrument_engine(engine)  # Idempotente: no duplica los hooks
+
+        try:
+            stats, token = track_update_queries()
+            try:
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+                    await conn.execute(text("SELECT 2"))
+            finally:
+                reset_update_queries(token)
+
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 3"))  # Fuera del update
+        finally:
+            await engine.dispose()
+
+        assert stats.count == 2
+        assert stats.seconds >= 0
+
+
+class TestMiddlewares:
+    """Tests for the update and handler middlewares."""
+
+    def test_handler_label(self):
+        data = {"handler": SimpleNamespace(callback=_sample_handler)}
+        assert handler_label(data) == f"{__name__}._sample_handler"
+        assert handler_label({}) == "unknown"
+
+    async def test_update_middleware_observes_sql(self):
+        middleware = UpdateMetricsMiddleware()
+        update = Update(update_id=1)
+        before = UPDATE_SQL_QUERIES.count("unknown")
+
+        assert await middleware(AsyncMock(return_value="ok"), update, {}) == "ok"
+        assert UPDATE_SQL_QUERIES.count("unknown") == before + 1
+
+    async def test_handler_errors_counted_but_not_skips(self):
+        middleware = HandlerMetricsMiddleware("message")
+        data = {"handler": SimpleNamespace(callback=_sample_handler)}
+        label = handler_label(data)
+        before = HANDLER_ERRORS.value("message", label)
+
+        with pytest.raises(SkipHandler):
+            await middleware(AsyncMock(side_effect=SkipHandler()), object(), data)
+        with pytest.raises(ValueError):
+            await middleware(AsyncMock(side_effect=ValueError("boom")), object(), data)
+
+        assert HANDLER_ERRORS.value("message", label) == before + 1
+
+
+class TestBotApiAndScheduler:
+    """Tests for Bot API metrics and scheduler labels."""
+
+    async def test_telegram_errors_counted_by_method(self):
+        middleware = TelegramMetricsMiddleware()
+        method = SimpleNamespace(__api_method__="sendMessage")
+        before = TELEGRAM_REQUEST_ERRORS.value("sendMessage", "TimeoutError")
+
+        with pytest.raises(TimeoutError):
+            await middleware(AsyncMock(side_effect=TimeoutError()), None, method)
+
+        assert TELEGRAM_REQUEST_ERRORS.value("sendMessage", "TimeoutError") == before + 1
+
+    def test_job_label_strips_instance_id(self):
+        assert job_label("scheduled_post_12") == "scheduled_post"
+        assert job_label("expire_vip_subscribers") == "expire_vip_subscribers"
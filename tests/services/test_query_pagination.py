@@ -0,0 +1,156 @@
+"""
+Tests for SQL-level pagination (QueryPaginator).
+
+Tests cover:
+- LIMIT/OFFSET pages with totals and navigation flags
+- Count cached between page flips, boundaries exact on stale counts
+- Count cache bounded (LRU) and purged of expired entries
+- Out-of-range pages clamped to the last page
+- Keyset pagination walks every row once
+"""
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, select
+
+from bot.database.enums import ContentCategory
+from bot.database.models import ContentPackage
+from bot.utils import pagination
+from bot.utils.pagination import QueryPaginator, clear_count_cache
+
+
+@pytest.fixture(autouse=True)
+def _reset_count_cache():
+    clear_count_cache()
+    yield
+    clear_count_cache()
+
+
+def _query():
+    return select(ContentPackage).order_by(ContentPackage.id)
+
+
+@pytest_asyncio.fixture
+async def packages(test_session):
+    """Fixture: 25 content packages."""
+    base = datetime(2026, 1, 1)
+    test_session.add_all([
+        ContentPackage(
+            name=f"Paquete {i}",
+            category=ContentCategory.FREE_CONTENT,
+            created_at=base + timedelta(minutes=i),
+            updated_at=base
+        )
+        for i in range(25)
+    ])
+    await test_session.commit()
+
+
+class TestQueryPaginator:
+    """Tests for LIMIT/OFFSET pages."""
+
+    async def test_middle_and_last_page(self, test_session, packages):
+        paginator = QueryPaginator(test_session, _query(), page_size=10)
+
+        page = await paginator.get_page(2)
+        assert [p.name for p in page.items][0] == "Paquete 10"
+        assert (page.total_items, page.total_pages) == (25, 3)
+        assert page.has_previous and page.has_next
+
+        last = await paginator.get_page(3)
+        assert len(last.items) == 5
+        assert not last.has_next
+
+    async def test_empty_query(self, test_session):
+        page = await QueryPaginator(test_session, _query()).get_page(1)
+
+        assert page.is_empty
+        assert (page.total_items, page.total_pages) == (0, 1)
+
+    async def test_out_of_range_page_is_clamped(self, test_session, packages):
+        page = await QueryPaginator(test_session, _query(), page_size=10).get_page(99)
+
+        assert page.current_page == 3
+        assert len(page.items) == 5
+
+    async def test_invalid_page_number(self, test_session):
+        with pytest.raises(ValueError):
+            await QueryPaginator(test_session, _query()).get_page(0)
+
+    async def test_count_is_cached(self, test_session, packages):
+        paginator = QueryPaginator(test_session, _query(), page_size=10)
+        assert await paginator.count() == 25
+
+        test_session.add(ContentPackage(name="Nuevo", category=ContentCategory.FREE_CONTENT))
+        await test_session.commit()
+
+        assert await paginator.count() == 25
+        assert await paginator.count(refresh=True) == 26
+
+    async def test_count_cache_is_bounded(self, test_session, packages):
+        # Un filtro con parámetro volátil (búsqueda, corte por hora) = una clave por llamada
+        with patch.object(pagination, "COUNT_CACHE_MAX_ENTRIES", 3):
+            for i in range(6):
+                query = _query().where(ContentPackage.name != f"búsqueda {i}")
+                await QueryPaginator(test_session, query).count()
+
+        assert len(pagination._count_cache) == 3
+        assert "búsqueda 5" in repr(next(reversed(pagination._count_cache)))  # El más reciente
+
+    async def test_expired_counts_purged_on_write(self, test_session, packages):
+        await QueryPaginator(test_session, _query(), count_ttl=1).count()
+
+        with patch("bot.utils.pagination.time.monotonic", return_value=10**9):
+            query = _query().where(ContentPackage.id > 0)
+            await QueryPaginator(test_session, query).count()
+
+        assert len(pagination._count_cache) == 1
+
+    async def test_stale_count_does_not_hide_rows(self, test_session, packages):
+        paginator = QueryPaginator(test_session, _query(), page_size=10)
+        await paginator.count()
+
+        test_session.add_all([
+            ContentPackage(name=f"Extra {i}", category=ContentCategory.FREE_CONTENT)
+            for i in range(10)
+        ])
+        await test_session.commit()
+
+        page = await paginator.get_page(3)
+        assert len(page.items) == 10
+        assert page.has_next
+        assert page.total_pages == 4
+
+    async def test_stale_count_after_deletes(self, test_session, packages):
+        paginator = QueryPaginator(test_session, _query(), page_size=10)
+        await paginator.count()
+
+        await test_session.execute(delete(ContentPackage).where(ContentPackage.id > 12))
+        await test_session.commit()
+
+        page = await paginator.get_page(3)
+        assert page.current_page == 2
+        assert len(page.items) == 2
+        assert (page.total_items, page.total_pages) == (12, 2)
+
+
+class TestKeysetPagination:
+    """Tests for keyset pages."""
+
+    async def test_walks_all_rows_once(self, test_session, packages):
+        query = select(ContentPackage).order_by(
+            ContentPackage.created_at.desc(), ContentPackage.id.desc()
+        )
+        paginator = QueryPaginator(test_session, query, page_size=10)
+        keys = [ContentPackage.created_at, ContentPackage.id]
+
+        seen = []
+        page = await paginator.get_page_after(keys, descending=True)
+        seen.extend(page.items)
+        while page.has_next:
+            page = await paginator.get_page_after(keys, page.next_cursor, descending=True)
+            seen.extend(page.items)
+
+        assert [p.name for p in seen] == [f"Paquete {i}" for i in reversed(range(25))]
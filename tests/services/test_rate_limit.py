@@ -0,0 +1,140 @@
+"""
+Tests for the global Bot API rate limiter.
+
+Tests cover:
+- bulk_lane marks the current context (and child tasks) as BULK
+- BULK acquires yield to waiting INTERACTIVE acquires
+- TelegramRetryAfter pauses the global bucket and retries the request
+- Exempt methods bypass the buckets
+- Per-chat buckets: private vs group rates, LRU cap
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import AnswerCallbackQuery, SendMessage
+
+from bot.utils.rate_limit import (
+    Priority,
+    TelegramRateLimiter,
+    TokenBucket,
+    bulk_lane,
+    current_priority,
+)
+
+
+def _retry_after(seconds=0):
+    return TelegramRetryAfter(method=MagicMock(), message="Flood", retry_after=seconds)
+
+
+class TestBulkLane:
+    """Tests for the priority context var."""
+
+    async def test_bulk_lane_is_inherited_by_tasks(self):
+        assert current_priority() is Priority.INTERACTIVE
+
+        async with bulk_lane():
+            inner = await asyncio.create_task(asyncio.sleep(0, result=current_priority()))
+            assert inner is Priority.BULK
+
+        assert current_priority() is Priority.INTERACTIVE
+
+
+class TestTokenBucket:
+    """Tests for the priority token bucket."""
+
+    def test_rate_must_be_positive(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+    async def test_bulk_yields_to_interactive(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+        await bucket.acquire()  # vacía el bucket
+        order = []
+
+        async def take(priority, label):
+            await bucket.acquire(priority=priority)
+            order.append(label)
+
+        bulk = asyncio.create_task(take(Priority.BULK, "bulk"))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(take(Priority.INTERACTIVE, "interactive"))
+
+        await asyncio.gather(bulk, interactive)
+        assert order == ["interactive", "bulk"]
+
+    async def test_pause_empties_bucket(self):
+        bucket = TokenBucket(rate=100)
+        bucket.pause(0.05)
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await bucket.acquire()
+        assert loop.time() - started >= 0.05
+
+
+class TestTelegramRateLimiter:
+    """Tests for the request middleware."""
+
+    async def test_retry_after_is_retried(self):
+        limiter = TelegramRateLimiter(rate=100)
+        make_request = AsyncMock(side_effect=[_retry_after(0), "ok"])
+
+        result = await limiter(make_request, MagicMock(), SendMessage(chat_id=1, text="hola"))
+
+        assert result == "ok"
+        assert make_request.await_count == 2
+        assert limiter.stats()["retry_after"] == 1
+
+    async def test_retry_after_gives_up_after_max_attempts(self):
+        limiter = TelegramRateLimiter(rate=100)
+        limiter.MAX_RETRY_AFTER_ATTEMPTS = 1
+        make_request = AsyncMock(side_effect=_retry_after(0))
+
+        with pytest.raises(TelegramRetryAfter):
+            await limiter(make_request, MagicMock(), SendMessage(chat_id=-100, text="hola"))
+
+        assert make_request.await_count == 2
+
+    async def test_long_retry_after_is_not_retried(self):
+        limiter = TelegramRateLimiter(rate=100)
+        make_request = AsyncMock(side_effect=_retry_after(3600))
+
+        with pytest.raises(TelegramRetryAfter):
+            await limiter(make_request, MagicMock(), SendMessage(chat_id=1, text="hola"))
+
+        assert make_request.await_count == 1
+
+    async def test_exempt_methods_bypass_buckets(self):
+        limiter = TelegramRateLimiter(rate=100)
+        make_request = AsyncMock(return_value=True)
+
+        await limiter(make_request, MagicMock(), AnswerCallbackQuery(callback_query_id="1"))
+
+        assert limiter.stats()["requests"] == 0
+        assert limiter.stats()["chat_buckets"] == 0
+
+    async def test_bulk_requests_are_counted(self):
+        limiter = TelegramRateLimiter(rate=100)
+        make_request = AsyncMock(return_value="ok")
+
+        async with bulk_lane():
+            await limiter(make_request, MagicMock(), SendMessage(chat_id=1, text="hola"))
+
+        assert limiter.stats()["bulk_requests"] == 1
+
+    def test_chat_buckets_by_chat_type(self):
+        limiter = TelegramRateLimiter(rate=100)
+
+        assert limiter._chat_bucket(42).rate == TelegramRateLimiter.PRIVATE_CHAT_RATE
+        assert limiter._chat_bucket(-1001).rate == TelegramRateLimiter.GROUP_CHAT_RATE
+
+    def test_chat_buckets_are_capped(self):
+        limiter = TelegramRateLimiter(rate=100)
+        limiter.MAX_CHAT_BUCKETS = 2
+
+        for chat_id in (1, 2, 3):
+            limiter._chat_bucket(chat_id)
+
+        assert list(limiter._chat_buckets) == [2, 3]
@@ -0,0 +1,199 @@
+"""
+Tests for scheduled channel posts.
+
+Tests cover:
+- ScheduledPostService validation, atomic claim and cancellation
+- parse_schedule_time formats
+- publish_scheduled_post publishes once and records the result
+- restore_scheduled_posts rebuilds jobs (catch-up) from the table
+- The leader sweep publishes due posts whose job was lost with its replica
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import pytest_asyncio
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from bot.background import tasks
+from bot.services.scheduled_post import ScheduledPostService
+from bot.utils.validators import parse_schedule_time
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _fake_session_factory(test_db):
+    @asynccontextmanager
+    async def fake_get_session():
+        async with test_db() as session:
+            yield session
+            await session.commit()
+    return fake_get_session
+
+
+@pytest_asyncio.fixture
+async def post_service(test_session):
+    """Fixture: Provides ScheduledPostService with test session."""
+    return ScheduledPostService(test_session)
+
+
+async def _create(service, **overrides):
+    params = dict(
+        target_channel="both",
+        content_type="text",
+        scheduled_at=_now() + timedelta(hours=1),
+        created_by=1,
+        caption="Hola"
+    )
+    params.update(overrides)
+    return await service.create_post(**params)
+
+
+class TestScheduledPostService:
+    """Tests for the service."""
+
+    async def test_create_post(self, post_service):
+        success, status, post = await _create(post_service)
+        assert success is True
+        assert status == "created"
+        assert post.status == "pending"
+
+    @pytest.mark.parametrize("overrides,expected", [
+        ({"scheduled_at": _now() - timedelta(minutes=1)}, "in_past"),
+        ({"target_channel": "dm"}, "invalid_target"),
+        ({"content_type": "photo"}, "missing_content"),
+    ])
+    async def test_create_rejects_invalid(self, post_service, overrides, expected):
+        success, status, _ = await _create(post_service, **overrides)
+        assert success is False
+        assert status == expected
+
+    async def test_claim_is_exclusive(self, post_service):
+        _, _, post = await _create(post_service)
+
+        claimed = await post_service.claim_post(post.id)
+        assert claimed.status == "sending"
+        assert await post_service.claim_post(post.id) is None
+
+    async def test_cancel_only_pending(self, post_service):
+        _, _, post = await _create(post_service)
+
+        assert await post_service.cancel_post(post.id) is True
+        assert await post_service.cancel_post(post.id) is False
+        assert await post_service.claim_post(post.id) is None
+
+
+class TestParseScheduleTime:
+    """Tests for the admin time parser."""
+
+    NOW = datetime(2026, 1, 1, 10, 0)
+
+    @pytest.mark.parametrize("text,expected", [
+        ("+30m", datetime(2026, 1, 1, 10, 30)),
+        ("+2h", datetime(2026, 1, 1, 12, 0)),
+        ("+1d", datetime(2026, 1, 2, 10, 0)),
+        ("21:15", datetime(2026, 1, 1, 21, 15)),
+        ("09:00", datetime(2026, 1, 2, 9, 0)),
+        ("2026-02-01 08:00", datetime(2026, 2, 1, 8, 0)),
+        ("2025-12-31 08:00", None),
+        ("+0h", None),
+        ("mañana", None),
+    ])
+    def test_formats(self, text, expected):
+        assert parse_schedule_time(text, self.NOW) == expected
+
+
+class TestPublishScheduledPost:
+    """Tests for the scheduler job."""
+
+    async def test_publishes_to_both_channels_once(self, test_db, test_session):
+        service = ScheduledPostService(test_session)
+        _, _, post = await _create(service, add_reactions=False)
+        await test_session.commit()
+
+        bot = MagicMock()
+        bot.send_message = AsyncMock(return_value=MagicMock())
+
+        with patch("bot.background.tasks.get_session", _fake_session_factory(test_db)):
+            await asyncio.gather(
+                tasks.publish_scheduled_post(bot, post.id),
+                tasks.publish_scheduled_post(bot, post.id)
+            )
+
+        chats = sorted(call.kwargs["chat_id"] for call in bot.send_message.await_args_list)
+        assert chats == ["-1000987654321", "-1001234567890"]
+
+        async with test_db() as session:
+            stored = await ScheduledPostService(session).get_post(post.id)
+            assert stored.status == "sent"
+            assert stored.sent_at is not None
+
+    async def test_failed_channel_marks_post_failed(self, test_db, test_session):
+        service = ScheduledPostService(test_session)
+        _, _, post = await _create(service, target_channel="vip", add_reactions=False)
+        await test_session.commit()
+
+        bot = MagicMock()
+        bot.send_message = AsyncMock(side_effect=RuntimeError("boom"))
+
+        with patch("bot.background.tasks.get_session", _fake_session_factory(test_db)):
+            await tasks.publish_scheduled_post(bot, post.id)
+
+        async with test_db() as session:
+            stored = await ScheduledPostService(session).get_post(post.id)
+            assert stored.status == "failed"
+            assert "VIP" in stored.error
+
+
+class TestRestoreScheduledPosts:
+    """Tests for rebuilding jobs on startup."""
+
+    async def test_restore_schedules_pending_and_fails_interrupted(self, test_db, test_session):
+        service = ScheduledPostService(test_session)
+        _, _, due = await _create(service)
+        _, _, interrupted = await _create(service)
+        await service.claim_post(interrupted.id)
+        await test_session.commit()
+
+        scheduler = AsyncIOScheduler(timezone="UTC")
+
+        with patch("bot.background.tasks.get_session", _fake_session_factory(test_db)), \
+                patch.object(tasks, "_scheduler", scheduler):
+            restored = await tasks.restore_scheduled_posts(MagicMock())
+
+        assert restored == 1
+        assert [job.id for job in scheduler.get_jobs()] == [f"scheduled_post_{due.id}"]
+
+        async with test_db() as session:
+            stored = await ScheduledPostService(session).get_post(interrupted.id)
+            assert stored.status == "failed"
+            assert stored.error == "interrupted"
+
+
+class TestPublishDuePosts:
+    """Tests for the leader sweep of due posts."""
+
+    async def test_sweep_publishes_only_due_posts(self, test_db, test_session):
+        service = ScheduledPostService(test_session)
+        _, _, due = await _create(service, target_channel="vip", add_reactions=False)
+        _, _, future = await _create(service, target_channel="vip", add_reactions=False)
+        # El job de este post vivía en una réplica que murió antes de la hora
+        due.scheduled_at = _now() - timedelta(minutes=5)
+        await test_session.commit()
+
+        bot = MagicMock()
+        bot.send_message = AsyncMock(return_value=MagicMock())
+
+        with patch("bot.background.tasks.get_session", _fake_session_factory(test_db)):
+            assert await tasks.publish_due_posts(bot) == 1
+            assert await tasks.publish_due_posts(bot) == 0
+
+        bot.send_message.assert_awaited_once()
+        async with test_db() as session:
+            service = ScheduledPostService(session)
+            assert (await service.get_post(due.id)).status == "sent"
+            assert (await service.get_post(future.id)).status == "pending"
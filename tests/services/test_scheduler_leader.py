@@ -0,0 +1,131 @@
+"""
+Tests for scheduler leader election.
+
+Tests cover:
+- Only one replica holds the lease; the holder renews it
+- Failover once the lease expires; release hands it over immediately
+- Leader-only jobs are skipped on followers
+- Election actions (post-restart cleanup, scheduled posts) run once per term
+"""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy import select, update
+
+from bot.background import tasks
+from bot.background.leader import LeaderLease
+from bot.database.models import SchedulerLease
+
+
+def _replica(test_db, name, ttl=30):
+    return LeaderLease(ttl_seconds=ttl, holder_id=name, session_factory=test_db)
+
+
+async def _row(test_db):
+    async with test_db() as session:
+        return (await session.execute(select(SchedulerLease))).scalar_one()
+
+
+async def _expire(test_db):
+    async with test_db() as session:
+        await session.execute(
+            update(SchedulerLease).values(
+                expires_at=datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=1)
+            )
+        )
+        await session.commit()
+
+
+class TestLeaderLease:
+    """Tests for the DB-backed lease."""
+
+    async def test_single_leader_and_renewal(self, test_db):
+        a, b = _replica(test_db, "a"), _replica(test_db, "b")
+
+        assert await a.try_acquire() is True
+        assert await b.try_acquire() is False
+        acquired_at = (await _row(test_db)).acquired_at
+
+        assert await a.try_acquire() is True  # Renovación
+        row = await _row(test_db)
+        assert row.holder == "a"
+        assert row.acquired_at == acquired_at
+        assert a.is_leader and not b.is_leader
+
+    async def test_failover_after_expiry(self, test_db):
+        a, b = _replica(test_db, "a"), _replica(test_db, "b")
+        await a.try_acquire()
+
+        await _expire(test_db)  # "a" dejó de renovar (proceso caído)
+
+        assert await b.try_acquire() is True
+        assert await a.try_acquire() is False
+        assert (await _row(test_db)).holder == "b"
+
+    async def test_release_hands_over_immediately(self, test_db):
+        a, b = _replica(test_db, "a"), _replica(test_db, "b")
+        await a.try_acquire()
+
+        await a.release()
+
+        assert not a.is_leader
+        assert await b.try_acquire() is True
+
+    async def test_db_error_keeps_unexpired_leadership(self, test_db):
+        a = _replica(test_db, "a")
+        await a.try_acquire()
+
+        a._session_factory = MagicMock(side_effect=RuntimeError("db down"))
+        assert await a.try_acquire() is True
+
+        a._expires_at = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=1)
+        assert await a.try_acquire() is False
+
+
+class TestLeaderOnlyJobs:
+    """Tests for the scheduler integration."""
+
+    async def test_followers_skip_leader_jobs(self, test_db):
+        job = AsyncMock(__name__="job")
+        leader, follower = _replica(test_db, "a"), _replica(test_db, "b")
+        await leader.try_acquire()
+        await follower.try_acquire()
+
+        with patch.object(tasks, "_lease", follower):
+            await tasks._run_as_leader(job, "bot")
+        job.assert_not_awaited()
+
+        with patch.object(tasks, "_lease", leader):
+            await tasks._run_as_leader(job, "bot")
+        job.assert_awaited_once_with("bot")
+
+    async def test_election_actions_run_once_per_term(self, test_db):
+        lease = _replica(test_db, "a")
+        cleanup = AsyncMock()
+        restore = AsyncMock()
+        resume = AsyncMock()
+
+        with patch.object(tasks, "_lease", lease), \
+                patch.object(tasks, "_leading", False), \
+                patch.object(tasks, "cleanup_expired_requests_after_restart", cleanup), \
+                patch.object(tasks, "restore_scheduled_posts", restore), \
+                patch.object(tasks, "resume_broadcasts", resume), \
+                patch.object(tasks, "get_session", test_db):
+            assert await tasks.lease_heartbeat("bot") is True
+            assert await tasks.lease_heartbeat("bot") is True
+            assert restore.await_count == 1
+
+            await _expire(test_db)
+            other = _replica(test_db, "b")
+            await other.try_acquire()
+            lease._expires_at = None  # Lease local vencido
+
+            assert await tasks.lease_heartbeat("bot") is False
+            assert tasks._leading is False
+
+            await other.release()
+            assert await tasks.lease_heartbeat("bot") is True
+
+        assert cleanup.await_count == 2
+        assert restore.await_count == 2
+        assert resume.await_count == 2  # Los broadcasts solo los reanuda el líder
@@ -0,0 +1,146 @@
+"""
+Tests for the shop catalog and ownership cache.
+
+Tests cover:
+- Warm catalog pages cost zero queries, ordered by price, grouped by tier
+- ORM writes (new product, toggle) invalidate the catalog
+- Owned content sets loaded once per user, refreshed after a purchase
+- Rolled back access records do not stay cached
+- validate_purchase loads product and content set in one query
+"""
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+
+from bot.database.enums import ContentTier, UserRole
+from bot.database.models import ContentSet, ShopProduct, User, UserContentAccess
+from bot.services.shop import ShopService
+from bot.services.shop_catalog import get_shop_catalog_cache
+
+
+@pytest.fixture(autouse=True)
+def _reset_cache():
+    get_shop_catalog_cache().clear()
+    yield
+    get_shop_catalog_cache().clear()
+
+
+@pytest.fixture
+def query_counter(test_session):
+    """Fixture: list collecting the SQL statements run on the test engine."""
+    statements = []
+    engine = test_session.bind.sync_engine
+
+    def _count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _count)
+    yield statements
+    event.remove(engine, "before_cursor_execute", _count)
+
+
+@pytest_asyncio.fixture
+async def catalog(test_session):
+    """Fixture: content set with four products (one inactive, one VIP)."""
+    content_set = ContentSet(name="Set", file_ids=["f1", "f2"])
+    test_session.add(content_set)
+    await test_session.flush()
+
+    test_session.add_all([
+        ShopProduct(name="Medio", content_set_id=content_set.id, besitos_price=50, tier=ContentTier.FREE),
+        ShopProduct(name="Barato", content_set_id=content_set.id, besitos_price=10, tier=ContentTier.FREE),
+        ShopProduct(name="VIP", content_set_id=content_set.id, besitos_price=30, tier=ContentTier.VIP),
+        ShopProduct(
+            name="Retirado", content_set_id=content_set.id, besitos_price=5,
+            tier=ContentTier.FREE, is_active=False
+        ),
+    ])
+    test_session.add(User(user_id=7001, first_name="Comprador", role=UserRole.FREE))
+    await test_session.commit()
+    return content_set
+
+
+class TestCatalogCache:
+    """Tests for cached catalog browsing."""
+
+    async def test_warm_pages_cost_no_queries(self, test_session, catalog, query_counter):
+        service = ShopService(test_session)
+
+        products, total = await service.browse_catalog(page=1, per_page=2)
+        assert [p.name for p in products] == ["Barato", "VIP"]
+        assert total == 3
+        loaded = len(query_counter)
+
+        products, _ = await service.browse_catalog(page=2, per_page=2)
+        assert [p.name for p in products] == ["Medio"]
+        assert len(query_counter) == loaded == 1
+
+    async def test_tier_filter(self, test_session, catalog):
+        products, total = await ShopService(test_session).browse_catalog(tier=ContentTier.VIP)
+
+        assert [p.name for p in products] == ["VIP"]
+        assert total == 1
+
+    async def test_orm_writes_invalidate(self, test_session, catalog):
+        service = ShopService(test_session)
+        await service.browse_catalog()
+
+        test_session.add(ShopProduct(
+            name="Nuevo", content_set_id=catalog.id, besitos_price=1, tier=ContentTier.FREE
+        ))
+        await test_session.commit()
+        products, total = await service.browse_catalog()
+        assert (products[0].name, total) == ("Nuevo", 4)
+
+        product = await test_session.get(ShopProduct, products[0].id)
+        product.is_active = False
+        await test_session.commit()
+        _, total = await service.browse_catalog()
+        assert total == 3
+
+
+class TestOwnershipCache:
+    """Tests for the per-user owned content sets."""
+
+    async def test_loaded_once_and_refreshed_on_purchase(self, test_session, catalog, query_counter):
+        service = ShopService(test_session)
+
+        assert not await service.check_ownership(7001, catalog.id)
+        assert not await service.check_ownership(7001, catalog.id)
+        assert len(query_counter) == 1
+
+        product = (await service.browse_catalog())[0][0]
+        success, status, _ = await service.purchase_product(7001, product.id)
+        assert (success, status) == (True, "success")
+
+        assert await service.check_ownership(7001, catalog.id)
+        assert catalog.id in await service.get_owned_content_set_ids(7001)
+
+    async def test_rollback_discards_uncommitted_access(self, test_session, catalog):
+        service = ShopService(test_session)
+        content_set_id = catalog.id
+
+        test_session.add(UserContentAccess(
+            user_id=7001, content_set_id=content_set_id, access_type="gift"
+        ))
+        await test_session.flush()
+        assert await service.check_ownership(7001, content_set_id)
+
+        await test_session.rollback()
+        assert not await service.check_ownership(7001, content_set_id)
+
+
+class TestValidatePurchase:
+    """Tests for the single-query purchase validation."""
+
+    async def test_product_and_content_set_in_one_query(self, test_session, catalog, query_counter):
+        service = ShopService(test_session)
+        await service.get_owned_content_set_ids(7001)
+        product = (await service.browse_catalog())[0][0]
+        query_counter.clear()
+
+        ok, reason, details = await service.validate_purchase(7001, product.id)
+
+        assert (ok, reason) == (True, "ok")
+        assert details["product"].content_set.id == catalog.id
+        assert len(query_counter) == 1
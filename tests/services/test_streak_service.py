@@ -312,6 +312,48 @@ class TestClaimDailyGift:
         assert result["success"] is True
         assert result["new_streak"] == 1
 
+    async def test_claim_existing_streak_single_update(self, streak_service, test_user):
+        """Test that an eligible existing streak is claimed without availability checks."""
+        streak = await streak_service._get_or_create_streak(
+            test_user.user_id, StreakType.DAILY_GIFT
+        )
+        streak.current_streak = 2
+        streak.longest_streak = 2
+        streak.last_claim_date = datetime.utcnow() - timedelta(days=1)
+        await streak_service.session.flush()
+
+        streak_service.can_claim_daily_gift = AsyncMock()
+
+        success, result = await streak_service.claim_daily_gift(user_id=test_user.user_id)
+
+        assert success is True
+        assert result["new_streak"] == 3
+        streak_service.can_claim_daily_gift.assert_not_called()
+
+    async def test_failed_credit_does_not_advance_streak(
+        self, streak_service, mock_wallet_service, test_user
+    ):
+        """Test that the streak update is rolled back when the wallet credit fails."""
+        streak = await streak_service._get_or_create_streak(
+            test_user.user_id, StreakType.DAILY_GIFT
+        )
+        streak.current_streak = 4
+        streak.longest_streak = 4
+        streak.last_claim_date = datetime.utcnow() - timedelta(days=1)
+        await streak_service.session.flush()
+
+        mock_wallet_service.earn_besitos.return_value = (False, "blocked", None)
+
+        success, result = await streak_service.claim_daily_gift(user_id=test_user.user_id)
+
+        assert success is False
+        assert result["error"] == "credit_failed: blocked"
+
+        info = await streak_service._get_streak_for_claim(test_user.user_id)
+        assert info[1] == 4  # current_streak unchanged
+        can_claim, _ = await streak_service.can_claim_daily_gift(test_user.user_id)
+        assert can_claim is True
+
 
 class TestGetStreakInfo:
     """Test get_streak_info method."""
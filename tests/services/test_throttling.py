@@ -0,0 +1,99 @@
+"""
+Tests for the per-user anti-flood middleware.
+
+Tests cover:
+- Token bucket: burst, refill over time, independent users and groups
+- Rule selection by callback_data prefix (reactions stricter)
+- Excess callbacks answered and dropped before the handler; admins exempt
+- Bounded bucket map
+"""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from aiogram.types import CallbackQuery, Update
+
+from bot.middlewares.throttling import ThrottleRule, ThrottlingMiddleware
+
+RULES = (
+    ThrottleRule("reactions", rate=0.5, burst=1, prefixes=("react:", "r:")),
+    ThrottleRule("callbacks", rate=1.0, burst=3),
+)
+
+
+def _callback_update(user_id, data):
+    callback = MagicMock(spec=CallbackQuery)
+    callback.from_user = MagicMock(id=user_id)
+    callback.data = data
+    callback.answer = AsyncMock()
+    update = MagicMock(spec=Update)
+    update.callback_query = callback
+    return update, callback
+
+
+def _clock(value):
+    return patch("bot.middlewares.throttling.time.monotonic", return_value=value)
+
+
+class TestBuckets:
+    """Tests for the token bucket and rule selection."""
+
+    def test_burst_then_refill(self):
+        middleware = ThrottlingMiddleware(RULES)
+        rule = RULES[1]
+
+        with _clock(100.0):
+            assert [middleware.allow(1, rule) for _ in range(4)] == [True, True, True, False]
+            assert middleware.allow(2, rule) is True  # Otro usuario, otro bucket
+        with _clock(101.0):
+            assert middleware.allow(1, rule) is True
+            assert middleware.allow(1, rule) is False
+
+    def test_rule_by_prefix(self):
+        middleware = ThrottlingMiddleware(RULES)
+        assert middleware.rule_for("react:42:🔥").name == "reactions"
+        assert middleware.rule_for("r:42:1").name == "reactions"
+        assert middleware.rule_for("shop_buy:3").name == "callbacks"
+        assert middleware.rule_for(None).name == "callbacks"
+
+    def test_bucket_map_is_bounded(self):
+        middleware = ThrottlingMiddleware(RULES, max_tracked=2)
+        for user_id in range(5):
+            middleware.allow(user_id, RULES[1])
+        assert middleware.stats()["tracked"] == 2
+
+
+class TestMiddleware:
+    """Tests for the outer middleware."""
+
+    async def test_excess_callbacks_dropped_with_answer(self):
+        middleware = ThrottlingMiddleware(RULES)
+        handler = AsyncMock(return_value="ok")
+
+        with _clock(100.0), patch("bot.middlewares.throttling.Config.is_admin", return_value=False):
+            first, _ = _callback_update(1, "react:1:🔥")
+            second, callback = _callback_update(1, "react:1:❤️")
+
+            assert await middleware(handler, first, {}) == "ok"
+            assert await middleware(handler, second, {}) is None
+
+            # Los botones generales tienen su propio bucket
+            menu, _ = _callback_update(1, "menu:main")
+            assert await middleware(handler, menu, {}) == "ok"
+
+        callback.answer.assert_awaited_once_with()
+        assert handler.await_count == 2
+        assert middleware.stats()["throttled"] == {"reactions": 1, "callbacks": 0}
+
+    async def test_admins_and_non_callbacks_pass(self):
+        middleware = ThrottlingMiddleware(RULES)
+        handler = AsyncMock()
+
+        with _clock(100.0), patch("bot.middlewares.throttling.Config.is_admin", return_value=True):
+            for _ in range(5):
+                update, _ = _callback_update(1, "react:1:🔥")
+                await middleware(handler, update, {})
+
+        message_update = MagicMock(spec=Update)
+        message_update.callback_query = None
+        await middleware(handler, message_update, {})
+
+        assert handler.await_count == 6
@@ -0,0 +1,211 @@
+"""
+Tests for the deep-link TokenGuard.
+
+Tests cover:
+- Negative cache (LRU bound, TTL, forget on generation)
+- Per-user attempt limiter
+- validate_token / redeem_vip_token skip the DB for cached rejections
+- DeepLinkGuardMiddleware drops invalid /start floods before the DB
+"""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from aiogram.types import Update
+from sqlalchemy import event
+
+from bot.middlewares.deep_link_guard import DeepLinkGuardMiddleware, extract_start_token
+from bot.services.subscription import SubscriptionService
+from bot.services.token_guard import TokenGuard, get_token_guard
+
+
+@pytest.fixture
+def guard():
+    """Provides the (cleared) singleton guard."""
+    return get_token_guard()
+
+
+def _count_queries(session):
+    """Attach a SELECT/UPDATE counter to the session engine; returns (list, remove_fn)."""
+    engine = session.bind.sync_engine
+    selects = []
+
+    def listener(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE")):
+            selects.append(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    return selects, lambda: event.remove(engine, "before_cursor_execute", listener)
+
+
+class TestNegativeCache:
+    """Tests for the rejected-token cache."""
+
+    def test_singleton(self):
+        assert TokenGuard() is get_token_guard()
+
+    def test_remember_and_forget(self, guard):
+        guard.remember_invalid("BADTOKEN")
+        assert guard.is_known_invalid("BADTOKEN") is True
+
+        guard.forget("BADTOKEN")
+        assert guard.is_known_invalid("BADTOKEN") is False
+
+    def test_bounded_lru(self, guard, monkeypatch):
+        monkeypatch.setattr(TokenGuard, "MAX_REJECTED", 3)
+        for token_str in ["A", "B", "C"]:
+            guard.remember_invalid(token_str)
+        guard.is_known_invalid("A")  # A pasa a ser el más reciente
+        guard.remember_invalid("D")
+
+        assert guard.stats()["rejected_tokens"] == 3
+        assert guard.is_known_invalid("B") is False
+        assert guard.is_known_invalid("A") is True
+
+    def test_entries_expire(self, guard, monkeypatch):
+        monkeypatch.setattr(TokenGuard, "REJECTED_TTL_SECONDS", -1)
+        guard.remember_invalid("OLDTOKEN")
+        assert guard.is_known_invalid("OLDTOKEN") is False
+
+    def test_well_formed(self, guard):
+        assert guard.is_well_formed("AbC_d-1234567890") is True
+        assert guard.is_well_formed("x" * 17) is False
+        assert guard.is_well_formed("<script>") is False
+        assert guard.is_well_formed("") is False
+
+
+class TestAttemptLimiter:
+    """Tests for the per-user limiter."""
+
+    def test_blocks_after_max_attempts(self, guard):
+        for _ in range(TokenGuard.MAX_ATTEMPTS - 1):
+            guard.record_failure(42)
+        assert guard.is_blocked(42) is False
+
+        guard.record_failure(42)
+        assert guard.is_blocked(42) is True
+        assert guard.is_blocked(43) is False
+
+    def test_reset_unblocks(self, guard):
+        for _ in range(TokenGuard.MAX_ATTEMPTS):
+            guard.record_failure(42)
+        guard.reset(42)
+        assert guard.is_blocked(42) is False
+
+    def test_attempts_leave_window(self, guard, monkeypatch):
+        for _ in range(TokenGuard.MAX_ATTEMPTS):
+            guard.record_failure(42)
+        monkeypatch.setattr(TokenGuard, "ATTEMPT_WINDOW_SECONDS", -1)
+        assert guard.is_blocked(42) is False
+
+
+class TestServiceIntegration:
+    """validate_token / redeem_vip_token use the negative cache."""
+
+    async def test_unknown_token_cached_after_first_lookup(self, test_session, mock_bot):
+        service = SubscriptionService(test_session, mock_bot)
+
+        is_valid, _, _ = await service.validate_token("NOPE000000000000")
+        assert is_valid is False
+
+        selects, remove = _count_queries(test_session)
+        try:
+            is_valid, _, token = await service.validate_token("NOPE000000000000")
+            success, _, _ = await service.redeem_vip_token("NOPE000000000000", 12345)
+        finally:
+            remove()
+
+        assert is_valid is False
+        assert token is None
+        assert success is False
+        assert selects == []
+
+    async def test_generated_token_is_forgotten(self, test_session, mock_bot, guard):
+        service = SubscriptionService(test_session, mock_bot)
+        token = await service.generate_vip_token(generated_by=1, duration_hours=24)
+        guard.remember_invalid(token.token)
+
+        tokens = await service.generate_vip_tokens(count=3, plan_id=None, generated_by=1)
+        for token_str in tokens:
+            assert guard.is_known_invalid(token_str) is False
+
+
+class TestDeepLinkGuardMiddleware:
+    """Middleware drops invalid floods before any DB middleware."""
+
+    @staticmethod
+    def _update(text, user_id=777):
+        return Update.model_validate({
+            "update_id": 1,
+            "message": {
+                "message_id": 1,
+                "date": 0,
+                "chat": {"id": user_id, "type": "private"},
+                "from": {"id": user_id, "is_bot": False, "first_name": "U"},
+                "text": text,
+            },
+        })
+
+    def test_extract_start_token(self):
+        update = self._update("/start ABC")
+        assert extract_start_token(update.message) == "ABC"
+        assert extract_start_token(self._update("/start").message) is None
+        assert extract_start_token(self._update("/help x").message) is None
+
+    async def test_cached_token_is_dropped(self, guard):
+        guard.remember_invalid("BADTOKEN12345678")
+        handler = AsyncMock()
+        bot = MagicMock()
+        bot.send_message = AsyncMock()
+
+        result = await DeepLinkGuardMiddleware()(
+            handler, self._update("/start BADTOKEN12345678"), {"bot": bot}
+        )
+
+        assert result is None
+        handler.assert_not_called()
+        bot.send_message.assert_awaited_once()
+        assert guard.stats()["tracked_users"] == 1
+
+    async def test_malformed_token_is_dropped(self):
+        handler = AsyncMock()
+        bot = MagicMock()
+        bot.send_message = AsyncMock()
+
+        await DeepLinkGuardMiddleware()(handler, self._update("/start ' OR 1=1 --"), {"bot": bot})
+
+        handler.assert_not_called()
+
+    async def test_blocked_user_is_dropped(self, guard):
+        for _ in range(TokenGuard.MAX_ATTEMPTS):
+            guard.record_failure(777)
+        handler = AsyncMock()
+        bot = MagicMock()
+        bot.send_message = AsyncMock()
+
+        await DeepLinkGuardMiddleware()(handler, self._update("/start GOODTOKEN1234567"), {"bot": bot})
+
+        handler.assert_not_called()
+        text = bot.send_message.call_args.args[1]
+        assert "Demasiados intentos" in text
+
+    async def test_plausible_token_passes(self):
+        handler = AsyncMock(return_value="ok")
+
+        result = await DeepLinkGuardMiddleware()(
+            handler, self._update("/start GOODTOKEN1234567"), {"bot": MagicMock()}
+        )
+
+        assert result == "ok"
+        handler.assert_awaited_once()
+
+    async def test_admin_is_not_filtered(self, guard):
+        for _ in range(TokenGuard.MAX_ATTEMPTS):
+            guard.record_failure(777)
+        handler = AsyncMock(return_value="ok")
+
+        with patch("bot.middlewares.deep_link_guard.Config.is_admin", return_value=True):
+            result = await DeepLinkGuardMiddleware()(
+                handler, self._update("/start BAD"), {"bot": MagicMock()}
+            )
+
+        assert result == "ok"
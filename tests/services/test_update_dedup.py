@@ -0,0 +1,55 @@
+"""
+Tests for duplicate update suppression.
+
+Tests cover:
+- RecentUpdateIds: duplicates inside the window, expiry, size bound
+- DuplicateUpdateMiddleware drops replays before the handler and counts them
+"""
+from unittest.mock import AsyncMock, patch
+
+from aiogram.types import Update
+
+from bot.middlewares.update_dedup import DuplicateUpdateMiddleware, RecentUpdateIds
+
+
+class TestRecentUpdateIds:
+    """Tests for the bounded time-windowed set."""
+
+    def test_detects_duplicates(self):
+        seen = RecentUpdateIds(window_seconds=60, max_ids=10)
+        assert seen.check_and_add(1) is True
+        assert seen.check_and_add(2) is True
+        assert seen.check_and_add(1) is False
+
+    def test_ids_expire_after_window(self):
+        seen = RecentUpdateIds(window_seconds=60, max_ids=10)
+        with patch("bot.middlewares.update_dedup.time.monotonic", return_value=1000.0):
+            seen.check_and_add(1)
+        with patch("bot.middlewares.update_dedup.time.monotonic", return_value=1061.0):
+            assert seen.check_and_add(1) is True
+        assert len(seen) == 1
+
+    def test_bounded_to_max_ids(self):
+        seen = RecentUpdateIds(window_seconds=60, max_ids=3)
+        for update_id in range(5):
+            seen.check_and_add(update_id)
+
+        assert len(seen) == 3
+        assert seen.check_and_add(0) is True  # El más antiguo salió del buffer
+        assert seen.check_and_add(4) is False
+
+
+class TestDuplicateUpdateMiddleware:
+    """Tests for the outer middleware."""
+
+    async def test_replayed_update_never_reaches_handler(self):
+        middleware = DuplicateUpdateMiddleware(window_seconds=60)
+        handler = AsyncMock(return_value="handled")
+        update = Update(update_id=500)
+
+        assert await middleware(handler, update, {}) == "handled"
+        assert await middleware(handler, update, {}) is None
+        assert await middleware(handler, Update(update_id=501), {}) == "handled"
+
+        assert handler.await_count == 2
+        assert middleware.stats() == {"suppressed": 1, "tracked": 2}
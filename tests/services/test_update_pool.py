@@ -0,0 +1,132 @@
+"""
+Tests for the sharded webhook update pool.
+
+Tests cover:
+- Shard key extraction (user, chat fallback, update_id fallback)
+- Per-user ordering with cross-user parallelism
+- Load shedding on a full shard, error isolation and metrics
+- Drain on close; webhook handler acknowledges before processing
+"""
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from bot.utils.update_pool import ShardedRequestHandler, UpdateWorkerPool, extract_shard_key
+
+
+def _message(update_id, user_id):
+    return {
+        "update_id": update_id,
+        "message": {"message_id": update_id, "from": {"id": user_id}, "chat": {"id": user_id}},
+    }
+
+
+class TestShardKey:
+    """Tests for extract_shard_key."""
+
+    def test_uses_author_then_chat_then_update_id(self):
+        assert extract_shard_key(_message(1, 77)) == 77
+        assert extract_shard_key({
+            "update_id": 2, "callback_query": {"id": "x", "from": {"id": 88}}
+        }) == 88
+        assert extract_shard_key({
+            "update_id": 3, "message_reaction": {"chat": {"id": -100}, "user": {"id": 99}}
+        }) == 99
+        assert extract_shard_key({
+            "update_id": 4, "channel_post": {"chat": {"id": -1001}}
+        }) == -1001
+        assert extract_shard_key({"update_id": 5}) == 5
+
+
+class TestUpdateWorkerPool:
+    """Tests for ordering, shedding and metrics."""
+
+    async def test_same_user_in_order_other_users_in_parallel(self):
+        processed = []
+        release = asyncio.Event()
+
+        async def process(update):
+            user_id = update["message"]["from"]["id"]
+            if user_id == 1:
+                await release.wait()  # Usuario 1 con un handler lento
+            processed.append((user_id, update["update_id"]))
+
+        pool = UpdateWorkerPool(process, shards=4)
+        for update_id in (1, 2, 3):
+            pool.submit(_message(update_id, user_id=1))
+        pool.submit(_message(10, user_id=2))
+
+        await asyncio.sleep(0.05)
+        assert processed == [(2, 10)]  # No espera al usuario lento
+
+        release.set()
+        await pool.close()
+        assert [u for u in processed if u[0] == 1] == [(1, 1), (1, 2), (1, 3)]
+
+    async def test_full_shard_sheds_updates(self):
+        release = asyncio.Event()
+
+        async def process(update):
+            await release.wait()
+
+        pool = UpdateWorkerPool(process, shards=1, max_queue=2)
+        results = [pool.submit(_message(i, user_id=1)) for i in range(5)]
+
+        # Cola de 2 y el worker aún no tomó nada: el resto se descarta
+        assert results == [True, True, False, False, False]
+        assert pool.stats()["shed"] == 3
+
+        release.set()
+        await pool.close()
+        assert pool.stats()["processed"] == 2
+
+    async def test_failures_are_isolated_and_measured(self):
+        async def process(update):
+            if update["update_id"] == 1:
+                raise RuntimeError("boom")
+
+        pool = UpdateWorkerPool(process, shards=1)
+        pool.submit(_message(1, user_id=1))
+        pool.submit(_message(2, user_id=1))
+        await pool.close()
+
+        shard = pool.stats()["shards"][0]
+        assert (shard["processed"], shard["failed"], shard["depth"]) == (1, 1, 0)
+        assert shard["max_depth"] >= 1
+        assert not pool.running
+        assert pool.submit(_message(3, user_id=1)) is False  # Cerrado
+
+    def test_rejects_invalid_sizes(self):
+        with pytest.raises(ValueError):
+            UpdateWorkerPool(MagicMock(), shards=0)
+
+
+class TestShardedRequestHandler:
+    """Tests for the aiohttp front-end."""
+
+    async def test_acknowledges_before_processing(self):
+        release = asyncio.Event()
+        fed = []
+
+        async def process(update):
+            await release.wait()
+            fed.append(update["update_id"])
+
+        bot = MagicMock()
+        bot.session.json_dumps = json.dumps
+        handler = ShardedRequestHandler(
+            dispatcher=MagicMock(), bot=bot, pool=UpdateWorkerPool(process, shards=2)
+        )
+
+        request = MagicMock()
+        request.json = AsyncMock(return_value=_message(7, user_id=5))
+
+        response = await handler._handle_request_background(bot, request)
+        assert response.status == 200
+        assert fed == []
+
+        release.set()
+        await handler.pool.close()
+        assert fed == [7]
@@ -0,0 +1,102 @@
+"""
+Tests for indexed user search (SQLite FTS5 path).
+
+Tests cover:
+- Triggers keep the FTS index in sync on insert/update/delete
+- Matches across username, first_name and last_name
+- Ranking: exact username, then prefix, then substring
+- Fuzzy completion for near misses, nothing for unrelated queries
+- Fallback to ILIKE when the index does not exist
+"""
+import pytest_asyncio
+
+from bot.database.enums import UserRole
+from bot.database.models import User
+from bot.database.search_index import create_user_search_index
+from bot.services.user_management import UserManagementService
+
+
+def _user(user_id, username, first_name, last_name=None):
+    return User(
+        user_id=user_id, username=username, first_name=first_name,
+        last_name=last_name, role=UserRole.FREE
+    )
+
+
+@pytest_asyncio.fixture
+async def indexed_session(test_session):
+    """Fixture: session whose database has the user search index."""
+    test_session.add(_user(4000, "preexisting", "Indexado"))
+    await test_session.commit()
+
+    await test_session.run_sync(lambda s: create_user_search_index(s.connection()))
+    await test_session.commit()
+    return test_session
+
+
+async def _search(session, mock_bot, query, limit=10):
+    service = UserManagementService(session, mock_bot)
+    return [user.user_id for user in await service.search_users(query, limit=limit)]
+
+
+class TestUserSearchIndex:
+    """Tests for the FTS5 search path."""
+
+    async def test_existing_users_are_backfilled(self, indexed_session, mock_bot):
+        assert await _search(indexed_session, mock_bot, "preexist") == [4000]
+
+    async def test_matches_names(self, indexed_session, mock_bot):
+        indexed_session.add_all([
+            _user(4001, None, "Carlos", "Gardel"),
+            _user(4002, "tango_fan", "Ana", "Carlota"),
+        ])
+        await indexed_session.commit()
+
+        assert set(await _search(indexed_session, mock_bot, "carl")) == {4001, 4002}
+        assert await _search(indexed_session, mock_bot, "carlos gardel") == [4001]
+
+    async def test_ranking_exact_then_prefix(self, indexed_session, mock_bot):
+        indexed_session.add_all([
+            _user(4010, "xmarco", "Otro"),
+            _user(4011, "marcos", "Otro"),
+            _user(4012, "marco", "Otro"),
+        ])
+        await indexed_session.commit()
+
+        assert await _search(indexed_session, mock_bot, "@marco") == [4012, 4011, 4010]
+
+    async def test_triggers_follow_updates_and_deletes(self, indexed_session, mock_bot):
+        user = _user(4020, "before_name", "Uno")
+        indexed_session.add(user)
+        await indexed_session.commit()
+
+        user.username = "after_name"
+        await indexed_session.commit()
+        assert await _search(indexed_session, mock_bot, "before") == []
+        assert await _search(indexed_session, mock_bot, "after") == [4020]
+
+        await indexed_session.delete(user)
+        await indexed_session.commit()
+        assert await _search(indexed_session, mock_bot, "after") == []
+
+    async def test_fuzzy_completion(self, indexed_session, mock_bot):
+        indexed_session.add(_user(4030, "johnny", "John"))
+        await indexed_session.commit()
+
+        assert await _search(indexed_session, mock_bot, "johnn") == [4030]
+        assert await _search(indexed_session, mock_bot, "johnx") == [4030]
+        assert await _search(indexed_session, mock_bot, "zzqqxx") == []
+
+
+class TestUserSearchFallback:
+    """Tests for the ILIKE path (no index)."""
+
+    async def test_like_searches_names_too(self, test_session, mock_bot):
+        test_session.add_all([
+            _user(4101, None, "Lucía", "Bermúdez"),
+            _user(4102, "100%_real", "Otro"),
+        ])
+        await test_session.commit()
+
+        assert await _search(test_session, mock_bot, "bermú") == [4101]
+        assert await _search(test_session, mock_bot, "%") == [4102]
@@ -0,0 +1,366 @@
+"""
+Tests for WalletService bulk airdrops.
+
+Tests cover:
+- Segment selection (active VIPs, min level, weekly reactors)
+- Set-based chunk crediting (balances, levels, transactions)
+- Idempotency by campaign key and resume from cursor
+- Duplicate keys roll back only their savepoint; exclusive runner claim
+- Campaigns left running by a dead process are released and resumed
+- Background runner progress reporting
+"""
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, func
+
+from bot.background.airdrop import run_airdrop
+from bot.database.enums import AirdropSegment, TransactionType
+from bot.database.models import (
+    User, UserGamificationProfile, Transaction, VIPSubscriber, InvitationToken, UserReaction
+)
+from bot.services.wallet import WalletService
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@pytest_asyncio.fixture
+async def wallet_service(test_session):
+    """Fixture: Provides WalletService with test session."""
+    return WalletService(test_session)
+
+
+@pytest_asyncio.fixture
+async def airdrop_users(test_session):
+    """Fixture: 5 users; 3 active VIPs (one expired), 2 with high level, 2 recent reactors."""
+    users = [
+        User(user_id=1000 + i, username=f"drop{i}", first_name=f"Drop{i}")
+        for i in range(5)
+    ]
+    test_session.add_all(users)
+    token = InvitationToken(token="AIRDROPTOKEN0001", generated_by=1, duration_hours=24)
+    test_session.add(token)
+    await test_session.flush()
+
+    for i, status in [(0, "active"), (1, "active"), (2, "active"), (3, "expired")]:
+        test_session.add(VIPSubscriber(
+            user_id=1000 + i,
+            expiry_date=_now() + timedelta(days=30),
+            status=status,
+            token_id=token.id
+        ))
+
+    test_session.add_all([
+        UserGamificationProfile(user_id=1003, balance=10, total_earned=2500, level=6),
+        UserGamificationProfile(user_id=1004, balance=0, total_earned=1600, level=5),
+        UserGamificationProfile(user_id=1000, balance=5, total_earned=5, level=1),
+    ])
+
+    test_session.add_all([
+        UserReaction(user_id=1001, content_id=1, channel_id="-100", emoji="❤️"),
+        UserReaction(user_id=1001, content_id=2, channel_id="-100", emoji="🔥"),
+        UserReaction(user_id=1004, content_id=1, channel_id="-100", emoji="❤️"),
+        UserReaction(
+            user_id=1002, content_id=3, channel_id="-100", emoji="❤️",
+            created_at=_now() - timedelta(days=10)
+        ),
+    ])
+    await test_session.commit()
+    return users
+
+
+async def _run_all_chunks(wallet, airdrop, chunk_size=2):
+    total = 0
+    while True:
+        credited = await wallet.credit_airdrop_chunk(airdrop, chunk_size=chunk_size)
+        if credited == 0:
+            return total
+        total += credited
+
+
+class TestCreateAirdrop:
+    """Tests for create_airdrop."""
+
+    async def test_create_airdrop(self, wallet_service):
+        success, status, airdrop = await wallet_service.create_airdrop(
+            campaign_key="promo1",
+            segment=AirdropSegment.ACTIVE_VIP,
+            amount=100,
+            reason="Promo",
+            admin_id=1
+        )
+
+        assert success is True
+        assert status == "created"
+        assert airdrop.status == "pending"
+        assert airdrop.last_user_id == 0
+
+    async def test_same_key_returns_existing(self, wallet_service):
+        _, _, first = await wallet_service.create_airdrop(
+            "promo1", AirdropSegment.ACTIVE_VIP, 100, "Promo", 1
+        )
+        success, status, second = await wallet_service.create_airdrop(
+            "promo1", AirdropSegment.WEEKLY_REACTORS, 999, "Other", 2
+        )
+
+        assert success is True
+        assert status == "exists"
+        assert second.id == first.id
+        assert second.amount == 100
+
+    async def test_duplicate_key_keeps_caller_work(self, wallet_service, test_session):
+        await wallet_service.create_airdrop("promo1", AirdropSegment.ACTIVE_VIP, 100, "Promo", 1)
+        test_session.add(User(user_id=4242, username="keep", first_name="Keep"))
+
+        # Simula la carrera: la clave no se ve en el SELECT previo al INSERT
+        with patch.object(wallet_service, "get_airdrop", AsyncMock(return_value=None)):
+            success, status, _ = await wallet_service.create_airdrop(
+                "promo1", AirdropSegment.ACTIVE_VIP, 100, "Promo", 2
+            )
+
+        assert (success, status) == (False, "exists")
+        await test_session.commit()
+        assert await test_session.get(User, 4242) is not None
+        assert await wallet_service.get_airdrop("promo1") is not None
+
+    async def test_rejects_invalid_amount(self, wallet_service):
+        success, status, airdrop = await wallet_service.create_airdrop(
+            "promo1", AirdropSegment.ACTIVE_VIP, 0, "Promo", 1
+        )
+        assert success is False
+        assert status == "invalid_amount"
+        assert airdrop is None
+
+    async def test_min_level_requires_level(self, wallet_service):
+        success, status, _ = await wallet_service.create_airdrop(
+            "promo1", AirdropSegment.MIN_LEVEL, 10, "Promo", 1
+        )
+        assert success is False
+        assert status == "invalid_level"
+
+
+class TestClaimAirdrop:
+    """Tests for the exclusive runner claim."""
+
+    async def test_claim_is_exclusive(self, wallet_service):
+        await wallet_service.create_airdrop("promo1", AirdropSegment.ACTIVE_VIP, 100, "Promo", 1)
+
+        claimed = await wallet_service.claim_airdrop("promo1")
+
+        assert claimed.status == "running"
+        assert await wallet_service.claim_airdrop("promo1") is None
+        assert await wallet_service.claim_airdrop("missing") is None
+
+    async def test_failed_campaign_can_be_reclaimed(self, wallet_service):
+        _, _, airdrop = await wallet_service.create_airdrop(
+            "promo1", AirdropSegment.ACTIVE_VIP, 100, "Promo", 1
+        )
+        airdrop.status = "failed"
+        await wallet_service.session.flush()
+
+        assert await wallet_service.claim_airdrop("promo1") is not None
+
+
+    async def test_interrupted_campaign_released_and_resumed(
+        self, test_db, test_session, airdrop_users
+    ):
+        wallet = WalletService(test_session)
+        await wallet.create_airdrop("vip_promo", AirdropSegment.ACTIVE_VIP, 100, "VIP promo", 1)
+        await wallet.create_airdrop("live", AirdropSegment.ACTIVE_VIP, 100, "Live", 1)
+        claimed = await wallet.claim_airdrop("vip_promo")
+        await wallet.credit_airdrop_chunk(claimed, chunk_size=2)
+        await wallet.claim_airdrop("live")
+        await test_session.commit()
+        # El proceso muere aquí: la campaña queda "running" con 2 acreditados
+
+        assert await wallet.fail_interrupted_airdrops(exclude_keys=["live"]) == 1
+        await test_session.commit()
+        assert (await wallet.get_airdrop("live")).status == "running"
+
+        @asynccontextmanager
+        async def fake_get_session():
+            async with test_db() as session:
+                yield session
+                await session.commit()
+
+        bot = MagicMock()
+        bot.edit_message_text = AsyncMock()
+
+        with patch("bot.background.airdrop.get_session", fake_get_session):
+            credited = await run_airdrop(bot, "vip_promo", chat_id=1, message_id=10)
+
+        assert credited == 3
+        count = await test_session.execute(
+            select(func.count()).select_from(Transaction)
+            .where(Transaction.type == TransactionType.EARN_ADMIN)
+        )
+        assert count.scalar_one() == 3
+
+
+class TestCreditAirdropChunk:
+    """Tests for set-based chunk crediting."""
+
+    async def test_active_vip_segment(self, wallet_service, test_session, airdrop_users):
+        _, _, airdrop = await wallet_service.create_airdrop(
+            "vip_promo", AirdropSegment.ACTIVE_VIP, 100, "VIP promo", 1
+        )
+        assert await wallet_service.count_airdrop_recipients(airdrop) == 3
+
+        credited = await _run_all_chunks(wallet_service, airdrop)
+
+        assert credited == 3
+        assert airdrop.status == "completed"
+        assert airdrop.credited_count == 3
+        assert await wallet_service.get_balance(1000) == 105
+        assert await wallet_service.get_balance(1001) == 100
+        assert await wallet_service.get_balance(1002) == 100
+        assert await wallet_service.get_balance(1003) == 10  # expired VIP
+
+    async def test_transactions_recorded_with_campaign_metadata(
+        self, wallet_service, test_session, airdrop_users
+    ):
+        _, _, airdrop = await wallet_service.create_airdrop(
+            "vip_promo", AirdropSegment.ACTIVE_VIP, 100, "VIP promo", 77
+        )
+        await _run_all_chunks(wallet_service, airdrop)
+
+        result = await test_session.execute(
+            select(Transaction).where(Transaction.user_id == 1001)
+        )
+        transactions = result.scalars().all()
+
+        assert len(transactions) == 1
+        tx = transactions[0]
+        assert tx.type == TransactionType.EARN_ADMIN
+        assert tx.amount == 100
+        assert tx.reason == "VIP promo"
+        assert tx.transaction_metadata == {
+            "admin_id": 77, "action": "airdrop", "campaign_key": "vip_promo"
+        }
+
+    async def test_min_level_segment(self, wallet_service, airdrop_users):
+        _, _, airdrop = await wallet_service.create_airdrop(
+            "lvl_promo", AirdropSegment.MIN_LEVEL, 50, "Level promo", 1, min_level=5
+        )
+        credited = await _run_all_chunks(wallet_service, airdrop)
+
+        assert credited == 2
+        assert await wallet_service.get_balance(1003) == 60
+        assert await wallet_service.get_balance(1004) == 50
+        assert await wallet_service.get_balance(1000) == 5
+
+    async def test_weekly_reactors_segment(self, wallet_service, airdrop_users):
+        _, _, airdrop = await wallet_service.create_airdrop(
+            "react_promo", AirdropSegment.WEEKLY_REACTORS, 20, "Reactors", 1
+        )
+        credited = await _run_all_chunks(wallet_service, airdrop)
+
+        # 1001 (two reactions, credited once) and 1004; 1002 reacted 10 days ago
+        assert credited == 2
+        assert await wallet_service.get_balance(1001) == 20
+        assert await wallet_service.get_balance(1004) == 20
+        assert await wallet_service.get_balance(1002) == 0
+
+    async def test_levels_updated_in_bulk(self, wallet_service, test_session, airdrop_users):
+        _, _, airdrop = await wallet_service.create_airdrop(
+            "big_promo", AirdropSegment.ACTIVE_VIP, 1000, "Big", 1
+        )
+        await _run_all_chunks(wallet_service, airdrop)
+
+        test_session.expire_all()
+        profile = await wallet_service.get_profile(1001)
+        assert profile.total_earned == 1000
+        assert profile.level == wallet_service._evaluate_level_formula(1000, None)
+        assert profile.level > 1
+
+    async def test_completed_campaign_is_not_recredited(self, wallet_service, airdrop_users):
+        _, _, airdrop = await wallet_service.create_airdrop(
+            "vip_promo", AirdropSegment.ACTIVE_VIP, 100, "VIP promo", 1
+        )
+        await _run_all_chunks(wallet_service, airdrop)
+
+        _, status, again = await wallet_service.create_airdrop(
+            "vip_promo", AirdropSegment.ACTIVE_VIP, 100, "VIP promo", 1
+        )
+        assert status == "exists"
+        assert await wallet_service.credit_airdrop_chunk(again) == 0
+        assert await wallet_service.get_balance(1001) == 100
+
+    async def test_resume_continues_from_cursor(self, wallet_service, test_session, airdrop_users):
+        _, _, airdrop = await wallet_service.create_airdrop(
+            "vip_promo", AirdropSegment.ACTIVE_VIP, 100, "VIP promo", 1
+        )
+        assert await wallet_service.credit_airdrop_chunk(airdrop, chunk_size=2) == 2
+        await test_session.commit()
+        assert airdrop.last_user_id == 1001
+
+        # Relanzar la misma clave: solo falta el tercer VIP
+        _, _, resumed = await wallet_service.create_airdrop(
+            "vip_promo", AirdropSegment.ACTIVE_VIP, 100, "VIP promo", 1
+        )
+        assert await wallet_service.count_airdrop_recipients(resumed) == 1
+        assert await _run_all_chunks(wallet_service, resumed) == 1
+
+        count = await test_session.execute(
+            select(func.count(Transaction.id)).where(Transaction.reason == "VIP promo")
+        )
+        assert count.scalar_one() == 3
+
+
+class TestAirdropRunner:
+    """Tests for the background runner."""
+
+    async def test_run_airdrop_reports_completion(self, test_db, test_session, airdrop_users):
+        wallet = WalletService(test_session)
+        await wallet.create_airdrop("vip_promo", AirdropSegment.ACTIVE_VIP, 100, "VIP promo", 1)
+        await test_session.commit()
+
+        @asynccontextmanager
+        async def fake_get_session():
+            async with test_db() as session:
+                yield session
+                await session.commit()
+
+        bot = MagicMock()
+        bot.edit_message_text = AsyncMock()
+
+        with patch("bot.background.airdrop.get_session", fake_get_session):
+            credited = await run_airdrop(bot, "vip_promo", chat_id=1, message_id=10, chunk_size=2)
+
+        assert credited == 3
+        final_text = bot.edit_message_text.call_args.kwargs["text"]
+        assert "completado" in final_text
+        assert "3</b> / 3" in final_text
+
+    async def test_run_airdrop_skips_campaign_claimed_elsewhere(
+        self, test_db, test_session, airdrop_users
+    ):
+        wallet = WalletService(test_session)
+        await wallet.create_airdrop("vip_promo", AirdropSegment.ACTIVE_VIP, 100, "VIP promo", 1)
+        await wallet.claim_airdrop("vip_promo")  # Otro proceso ya la ejecuta
+        await test_session.commit()
+
+        @asynccontextmanager
+        async def fake_get_session():
+            async with test_db() as session:
+                yield session
+                await session.commit()
+
+        bot = MagicMock()
+        bot.edit_message_text = AsyncMock()
+
+        with patch("bot.background.airdrop.get_session", fake_get_session):
+            credited = await run_airdrop(bot, "vip_promo", chat_id=1, message_id=10)
+
+        assert credited == 0
+        assert "ya está en curso" in bot.edit_message_text.call_args.kwargs["text"]
+        count = await test_session.execute(
+            select(func.count()).select_from(Transaction)
+            .where(Transaction.type == TransactionType.EARN_ADMIN)
+        )
+        assert count.scalar_one() == 0
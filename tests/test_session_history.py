@@ -304,3 +304,60 @@ class TestBaseMessageProviderIntegration:
             session_history=history
         )
         assert result in variants
+
+
+class TestSessionHistoryBounds:
+    """Test the user cap, idle sweep and process-wide instance."""
+
+    def test_lru_eviction_at_cap(self):
+        """Least recently active user is evicted when the cap is reached."""
+        history = SessionMessageHistory(ttl_seconds=300, max_users=2)
+
+        history.add_entry(user_id=1, method_name="greeting", variant_index=0)
+        history.add_entry(user_id=2, method_name="greeting", variant_index=0)
+        history.add_entry(user_id=1, method_name="greeting", variant_index=1)  # 1 touched
+        history.add_entry(user_id=3, method_name="greeting", variant_index=0)
+
+        assert list(history._sessions) == [1, 3]
+        assert history.get_recent_variants(1, "greeting") == [1, 0]
+        assert history.get_stats()["evicted_users"] == 1
+
+    def test_sweep_drops_only_idle_sessions(self):
+        """Sweep removes sessions whose last entry expired and keeps live ones."""
+        history = SessionMessageHistory(ttl_seconds=300)
+
+        history.add_entry(user_id=1, method_name="greeting", variant_index=0)
+        history.add_entry(user_id=2, method_name="greeting", variant_index=0)
+        history.add_entry(user_id=3, method_name="greeting", variant_index=0)
+        for user_id in (1, 2):
+            history._sessions[user_id][-1].timestamp -= 600
+
+        assert history.sweep_expired() == 2
+        assert list(history._sessions) == [3]
+
+        stats = history.get_stats()
+        assert stats["expired_users"] == 2
+        assert stats["sweeps"] == 1
+
+    def test_memory_estimate_grows_with_users(self):
+        """Memory estimate is reported and grows with tracked users."""
+        history = SessionMessageHistory(ttl_seconds=300)
+        empty = history.get_stats()["memory_bytes"]
+
+        for user_id in range(50):
+            history.add_entry(user_id=user_id, method_name="greeting", variant_index=0)
+
+        assert history.get_stats()["memory_bytes"] > empty
+
+    def test_process_wide_instance(self):
+        """Containers share the same history across updates."""
+        from unittest.mock import MagicMock
+
+        from bot.services.container import ServiceContainer
+        from bot.services.message.session_history import get_session_history
+
+        first = ServiceContainer(MagicMock(), MagicMock())
+        second = ServiceContainer(MagicMock(), MagicMock())
+
+        assert first.session_history is second.session_history
+        assert first.session_history is get_session_history()
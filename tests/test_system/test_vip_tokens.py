@@ -307,3 +307,101 @@ async def test_redeem_token_extends_existing_vip(test_session, mock_bot):
     # Verify subscription was extended (same subscriber, new expiry)
     assert sub1.id == sub2.id
     assert sub2.expiry_date > original_expiry
+
+
+async def test_generate_vip_tokens_batch(test_session, mock_bot):
+    """Verify a batch of tokens is inserted in a single statement."""
+    from sqlalchemy import event, func
+
+    subscription_service = SubscriptionService(test_session, mock_bot)
+
+    statements = []
+    engine = test_session.bind.sync_engine
+
+    def count_insert(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("INSERT"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count_insert)
+    try:
+        tokens = await subscription_service.generate_vip_tokens(
+            count=200,
+            plan_id=None,
+            generated_by=123456789,
+            duration_hours=48
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", count_insert)
+    await test_session.commit()
+
+    assert len(tokens) == 200
+    assert len(set(tokens)) == 200
+    assert all(len(t) == 16 for t in tokens)
+    assert len(statements) == 1
+
+    result = await test_session.execute(
+        select(func.count(InvitationToken.id)).where(InvitationToken.duration_hours == 48)
+    )
+    assert result.scalar_one() == 200
+
+
+async def test_generate_vip_tokens_retries_collisions(test_session, mock_bot, monkeypatch):
+    """Verify colliding candidates are skipped and regenerated."""
+    existing = InvitationToken(token="A" * 16, generated_by=1, duration_hours=24)
+    test_session.add(existing)
+    await test_session.commit()
+
+    candidates = iter(["A" * 16, "B" * 16, "C" * 16])
+    monkeypatch.setattr(
+        "bot.services.subscription.secrets.token_urlsafe",
+        lambda n: next(candidates)
+    )
+
+    subscription_service = SubscriptionService(test_session, mock_bot)
+    tokens = await subscription_service.generate_vip_tokens(
+        count=2, plan_id=None, generated_by=123456789
+    )
+
+    assert sorted(tokens) == ["B" * 16, "C" * 16]
+
+
+async def test_generate_vip_tokens_rejects_invalid_count(test_session, mock_bot):
+    """Verify batch size is bounded."""
+    subscription_service = SubscriptionService(test_session, mock_bot)
+
+    with pytest.raises(ValueError):
+        await subscription_service.generate_vip_tokens(
+            count=0, plan_id=None, generated_by=123456789
+        )
+    with pytest.raises(ValueError):
+        await subscription_service.generate_vip_tokens(
+            count=10_000, plan_id=None, generated_by=123456789
+        )
+
+
+async def test_generate_entry_token_stores_token(test_session, mock_bot):
+    """Verify the stage 3 entry token is stored with a single UPDATE."""
+    from bot.services.vip_entry import VIPEntryService
+
+    token = InvitationToken(token="E" * 16, generated_by=1, duration_hours=24)
+    test_session.add_all([User(user_id=555001, first_name="Entry"), token])
+    await test_session.flush()
+    subscriber = VIPSubscriber(
+        user_id=555001,
+        expiry_date=datetime.utcnow() + timedelta(days=30),
+        token_id=token.id
+    )
+    test_session.add(subscriber)
+    await test_session.commit()
+
+    entry_service = VIPEntryService(test_session, mock_bot)
+    entry_token = await entry_service.generate_entry_token(555001)
+
+    assert len(entry_token) == 64
+    result = await test_session.execute(
+        select(VIPSubscriber.vip_entry_token).where(VIPSubscriber.user_id == 555001)
+    )
+    assert result.scalar_one() == entry_token
+
+    with pytest.raises(RuntimeError):
+        await entry_service.generate_entry_token(999999)
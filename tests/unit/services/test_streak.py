@@ -459,6 +459,43 @@ class TestBackgroundJobs:
         )
         assert streak.current_streak == 0
 
+    async def test_expire_only_touches_own_type(self, streak_service, test_user):
+        """Daily gift expiration leaves reaction streaks untouched."""
+        gift = await streak_service._get_or_create_streak(
+            test_user.user_id, StreakType.DAILY_GIFT
+        )
+        gift.current_streak = 3
+        gift.last_claim_date = datetime.utcnow() - timedelta(days=2)
+        reaction = await streak_service._get_or_create_streak(
+            test_user.user_id, StreakType.REACTION
+        )
+        reaction.current_streak = 4
+        reaction.last_reaction_date = datetime.utcnow() - timedelta(days=2)
+        await streak_service.session.flush()
+
+        reset_count = await streak_service.process_streak_expirations()
+
+        assert reset_count == 1
+        assert gift.current_streak == 0
+        assert reaction.current_streak == 4
+
+    async def test_expire_logs_users_only_at_debug(self, streak_service, test_user, caplog):
+        """Per-user log lines are emitted only when DEBUG is enabled."""
+        streak = await streak_service._get_or_create_streak(
+            test_user.user_id, StreakType.DAILY_GIFT
+        )
+        streak.current_streak = 5
+        streak.last_claim_date = datetime.utcnow() - timedelta(days=2)
+        await streak_service.session.flush()
+
+        with caplog.at_level("DEBUG", logger="bot.services.streak"):
+            reset_count = await streak_service.process_streak_expirations()
+
+        assert reset_count == 1
+        debug_lines = [r for r in caplog.records if r.levelname == "DEBUG"]
+        assert len(debug_lines) == 1
+        assert str(test_user.user_id) in debug_lines[0].getMessage()
+
 
 class TestResetStreak:
     """Test reset_streak method."""